@@ -0,0 +1,238 @@
+"""
+Background Sentiment Refresher
+Keeps per-symbol sentiment warm off the event loop (stale-while-revalidate)
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from ai.sentiment_analyzer import SentimentScore
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_symbol(symbol: str) -> str:
+    """Base asset used by the collectors: 'BTCUSDT' / 'BTC/USDT' -> 'BTC'"""
+    base = symbol.upper().replace('/USDT', '')
+    return base[:-4] if base.endswith('USDT') and len(base) > 4 else base
+
+
+class SentimentRefresher:
+    """
+    Asyncio service that refreshes sentiment per symbol ahead of expiry
+
+    Collection (RSS, Reddit) and LLM scoring are blocking, so each refresh
+    runs in the default thread pool. Callers are served the cached score even
+    when it is stale, and a refresh is scheduled in the background. Refreshes
+    are single-flight: concurrent requests for a symbol share one fetch.
+
+    All refresh bookkeeping runs on the event loop thread; request() may be
+    called from any thread.
+    """
+
+    def __init__(self, ttl: int = 3600, refresh_ahead: int = 300,
+                 check_interval: int = 60, max_concurrent: int = 2,
+                 max_results: int = 10,
+                 fetcher: Optional[Callable[[str], Optional[SentimentScore]]] = None):
+        """
+        Args:
+            ttl: Age in seconds after which a score is stale
+            refresh_ahead: Refresh tracked symbols this many seconds before expiry
+            check_interval: Seconds between expiry sweeps
+            max_concurrent: Maximum refreshes running at once
+            max_results: Headlines / posts collected per source
+            fetcher: Blocking symbol -> SentimentScore callable (defaults to
+                news + Reddit collection scored by sentiment_analyzer)
+        """
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.check_interval = check_interval
+        self.max_results = max_results
+        self.fetcher = fetcher or self._collect_and_score
+
+        # symbol -> (score or None when no data, monotonic fetch time)
+        self._scores: Dict[str, Tuple[Optional[SentimentScore], float]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._tracked: set = set()
+
+        self._max_concurrent = max_concurrent
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.fetches = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, symbols: Iterable[str] = ()):
+        """Start the background sweep (idempotent) and track the given symbols"""
+        for symbol in symbols:
+            self._tracked.add(normalize_symbol(symbol))
+
+        if self.running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Sentiment refresher started for {sorted(self._tracked)}")
+
+    async def stop(self):
+        """Stop the sweep and cancel refreshes in flight"""
+        tasks = [self._task] if self._task else []
+        tasks.extend(self._inflight.values())
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._task = None
+        self._inflight.clear()
+        logger.info("Sentiment refresher stopped")
+
+    def peek(self, symbol: str) -> Tuple[Optional[SentimentScore], Optional[float]]:
+        """
+        Cached score and its age in seconds, without fetching
+
+        Returns:
+            (score, age); (None, None) if the symbol was never fetched
+        """
+        entry = self._scores.get(normalize_symbol(symbol))
+        if entry is None:
+            return None, None
+        score, fetched_at = entry
+        return score, time.monotonic() - fetched_at
+
+    def request(self, symbol: str) -> Tuple[Optional[SentimentScore], Optional[float]]:
+        """
+        Non-blocking read for synchronous callers (e.g. strategies)
+
+        Returns the cached score (possibly stale) and schedules a background
+        refresh when it is missing or past refresh_ahead of expiry.
+        """
+        key = normalize_symbol(symbol)
+        self._tracked.add(key)
+        score, age = self.peek(key)
+
+        if self._needs_refresh(age) and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._refresh, key)
+
+        return score, age
+
+    async def get(self, symbol: str, wait: bool = True) -> Optional[SentimentScore]:
+        """
+        Sentiment for a symbol, fetching only when nothing is cached
+
+        Args:
+            symbol: Trading symbol
+            wait: Await the first fetch when nothing is cached; with False
+                a refresh is scheduled and None returned
+
+        Returns:
+            SentimentScore (possibly stale while revalidating) or None
+        """
+        key = normalize_symbol(symbol)
+        self._tracked.add(key)
+        self._loop = self._loop or asyncio.get_running_loop()
+        score, age = self.peek(key)
+
+        if age is not None:
+            if self._needs_refresh(age):
+                self._refresh(key)
+            return score
+
+        future = self._refresh(key)
+        if not wait:
+            return None
+        return await asyncio.shield(future)
+
+    def _needs_refresh(self, age: Optional[float]) -> bool:
+        return age is None or age >= self.ttl - self.refresh_ahead
+
+    def _refresh(self, key: str) -> asyncio.Future:
+        """Start a refresh for key unless one is already in flight"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrent)
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(key))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return future
+
+    async def _fetch(self, key: str) -> Optional[SentimentScore]:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            self.fetches += 1
+            started = time.monotonic()
+
+            try:
+                score = await loop.run_in_executor(None, self.fetcher, key)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Sentiment refresh failed for {key}: {e}")
+                # Keep serving the previous score; retried on the next sweep
+                previous = self._scores.get(key)
+                return previous[0] if previous else None
+
+            self._scores[key] = (score, time.monotonic())
+            logger.info(f"Refreshed sentiment for {key} in {time.monotonic() - started:.1f}s")
+            return score
+
+    async def _run(self):
+        """Periodically refresh tracked symbols that are close to expiry"""
+        while True:
+            for key in list(self._tracked):
+                _, age = self.peek(key)
+                if self._needs_refresh(age):
+                    self._refresh(key)
+            await asyncio.sleep(self.check_interval)
+
+    def _collect_and_score(self, symbol: str) -> Optional[SentimentScore]:
+        """Blocking collection + LLM scoring (runs in a worker thread)"""
+        from ai.data_collectors import news_collector, reddit_collector
+        from ai.sentiment_analyzer import sentiment_analyzer
+
+        news_headlines = news_collector.collect_headlines(symbol, hours=24, max_results=self.max_results)
+        reddit_posts = reddit_collector.collect_posts(symbol, hours=24, max_results=self.max_results)
+
+        logger.info(f"Collected {len(news_headlines)} news + {len(reddit_posts)} reddit posts for {symbol}")
+
+        if not news_headlines and not reddit_posts:
+            return None
+
+        return sentiment_analyzer.get_market_sentiment(
+            symbol=symbol,
+            news_headlines=news_headlines,
+            reddit_posts=reddit_posts
+        )
+
+    def stats(self) -> Dict:
+        """Get refresher statistics"""
+        return {
+            'running': self.running,
+            'tracked': sorted(self._tracked),
+            'cached': {key: round(time.monotonic() - fetched_at) for key, (_, fetched_at) in self._scores.items()},
+            'inflight': sorted(self._inflight),
+            'fetches': self.fetches,
+            'failures': self.failures
+        }
+
+
+# Global sentiment refresher
+_sentiment_refresher: Optional[SentimentRefresher] = None
+
+def get_sentiment_refresher() -> SentimentRefresher:
+    """Get the global sentiment refresher"""
+    global _sentiment_refresher
+
+    if _sentiment_refresher is None:
+        # 3 results per source keeps cold refreshes as fast as the API's
+        # previous inline collection
+        _sentiment_refresher = SentimentRefresher(max_results=3)
+
+    return _sentiment_refresher
@@ -41,6 +41,7 @@ try:
     from ai.sentiment_analyzer import sentiment_analyzer
     from ai.data_collectors import news_collector, reddit_collector
     from ai.market_commentary import market_commentary
+    from ai.sentiment_refresher import get_sentiment_refresher
     AI_AVAILABLE = True
     logger.info("AI modules loaded successfully")
 except ImportError as e:
@@ -49,6 +50,7 @@ except ImportError as e:
     news_collector = None
     reddit_collector = None
     market_commentary = None
+    get_sentiment_refresher = None
     AI_AVAILABLE = False
 
 # Initialize global variables
@@ -141,6 +143,14 @@ async def startup_event():
     else:
         logger.info("Skipping live data feed - no valid API keys configured")
     
+    # Keep AI sentiment warm for the dashboard, with or without the engine
+    if AI_AVAILABLE:
+        try:
+            symbols = trading_engine.symbols if trading_engine else ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+            await get_sentiment_refresher().start(symbols)
+        except Exception as e:
+            logger.warning(f"Could not start sentiment refresher: {e}")
+
     logger.info("API startup completed with graceful handling")
     
     # Get the data feed manager reference safely
@@ -362,6 +372,10 @@ async def shutdown_event():
     # Stop data feed
     await stop_live_feed()
     
+    # Stop background sentiment refresh
+    if AI_AVAILABLE:
+        await get_sentiment_refresher().stop()
+    
     print("AI Trading Bot API shut down successfully!")
 
 @app.get("/api/portfolio")
@@ -1192,43 +1206,27 @@ async def get_ai_sentiment_full(symbol: str):
         }
 
     try:
-        logger.info(f"Getting FULL AI sentiment for {symbol} (this may take 30+ seconds)")
+        logger.info(f"Getting FULL AI sentiment for {symbol}")
 
-        # Collect data (reduced limits for speed)
-        news = news_collector.collect_headlines(symbol, hours=24, max_results=3)
-        reddit = reddit_collector.collect_posts(symbol, hours=24, max_results=3)
-        
-        logger.info(f"Collected {len(news)} news and {len(reddit)} reddit posts")
-        
-        # If no data, return neutral
-        if not news and not reddit:
-            return {
-                "symbol": symbol,
-                "sentiment": 0.0,
-                "confidence": 0.0,
-                "reason": "No recent news or social media data available",
-                "sources": [],
-                "timestamp": datetime.now().isoformat()
-            }
-        
-        # Analyze sentiment with real LLM (this is slow - 20-40 seconds)
-        sentiment = sentiment_analyzer.get_market_sentiment(
-            symbol=symbol,
-            news_headlines=news,
-            reddit_posts=reddit
-        )
+        # Served from the shared refresher: a cached (possibly stale) score is
+        # returned immediately; only a cold symbol waits for collection + LLM
+        # (20-40 seconds), and concurrent callers share that single fetch
+        refresher = get_sentiment_refresher()
+        sentiment = await refresher.get(symbol)
+        _, age = refresher.peek(symbol)
         
         if sentiment:
             result = sentiment.to_dict()
             result["mode"] = "full_ai"
             result["llm_model"] = "llama3.2:3b"
+            result["age_seconds"] = round(age) if age is not None else None
             return result
         else:
             return {
                 "symbol": symbol,
                 "sentiment": 0.0,
                 "confidence": 0.0,
-                "reason": "Sentiment analysis failed",
+                "reason": "No recent news or social media data available",
                 "sources": [],
                 "timestamp": datetime.now().isoformat()
             }
@@ -1395,9 +1393,11 @@ async def get_daily_commentary_full():
         # Get market sentiment for major positions
         market_sentiment = {}
         if position_details:
-            # For now, use simple placeholder - could enhance with real sentiment later
+            # Cached sentiment only; cold symbols are neutral and queued for refresh
+            refresher = get_sentiment_refresher()
             for p in position_details[:3]:  # Top 3 positions
-                market_sentiment[p["symbol"]] = 0.0  # Neutral
+                score = await refresher.get(p["symbol"], wait=False)
+                market_sentiment[p["symbol"]] = score.sentiment if score else 0.0
         
         # Generate real LLM commentary
         logger.info("Calling Ollama LLM for daily commentary...")
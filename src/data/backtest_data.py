@@ -0,0 +1,412 @@
+"""
+Backtest Data Provider
+float64 OHLCV arrays for (symbol, timeframe, range) with in-memory LRU and on-disk columnar caches
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Candles newer than this may still be rewritten (the aggregator saves a
+# candle after its period closes), so they are re-fetched on the next top-up
+SETTLE_PERIOD = timedelta(minutes=15)
+
+DEFAULT_CACHE_DIR = os.getenv(
+    'BACKTEST_CACHE_DIR',
+    os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'cache', 'candles')
+)
+
+# Coverage bounds for open-ended requests
+_MIN_NS = np.iinfo(np.int64).min
+_MAX_NS = np.iinfo(np.int64).max
+
+
+def _to_ns(value) -> int:
+    """UTC nanoseconds for a datetime / Timestamp (naive values are local time, like datetime.now())"""
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize(datetime.now().astimezone().tzinfo)
+    return int(stamp.tz_convert('UTC').as_unit('ns').value)
+
+
+@dataclass
+class CandleArrays:
+    """
+    OHLCV candles as parallel arrays
+
+    timestamp: UTC nanoseconds (int64), ascending
+    open / high / low / close / volume: float64
+    """
+    symbol: str
+    timeframe: str
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @classmethod
+    def empty(cls, symbol: str, timeframe: str) -> 'CandleArrays':
+        return cls(symbol, timeframe, np.empty(0, dtype=np.int64), *(np.empty(0) for _ in COLUMNS))
+
+    def between(self, start_ns: int, end_ns: int) -> 'CandleArrays':
+        """Candles with start_ns <= timestamp <= end_ns (views, no copy)"""
+        lo = np.searchsorted(self.timestamp, start_ns, side='left')
+        hi = np.searchsorted(self.timestamp, end_ns, side='right')
+        return CandleArrays(self.symbol, self.timeframe, self.timestamp[lo:hi],
+                            *(getattr(self, column)[lo:hi] for column in COLUMNS))
+
+    def to_frame(self, style: str = 'short', index: bool = True) -> pd.DataFrame:
+        """
+        DataFrame view for strategies
+
+        Args:
+            style: 'short' (open/high/low/close), 'price' (open_price/...
+                /close_price) or 'both'
+            index: Timestamps as a DatetimeIndex; otherwise a 'timestamp'
+                column with a RangeIndex
+
+        Returns:
+            DataFrame with volume and UTC timestamps
+        """
+        if style not in ('short', 'price', 'both'):
+            raise ValueError(f"Unknown frame style '{style}'")
+
+        columns = {}
+        for column in COLUMNS[:4]:
+            values = getattr(self, column)
+            if style in ('short', 'both'):
+                columns[column] = values
+            if style in ('price', 'both'):
+                columns[f'{column}_price'] = values
+        columns['volume'] = self.volume
+
+        timestamps = pd.DatetimeIndex(self.timestamp.astype('datetime64[ns]'), name='timestamp').tz_localize('UTC')
+        if index:
+            return pd.DataFrame(columns, index=timestamps)
+
+        return pd.DataFrame({'timestamp': timestamps, **columns})
+
+
+def _concat(parts, symbol: str, timeframe: str) -> CandleArrays:
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return CandleArrays.empty(symbol, timeframe)
+    return CandleArrays(
+        symbol, timeframe,
+        np.concatenate([part.timestamp for part in parts]),
+        *(np.concatenate([getattr(part, column) for part in parts]) for column in COLUMNS)
+    )
+
+
+class _CacheEntry:
+    """Cached candles plus the time range known to be complete"""
+
+    def __init__(self, candles: CandleArrays, covered_from: int, covered_until: int):
+        self.candles = candles
+        self.covered_from = covered_from
+        self.covered_until = covered_until
+        self.topped_up_at = time.monotonic()
+
+
+class BacktestDataProvider:
+    """
+    Single source of historical candles for backtests, optimizers and training
+
+    Requests are served from an in-memory LRU of per-(symbol, timeframe)
+    arrays, then from a columnar file cache (one .npy file per column), and
+    only the missing part of the range is queried from the database: older
+    history is prepended, newer rows are topped up incrementally. Numeric
+    columns are cast to float in SQL, so no per-row Decimal conversion.
+
+    MarketData has no timeframe column; timeframe only namespaces the
+    caches and rows are returned as stored.
+
+    Returned arrays are shared with the cache and must be treated as read-only.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, max_entries: int = 16,
+                 refresh_interval: float = 60, session_factory: Optional[Callable] = None,
+                 store=None):
+        """
+        Args:
+            cache_dir: Directory of the on-disk cache (None disables it)
+            max_entries: (symbol, timeframe) series kept in memory
+            refresh_interval: Seconds before requests reaching past the
+                settled range top up again (repeated "last N days" backtests
+                within this interval are served from memory)
+            session_factory: Callable returning a SQLAlchemy session
+                (defaults to data.database.get_db_sync)
+            store: CandleStore to serve candles from instead of the
+                database and caches (memory-mapped, no query)
+        """
+        self.cache_dir = os.path.abspath(cache_dir) if cache_dir else None
+        self.max_entries = max_entries
+        self.refresh_interval = refresh_interval
+        self.session_factory = session_factory
+        self.store = store
+
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_loads = 0
+        self.queries = 0
+        self.rows_fetched = 0
+
+    def get(self, symbol: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+            timeframe: str = '5m', session=None) -> CandleArrays:
+        """
+        Candles for symbol between start and end (inclusive, open-ended if None)
+
+        Args:
+            symbol: Symbol as stored (e.g. 'BTC/USDT' or 'BTCUSDT')
+            start: First timestamp (None = all history)
+            end: Last timestamp (None = now)
+            timeframe: Cache namespace, e.g. '5m'
+            session: Session to use for any database query (optional)
+
+        Returns:
+            CandleArrays (read-only views into the cache)
+        """
+        if self.store is not None:
+            return self.store.read(symbol, timeframe, start, end)
+
+        start_ns = _to_ns(start) if start is not None else _MIN_NS
+        end_ns = _to_ns(end if end is not None else datetime.now())
+
+        with self._lock:
+            entry = self._entry(symbol, timeframe)
+
+            if entry is not None and entry.covered_from <= start_ns and (
+                    end_ns <= entry.covered_until
+                    or time.monotonic() - entry.topped_up_at < self.refresh_interval):
+                self.memory_hits += 1
+            else:
+                entry = self._fill(symbol, timeframe, entry, start_ns, end_ns, session)
+
+            return entry.candles.between(start_ns, end_ns)
+
+    def lookback(self, symbol: str, days: float, timeframe: str = '5m', session=None) -> CandleArrays:
+        """Candles for the last `days` days"""
+        end = datetime.now()
+        return self.get(symbol, end - timedelta(days=days), end, timeframe, session)
+
+    def get_frame(self, symbol: str, lookback_days: Optional[float] = None,
+                  start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  timeframe: str = '5m', style: str = 'short', index: bool = True,
+                  session=None) -> Optional[pd.DataFrame]:
+        """
+        Candles as a DataFrame (see CandleArrays.to_frame), None if there are none
+
+        Args:
+            lookback_days: Last N days (overrides start / end)
+        """
+        if lookback_days is not None:
+            candles = self.lookback(symbol, lookback_days, timeframe, session)
+        else:
+            candles = self.get(symbol, start, end, timeframe, session)
+
+        if len(candles) == 0:
+            return None
+        return candles.to_frame(style=style, index=index)
+
+    def invalidate(self, symbol: Optional[str] = None, timeframe: Optional[str] = None,
+                   disk: bool = False):
+        """Drop cached series from memory (and disk when disk=True)"""
+        with self._lock:
+            for key in list(self._entries):
+                if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe):
+                    del self._entries[key]
+                    if disk and self.cache_dir and os.path.isdir(self._series_dir(*key)):
+                        for name in os.listdir(self._series_dir(*key)):
+                            os.remove(os.path.join(self._series_dir(*key), name))
+
+    def _entry(self, symbol: str, timeframe: str) -> Optional[_CacheEntry]:
+        key = (symbol, timeframe)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        entry = self._load_disk(symbol, timeframe)
+        if entry is not None:
+            self.disk_loads += 1
+            self._store(key, entry)
+        return entry
+
+    def _store(self, key: Tuple[str, str], entry: _CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _fill(self, symbol: str, timeframe: str, entry: Optional[_CacheEntry],
+              start_ns: int, end_ns: int, session) -> _CacheEntry:
+        """Query only the parts of [start_ns, end_ns] the cache does not cover"""
+        settled_ns = _to_ns(datetime.now() - SETTLE_PERIOD)
+
+        if entry is None:
+            candles = self._query(symbol, timeframe, start_ns, end_ns, session)
+            entry = _CacheEntry(candles, start_ns, min(end_ns, settled_ns))
+        else:
+            parts = [entry.candles]
+
+            if start_ns < entry.covered_from:
+                # Older history: rows before the covered range
+                older = self._query(symbol, timeframe, start_ns, entry.covered_from - 1, session)
+                parts.insert(0, older)
+                entry.covered_from = start_ns
+
+            if end_ns > entry.covered_until:
+                # Incremental top-up: replace everything after the settled mark
+                newer = self._query(symbol, timeframe, entry.covered_until + 1, end_ns, session)
+                parts[-1] = parts[-1].between(_MIN_NS, entry.covered_until)
+                parts.append(newer)
+                entry.covered_until = max(entry.covered_until, min(end_ns, settled_ns))
+                entry.topped_up_at = time.monotonic()
+
+            entry.candles = _concat(parts, symbol, timeframe)
+
+        self._store((symbol, timeframe), entry)
+        self._save_disk(entry)
+        return entry
+
+    def _query(self, symbol: str, timeframe: str, start_ns: int, end_ns: int, session) -> CandleArrays:
+        """Fetch candles in [start_ns, end_ns] with numeric columns cast to float in SQL"""
+        from sqlalchemy import Float, cast
+        from data.models import MarketData
+
+        own_session = session is None
+        if own_session:
+            if self.session_factory is None:
+                from data.database import get_db_sync
+                self.session_factory = get_db_sync
+            session = self.session_factory()
+
+        try:
+            query = session.query(
+                MarketData.timestamp,
+                *(cast(getattr(MarketData, f'{column}_price' if column != 'volume' else column), Float)
+                  for column in COLUMNS)
+            ).filter(MarketData.symbol == symbol)
+
+            # datetime has microsecond resolution: round the bounds inwards
+            if start_ns != _MIN_NS:
+                start_us = -(-start_ns // 1000)
+                query = query.filter(MarketData.timestamp >= pd.Timestamp(start_us, unit='us', tz='UTC').to_pydatetime())
+            end_us = end_ns // 1000
+            query = query.filter(MarketData.timestamp <= pd.Timestamp(end_us, unit='us', tz='UTC').to_pydatetime())
+
+            rows = query.order_by(MarketData.timestamp).all()
+        finally:
+            if own_session:
+                session.close()
+
+        self.queries += 1
+        self.rows_fetched += len(rows)
+        logger.debug(f"Fetched {len(rows)} {symbol} {timeframe} rows from the database")
+
+        if not rows:
+            return CandleArrays.empty(symbol, timeframe)
+
+        timestamps, *values = zip(*rows)
+        stamps = pd.to_datetime(list(timestamps), utc=True).as_unit('ns').asi8
+        numeric = np.array(values, dtype=np.float64)
+
+        # The same candle can be stored twice; keep the last copy
+        unique = np.r_[stamps[1:] != stamps[:-1], True]
+        return CandleArrays(symbol, timeframe, stamps[unique], *numeric[:, unique])
+
+    def _series_dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.cache_dir, symbol.replace('/', '_'), timeframe)
+
+    def _load_disk(self, symbol: str, timeframe: str) -> Optional[_CacheEntry]:
+        if not self.cache_dir:
+            return None
+
+        directory = self._series_dir(symbol, timeframe)
+        meta_path = os.path.join(directory, 'coverage.json')
+        if not os.path.exists(meta_path):
+            return None
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            arrays = {name: np.load(os.path.join(directory, f'{name}.npy'))
+                      for name in ('timestamp',) + COLUMNS}
+            if any(len(values) != meta['rows'] for values in arrays.values()):
+                raise ValueError("column lengths do not match coverage.json")
+        except Exception as e:
+            logger.warning(f"Ignoring damaged candle cache in {directory}: {e}")
+            return None
+
+        candles = CandleArrays(symbol, timeframe, arrays['timestamp'], *(arrays[c] for c in COLUMNS))
+        entry = _CacheEntry(candles, meta['covered_from'], meta['covered_until'])
+        entry.topped_up_at = float('-inf')  # top up on first use
+        return entry
+
+    def _save_disk(self, entry: _CacheEntry):
+        if not self.cache_dir:
+            return
+
+        candles = entry.candles
+        directory = self._series_dir(candles.symbol, candles.timeframe)
+        os.makedirs(directory, exist_ok=True)
+
+        # Columns first, coverage last: a crash leaves mismatched lengths, which _load_disk rejects
+        for name in ('timestamp',) + COLUMNS:
+            tmp_path = os.path.join(directory, f'{name}.tmp.npy')
+            np.save(tmp_path, getattr(candles, name))
+            os.replace(tmp_path, os.path.join(directory, f'{name}.npy'))
+
+        meta = {'rows': len(candles), 'covered_from': entry.covered_from, 'covered_until': entry.covered_until}
+        tmp_path = os.path.join(directory, 'coverage.tmp.json')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(directory, 'coverage.json'))
+
+    def stats(self) -> Dict:
+        """Get provider statistics"""
+        with self._lock:
+            return {
+                'series': [f'{symbol}:{timeframe}' for symbol, timeframe in self._entries],
+                'memory_hits': self.memory_hits,
+                'disk_loads': self.disk_loads,
+                'queries': self.queries,
+                'rows_fetched': self.rows_fetched,
+                'cache_dir': self.cache_dir,
+                'store': self.store.root if self.store is not None else None
+            }
+
+
+# Global backtest data provider
+_backtest_data_provider: Optional[BacktestDataProvider] = None
+
+def get_backtest_data_provider() -> BacktestDataProvider:
+    """Get the global backtest data provider"""
+    global _backtest_data_provider
+
+    if _backtest_data_provider is None:
+        store = None
+        if os.getenv('BACKTEST_DATA_SOURCE', 'database').lower() == 'store':
+            from data.candle_store import get_candle_store
+            store = get_candle_store()
+        _backtest_data_provider = BacktestDataProvider(store=store)
+
+    return _backtest_data_provider
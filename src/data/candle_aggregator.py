@@ -17,6 +17,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from data.live_feed import PriceUpdate, get_data_feed_manager
 from data.database import get_db
 from data.models import MarketData
+from strategies.indicator_cache import get_indicator_cache
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +53,7 @@ class CandleAggregator:
     Features:
     - Builds 5-minute candles from tick data
     - Maintains historical candle buffer
-    - Saves completed candles to database
+    - Saves completed candles to database and the columnar candle store
     - Provides current candle state
     """
 
@@ -141,46 +142,42 @@ class CandleAggregator:
         if len(self.candle_history[symbol]) > self.buffer_size:
             self.candle_history[symbol] = self.candle_history[symbol][-self.buffer_size:]
 
-        # Save to database
+        # Indicators computed on the previous bar are now superseded
+        get_indicator_cache().invalidate(symbol, self.timeframe_str)
+
+        # Save to database and candle store
         self._save_to_database(candle)
+        self._save_to_store(candle)
 
         logger.info(f"Completed {self.timeframe_str} candle: {symbol} @ {candle.timestamp} "
                    f"O:{candle.open_price:.2f} H:{candle.high_price:.2f} "
                    f"L:{candle.low_price:.2f} C:{candle.close_price:.2f}")
 
     def _save_to_database(self, candle: Candle):
-        """Save candle to database"""
+        """Save candle to database (skipped if already stored)"""
         try:
-            from data.database import get_db_sync
-            from sqlalchemy.exc import IntegrityError
-            db = get_db_sync()
-            
-            try:
-                market_record = MarketData(
-                    symbol=candle.symbol,
-                    timestamp=candle.timestamp,
-                    open_price=candle.open_price,
-                    high_price=candle.high_price,
-                    low_price=candle.low_price,
-                    close_price=candle.close_price,
-                    volume=candle.volume
-                )
-
-                db.add(market_record)
-                db.commit()
-
-                logger.debug(f"Saved {self.timeframe_str} candle to database: {candle.symbol}")
+            from data.market_data_writer import bulk_insert_market_data
+
+            bulk_insert_market_data([{
+                'symbol': candle.symbol,
+                'timestamp': candle.timestamp,
+                'open_price': candle.open_price,
+                'high_price': candle.high_price,
+                'low_price': candle.low_price,
+                'close_price': candle.close_price,
+                'volume': candle.volume
+            }])
+            logger.debug(f"Saved {self.timeframe_str} candle to database: {candle.symbol}")
+        except Exception as e:
+            logger.error(f"Error saving candle to database: {e}")
 
-            except IntegrityError:
-                # Duplicate candle, skip silently
-                db.rollback()
-            except Exception as e:
-                logger.error(f"Error saving candle to database: {e}")
-                db.rollback()
-            finally:
-                db.close()
+    def _save_to_store(self, candle: Candle):
+        """Append candle to the columnar candle store"""
+        try:
+            from data.candle_store import get_candle_store
+            get_candle_store().append_candle(candle)
         except Exception as e:
-            logger.error(f"Database connection error: {e}")
+            logger.error(f"Error saving candle to candle store: {e}")
 
     def get_candle_history(self, symbol: str, limit: Optional[int] = None) -> List[Candle]:
         """
@@ -216,20 +213,17 @@ class CandleAggregator:
         if not candles:
             return pd.DataFrame()
 
-        df = pd.DataFrame([
+        # Built column-wise: this runs for every symbol on every trading cycle
+        return pd.DataFrame(
             {
-                'timestamp': c.timestamp,
-                'open_price': c.open_price,
-                'high_price': c.high_price,
-                'low_price': c.low_price,
-                'close_price': c.close_price,
-                'volume': c.volume
-            }
-            for c in candles
-        ])
-
-        df.set_index('timestamp', inplace=True)
-        return df
+                'open_price': [c.open_price for c in candles],
+                'high_price': [c.high_price for c in candles],
+                'low_price': [c.low_price for c in candles],
+                'close_price': [c.close_price for c in candles],
+                'volume': [c.volume for c in candles]
+            },
+            index=pd.Index([c.timestamp for c in candles], name='timestamp')
+        )
 
     def get_current_candle(self, symbol: str) -> Optional[Candle]:
         """Get the current (incomplete) candle for a symbol"""
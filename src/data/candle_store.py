@@ -0,0 +1,365 @@
+"""
+Columnar Candle Store
+Append-only, memory-mapped OHLCV history partitioned by symbol / timeframe / month
+
+Layout: <root>/<symbol>/<timeframe>/<YYYY-MM>/<column>.bin, one raw
+little-endian array per column (int64 UTC nanoseconds for timestamp,
+float64 for open / high / low / close / volume). Appends write to the end of
+the month's files; reads memory-map them, so a range inside one month comes
+back as NumPy views of the page cache without copying.
+"""
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from data.backtest_data import COLUMNS, CandleArrays, _MAX_NS, _MIN_NS, _concat, _to_ns
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = os.getenv(
+    'CANDLE_STORE_DIR',
+    os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'candle_store')
+)
+
+FIELDS = ('timestamp',) + COLUMNS
+DTYPES = {'timestamp': np.dtype('<i8'), **{column: np.dtype('<f8') for column in COLUMNS}}
+
+
+def _row_ns(values) -> np.ndarray:
+    """UTC nanoseconds for stored candle timestamps (naive values are UTC, as in the database)"""
+    return pd.to_datetime(pd.Index(values), utc=True).as_unit('ns').asi8
+
+
+def _months(timestamps: np.ndarray) -> np.ndarray:
+    return timestamps.astype('datetime64[ns]').astype('datetime64[M]')
+
+
+class CandleStore:
+    """
+    Append-only columnar candle history
+
+    Rows are kept sorted and unique per (symbol, timeframe). Candles newer
+    than a month's last row are appended in place; candles already stored
+    are skipped (first write wins, like the database's unique constraint);
+    older candles that fill gaps rewrite only their month.
+
+    Writes are serialized within a process; use one writer process per store.
+    Returned arrays are read-only views and stay valid after later appends.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR):
+        """
+        Args:
+            root: Store directory (created on first write)
+        """
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+        self._maps: Dict[str, Tuple[int, np.memmap]] = {}  # path -> (rows, memmap)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append(self, candles: CandleArrays) -> int:
+        """
+        Store candles (any order; duplicates within the batch keep the last)
+
+        Returns:
+            Number of new rows written
+        """
+        if len(candles) == 0:
+            return 0
+
+        timestamp = np.asarray(candles.timestamp, dtype=np.int64)
+        order = np.argsort(timestamp, kind='stable')
+        timestamp = timestamp[order]
+        last_copy = np.r_[timestamp[1:] != timestamp[:-1], True]
+        rows = {'timestamp': timestamp[last_copy]}
+        for column in COLUMNS:
+            rows[column] = np.asarray(getattr(candles, column), dtype=np.float64)[order][last_copy]
+
+        months = _months(rows['timestamp'])
+        bounds = np.flatnonzero(np.r_[True, months[1:] != months[:-1], True])
+
+        written = 0
+        with self._lock:
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                directory = self._partition_dir(candles.symbol, candles.timeframe, str(months[lo]))
+                written += self._write_partition(directory, {name: values[lo:hi] for name, values in rows.items()})
+        return written
+
+    def append_frame(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """
+        Store an OHLCV DataFrame
+
+        Args:
+            df: Timestamps as the index or a 'timestamp' column; open/high/
+                low/close or *_price columns plus volume
+
+        Returns:
+            Number of new rows written
+        """
+        if df.empty:
+            return 0
+        timestamps = df['timestamp'] if 'timestamp' in df.columns else df.index
+        prefix = '_price' if 'close_price' in df.columns else ''
+        return self.append(CandleArrays(
+            symbol, timeframe, _row_ns(timestamps),
+            *(df[f'{column}{prefix}' if column != 'volume' else column].to_numpy(dtype=np.float64)
+              for column in COLUMNS)
+        ))
+
+    def append_candle(self, candle) -> int:
+        """Store one aggregator Candle (symbol / timeframe taken from the candle)"""
+        return self.append(CandleArrays(
+            candle.symbol, candle.timeframe, _row_ns([candle.timestamp]),
+            *(np.array([getattr(candle, f'{column}_price' if column != 'volume' else column)], dtype=np.float64)
+              for column in COLUMNS)
+        ))
+
+    def _write_partition(self, directory: str, rows: Dict[str, np.ndarray]) -> int:
+        existing = self._partition_rows(directory, repair=True)
+        if existing == 0:
+            os.makedirs(directory, exist_ok=True)
+            self._append_files(directory, rows)
+            return len(rows['timestamp'])
+
+        stored = self._column(directory, 'timestamp', existing)
+        new = rows['timestamp']
+        if new[0] > stored[-1]:
+            self._append_files(directory, rows)
+            return len(new)
+
+        # Backfill: keep stored rows, add only timestamps not stored yet
+        keep = ~np.isin(new, stored)
+        if not keep.any():
+            return 0
+        if new[keep][0] > stored[-1]:
+            self._append_files(directory, {name: values[keep] for name, values in rows.items()})
+            return int(keep.sum())
+
+        merged = {name: np.concatenate([self._column(directory, name, existing), values[keep]])
+                  for name, values in rows.items()}
+        order = np.argsort(merged['timestamp'], kind='stable')
+        self._rewrite(directory, {name: values[order] for name, values in merged.items()})
+        return int(keep.sum())
+
+    def _append_files(self, directory: str, rows: Dict[str, np.ndarray]):
+        # Timestamp last: readers use the shortest column, so a torn append is invisible
+        for name in COLUMNS + ('timestamp',):
+            with open(os.path.join(directory, f'{name}.bin'), 'ab') as f:
+                f.write(rows[name].astype(DTYPES[name], copy=False).tobytes())
+
+    def _rewrite(self, directory: str, rows: Dict[str, np.ndarray]):
+        """Replace a month: write a sibling directory, then swap it in"""
+        tmp_dir, old_dir = f'{directory}.tmp', f'{directory}.old'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        self._append_files(tmp_dir, rows)
+
+        os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def read(self, symbol: str, timeframe: str = '5m', start: Optional[datetime] = None,
+             end: Optional[datetime] = None) -> CandleArrays:
+        """
+        Candles between start and end (inclusive, open-ended if None)
+
+        Ranges inside one month are zero-copy views of the memory-mapped
+        files; longer ranges are concatenated once.
+        """
+        parts = list(self.read_partitions(symbol, timeframe, start, end))
+        if len(parts) == 1:
+            return parts[0]
+        return _concat(parts, symbol, timeframe)
+
+    def read_partitions(self, symbol: str, timeframe: str = '5m', start: Optional[datetime] = None,
+                        end: Optional[datetime] = None) -> Iterator[CandleArrays]:
+        """Per-month zero-copy views covering [start, end], oldest first"""
+        start_ns = _to_ns(start) if start is not None else None
+        end_ns = _to_ns(end) if end is not None else None
+        first = str(_months(np.array([start_ns]))[0]) if start_ns is not None else None
+        last = str(_months(np.array([end_ns]))[0]) if end_ns is not None else None
+
+        for month in self.months(symbol, timeframe):
+            if (first is not None and month < first) or (last is not None and month > last):
+                continue
+
+            directory = self._partition_dir(symbol, timeframe, month)
+            rows = self._partition_rows(directory)
+            if rows == 0:
+                continue
+
+            candles = CandleArrays(symbol, timeframe,
+                                   *(self._column(directory, name, rows) for name in FIELDS))
+            if start_ns is not None or end_ns is not None:
+                candles = candles.between(start_ns if start_ns is not None else _MIN_NS,
+                                          end_ns if end_ns is not None else _MAX_NS)
+            if len(candles):
+                yield candles
+
+    def months(self, symbol: str, timeframe: str = '5m') -> List[str]:
+        """Stored months ('YYYY-MM'), oldest first"""
+        directory = self._series_dir(symbol, timeframe)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name for name in os.listdir(directory) if len(name) == 7 and name[4] == '-')
+
+    def series(self) -> List[Tuple[str, str]]:
+        """Stored (symbol, timeframe) pairs"""
+        if not os.path.isdir(self.root):
+            return []
+        return [(symbol.replace('_', '/'), timeframe)
+                for symbol in sorted(os.listdir(self.root))
+                for timeframe in sorted(os.listdir(os.path.join(self.root, symbol)))]
+
+    def count(self, symbol: str, timeframe: str = '5m') -> int:
+        return sum(self._partition_rows(self._partition_dir(symbol, timeframe, month))
+                   for month in self.months(symbol, timeframe))
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def _series_dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol.replace('/', '_'), timeframe)
+
+    def _partition_dir(self, symbol: str, timeframe: str, month: str) -> str:
+        return os.path.join(self._series_dir(symbol, timeframe), month)
+
+    def _partition_rows(self, directory: str, repair: bool = False) -> int:
+        """Complete rows in a month (shortest column); repair truncates torn writes"""
+        if not os.path.isdir(directory):
+            old_dir = f'{directory}.old'
+            if repair and os.path.isdir(old_dir):
+                # Interrupted rewrite: the old month is still whole
+                os.replace(old_dir, directory)
+            else:
+                return 0
+
+        sizes = {}
+        for name in FIELDS:
+            path = os.path.join(directory, f'{name}.bin')
+            sizes[name] = os.path.getsize(path) // 8 if os.path.exists(path) else 0
+        rows = min(sizes.values())
+
+        if repair and any(size != rows for size in sizes.values()):
+            logger.warning(f"Truncating incomplete rows in {directory}")
+            for name in FIELDS:
+                path = os.path.join(directory, f'{name}.bin')
+                if os.path.exists(path):
+                    os.truncate(path, rows * 8)
+        return rows
+
+    def _column(self, directory: str, name: str, rows: int) -> np.ndarray:
+        path = os.path.join(directory, f'{name}.bin')
+        cached = self._maps.get(path)
+        # Appends and rewrites always change the row count, so it keys the map
+        if cached is None or cached[0] != rows:
+            self._maps[path] = cached = (rows, np.memmap(path, dtype=DTYPES[name], mode='r', shape=(rows,)))
+        return cached[1]
+
+    # ------------------------------------------------------------------
+    # Import
+    # ------------------------------------------------------------------
+
+    def import_from_db(self, symbol: str, timeframe: str = '5m', start: Optional[datetime] = None,
+                       end: Optional[datetime] = None, session=None) -> int:
+        """
+        Copy a symbol's market_data rows into the store
+
+        Returns:
+            Number of new rows written
+        """
+        from data.backtest_data import BacktestDataProvider
+
+        provider = BacktestDataProvider(cache_dir=None, max_entries=1)
+        candles = provider.get(symbol, start, end, timeframe, session)
+        return self.append(candles)
+
+
+# Global candle store
+_candle_store: Optional[CandleStore] = None
+
+def get_candle_store() -> CandleStore:
+    """Get the global candle store"""
+    global _candle_store
+
+    if _candle_store is None:
+        _candle_store = CandleStore()
+
+    return _candle_store
+
+
+def main():
+    """Import history from the database or benchmark reads"""
+    import argparse
+    import tempfile
+    import time
+
+    parser = argparse.ArgumentParser(description='Columnar candle store')
+    parser.add_argument('--import-symbols', nargs='+', help='Copy these symbols from market_data into the store')
+    parser.add_argument('--timeframe', default='5m')
+    parser.add_argument('--benchmark', type=int, default=0, help='Write and read N synthetic candles')
+    args = parser.parse_args()
+
+    if args.import_symbols:
+        store = get_candle_store()
+        for symbol in args.import_symbols:
+            started = time.perf_counter()
+            written = store.import_from_db(symbol, args.timeframe)
+            print(f"📥 {symbol} {args.timeframe}: {written:,} new rows "
+                  f"({store.count(symbol, args.timeframe):,} stored) in {time.perf_counter() - started:.1f}s")
+
+    if args.benchmark:
+        n = args.benchmark
+        rng = np.random.default_rng(0)
+        close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+        timestamps = pd.Timestamp('2015-01-01', tz='UTC').value + np.arange(n, dtype=np.int64) * 300_000_000_000
+        candles = CandleArrays('BTCUSDT', '5m', timestamps, close, close * 1.001, close * 0.999, close, rng.uniform(1, 10, n))
+
+        with tempfile.TemporaryDirectory() as root:
+            store = CandleStore(root)
+            started = time.perf_counter()
+            store.append(candles)
+            written = time.perf_counter() - started
+
+            cold = CandleStore(root)
+            started = time.perf_counter()
+            full = cold.read('BTCUSDT', '5m')
+            first_read = time.perf_counter() - started
+            started = time.perf_counter()
+            cold.read('BTCUSDT', '5m')
+            warm_read = time.perf_counter() - started
+
+            middle = pd.Timestamp(timestamps[n // 2], tz='UTC')
+            started = time.perf_counter()
+            month = cold.read('BTCUSDT', '5m', middle, middle + pd.Timedelta(days=7))
+            week_read = time.perf_counter() - started
+
+            print("🗄️  Candle Store Benchmark")
+            print("=" * 70)
+            print(f"Candles: {n:,} in {len(cold.months('BTCUSDT', '5m'))} monthly partitions")
+            print(f"Write:             {written * 1000:8.1f} ms")
+            print(f"Read all (cold):   {first_read * 1000:8.1f} ms")
+            print(f"Read all (warm):   {warm_read * 1000:8.1f} ms")
+            print(f"Read one week:     {week_read * 1000:8.3f} ms (zero-copy: {isinstance(month.close.base, np.memmap) or isinstance(month.close, np.memmap)})")
+            assert len(full) == n
+
+
+if __name__ == "__main__":
+    main()
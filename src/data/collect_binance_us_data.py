@@ -12,7 +12,8 @@ from datetime import datetime, timedelta
 import pandas as pd
 from data.database import get_db
 from data.models import MarketData
-from sqlalchemy.exc import IntegrityError
+from data.candle_store import get_candle_store
+from data.market_data_writer import insert_candle_frame
 import time
 
 def collect_binance_us_data(symbol='BTCUSDT', days=90, interval='1h'):
@@ -115,35 +116,13 @@ def collect_binance_us_data(symbol='BTCUSDT', days=90, interval='1h'):
         
         # Save to database
         db = next(get_db())
-        saved_count = 0
-        duplicate_count = 0
         
         # Use standard symbol format for database
         db_symbol = 'BTC/USDT'
         
         print(f"Saving to database as {db_symbol}...")
-        for _, row in df.iterrows():
-            market_data = MarketData(
-                symbol=db_symbol,
-                timestamp=row['timestamp'],
-                open_price=row['open'],
-                high_price=row['high'],
-                low_price=row['low'],
-                close_price=row['close'],
-                volume=row['volume']
-            )
-            
-            try:
-                db.add(market_data)
-                db.commit()
-                saved_count += 1
-                
-                if saved_count % 100 == 0:
-                    print(f"  Saved {saved_count} records...")
-                    
-            except IntegrityError:
-                db.rollback()
-                duplicate_count += 1
+        saved_count = insert_candle_frame(db_symbol, df, db)
+        duplicate_count = len(df) - saved_count
         
         print(f"\n{'='*80}")
         print(f"DATABASE SAVE COMPLETE")
@@ -152,7 +131,11 @@ def collect_binance_us_data(symbol='BTCUSDT', days=90, interval='1h'):
         print(f"Skipped: {duplicate_count} duplicates")
         print(f"Total saved: {saved_count + duplicate_count} records")
         print(f"{'='*80}\n")
-        
+
+        # Append to the columnar candle store
+        stored_count = get_candle_store().append_frame(db_symbol, interval, df)
+        print(f"Candle store: {stored_count} new candles")
+
         return df
         
     except Exception as e:
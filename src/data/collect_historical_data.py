@@ -12,7 +12,8 @@ from datetime import datetime, timedelta
 import pandas as pd
 from data.database import get_db
 from data.models import MarketData
-from sqlalchemy.exc import IntegrityError
+from data.candle_store import get_candle_store
+from data.market_data_writer import insert_candle_frame
 import time
 
 def collect_binance_data(symbol='BTC/USDT', days=90, timeframe='1h'):
@@ -100,32 +101,10 @@ def collect_binance_data(symbol='BTC/USDT', days=90, timeframe='1h'):
         
         # Save to database
         db = next(get_db())
-        saved_count = 0
-        duplicate_count = 0
         
         print("Saving to database...")
-        for _, row in df.iterrows():
-            market_data = MarketData(
-                symbol=symbol,
-                timestamp=row['timestamp'],
-                open_price=float(row['open']),
-                high_price=float(row['high']),
-                low_price=float(row['low']),
-                close_price=float(row['close']),
-                volume=float(row['volume'])
-            )
-            
-            try:
-                db.add(market_data)
-                db.commit()
-                saved_count += 1
-                
-                if saved_count % 100 == 0:
-                    print(f"  Saved {saved_count} records...")
-                    
-            except IntegrityError:
-                db.rollback()
-                duplicate_count += 1
+        saved_count = insert_candle_frame(symbol, df, db)
+        duplicate_count = len(df) - saved_count
         
         print(f"\n{'='*80}")
         print(f"DATABASE SAVE COMPLETE")
@@ -134,7 +113,11 @@ def collect_binance_data(symbol='BTC/USDT', days=90, timeframe='1h'):
         print(f"Skipped: {duplicate_count} duplicates")
         print(f"Total in DB: {saved_count + duplicate_count} records")
         print(f"{'='*80}\n")
-        
+
+        # Append to the columnar candle store
+        stored_count = get_candle_store().append_frame(symbol, timeframe, df)
+        print(f"Candle store: {stored_count} new candles")
+
         return df
         
     except Exception as e:
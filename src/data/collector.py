@@ -15,7 +15,8 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from data.database import get_db_sync, test_connection, create_tables
-from data.models import MarketData
+from data.candle_store import get_candle_store
+from data.market_data_writer import insert_candle_frame
 
 # Configure logging
 logging.basicConfig(
@@ -127,54 +128,39 @@ class DataCollector:
                 logger.warning("No data to save")
                 return False
             
-            # Prepare data for database
-            records = []
-            for _, row in df.iterrows():
-                record = MarketData(
-                    symbol=row['symbol'],
-                    timestamp=row['timestamp'],
-                    open_price=float(row['open']),
-                    high_price=float(row['high']),
-                    low_price=float(row['low']),
-                    close_price=float(row['close']),
-                    volume=float(row['volume'])
-                )
-                records.append(record)
-            
-            # Bulk insert with conflict handling
-            try:
-                self.db.bulk_save_objects(records)
-                self.db.commit()
-                logger.info(f"Saved {len(records)} records to database")
-                return True
-            except Exception as e:
-                self.db.rollback()
-                # Try individual inserts for duplicate handling
-                success_count = 0
-                for record in records:
-                    try:
-                        # Check if record exists
-                        existing = self.db.query(MarketData).filter(
-                            MarketData.symbol == record.symbol,
-                            MarketData.timestamp == record.timestamp
-                        ).first()
-                        
-                        if not existing:
-                            self.db.add(record)
-                            self.db.commit()
-                            success_count += 1
-                    except Exception:
-                        self.db.rollback()
-                        continue
-                
-                logger.info(f"Saved {success_count} new records (skipped duplicates)")
-                return success_count > 0
+            # Multi-row inserts; duplicates are skipped by the unique index
+            saved = sum(
+                insert_candle_frame(symbol, group, self.db)
+                for symbol, group in df.groupby('symbol', sort=False)
+            )
+            logger.info(f"Saved {saved} new records (skipped {len(df) - saved} duplicates)")
+            return True
                 
         except Exception as e:
             logger.error(f"Error saving to database: {e}")
             self.db.rollback()
             return False
     
+    def save_to_store(self, df: pd.DataFrame, timeframe: str) -> int:
+        """Append DataFrame to the columnar candle store
+
+        Args:
+            df: DataFrame with market data (one symbol)
+            timeframe: Candle timeframe
+
+        Returns:
+            Number of new candles stored
+        """
+        try:
+            if df.empty:
+                return 0
+            saved = get_candle_store().append_frame(df['symbol'].iloc[0], timeframe, df)
+            logger.info(f"Saved {saved} new candles to candle store")
+            return saved
+        except Exception as e:
+            logger.error(f"Error saving to candle store: {e}")
+            return 0
+
     def collect_symbol_data(self, symbol: str, days: int = 365):
         """Collect and save data for a single symbol"""
         logger.info(f"Starting data collection for {symbol}")
@@ -185,6 +171,7 @@ class DataCollector:
         if not df.empty:
             # Save to database
             success = self.save_to_database(df)
+            self.save_to_store(df, '1h')
             if success:
                 logger.info(f"Successfully collected data for {symbol}")
             else:
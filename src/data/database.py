@@ -2,7 +2,7 @@
 Database connection and session management
 """
 import os
-from sqlalchemy import create_engine, MetaData, text
+from sqlalchemy import create_engine, MetaData, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 from .models import Base
@@ -37,12 +37,42 @@ def create_tables():
     try:
         # Create all tables in public schema (Railway default)
         Base.metadata.create_all(bind=engine)
+        ensure_market_data_unique(engine)
         logger.info("Database tables created successfully in public schema")
     except Exception as e:
         logger.error(f"Error creating tables: {e}")
         raise
 
 
+def ensure_market_data_unique(bind=engine) -> bool:
+    """
+    Add the (symbol, timestamp) unique index to a market_data table created without it
+
+    Duplicate rows are removed first (the oldest id is kept). Bulk inserts
+    rely on this index for ON CONFLICT DO NOTHING.
+
+    Returns:
+        True if the index was created
+    """
+    inspector = inspect(bind)
+    unique_sets = [constraint['column_names'] for constraint in inspector.get_unique_constraints('market_data')]
+    unique_sets += [index['column_names'] for index in inspector.get_indexes('market_data') if index['unique']]
+    if any(sorted(columns) == ['symbol', 'timestamp'] for columns in unique_sets):
+        return False
+
+    with bind.begin() as conn:
+        removed = conn.execute(text("""
+            DELETE FROM market_data
+            WHERE id NOT IN (SELECT MIN(id) FROM market_data GROUP BY symbol, timestamp)
+        """)).rowcount
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_market_data_symbol_timestamp ON market_data (symbol, timestamp)"
+        ))
+
+    logger.info(f"Added market_data (symbol, timestamp) unique index ({removed} duplicate rows removed)")
+    return True
+
+
 def get_db() -> Session:
     """Get database session"""
     db = SessionLocal()
@@ -7,12 +7,14 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 import requests
+import pandas as pd
 from datetime import datetime, timedelta
 import logging
 from typing import List, Dict
 from data.database import get_db
 from data.models import MarketData
-from sqlalchemy.exc import IntegrityError
+from data.candle_store import get_candle_store
+from data.market_data_writer import insert_candle_frame
 
 logger = logging.getLogger(__name__)
 
@@ -100,29 +102,17 @@ def preload_historical_candles_to_db(symbols: List[str] = None, hours: int = 8):
             logger.warning(f"No candles fetched for {binance_symbol}")
             continue
         
-        saved = 0
-        skipped = 0
-        
-        for candle in candles:
-            market_data = MarketData(
-                symbol=db_symbol,
-                timestamp=candle['timestamp'],
-                open_price=candle['open'],
-                high_price=candle['high'],
-                low_price=candle['low'],
-                close_price=candle['close'],
-                volume=candle['volume']
-            )
-            
-            try:
-                db.add(market_data)
-                db.commit()
-                saved += 1
-            except IntegrityError:
-                db.rollback()
-                skipped += 1
+        frame = pd.DataFrame(candles)
+        saved = insert_candle_frame(db_symbol, frame, db)
+        skipped = len(candles) - saved
         
         logger.info(f"  {db_symbol}: Saved {saved} new candles, skipped {skipped} duplicates")
+
+        try:
+            stored = get_candle_store().append_frame(db_symbol, '5m', frame)
+            logger.info(f"  {db_symbol}: Stored {stored} new candles in candle store")
+        except Exception as e:
+            logger.error(f"Error saving {db_symbol} candles to candle store: {e}")
     
     db.close()
     logger.info("Historical candle pre-load complete")
@@ -15,8 +15,6 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from data.database import get_db
-from data.models import MarketData
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -187,11 +185,19 @@ class MockDataFeed(LiveDataFeed):
 class DataFeedManager:
     """Manages live data feeds"""
     
-    def __init__(self, symbols: List[str], use_mock: bool = True):
+    def __init__(self, symbols: List[str], use_mock: bool = True, feed: Optional[LiveDataFeed] = None):
+        """
+        Args:
+            symbols: Symbols to stream
+            use_mock: Use MockDataFeed instead of the Binance.US WebSocket
+            feed: Explicit feed (e.g. a replay feed); overrides use_mock
+        """
         self.symbols = symbols
         self.use_mock = use_mock
         
-        if use_mock:
+        if feed is not None:
+            self.feed = feed
+        elif use_mock:
             self.feed = MockDataFeed(symbols)
         else:
             # Use Binance.US WebSocket for US users
@@ -267,22 +273,18 @@ class DataFeedManager:
     def _save_to_database(self, update: PriceUpdate):
         """Save price update to database"""
         try:
-            db = next(get_db())
-            
-            # Create a new market data record
-            market_record = MarketData(
-                symbol=update.symbol,
-                timestamp=update.timestamp,
-                open_price=update.price,  # For live data, use current price for all OHLC
-                high_price=update.price,
-                low_price=update.price,
-                close_price=update.price,
-                volume=update.volume or 0
-            )
-            
-            db.add(market_record)
-            db.commit()
-            db.close()
+            from data.market_data_writer import bulk_insert_market_data
+
+            # For live data, use current price for all OHLC
+            bulk_insert_market_data([{
+                'symbol': update.symbol,
+                'timestamp': update.timestamp,
+                'open_price': update.price,
+                'high_price': update.price,
+                'low_price': update.price,
+                'close_price': update.price,
+                'volume': update.volume or 0
+            }])
             
             logger.debug(f"Stored price update: {update.symbol} @ ${update.price:.2f}")
             
@@ -0,0 +1,110 @@
+"""
+Bulk Market Data Writer
+Insert candles into market_data thousands of rows per round trip
+
+Rows go out as multi-row INSERT ... ON CONFLICT (symbol, timestamp) DO
+NOTHING statements, so duplicates are skipped by the database instead of
+one commit and IntegrityError rollback per candle.
+"""
+import logging
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from data.models import MarketData
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+
+_PRICE_COLUMNS = ('open_price', 'high_price', 'low_price', 'close_price', 'volume')
+
+
+def candle_rows(symbol: str, df: pd.DataFrame) -> List[Dict]:
+    """
+    market_data rows from an OHLCV DataFrame
+
+    Args:
+        symbol: Symbol as stored (e.g. 'BTC/USDT')
+        df: Timestamps as the index or a 'timestamp' column; open/high/low/
+            close or *_price columns plus volume
+
+    Returns:
+        List of row dicts
+    """
+    timestamps = df['timestamp'] if 'timestamp' in df.columns else df.index.to_series()
+    columns = {'timestamp': list(pd.to_datetime(timestamps).dt.to_pydatetime())}
+    for column in _PRICE_COLUMNS:
+        source = column if column in df.columns or column == 'volume' else column.replace('_price', '')
+        columns[column] = df[source].astype(float).tolist()
+
+    return [
+        {'symbol': symbol, 'timestamp': ts, 'open_price': o, 'high_price': h,
+         'low_price': l, 'close_price': c, 'volume': v}
+        for ts, o, h, l, c, v in zip(columns['timestamp'], *(columns[column] for column in _PRICE_COLUMNS))
+    ]
+
+
+def bulk_insert_market_data(rows: Iterable[Dict], session=None, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Insert market_data rows, skipping (symbol, timestamp) pairs already stored
+
+    Args:
+        rows: Dicts with symbol, timestamp, open_price, high_price,
+            low_price, close_price and volume
+        session: SQLAlchemy session (a new one is opened and closed if None)
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        Number of rows inserted
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    own_session = session is None
+    if own_session:
+        from data.database import get_db_sync
+        session = get_db_sync()
+
+    try:
+        dialect = session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise ValueError(f"Bulk insert is not supported for the '{dialect}' dialect")
+
+        # executemany with RETURNING is sent as multi-row VALUES pages of
+        # batch_size rows; conflicting rows return nothing
+        statement = insert(MarketData).on_conflict_do_nothing(index_elements=['symbol', 'timestamp']) \
+            .returning(MarketData.id).execution_options(insertmanyvalues_page_size=batch_size)
+        inserted = len(session.execute(statement, rows).all())
+        session.commit()
+
+        logger.debug(f"Inserted {inserted} of {len(rows)} market data rows")
+        return inserted
+
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        if own_session:
+            session.close()
+
+
+def insert_candle_frame(symbol: str, df: pd.DataFrame, session=None, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Insert an OHLCV DataFrame into market_data (see candle_rows)
+
+    Returns:
+        Number of rows inserted (duplicates are skipped)
+    """
+    if df.empty:
+        return 0
+    return bulk_insert_market_data(candle_rows(symbol, df), session, batch_size)
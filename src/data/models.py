@@ -1,7 +1,7 @@
 """
 Database models for the AI Trading Bot
 """
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, Index, CheckConstraint
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Index, CheckConstraint, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -15,6 +15,7 @@ class MarketData(Base):
     __tablename__ = 'market_data'
     __table_args__ = (
         Index('idx_market_data_symbol_timestamp', 'symbol', 'timestamp'),
+        UniqueConstraint('symbol', 'timestamp', name='uq_market_data_symbol_timestamp'),
     )
 
     id = Column(Integer, primary_key=True)
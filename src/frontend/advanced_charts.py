@@ -7,7 +7,17 @@ import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import requests
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    from strategies.indicator_cache import get_indicator_cache, frame_watermark
+    INDICATOR_CACHE_AVAILABLE = True
+except ImportError:
+    INDICATOR_CACHE_AVAILABLE = False
 
 
 class TechnicalIndicators:
@@ -93,6 +103,17 @@ class AdvancedChart:
             'vwap': '#FF5722'
         }
     
+    def _cached(self, df: pd.DataFrame, indicator: str, params: Dict, compute: Callable) -> Any:
+        """Memoize an indicator on the shared cache when the frame carries its symbol"""
+        symbol = df.attrs.get('symbol')
+        watermark = frame_watermark(df) if INDICATOR_CACHE_AVAILABLE else None
+        if symbol is None or watermark is None:
+            return compute()
+
+        return get_indicator_cache().get_or_compute(
+            symbol, df.attrs.get('timeframe', '5m'), indicator, params, watermark, compute
+        )
+    
     def create_main_chart(self, df: pd.DataFrame, 
                          show_sma: bool = False,
                          show_ema: bool = False,
@@ -147,7 +168,7 @@ class AdvancedChart:
         if show_sma:
             for i, period in enumerate(sma_periods):
                 if len(df) >= period:
-                    sma = self.indicators.calculate_sma(df['close'], period)
+                    sma = self._cached(df, 'sma', {'period': period}, lambda: self.indicators.calculate_sma(df['close'], period))
                     fig.add_trace(
                         go.Scatter(
                             x=df['timestamp'],
@@ -163,7 +184,7 @@ class AdvancedChart:
         if show_ema:
             for i, period in enumerate(ema_periods):
                 if len(df) >= period:
-                    ema = self.indicators.calculate_ema(df['close'], period)
+                    ema = self._cached(df, 'ema', {'period': period}, lambda: self.indicators.calculate_ema(df['close'], period))
                     fig.add_trace(
                         go.Scatter(
                             x=df['timestamp'],
@@ -177,7 +198,7 @@ class AdvancedChart:
         
         # Add Bollinger Bands
         if show_bb and len(df) >= 20:
-            upper, middle, lower = self.indicators.calculate_bollinger_bands(df['close'])
+            upper, middle, lower = self._cached(df, 'bollinger_bands', {}, lambda: self.indicators.calculate_bollinger_bands(df['close']))
             
             fig.add_trace(
                 go.Scatter(
@@ -207,7 +228,7 @@ class AdvancedChart:
         
         # Add VWAP
         if show_vwap:
-            vwap = self.indicators.calculate_vwap(df)
+            vwap = self._cached(df, 'vwap', {}, lambda: self.indicators.calculate_vwap(df))
             fig.add_trace(
                 go.Scatter(
                     x=df['timestamp'],
@@ -294,7 +315,7 @@ class AdvancedChart:
         if len(df) < period + 1:
             return None
         
-        rsi = self.indicators.calculate_rsi(df['close'], period)
+        rsi = self._cached(df, 'rsi', {'period': period}, lambda: self.indicators.calculate_rsi(df['close'], period))
         
         fig = go.Figure()
         
@@ -337,7 +358,7 @@ class AdvancedChart:
         if len(df) < 26:
             return None
         
-        macd, signal, histogram = self.indicators.calculate_macd(df['close'])
+        macd, signal, histogram = self._cached(df, 'macd', {}, lambda: self.indicators.calculate_macd(df['close']))
         
         fig = go.Figure()
         
@@ -404,7 +425,7 @@ class AdvancedChart:
         if len(df) < period + 3:
             return None
         
-        k, d = self.indicators.calculate_stochastic(df['high'], df['low'], df['close'], period)
+        k, d = self._cached(df, 'stochastic', {'period': period}, lambda: self.indicators.calculate_stochastic(df['high'], df['low'], df['close'], period))
         
         fig = go.Figure()
         
@@ -549,6 +570,8 @@ def fetch_chart_data(symbol: str, limit: int = 200) -> pd.DataFrame:
             # Ensure timestamp is datetime with ISO8601 format (handles microseconds + timezone)
             if 'timestamp' in df.columns:
                 df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+            df.attrs['symbol'] = symbol
+            df.attrs['timeframe'] = '5m'
             return df
         else:
             st.warning(f"⚠️ API returned 0 candles for {symbol}")
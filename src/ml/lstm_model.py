@@ -296,27 +296,16 @@ class ModelTrainer:
         import os
         sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
         
-        from data.models import MarketData
+        from data.backtest_data import get_backtest_data_provider
         from sqlalchemy.orm import sessionmaker
         
         Session = sessionmaker(bind=db_connection)
         session = Session()
         
         try:
-            # Query data
-            data = session.query(MarketData).filter(
-                MarketData.symbol == self.symbol.replace('/', '')
-            ).order_by(MarketData.timestamp.asc()).all()
-            
-            # Convert to DataFrame
-            df = pd.DataFrame([{
-                'timestamp': d.timestamp,
-                'open_price': float(d.open_price),
-                'high_price': float(d.high_price),
-                'low_price': float(d.low_price),
-                'close_price': float(d.close_price),
-                'volume': float(d.volume)
-            } for d in data])
+            # Full history (cached; only new candles are queried)
+            candles = get_backtest_data_provider().get(self.symbol.replace('/', ''), session=session)
+            df = candles.to_frame(style='price', index=False)
             
             logger.info(f"Loaded {len(df)} records for {self.symbol}")
             return df
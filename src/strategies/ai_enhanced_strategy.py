@@ -9,11 +9,14 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, Optional, Tuple
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
 from datetime import datetime
 
 from strategies.technical_indicators import TechnicalIndicators
+from strategies.signal_frame import SignalFrame
 from strategies.phase2_final_test import OptimizedPhase2Strategy
+from strategies.incremental_indicators import candle_ohlcv
 from ai.sentiment_analyzer import sentiment_analyzer
 from ai.data_collectors import news_collector, reddit_collector
 
@@ -31,8 +34,23 @@ class AIEnhancedStrategy:
         self,
         technical_weight: float = 0.4,
         lstm_weight: float = 0.3,
-        sentiment_weight: float = 0.3
+        sentiment_weight: float = 0.3,
+        buy_threshold: float = 0.3,
+        sell_threshold: float = -0.3,
+        tail_rows: Optional[int] = None,
+        sentiment_refresher: Optional[Any] = None
     ):
+        """
+        Args:
+            technical_weight: Weight of the technical component
+            lstm_weight: Weight of the LSTM/momentum component
+            sentiment_weight: Weight of the sentiment component
+            buy_threshold: Fused score above which a BUY is emitted
+            sell_threshold: Fused score below which a SELL is emitted
+            tail_rows: Default for generate_signals(tail_rows=...); None scores every row
+            sentiment_refresher: Running SentimentRefresher; sentiment is then
+                read from it without blocking instead of fetched inline
+        """
         self.name = "AI Enhanced Strategy"
         
         # Weights for signal fusion
@@ -40,6 +58,11 @@ class AIEnhancedStrategy:
         self.lstm_weight = lstm_weight
         self.sentiment_weight = sentiment_weight
         
+        # Fusion thresholds (balanced for good signal detection)
+        self.buy_threshold = buy_threshold
+        self.sell_threshold = sell_threshold
+        self.tail_rows = tail_rows
+        
         # Component strategies
         self.technical_strategy = OptimizedPhase2Strategy()
         self.indicators = TechnicalIndicators()
@@ -47,6 +70,10 @@ class AIEnhancedStrategy:
         # Cache for sentiment (refresh every 1 hour)
         self.sentiment_cache: Dict[str, Tuple[float, datetime]] = {}
         self.cache_ttl = 3600  # 1 hour in seconds
+        self.sentiment_refresher = sentiment_refresher
+        
+        # Per-symbol streaming state for on_candle / latest_signal
+        self.live_states: Dict[str, Dict[str, Any]] = {}
     
     def get_sentiment_signal(self, symbol: str) -> float:
         """
@@ -55,6 +82,14 @@ class AIEnhancedStrategy:
         Returns:
             Float between -1.0 (bearish) and 1.0 (bullish)
         """
+        # Background refresher: serve the cached (possibly stale) score, never block
+        if self.sentiment_refresher is not None and self.sentiment_refresher.running:
+            score, age = self.sentiment_refresher.request(symbol)
+            if score is None:
+                logger.debug(f"No sentiment yet for {symbol}, using neutral sentiment")
+                return 0.0
+            return score.sentiment * score.confidence
+        
         # Check cache
         if symbol in self.sentiment_cache:
             cached_sentiment, cache_time = self.sentiment_cache[symbol]
@@ -145,48 +180,10 @@ class AIEnhancedStrategy:
                 logger.warning(f"No close price column found for LSTM signal")
                 return 0.0
             
-            # Generate momentum-based signal (LSTM-like analysis)
-            current_price = float(recent_data[close_col].iloc[-1])
-            
-            # Calculate multiple timeframe momentums
-            if len(recent_data) >= 30:
-                price_5_ago = float(recent_data[close_col].iloc[-5])
-                price_10_ago = float(recent_data[close_col].iloc[-10])
-                price_30_ago = float(recent_data[close_col].iloc[-30])
-                
-                # Short-term momentum (5 periods)
-                short_momentum = (current_price - price_5_ago) / price_5_ago
-                # Medium-term momentum (10 periods)
-                medium_momentum = (current_price - price_10_ago) / price_10_ago
-                # Long-term momentum (30 periods)
-                long_momentum = (current_price - price_30_ago) / price_30_ago
-                
-                # Weighted combination (favor shorter timeframes for 5m trading)
-                momentum_signal = (short_momentum * 0.5 + medium_momentum * 0.3 + long_momentum * 0.2)
-                
-                # Add volume confirmation if available
-                if 'volume' in recent_data.columns:
-                    recent_volume = recent_data['volume'].iloc[-5:].mean()
-                    historical_volume = recent_data['volume'].iloc[-30:-5].mean()
-                    if historical_volume > 0:
-                        volume_ratio = recent_volume / historical_volume
-                        # Boost signal if volume is increasing
-                        if volume_ratio > 1.2:
-                            momentum_signal *= 1.2
-                        elif volume_ratio < 0.8:
-                            momentum_signal *= 0.8
-                
-                # Scale and clip to [-1, 1]
-                lstm_signal = np.clip(momentum_signal * 15, -1.0, 1.0)
-                
-                logger.debug(f"LSTM Signal for {symbol}: "
-                           f"Price: ${current_price:.2f}, "
-                           f"Short: {short_momentum:.4f}, "
-                           f"Medium: {medium_momentum:.4f}, "
-                           f"Long: {long_momentum:.4f}, "
-                           f"Final: {lstm_signal:.3f}")
-                
-                return float(lstm_signal)
+            volumes = recent_data['volume'].to_numpy(dtype=float) if 'volume' in recent_data.columns else None
+            lstm_signal = self._momentum_signal(recent_data[close_col].to_numpy(dtype=float), volumes, symbol)
+            if lstm_signal is not None:
+                return lstm_signal
             
         except Exception as e:
             logger.error(f"LSTM prediction error for {symbol}: {e}")
@@ -194,19 +191,82 @@ class AIEnhancedStrategy:
         # Safe fallback - return neutral signal instead of random noise
         return 0.0
     
-    def generate_signals(self, data: pd.DataFrame, symbol: str = "BTC") -> pd.Series:
+    def _momentum_signal(self, closes: np.ndarray, volumes: Optional[np.ndarray],
+                         symbol: str) -> Optional[float]:
+        """
+        Multi-timeframe momentum signal over the last 60 closes (LSTM stand-in)
+        
+        Returns:
+            Float between -1.0 and 1.0, or None with fewer than 30 closes
+        """
+        if len(closes) < 30:
+            return None
+        
+        # Generate momentum-based signal (LSTM-like analysis)
+        current_price = float(closes[-1])
+        price_5_ago = float(closes[-5])
+        price_10_ago = float(closes[-10])
+        price_30_ago = float(closes[-30])
+        
+        # Short-term momentum (5 periods)
+        short_momentum = (current_price - price_5_ago) / price_5_ago
+        # Medium-term momentum (10 periods)
+        medium_momentum = (current_price - price_10_ago) / price_10_ago
+        # Long-term momentum (30 periods)
+        long_momentum = (current_price - price_30_ago) / price_30_ago
+        
+        # Weighted combination (favor shorter timeframes for 5m trading)
+        momentum_signal = (short_momentum * 0.5 + medium_momentum * 0.3 + long_momentum * 0.2)
+        
+        # Add volume confirmation if available
+        if volumes is not None:
+            recent_volume = np.nanmean(volumes[-5:])
+            historical_volume = np.nanmean(volumes[-30:-5])
+            if historical_volume > 0:
+                volume_ratio = recent_volume / historical_volume
+                # Boost signal if volume is increasing
+                if volume_ratio > 1.2:
+                    momentum_signal *= 1.2
+                elif volume_ratio < 0.8:
+                    momentum_signal *= 0.8
+        
+        # Scale and clip to [-1, 1]
+        lstm_signal = np.clip(momentum_signal * 15, -1.0, 1.0)
+        
+        logger.debug(f"LSTM Signal for {symbol}: "
+                   f"Price: ${current_price:.2f}, "
+                   f"Short: {short_momentum:.4f}, "
+                   f"Medium: {medium_momentum:.4f}, "
+                   f"Long: {long_momentum:.4f}, "
+                   f"Final: {lstm_signal:.3f}")
+        
+        return float(lstm_signal)
+    
+    def generate_signals(self, data: pd.DataFrame, symbol: str = "BTC",
+                         tail_rows: Optional[int] = None) -> pd.Series:
         """
         Generate AI-enhanced trading signals
         
         Args:
             data: DataFrame with OHLCV data
             symbol: Trading symbol
+            tail_rows: Only score the last N rows (defaults to self.tail_rows).
+                The technical strategy then runs on those rows plus its warm-up
+                instead of the full window; None scores every row.
             
         Returns:
             Series of signals: 1.0 (BUY), -1.0 (SELL), 0.0 (HOLD)
         """
+        tail_rows = self.tail_rows if tail_rows is None else tail_rows
+        
         # 1. Get technical indicator signals
-        technical_signals = self.technical_strategy.generate_signals(data)
+        if tail_rows and tail_rows < len(data):
+            # Slow MA / RSI window plus the previous row for crossover detection
+            warmup = max(self.technical_strategy.slow_ma, 14) + 1
+            window = data.iloc[-(tail_rows + warmup):]
+            technical_signals = self.technical_strategy.generate_signals(window).iloc[-tail_rows:]
+        else:
+            technical_signals = self.technical_strategy.generate_signals(data)
         
         # 2. Get sentiment signal (same for all timestamps in this batch)
         sentiment_signal = self.get_sentiment_signal(symbol)
@@ -214,27 +274,20 @@ class AIEnhancedStrategy:
         # 3. Get LSTM signal (placeholder for now)
         lstm_signal = self.get_lstm_signal(data, symbol)
         
-        # 4. Combine signals with weights
-        combined_signals = pd.Series(index=data.index, dtype=float)
-        
-        for i in range(len(data)):
-            # Weighted average of all signals
-            combined = (
-                self.technical_weight * technical_signals.iloc[i] +
-                self.lstm_weight * lstm_signal +
-                self.sentiment_weight * sentiment_signal
-            )
-            
-            # Apply threshold (balanced for good signal detection)
-            if combined > 0.3:  # Reverted from 0.6 to allow more trades
-                combined_signals.iloc[i] = 1.0  # Strong BUY
-            elif combined < -0.3:  # Reverted from -0.6 to allow more trades
-                combined_signals.iloc[i] = -1.0  # Strong SELL
-            else:
-                combined_signals.iloc[i] = 0.0  # HOLD
+        # 4. Combine signals with weights; LSTM and sentiment are batch scalars
+        combined = (
+            self.technical_weight * technical_signals.to_numpy(dtype=float) +
+            self.lstm_weight * lstm_signal +
+            self.sentiment_weight * sentiment_signal
+        )
+        combined_signals = pd.Series(
+            np.where(combined > self.buy_threshold, 1.0,
+                     np.where(combined < self.sell_threshold, -1.0, 0.0)),
+            index=technical_signals.index
+        )
         
         # Log signal breakdown for latest point
-        latest_idx = len(data) - 1
+        latest_idx = len(combined_signals) - 1
         logger.info(f"\n{'='*60}")
         logger.info(f"Signal Breakdown for {symbol}:")
         logger.info(f"  Technical: {technical_signals.iloc[latest_idx]:.2f} "
@@ -247,3 +300,75 @@ class AIEnhancedStrategy:
         logger.info(f"{'='*60}\n")
         
         return combined_signals
+
+    
+    def generate_signal_frame(self, data: pd.DataFrame, symbol: str = "BTC",
+                              tail_rows: Optional[int] = None) -> SignalFrame:
+        """Fused signals as a SignalFrame (see generate_signals)"""
+        return SignalFrame.from_series(self.generate_signals(data, symbol=symbol, tail_rows=tail_rows))
+    
+    def on_candle(self, symbol: str, candle: Any) -> float:
+        """
+        Feed one completed candle for a symbol
+        
+        Updates the technical component and the momentum buffer in O(1). The
+        fused signal needs sentiment, so it is computed once per candle by
+        latest_signal rather than for every candle fed during warm-up.
+        
+        Returns:
+            Technical component signal for this candle
+        """
+        state = self.live_states.get(symbol)
+        if state is None:
+            state = self.live_states[symbol] = {
+                'closes': deque(maxlen=60),
+                'volumes': deque(maxlen=60),
+                'technical': 0.0,
+                'signal': None
+            }
+        
+        _, _, _, close, volume = candle_ohlcv(candle)
+        state['closes'].append(close)
+        state['volumes'].append(volume)
+        state['technical'] = self.technical_strategy.on_candle(symbol, candle)
+        state['signal'] = None
+        return state['technical']
+    
+    def latest_signal(self, symbol: str) -> float:
+        """
+        Fused signal for the most recent candle passed to on_candle
+        
+        Returns:
+            1.0 (BUY), -1.0 (SELL) or 0.0 (HOLD); 0.0 if no candles were fed
+        """
+        state = self.live_states.get(symbol)
+        if state is None:
+            return 0.0
+        
+        if state['signal'] is None:
+            sentiment_signal = self.get_sentiment_signal(symbol)
+            
+            lstm_signal = 0.0
+            if len(state['closes']) >= 60:
+                lstm_signal = self._momentum_signal(
+                    np.array(state['closes']), np.array(state['volumes']), symbol
+                )
+            
+            combined = (
+                self.technical_weight * state['technical'] +
+                self.lstm_weight * lstm_signal +
+                self.sentiment_weight * sentiment_signal
+            )
+            state['signal'] = (1.0 if combined > self.buy_threshold else
+                               -1.0 if combined < self.sell_threshold else 0.0)
+        
+        return state['signal']
+    
+    def reset_live_state(self, symbol: Optional[str] = None):
+        """Drop streaming state for one symbol or for all symbols"""
+        if symbol is None:
+            self.live_states.clear()
+            self.technical_strategy.reset_live_state()
+        else:
+            self.live_states.pop(symbol, None)
+            self.technical_strategy.reset_live_state(symbol)
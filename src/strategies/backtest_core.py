@@ -0,0 +1,593 @@
+"""
+Array Backtest Core
+Shared simulation kernels for strategy backtests on NumPy price / position arrays
+
+State (cash, position) only changes at trades, so instead of stepping through
+every candle the kernels evaluate the stretch between trades as one array
+expression and jump to the next candle that trades. Per-candle arithmetic is
+kept in the same operation order as the previous row loops, so equity curves
+and trade logs are identical to them.
+"""
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Trade kinds recorded in BacktestResult.trades['kind']
+BUY, SELL, STOP_LOSS, TAKE_PROFIT, REBALANCE = 'BUY', 'SELL', 'STOP_LOSS', 'TAKE_PROFIT', 'REBALANCE'
+
+# How stops / targets are checked within a candle
+FILL_MODELS = ('close', 'intrabar')
+
+# Which level fills first when a candle's range crosses both
+SAME_BAR_RULES = ('stop_first', 'target_first', 'open_distance')
+
+
+@dataclass
+class BacktestResult:
+    """
+    Output of a simulation kernel
+
+    equity: Portfolio value per candle (see each kernel for whether a
+        candle is valued before or after its trade)
+    trades: Columnar trade log: index (candle position), kind, price,
+        size (signed change in units), position (units after), cash (after)
+    cash / position: State after the last candle
+    final_value: Cash plus the open position marked at the last close
+    """
+    equity: np.ndarray
+    trades: Dict[str, np.ndarray]
+    cash: float
+    position: float
+    final_value: float
+
+    @property
+    def total_trades(self) -> int:
+        return len(self.trades['index'])
+
+    @property
+    def max_drawdown(self) -> float:
+        """Largest peak-to-trough decline of the equity curve (positive fraction)"""
+        return max_drawdown(self.equity)
+
+    def sharpe_ratio(self, periods_per_year: Optional[float] = None) -> float:
+        """Sharpe ratio of per-candle returns (annualized when periods_per_year is given)"""
+        return sharpe_ratio(self.equity, periods_per_year)
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+    """Largest peak-to-trough decline as a positive fraction (0.0 if none)"""
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) == 0:
+        return 0.0
+    peak = np.maximum.accumulate(equity)
+    return max(float(np.max((peak - equity) / peak)), 0.0)
+
+
+def sharpe_ratio(equity: np.ndarray, periods_per_year: Optional[float] = None) -> float:
+    """Mean over std (ddof=1) of per-candle returns, optionally annualized"""
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) < 3:
+        return 0.0
+    returns = np.diff(equity) / equity[:-1]
+    std = returns.std(ddof=1)
+    if not std > 0:
+        return 0.0
+    ratio = returns.mean() / std
+    return float(ratio * np.sqrt(periods_per_year)) if periods_per_year else float(ratio)
+
+
+class _TradeLog:
+    """Append-only trade columns"""
+
+    def __init__(self):
+        self.rows: List[tuple] = []
+
+    def add(self, i: int, kind: str, price: float, size: float, position: float, cash: float):
+        self.rows.append((i, kind, price, size, position, cash))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        index, kind, price, size, position, cash = zip(*self.rows) if self.rows else ([],) * 6
+        return {
+            'index': np.asarray(index, dtype=np.int64),
+            'kind': np.asarray(kind, dtype=object),
+            'price': np.asarray(price, dtype=float),
+            'size': np.asarray(size, dtype=float),
+            'position': np.asarray(position, dtype=float),
+            'cash': np.asarray(cash, dtype=float),
+        }
+
+
+def _first_hit(mask: Callable[[int, int], np.ndarray], start: int, stop: int, window: int) -> int:
+    """First position in [start, stop) where mask(a, b) is True, scanning doubling windows"""
+    a = start
+    while a < stop:
+        b = min(a + window, stop)
+        hits = np.flatnonzero(mask(a, b))
+        if len(hits):
+            return a + int(hits[0])
+        a = b
+        window = min(window * 2, 1 << 16)
+    return stop
+
+
+def _result(close: np.ndarray, equity: np.ndarray, log: _TradeLog,
+            cash: float, position: float) -> BacktestResult:
+    final_value = cash + (position * float(close[-1])) if len(close) else cash
+    return BacktestResult(equity, log.to_arrays(), cash, position, final_value)
+
+
+def run_target_positions(close: np.ndarray, target_fraction: np.ndarray,
+                         initial_capital: float = 10000, fee_rate: float = 0.001,
+                         min_trade_pct: float = 0.01, window: int = 256) -> BacktestResult:
+    """
+    Rebalance toward a target fraction of portfolio value on every candle
+
+    A trade executes when the required change is worth more than
+    min_trade_pct of portfolio value and cash covers it plus the fee.
+    Equity is valued before each candle's trade.
+
+    Args:
+        close: Close prices
+        target_fraction: Target position value / portfolio value per candle
+            (negative for shorts)
+        initial_capital: Starting cash
+        fee_rate: Fee as a fraction of traded value
+        min_trade_pct: Minimum trade value as a fraction of portfolio value
+        window: Initial number of candles evaluated per array step
+
+    Returns:
+        BacktestResult with REBALANCE trades
+    """
+    close = np.asarray(close, dtype=float)
+    target_fraction = np.asarray(target_fraction, dtype=float)
+    n = len(close)
+
+    equity = np.empty(n)
+    log = _TradeLog()
+    cash = initial_capital
+    position = 0.0
+
+    # A flat book can only trade where the target is non-zero
+    active = np.flatnonzero(target_fraction != 0)
+
+    def executes(a: int, b: int) -> np.ndarray:
+        price = close[a:b]
+        value = cash + (position * price)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            target_shares = np.where(price > 0, (target_fraction[a:b] * value) / price, 0.0)
+        trade_value = (target_shares - position) * price
+        fee = np.abs(trade_value) * fee_rate
+        return (np.abs(trade_value) > value * min_trade_pct) & (trade_value <= cash + fee)
+
+    i = 0
+    while i < n:
+        if position == 0 and cash >= 0:
+            k = np.searchsorted(active, i)
+            start = int(active[k]) if k < len(active) else n
+        else:
+            start = i
+
+        j = _first_hit(executes, start, n, window)
+        equity[i:j + 1] = cash + (position * close[i:j + 1])
+        if j >= n:
+            break
+
+        # Same scalar arithmetic as the per-row loop
+        price = float(close[j])
+        value = cash + (position * price)
+        target_shares = (float(target_fraction[j]) * value) / price if price > 0 else 0.0
+        change = target_shares - position
+        trade_value = change * price
+        cash -= trade_value + abs(trade_value) * fee_rate
+        position = target_shares
+        log.add(j, REBALANCE, price, change, position, cash)
+        i = j + 1
+
+    return _result(close, equity, log, cash, position)
+
+
+def run_sized_positions(close: np.ndarray, size: Callable[[int, float, float], float],
+                        initial_capital: float = 10000, fee_rate: float = 0.001,
+                        min_trade_pct: float = 0.01) -> BacktestResult:
+    """
+    run_target_positions with the target fraction decided candle by candle
+
+    For sizing rules that depend on the current portfolio value, which is
+    only known once the earlier candles have traded.
+
+    Args:
+        close: Close prices
+        size: Callable (candle position, price, portfolio value) -> target fraction
+        initial_capital: Starting cash
+        fee_rate: Fee as a fraction of traded value
+        min_trade_pct: Minimum trade value as a fraction of portfolio value
+
+    Returns:
+        BacktestResult with REBALANCE trades
+    """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+
+    equity = np.empty(n)
+    log = _TradeLog()
+    cash = initial_capital
+    position = 0.0
+
+    for i in range(n):
+        price = float(close[i])
+        value = cash + (position * price)
+        equity[i] = value
+
+        target_shares = (float(size(i, price, value)) * value) / price if price > 0 else 0.0
+        change = target_shares - position
+        trade_value = change * price
+        fee = abs(trade_value) * fee_rate
+        if abs(trade_value) > value * min_trade_pct and trade_value <= cash + fee:
+            cash -= trade_value + fee
+            position = target_shares
+            log.add(i, REBALANCE, price, change, position, cash)
+
+    return _result(close, equity, log, cash, position)
+
+
+def run_all_in(close: np.ndarray, signal: np.ndarray,
+               initial_capital: float = 10000) -> BacktestResult:
+    """
+    Long-only, all-in / all-out on +1 / -1 signals without fees
+
+    Buys with all cash on signal == 1 when flat and sells the whole position
+    on signal == -1 when long. Equity is valued after each candle's trade.
+
+    Args:
+        close: Close prices
+        signal: +1 buy, -1 sell, anything else holds
+        initial_capital: Starting cash
+
+    Returns:
+        BacktestResult with BUY / SELL trades
+    """
+    close = np.asarray(close, dtype=float)
+    signal = np.asarray(signal, dtype=float)
+    n = len(close)
+
+    equity = np.empty(n)
+    log = _TradeLog()
+    cash = initial_capital
+    position = 0.0
+    segment_start = 0
+
+    for i in np.flatnonzero((signal == 1) | (signal == -1)):
+        price = float(close[i])
+
+        if signal[i] == 1 and position == 0:
+            equity[segment_start:i] = cash
+            position = cash / price
+            cash = 0
+            log.add(i, BUY, price, position, position, cash)
+            segment_start = i
+
+        elif signal[i] == -1 and position > 0:
+            equity[segment_start:i] = position * close[segment_start:i]
+            cash = position * price
+            log.add(i, SELL, price, -position, 0.0, cash)
+            position = 0.0
+            segment_start = i
+
+    if position > 0:
+        equity[segment_start:] = position * close[segment_start:]
+    else:
+        equity[segment_start:] = cash
+
+    return _result(close, equity, log, cash, position)
+
+
+def run_sized_long(close: np.ndarray, signal: np.ndarray, initial_capital: float = 10000,
+                   max_position_pct: float = 0.30, stop_loss_pct: float = 0.10,
+                   window: int = 256) -> BacktestResult:
+    """
+    Long-only entries sized by signal strength with a fixed stop loss
+
+    Enters max_position_pct * signal of portfolio value on a positive signal
+    when flat (if cash covers it) and exits on a negative signal or when the
+    close falls to the stop. The stop is checked first, so a stopped-out
+    candle can re-enter on the same bar. Equity is valued before each
+    candle's trades.
+
+    Args:
+        close: Close prices
+        signal: Signal strength per candle (> 0 buy, < 0 sell)
+        initial_capital: Starting cash
+        max_position_pct: Fraction of portfolio value for a full-strength signal
+        stop_loss_pct: Stop distance below the entry price
+        window: Initial number of candles evaluated per array step
+
+    Returns:
+        BacktestResult with BUY / SELL / STOP_LOSS trades
+    """
+    close = np.asarray(close, dtype=float)
+    signal = np.asarray(signal, dtype=float)
+    n = len(close)
+
+    equity = np.empty(n)
+    log = _TradeLog()
+    cash = initial_capital
+    position = 0.0
+    entry_price = 0.0
+    stop_price = 0.0
+
+    buy_rows = np.flatnonzero(signal > 0)
+
+    def exits(a: int, b: int) -> np.ndarray:
+        return ((entry_price > 0) & (close[a:b] <= stop_price)) | (signal[a:b] < 0)
+
+    i = 0
+    while i < n:
+        if position == 0:
+            k = np.searchsorted(buy_rows, i)
+            j = int(buy_rows[k]) if k < len(buy_rows) else n
+        else:
+            j = _first_hit(exits, i, n, window)
+
+        equity[i:j + 1] = cash + (position * close[i:j + 1])
+        if j >= n:
+            break
+
+        price = float(close[j])
+        portfolio_value = cash + (position * price)
+        i = j + 1
+
+        if position > 0:
+            kind = STOP_LOSS if entry_price > 0 and price <= stop_price else SELL
+            cash = cash + (position * price)
+            log.add(j, kind, price, -position, 0.0, cash)
+            position = 0.0
+            entry_price = 0.0
+            if kind == SELL:
+                continue
+
+        if signal[j] > 0:
+            max_investment = portfolio_value * (max_position_pct * float(signal[j]))
+            shares = max_investment / price
+
+            if cash >= max_investment:
+                position = shares
+                cash = cash - (shares * price)
+                entry_price = price
+                stop_price = entry_price * (1 - stop_loss_pct)
+                log.add(j, BUY, price, shares, position, cash)
+
+    return _result(close, equity, log, cash, position)
+
+
+def all_in_trade_records(result: BacktestResult, timestamps, initial_capital: float) -> List[Dict]:
+    """
+    Trade dicts in the Week1 backtest format for a run_all_in result
+
+    Args:
+        result: run_all_in output
+        timestamps: Per-candle timestamps (Series or Index)
+        initial_capital: Starting cash (SELL profit is measured against it)
+    """
+    timestamps = timestamps.iloc if hasattr(timestamps, 'iloc') else timestamps
+    trades = []
+    entry_price = 0
+
+    for i, kind, price, cash in zip(result.trades['index'].tolist(), result.trades['kind'],
+                                    result.trades['price'].tolist(), result.trades['cash'].tolist()):
+        if kind == BUY:
+            entry_price = price
+            trades.append({'type': 'BUY', 'price': price, 'timestamp': timestamps[i]})
+        else:
+            trades.append({
+                'type': 'SELL',
+                'price': price,
+                'profit': cash - initial_capital,
+                'return': (price - entry_price) / entry_price * 100,
+                'timestamp': timestamps[i]
+            })
+
+    return trades
+
+
+def bar_ticks(bar_times: Sequence, tick_times: Sequence, tick_prices: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Assign tick prices (e.g. 30-second ticker polls) to the candles they fall in
+
+    Args:
+        bar_times: Candle open times, ascending
+        tick_times: Tick times, ascending
+        tick_prices: Tick prices
+
+    Returns:
+        (tick_bar, tick_price): candle position of every tick inside the
+        candle range, and its price
+    """
+    bar_times = _time_values(bar_times)
+    tick_times = _time_values(tick_times)
+    tick_prices = np.asarray(tick_prices, dtype=float)
+
+    tick_bar = np.searchsorted(bar_times, tick_times, side='right') - 1
+    inside = tick_bar >= 0
+    return tick_bar[inside].astype(np.int64), tick_prices[inside]
+
+
+def _time_values(values: Sequence) -> np.ndarray:
+    """Comparable numeric values for timestamps (UTC nanoseconds) or plain numbers"""
+    index = pd.Index(values)
+    if isinstance(index, pd.DatetimeIndex):
+        return index.as_unit('ns').asi8
+    return index.to_numpy()
+
+
+def run_brackets(close: np.ndarray, signal: np.ndarray, size_fraction: np.ndarray,
+                 stop_loss_pct: Optional[float], take_profit_pct: Optional[float],
+                 initial_capital: float = 10000, fill: str = 'close',
+                 open_: Optional[np.ndarray] = None, high: Optional[np.ndarray] = None,
+                 low: Optional[np.ndarray] = None,
+                 ticks: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                 same_bar: str = 'stop_first', window: int = 256) -> BacktestResult:
+    """
+    Long-only entries with a stop loss / take profit bracket
+
+    Enters size_fraction of portfolio value at the close of a positive
+    signal candle when flat. From the next candle on, the position exits at
+    the stop, the target or the close of a negative signal candle.
+
+    Stops and targets are resolved with one of three fill models:
+        close: checked against the candle close and filled there (the
+            per-row backtest loops)
+        intrabar: checked against the candle high / low; fills at the level,
+            or at the open when the candle gaps through it. When the range
+            crosses both levels, same_bar picks the order: 'stop_first'
+            (pessimistic), 'target_first', or 'open_distance' (the extreme
+            nearer the open trades first)
+        ticks: (tick_bar, tick_price) from bar_ticks(); the first tick
+            through a level fills at the tick price, like the live engine's
+            ticker-poll stop checks. Candles without ticks use intrabar.
+
+    Equity is valued at each candle's close before its trades.
+
+    Args:
+        close: Close prices
+        signal: > 0 enter, < 0 exit
+        size_fraction: Fraction of portfolio value to invest per candle
+        stop_loss_pct / take_profit_pct: Bracket distance from the entry
+            price (None disables the level)
+        initial_capital: Starting cash
+        fill: 'close' or 'intrabar' (ignored when ticks are given)
+        open_ / high / low: Candle prices (required for intrabar fills)
+        ticks: Optional intrabar price path
+        same_bar: Ordering rule for candles crossing both levels
+        window: Initial number of candles evaluated per array step
+
+    Returns:
+        BacktestResult with BUY / STOP_LOSS / TAKE_PROFIT / SELL trades
+    """
+    if fill not in FILL_MODELS:
+        raise ValueError(f"Unknown fill model '{fill}'. Expected one of {FILL_MODELS}")
+    if same_bar not in SAME_BAR_RULES:
+        raise ValueError(f"Unknown same-bar rule '{same_bar}'. Expected one of {SAME_BAR_RULES}")
+
+    close = np.asarray(close, dtype=float)
+    signal = np.asarray(signal, dtype=float)
+    size_fraction = np.asarray(size_fraction, dtype=float)
+    n = len(close)
+    intrabar = fill == 'intrabar' or ticks is not None
+
+    if intrabar:
+        if open_ is None or high is None or low is None:
+            raise ValueError("Intrabar fills need open, high and low prices")
+        open_ = np.asarray(open_, dtype=float)
+        bar_high = np.asarray(high, dtype=float)
+        bar_low = np.asarray(low, dtype=float)
+    else:
+        bar_high = bar_low = close
+
+    tick_start = tick_end = tick_price = None
+    if ticks is not None:
+        tick_bar, tick_price = np.asarray(ticks[0], dtype=np.int64), np.asarray(ticks[1], dtype=float)
+        bars = np.arange(n)
+        tick_start = np.searchsorted(tick_bar, bars, side='left')
+        tick_end = np.searchsorted(tick_bar, bars, side='right')
+
+        # Candles with ticks only see the polled prices
+        has_ticks = np.flatnonzero(tick_end > tick_start)
+        if len(has_ticks):
+            bar_high = bar_high.copy()
+            bar_low = bar_low.copy()
+            bar_high[has_ticks] = np.maximum.reduceat(tick_price, tick_start[has_ticks])
+            bar_low[has_ticks] = np.minimum.reduceat(tick_price, tick_start[has_ticks])
+
+    equity = np.empty(n)
+    log = _TradeLog()
+    cash = initial_capital
+    position = 0.0
+    stop_price = -np.inf
+    target_price = np.inf
+
+    entry_rows = np.flatnonzero(signal > 0)
+
+    def exits(a: int, b: int) -> np.ndarray:
+        return (bar_low[a:b] <= stop_price) | (bar_high[a:b] >= target_price) | (signal[a:b] < 0)
+
+    i = 0
+    while i < n:
+        if position == 0:
+            if not cash > 0:
+                j = n
+            else:
+                k = np.searchsorted(entry_rows, i)
+                j = int(entry_rows[k]) if k < len(entry_rows) else n
+        else:
+            j = _first_hit(exits, i, n, window)
+
+        equity[i:j + 1] = cash + (position * close[i:j + 1])
+        if j >= n:
+            break
+
+        price = float(close[j])
+        i = j + 1
+
+        if position > 0:
+            kind, fill_price = _resolve_exit(
+                j, price, float(signal[j]), stop_price, target_price, intrabar, same_bar,
+                open_, bar_high, bar_low, tick_start, tick_end, tick_price
+            )
+            cash += position * fill_price
+            log.add(j, kind, fill_price, -position, 0.0, cash)
+            position = 0.0
+            continue
+
+        portfolio_value = cash + (position * price)
+        investment = portfolio_value * float(size_fraction[j])
+        if cash >= investment:
+            position = investment / price
+            cash -= investment
+            stop_price = price * (1 - stop_loss_pct) if stop_loss_pct is not None else -np.inf
+            target_price = price * (1 + take_profit_pct) if take_profit_pct is not None else np.inf
+            log.add(j, BUY, price, position, position, cash)
+
+    return _result(close, equity, log, cash, position)
+
+
+def _resolve_exit(j: int, close: float, signal: float, stop_price: float, target_price: float,
+                  intrabar: bool, same_bar: str, open_, high, low,
+                  tick_start, tick_end, tick_price) -> Tuple[str, float]:
+    """Exit kind and fill price for a candle known to exit"""
+    if not intrabar:
+        if close <= stop_price:
+            return STOP_LOSS, close
+        if close >= target_price:
+            return TAKE_PROFIT, close
+        return SELL, close
+
+    if tick_start is not None and tick_end[j] > tick_start[j]:
+        path = tick_price[tick_start[j]:tick_end[j]]
+        crossed = np.flatnonzero((path <= stop_price) | (path >= target_price))
+        if len(crossed):
+            fill_price = float(path[crossed[0]])
+            return (STOP_LOSS if fill_price <= stop_price else TAKE_PROFIT), fill_price
+        return SELL, close
+
+    bar_open = float(open_[j])
+    if bar_open <= stop_price:
+        return STOP_LOSS, bar_open
+    if bar_open >= target_price:
+        return TAKE_PROFIT, bar_open
+
+    stop_hit = low[j] <= stop_price
+    target_hit = high[j] >= target_price
+    if stop_hit and target_hit:
+        if same_bar == 'target_first' or (
+                same_bar == 'open_distance' and high[j] - bar_open < bar_open - low[j]):
+            return TAKE_PROFIT, target_price
+        return STOP_LOSS, stop_price
+    if stop_hit:
+        return STOP_LOSS, stop_price
+    if target_hit:
+        return TAKE_PROFIT, target_price
+    return SELL, close
@@ -0,0 +1,279 @@
+"""
+Batched Technical Indicators
+Computes indicators for a whole symbol universe on (symbols x time) matrices
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BatchIndicators:
+    """
+    Vectorized counterparts of TechnicalIndicators for 2-D arrays
+
+    Every input is a float matrix with one row per symbol and one column per
+    candle (oldest first). Rows with shorter history are left-padded with NaN.
+    Outputs have the same shape and follow the pandas semantics of the
+    per-Series implementations (NaN during warm-up, ddof=1 std,
+    ewm(adjust=False)), so row i equals TechnicalIndicators on symbol i.
+    """
+
+    @staticmethod
+    def _rolling(data: np.ndarray, window: int, reducer) -> np.ndarray:
+        """Apply a reducer over trailing windows along the time axis"""
+        data = np.asarray(data, dtype=float)
+        result = np.full(data.shape, np.nan)
+
+        if window < 1 or data.shape[1] < window:
+            return result
+
+        windows = np.lib.stride_tricks.sliding_window_view(data, window, axis=1)
+        result[:, window - 1:] = reducer(windows, axis=-1)
+        return result
+
+    @staticmethod
+    def simple_moving_average(data: np.ndarray, window: int) -> np.ndarray:
+        """Calculate Simple Moving Average"""
+        return BatchIndicators._rolling(data, window, np.mean)
+
+    @staticmethod
+    def rolling_std(data: np.ndarray, window: int) -> np.ndarray:
+        """Calculate rolling sample standard deviation (ddof=1)"""
+        return BatchIndicators._rolling(data, window, lambda w, axis: np.std(w, axis=axis, ddof=1))
+
+    @staticmethod
+    def exponential_moving_average(data: np.ndarray, window: int) -> np.ndarray:
+        """
+        Calculate Exponential Moving Average
+
+        Recursion runs over time with every symbol updated at once, mirroring
+        pandas ewm(span=window, adjust=False) including its NaN weighting.
+        """
+        data = np.asarray(data, dtype=float)
+        result = np.full(data.shape, np.nan)
+
+        if data.shape[1] == 0:
+            return result
+
+        alpha = 2.0 / (window + 1.0)
+        decay = 1.0 - alpha
+
+        weighted = data[:, 0].copy()
+        old_wt = np.ones(data.shape[0])
+        result[:, 0] = weighted
+
+        for t in range(1, data.shape[1]):
+            current = data[:, t]
+            observed = ~np.isnan(current)
+            started = ~np.isnan(weighted)
+
+            old_wt = np.where(started, old_wt * decay, old_wt)
+            blend = started & observed & (weighted != current)
+
+            with np.errstate(invalid='ignore'):
+                blended = (old_wt * weighted + alpha * current) / (old_wt + alpha)
+
+            weighted = np.where(blend, blended, np.where(~started & observed, current, weighted))
+            old_wt = np.where(started & observed, 1.0, old_wt)
+            result[:, t] = weighted
+
+        return result
+
+    @staticmethod
+    def rsi(data: np.ndarray, window: int = 14) -> np.ndarray:
+        """Calculate Relative Strength Index (RSI)"""
+        data = np.asarray(data, dtype=float)
+        delta = np.full(data.shape, np.nan)
+        delta[:, 1:] = np.diff(data, axis=1)
+
+        # The first delta of a series counts as zero gain/loss, as with
+        # Series.where; padding before a symbol's history stays NaN
+        padding = np.isnan(data)
+        gain = np.where(padding, np.nan, np.where(delta > 0, delta, 0.0))
+        loss = np.where(padding, np.nan, np.where(delta < 0, -delta, 0.0))
+
+        avg_gain = BatchIndicators.simple_moving_average(gain, window)
+        avg_loss = BatchIndicators.simple_moving_average(loss, window)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = avg_gain / avg_loss
+            return 100 - (100 / (1 + rs))
+
+    @staticmethod
+    def macd(data: np.ndarray, fast: int = 12, slow: int = 26,
+             signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Calculate MACD line, signal line and histogram"""
+        macd_line = (BatchIndicators.exponential_moving_average(data, fast) -
+                     BatchIndicators.exponential_moving_average(data, slow))
+        signal_line = BatchIndicators.exponential_moving_average(macd_line, signal)
+        return macd_line, signal_line, macd_line - signal_line
+
+    @staticmethod
+    def bollinger_bands(data: np.ndarray, window: int = 20,
+                        num_std: float = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Calculate upper, middle and lower Bollinger Bands"""
+        sma = BatchIndicators.simple_moving_average(data, window)
+        std = BatchIndicators.rolling_std(data, window)
+        return sma + (std * num_std), sma, sma - (std * num_std)
+
+    @staticmethod
+    def stochastic_oscillator(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                              k_window: int = 14, d_window: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """Calculate Stochastic %K and %D"""
+        lowest_low = BatchIndicators._rolling(low, k_window, np.min)
+        highest_high = BatchIndicators._rolling(high, k_window, np.max)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k_percent = ((close - lowest_low) / (highest_high - lowest_low)) * 100
+
+        return k_percent, BatchIndicators.simple_moving_average(k_percent, d_window)
+
+    @staticmethod
+    def williams_r(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+        """Calculate Williams %R"""
+        highest_high = BatchIndicators._rolling(high, window, np.max)
+        lowest_low = BatchIndicators._rolling(low, window, np.min)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return ((highest_high - close) / (highest_high - lowest_low)) * -100
+
+    @staticmethod
+    def average_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                           window: int = 14) -> np.ndarray:
+        """Calculate Average True Range (ATR)"""
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        prev_close = np.full(high.shape, np.nan)
+        prev_close[:, 1:] = np.asarray(close, dtype=float)[:, :-1]
+
+        # fmax skips NaN like DataFrame.max(axis=1)
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        return BatchIndicators.simple_moving_average(true_range, window)
+
+    @staticmethod
+    def on_balance_volume(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """Calculate On-Balance Volume (OBV) as a cumulative sum of signed volume"""
+        close = np.asarray(close, dtype=float)
+        volume = np.asarray(volume, dtype=float)
+
+        if close.shape[1] == 0:
+            return np.empty(close.shape)
+
+        price_change = np.diff(close, axis=1)
+        signed_volume = np.empty_like(volume)
+        signed_volume[:, 0] = volume[:, 0]
+        signed_volume[:, 1:] = np.where(
+            price_change > 0, volume[:, 1:],
+            np.where(price_change < 0, -volume[:, 1:], 0.0)
+        )
+
+        # First candle after NaN padding seeds OBV with its volume
+        signed_volume[:, 1:] = np.where(np.isnan(close[:, :-1]), volume[:, 1:], signed_volume[:, 1:])
+
+        obv = np.nancumsum(signed_volume, axis=1)
+        obv[np.isnan(close)] = np.nan
+        return obv
+
+    @staticmethod
+    def vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """Calculate cumulative Volume Weighted Average Price (VWAP)"""
+        typical_price = (np.asarray(high, dtype=float) + low + close) / 3
+        volume_price = typical_price * volume
+
+        # Series.cumsum skips NaN padding but keeps NaN at those positions
+        cumulative_volume_price = np.nancumsum(volume_price, axis=1)
+        cumulative_volume = np.nancumsum(volume, axis=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vwap = cumulative_volume_price / cumulative_volume
+
+        vwap[np.isnan(volume_price)] = np.nan
+        return vwap
+
+    @classmethod
+    def calculate_all_indicators(cls, close: np.ndarray, high: Optional[np.ndarray] = None,
+                                 low: Optional[np.ndarray] = None,
+                                 volume: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Calculate the core indicator set for every symbol in one pass
+
+        Args:
+            close: (symbols x time) close prices
+            high: (symbols x time) high prices, enables range-based indicators
+            low: (symbols x time) low prices
+            volume: (symbols x time) volumes, enables volume indicators
+
+        Returns:
+            Dictionary of indicator matrices keyed by the column names used in
+            TechnicalIndicators.calculate_all_indicators
+        """
+        close = np.atleast_2d(np.asarray(close, dtype=float))
+        result: Dict[str, np.ndarray] = {}
+
+        for window in (5, 10, 20, 50, 200):
+            result[f'sma_{window}'] = cls.simple_moving_average(close, window)
+
+        for window in (5, 10, 20, 50):
+            result[f'ema_{window}'] = cls.exponential_moving_average(close, window)
+
+        result['rsi'] = cls.rsi(close, 14)
+        result['rsi_30'] = cls.rsi(close, 30)
+        result['macd'], result['macd_signal'], result['macd_histogram'] = cls.macd(close)
+
+        upper, middle, lower = cls.bollinger_bands(close)
+        result['bb_upper'], result['bb_middle'], result['bb_lower'] = upper, middle, lower
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result['bb_width'] = (upper - lower) / middle
+            result['bb_position'] = (close - lower) / (upper - lower)
+
+        if high is not None and low is not None:
+            high = np.atleast_2d(np.asarray(high, dtype=float))
+            low = np.atleast_2d(np.asarray(low, dtype=float))
+            result['stoch_k'], result['stoch_d'] = cls.stochastic_oscillator(high, low, close)
+            result['williams_r'] = cls.williams_r(high, low, close)
+            result['atr'] = cls.average_true_range(high, low, close)
+
+            if volume is not None:
+                volume = np.atleast_2d(np.asarray(volume, dtype=float))
+                result['vwap'] = cls.vwap(high, low, close, volume)
+
+        if volume is not None:
+            volume = np.atleast_2d(np.asarray(volume, dtype=float))
+            result['obv'] = cls.on_balance_volume(close, volume)
+            result['volume_sma'] = cls.simple_moving_average(volume, 20)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result['volume_ratio'] = volume / result['volume_sma']
+
+        logger.debug(f"Calculated {len(result)} batched indicators for {close.shape[0]} symbols")
+        return result
+
+
+def stack_frames(frames: Dict[str, pd.DataFrame],
+                 columns: Tuple[str, ...] = ('open_price', 'high_price', 'low_price', 'close_price', 'volume')
+                 ) -> Tuple[List[str], pd.Index, Dict[str, np.ndarray]]:
+    """
+    Align per-symbol candle frames into (symbols x time) matrices
+
+    Args:
+        frames: Symbol -> DataFrame indexed by timestamp
+        columns: Columns to stack
+
+    Returns:
+        (symbols, shared time index, column -> matrix); missing candles are NaN
+    """
+    symbols = list(frames.keys())
+    index = pd.Index([])
+    for frame in frames.values():
+        index = index.union(frame.index)
+
+    matrices = {
+        column: np.vstack([
+            frames[symbol][column].reindex(index).to_numpy(dtype=float) for symbol in symbols
+        ]) if symbols else np.empty((0, 0))
+        for column in columns
+    }
+
+    return symbols, index, matrices
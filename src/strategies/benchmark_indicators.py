@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark indicator kernels against their previous row-by-row implementations
+
+Usage:
+    python src/strategies/benchmark_indicators.py [--sizes 10000 100000 1000000]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import time
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+
+from strategies.technical_indicators import TechnicalIndicators
+
+
+def legacy_on_balance_volume(close: pd.Series, volume: pd.Series) -> pd.Series:
+    """Previous OBV implementation (scalar .iloc loop), kept as reference"""
+    price_change = close.diff()
+    obv = pd.Series(index=close.index, dtype=float)
+    obv.iloc[0] = volume.iloc[0]
+
+    for i in range(1, len(close)):
+        if price_change.iloc[i] > 0:
+            obv.iloc[i] = obv.iloc[i-1] + volume.iloc[i]
+        elif price_change.iloc[i] < 0:
+            obv.iloc[i] = obv.iloc[i-1] - volume.iloc[i]
+        else:
+            obv.iloc[i] = obv.iloc[i-1]
+
+    return obv
+
+
+def legacy_parabolic_sar(high: pd.Series, low: pd.Series, af_start: float = 0.02,
+                         af_increment: float = 0.02, af_max: float = 0.2) -> pd.Series:
+    """Previous Parabolic SAR implementation (scalar .iloc loop), kept as reference"""
+    length = len(high)
+    psar = pd.Series(index=high.index, dtype=float)
+    uptrend = True
+    af = af_start
+    ep = high.iloc[0] if uptrend else low.iloc[0]
+
+    psar.iloc[0] = low.iloc[0]
+
+    for i in range(1, length):
+        if uptrend:
+            psar.iloc[i] = psar.iloc[i-1] + af * (ep - psar.iloc[i-1])
+
+            if low.iloc[i] <= psar.iloc[i]:
+                uptrend = False
+                psar.iloc[i] = ep
+                ep = low.iloc[i]
+                af = af_start
+            else:
+                if high.iloc[i] > ep:
+                    ep = high.iloc[i]
+                    af = min(af + af_increment, af_max)
+        else:
+            psar.iloc[i] = psar.iloc[i-1] + af * (ep - psar.iloc[i-1])
+
+            if high.iloc[i] >= psar.iloc[i]:
+                uptrend = True
+                psar.iloc[i] = ep
+                ep = high.iloc[i]
+                af = af_start
+            else:
+                if low.iloc[i] < ep:
+                    ep = low.iloc[i]
+                    af = min(af + af_increment, af_max)
+
+    return psar
+
+
+def legacy_commodity_channel_index(high: pd.Series, low: pd.Series, close: pd.Series,
+                                   window: int = 20) -> pd.Series:
+    """Previous CCI implementation (rolling.apply with a Python callback), kept as reference"""
+    typical_price = (high + low + close) / 3
+    sma_tp = typical_price.rolling(window=window).mean()
+
+    mean_deviation = typical_price.rolling(window=window).apply(
+        lambda x: np.mean(np.abs(x - x.mean())), raw=True
+    )
+
+    cci = (typical_price - sma_tp) / (0.015 * mean_deviation)
+    return cci
+
+
+def make_candles(n: int, seed: int = 7) -> pd.DataFrame:
+    """Random-walk 5m OHLCV candles"""
+    rng = np.random.default_rng(seed)
+    close = 30000 + np.cumsum(rng.normal(0, 25, n))
+    spread = rng.uniform(0, 40, n)
+    return pd.DataFrame({
+        'open_price': close,
+        'high_price': close + spread,
+        'low_price': close - spread[::-1],
+        'close_price': close,
+        'volume': rng.uniform(1, 100, n)
+    }, index=pd.date_range('2024-01-01', periods=n, freq='5min'))
+
+
+def _time(func: Callable, *args) -> Tuple[float, pd.Series]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def benchmark_cases(df: pd.DataFrame) -> Dict[str, Tuple[Callable, Callable, tuple]]:
+    """Indicator name -> (legacy, current, args)"""
+    return {
+        'OBV': (legacy_on_balance_volume, TechnicalIndicators.on_balance_volume,
+                (df['close_price'], df['volume'])),
+        'PSAR': (legacy_parabolic_sar, TechnicalIndicators.parabolic_sar,
+                 (df['high_price'], df['low_price'])),
+        'CCI': (legacy_commodity_channel_index, TechnicalIndicators.commodity_channel_index,
+                (df['high_price'], df['low_price'], df['close_price'])),
+    }
+
+
+def run_benchmark(sizes: List[int]) -> pd.DataFrame:
+    """Time legacy vs current kernels and verify identical output"""
+    rows = []
+
+    for n in sizes:
+        df = make_candles(n)
+
+        for name, (legacy, current, args) in benchmark_cases(df).items():
+            legacy_time, expected = _time(legacy, *args)
+            current_time, actual = _time(current, *args)
+
+            rows.append({
+                'indicator': name,
+                'rows': n,
+                'legacy_s': legacy_time,
+                'current_s': current_time,
+                'speedup': legacy_time / current_time if current_time > 0 else float('inf'),
+                'identical': expected.equals(actual)
+            })
+
+            print(f"  {name:>5} {n:>9,} rows: legacy {legacy_time:8.3f}s | "
+                  f"current {current_time:8.4f}s | x{rows[-1]['speedup']:,.0f} | "
+                  f"identical: {rows[-1]['identical']}")
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indicator kernels")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print("⏱️  Indicator Kernel Benchmark")
+    print("=" * 80)
+    results = run_benchmark(args.sizes)
+    print("=" * 80)
+
+    if results['identical'].all():
+        print("✅ All kernels produce identical output")
+    else:
+        print("❌ Output mismatch detected")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
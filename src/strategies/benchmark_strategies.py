@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Benchmark strategy signal generation and backtests against the previous row-by-row implementations
+
+Usage:
+    python src/strategies/benchmark_strategies.py [--sizes 2000 10000 26000]
+    python src/strategies/benchmark_strategies.py --backtest [--sizes 105120]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import time
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+
+from strategies.week1_refined_5m import Week1Refined5mStrategy
+from strategies.pivot_zone_strategy import PivotZoneStrategy
+from strategies.trading_strategies import MomentumStrategy, MeanReversionStrategy
+from strategies.phase2_final_test import OptimizedPhase2Strategy
+from strategies.benchmark_indicators import make_candles
+
+
+def legacy_week1_refined_5m_signals(strategy: Week1Refined5mStrategy, data: pd.DataFrame) -> pd.DataFrame:
+    """Previous Week1Refined5mStrategy.generate_signals (.iloc loop), kept as reference"""
+    data = data.copy()
+
+    data['ma_fast'] = data['close_price'].rolling(strategy.fast_ma).mean()
+    data['ma_slow'] = data['close_price'].rolling(strategy.slow_ma).mean()
+    data['rsi'] = strategy.indicators.rsi(data['close_price'])
+
+    macd, signal, histogram = strategy.indicators.macd(data['close_price'])
+    data['macd'] = macd
+    data['macd_signal'] = signal
+    data['macd_histogram'] = histogram
+
+    data['adx'] = strategy.calculate_adx(data)
+    data['volume_confirmed'] = strategy.volume_confirmation(data)
+
+    data['htf_fast'] = data['close_price'].rolling(strategy.htf_fast_ma).mean()
+    data['htf_slow'] = data['close_price'].rolling(strategy.htf_slow_ma).mean()
+
+    data['signal'] = 0
+    data['position'] = 0
+    data['entry_price'] = 0.0
+    data['stop_loss'] = 0.0
+    data['take_profit'] = 0.0
+
+    position = 0
+    entry_price = 0
+
+    for i in range(len(data)):
+        if i < max(strategy.htf_slow_ma, 200):
+            continue
+
+        trend_up = data.iloc[i]['htf_fast'] > data.iloc[i]['htf_slow']
+        cooldown_passed = (i - strategy.last_trade_index) >= strategy.cooldown_periods
+        volume_ok = data.iloc[i]['volume_confirmed']
+        macd_bullish = data.iloc[i]['macd'] > data.iloc[i]['macd_signal']
+        strong_trend = data.iloc[i]['adx'] > strategy.adx_threshold
+
+        if position == 0:
+            ma_cross_up = (data.iloc[i]['ma_fast'] > data.iloc[i]['ma_slow'] and
+                           data.iloc[i-1]['ma_fast'] <= data.iloc[i-1]['ma_slow'])
+            rsi_ok = data.iloc[i]['rsi'] < strategy.rsi_overbought
+
+            if (ma_cross_up and rsi_ok and trend_up and cooldown_passed and
+                    volume_ok and macd_bullish and strong_trend):
+                data.loc[data.index[i], 'signal'] = 1
+                position = 1
+                entry_price = data.iloc[i]['close_price']
+                data.loc[data.index[i], 'entry_price'] = entry_price
+                data.loc[data.index[i], 'stop_loss'] = entry_price * (1 - strategy.stop_loss_pct)
+                data.loc[data.index[i], 'take_profit'] = entry_price * (1 + strategy.take_profit_pct)
+                strategy.last_trade_index = i
+
+        elif position == 1:
+            ma_cross_down = (data.iloc[i]['ma_fast'] < data.iloc[i]['ma_slow'] and
+                             data.iloc[i-1]['ma_fast'] >= data.iloc[i-1]['ma_slow'])
+            rsi_overbought = data.iloc[i]['rsi'] > strategy.rsi_overbought
+            stop_loss_hit = data.iloc[i]['close_price'] <= data.iloc[i-1]['stop_loss']
+            take_profit_hit = data.iloc[i]['close_price'] >= data.iloc[i-1]['take_profit']
+
+            if ma_cross_down or rsi_overbought or stop_loss_hit or take_profit_hit:
+                data.loc[data.index[i], 'signal'] = -1
+                position = 0
+                entry_price = 0
+            else:
+                data.loc[data.index[i], 'entry_price'] = data.iloc[i-1]['entry_price']
+                data.loc[data.index[i], 'stop_loss'] = data.iloc[i-1]['stop_loss']
+                data.loc[data.index[i], 'take_profit'] = data.iloc[i-1]['take_profit']
+
+        data.loc[data.index[i], 'position'] = position
+
+    return data
+
+
+def legacy_pivot_zone_signals(strategy: PivotZoneStrategy, data: pd.DataFrame) -> pd.DataFrame:
+    """Previous PivotZoneStrategy.generate_signals (per-row slices), kept as reference"""
+    df = data.copy()
+    zones = strategy.calculate_pivot_zones(df)
+
+    signals = pd.DataFrame(index=df.index)
+    signals['signal'] = 0.0
+    signals['zone_name'] = ''
+    signals['signal_strength'] = 0.0
+
+    zone_pairs = [
+        ('R5/R6', zones['r5'], zones['r6']),
+        ('R2/R3', zones['r2'], zones['r3']),
+        ('R0/R1', zones['r0'], zones['r1']),
+        ('S0/S1', zones['s1'], zones['s0']),
+        ('S2/S3', zones['s3'], zones['s2']),
+        ('S5/S6', zones['s6'], zones['s5']),
+    ]
+
+    start_idx = max(strategy.ma_trend_period, 200, 20)
+
+    for i in range(start_idx, len(df)):
+        candle = df.iloc[i]
+        trend = strategy.check_trend_direction(df, i)
+        volume_ok = strategy.check_volume_confirmation(df, i)
+
+        for zone_name, zone_bottom, zone_top in zone_pairs:
+            bottom_val = zone_bottom.iloc[i]
+            top_val = zone_top.iloc[i]
+
+            if 'S' in zone_name:
+                if strategy.check_zone_touch_and_close(candle, bottom_val, top_val, 'ABOVE'):
+                    if strategy.use_trend_filter and trend == 'BEARISH':
+                        continue
+                    if not volume_ok:
+                        continue
+
+                    strength = 0.6
+                    if trend == 'BULLISH':
+                        strength += 0.2
+                    if volume_ok:
+                        strength += 0.2
+
+                    signals.loc[signals.index[i], 'signal'] = 1.0
+                    signals.loc[signals.index[i], 'zone_name'] = zone_name
+                    signals.loc[signals.index[i], 'signal_strength'] = min(strength, 1.0)
+                    break
+
+            elif 'R' in zone_name:
+                if strategy.check_zone_touch_and_close(candle, bottom_val, top_val, 'BELOW'):
+                    if strategy.use_trend_filter and trend == 'BULLISH':
+                        continue
+                    if not volume_ok:
+                        continue
+
+                    strength = 0.6
+                    if trend == 'BEARISH':
+                        strength += 0.2
+                    if volume_ok:
+                        strength += 0.2
+
+                    signals.loc[signals.index[i], 'signal'] = -1.0
+                    signals.loc[signals.index[i], 'zone_name'] = zone_name
+                    signals.loc[signals.index[i], 'signal_strength'] = min(strength, 1.0)
+                    break
+
+    return signals
+
+
+def legacy_base_backtest(strategy, data: pd.DataFrame, initial_capital: float = 10000) -> Dict:
+    """Previous BaseStrategy.backtest (iterrows loop), kept as reference"""
+    signals = strategy.generate_signals(data)
+
+    cash = initial_capital
+    position = 0
+    trades = []
+    portfolio_values = []
+
+    for i, (timestamp, row) in enumerate(data.iterrows()):
+        current_price = row['close_price']
+        signal = signals.iloc[i] if i < len(signals) else 0
+
+        current_portfolio_value = cash + (position * current_price)
+        portfolio_values.append(current_portfolio_value)
+
+        target_position_fraction = strategy.get_position_size(signal, current_price, current_portfolio_value)
+        target_position_value = target_position_fraction * current_portfolio_value
+        target_position_shares = target_position_value / current_price if current_price > 0 else 0
+
+        position_change = target_position_shares - position
+
+        if abs(position_change * current_price) > current_portfolio_value * 0.01:
+            trade_value = position_change * current_price
+            fee = abs(trade_value) * 0.001
+
+            if trade_value <= cash + fee:
+                cash -= trade_value + fee
+                position = target_position_shares
+
+                trades.append({
+                    'timestamp': timestamp,
+                    'signal': signal,
+                    'price': current_price,
+                    'size': position_change,
+                    'position': position,
+                    'cash': cash,
+                    'portfolio_value': cash + (position * current_price)
+                })
+
+    final_price = data['close_price'].iloc[-1]
+    portfolio_values[-1] = cash + (position * final_price)
+
+    return {'trades': trades, 'portfolio_values': portfolio_values}
+
+
+def legacy_all_in_backtest(signals: pd.DataFrame, initial_capital: float = 10000) -> Dict:
+    """Previous Week1Refined5mStrategy.backtest loop (.iloc per row), kept as reference"""
+    capital = initial_capital
+    position = 0
+    entry_price = 0
+    trades = []
+    equity_curve = [initial_capital]
+
+    for i in range(len(signals)):
+        current_price = signals.iloc[i]['close_price']
+        signal = signals.iloc[i]['signal']
+
+        if signal == 1 and position == 0:
+            position = capital / current_price
+            entry_price = current_price
+            capital = 0
+            trades.append({'type': 'BUY', 'price': current_price, 'timestamp': signals.iloc[i].name})
+
+        elif signal == -1 and position > 0:
+            capital = position * current_price
+            trades.append({
+                'type': 'SELL',
+                'price': current_price,
+                'profit': capital - initial_capital,
+                'return': (current_price - entry_price) / entry_price * 100,
+                'timestamp': signals.iloc[i].name
+            })
+            position = 0
+            entry_price = 0
+
+        if position > 0:
+            equity_curve.append(position * current_price)
+        else:
+            equity_curve.append(capital)
+
+    if position > 0:
+        capital = position * signals.iloc[-1]['close_price']
+
+    return {'trades': trades, 'equity_curve': equity_curve, 'final_value': capital}
+
+
+def legacy_phase2_backtest(strategy, data: pd.DataFrame, initial_capital: float = 10000) -> Dict:
+    """Previous OptimizedPhase2Strategy.backtest (iterrows loop), kept as reference"""
+    signals = strategy.generate_signals(data)
+
+    cash = initial_capital
+    position = 0
+    portfolio_values = []
+    trades = []
+    max_position_pct = 0.30
+    stop_loss_pct = 0.10
+    entry_price = 0
+
+    for i, (timestamp, row) in enumerate(data.iterrows()):
+        current_price = row['close_price']
+        signal = signals.iloc[i]
+
+        portfolio_value = cash + (position * current_price)
+        portfolio_values.append(portfolio_value)
+
+        if position > 0 and entry_price > 0:
+            if current_price <= entry_price * (1 - stop_loss_pct):
+                cash = cash + (position * current_price)
+                trades.append({'type': 'STOP_LOSS', 'price': current_price, 'shares': position, 'timestamp': timestamp})
+                position = 0
+                entry_price = 0
+
+        if signal > 0 and position == 0:
+            max_investment = portfolio_value * (max_position_pct * signal)
+            shares_to_buy = max_investment / current_price
+
+            if cash >= max_investment:
+                position = shares_to_buy
+                cash = cash - (shares_to_buy * current_price)
+                entry_price = current_price
+                trades.append({
+                    'type': 'BUY', 'price': current_price, 'shares': shares_to_buy,
+                    'timestamp': timestamp, 'signal_strength': signal
+                })
+
+        elif signal < 0 and position > 0:
+            cash = cash + (position * current_price)
+            trades.append({'type': 'SELL', 'price': current_price, 'shares': position, 'timestamp': timestamp})
+            position = 0
+            entry_price = 0
+
+    final_value = cash + (position * data['close_price'].iloc[-1])
+
+    return {'trades': trades, 'portfolio_values': np.array(portfolio_values), 'final_value': final_value}
+
+
+def legacy_portfolio_backtest(close: np.ndarray, signal: np.ndarray, symbols: List[str]) -> Dict:
+    """
+    Candle-by-candle replay of LiveTradingEngine5m.trading_cycle through a
+    PortfolioManager, kept as reference for PortfolioBacktester
+    """
+    import logging
+    from trading.live_engine_5m import PortfolioManager
+
+    engine_logger = logging.getLogger('trading.live_engine_5m')
+    level = engine_logger.level
+    engine_logger.setLevel(logging.ERROR)  # Every stop / fill is logged
+    try:
+        pm = PortfolioManager()
+        last_signals = {}
+        trades, equity = [], []
+
+        for t in range(len(close)):
+            prices = {symbol: close[t, k] for k, symbol in enumerate(symbols) if not np.isnan(close[t, k])}
+            pm.update_positions(prices)
+
+            for symbol in pm.check_stop_losses(prices):
+                pm.close_position(symbol, prices[symbol])
+                trades.append((t, symbol, 'SELL', prices[symbol], 'STOP_LOSS'))
+            for symbol in pm.check_take_profits(prices):
+                pm.close_position(symbol, prices[symbol])
+                trades.append((t, symbol, 'SELL', prices[symbol], 'TAKE_PROFIT'))
+
+            for k, symbol in enumerate(symbols):
+                if symbol not in prices:
+                    continue
+                latest, previous = signal[t, k], last_signals.get(symbol, 0.0)
+                last_signals[symbol] = latest
+
+                if latest > 0 and previous <= 0:
+                    if pm.can_open_position(symbol):
+                        amount = pm.get_position_size(symbol, prices[symbol])
+                        if amount > 0 and pm.open_position(symbol, amount, prices[symbol]):
+                            trades.append((t, symbol, 'BUY', prices[symbol], 'SIGNAL'))
+                elif latest < 0 and previous >= 0 and symbol in pm.positions:
+                    pm.close_position(symbol, prices[symbol])
+                    trades.append((t, symbol, 'SELL', prices[symbol], 'SIGNAL'))
+
+            equity.append(pm.get_portfolio_value())
+    finally:
+        engine_logger.setLevel(level)
+
+    # Rounded to cents: the array path sums cash flows in a different order
+    return {'trades': trades, 'equity': np.asarray(equity)}
+
+
+def portfolio_summary(result) -> Dict:
+    """PortfolioBacktestResult in the legacy_portfolio_backtest format"""
+    return {
+        'trades': [(trade['index'], trade['symbol'], trade['side'], trade['price'], trade['reason'])
+                   for trade in result.trades],
+        'equity': result.equity
+    }
+
+
+def portfolio_inputs(n: int, symbols: int = 20) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """Aligned closes and sparse signals for a synthetic symbol universe"""
+    close = np.column_stack([make_candles(n, seed=k)['close_price'].to_numpy() * (1 + k / 10)
+                             for k in range(symbols)])
+    signal = np.column_stack([sparse_signals(pd.RangeIndex(n), seed=k).to_numpy() for k in range(symbols)])
+    return close, signal, [f'SYM{k}USDT' for k in range(symbols)]
+
+
+def short_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Rename make_candles output to the short OHLC names PivotZoneStrategy reads"""
+    df = df.rename(columns={
+        'open_price': 'open', 'high_price': 'high', 'low_price': 'low', 'close_price': 'close'
+    })
+    df['open'] = df['close'].shift(1).fillna(df['close'])
+    return df
+
+
+def sparse_signals(index: pd.Index, density: float = 0.02, seed: int = 7) -> pd.Series:
+    """Smoothed random signals in [-1, 1] on a fraction of candles (backtest input)"""
+    rng = np.random.default_rng(seed)
+    raw = np.where(rng.random(len(index)) < density, rng.uniform(-1, 1, len(index)), 0.0)
+    return pd.Series(raw, index=index).rolling(3).mean().fillna(0)
+
+
+def with_signals(strategy, signals):
+    """Pin a strategy's generate_signals output so backtests time only the simulation"""
+    strategy.generate_signals = lambda data, *args, **kwargs: signals
+    return strategy
+
+
+def _identical(expected, actual) -> bool:
+    if isinstance(expected, (pd.DataFrame, pd.Series)):
+        return expected.equals(actual)
+    # Legacy backtest references return a subset of the current result keys
+    return all(_matches(key, value, actual[key]) for key, value in expected.items())
+
+
+def _matches(key: str, expected, actual) -> bool:
+    if key == 'equity':
+        # Portfolio equity is summed in a different order (cash + positions
+        # per candle vs holdings x marks), so it agrees to the cent, not the bit
+        return np.allclose(expected, actual, rtol=0, atol=0.005)
+    if isinstance(expected, np.ndarray):
+        return np.array_equal(expected, actual)
+    return expected == actual
+
+
+def _time(func: Callable, *args) -> Tuple[float, pd.DataFrame]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def benchmark_cases(df: pd.DataFrame) -> Dict[str, Tuple[Callable, Callable]]:
+    """Strategy name -> (legacy, current); each gets a fresh strategy instance"""
+    pivot_df = short_columns(df)
+
+    return {
+        'Week1Refined5m': (
+            lambda: legacy_week1_refined_5m_signals(Week1Refined5mStrategy(), df),
+            lambda: Week1Refined5mStrategy().generate_signals(df)
+        ),
+        'PivotZone': (
+            lambda: legacy_pivot_zone_signals(PivotZoneStrategy(), pivot_df),
+            lambda: PivotZoneStrategy().generate_signals(pivot_df)
+        ),
+    }
+
+
+def backtest_cases(df: pd.DataFrame) -> Dict[str, Tuple[Callable, Callable]]:
+    """Backtest name -> (legacy, current) on fixed signals"""
+    signals = sparse_signals(df.index)
+    week1_signals = Week1Refined5mStrategy().generate_signals(df)
+
+    return {
+        'Momentum': (
+            lambda: legacy_base_backtest(with_signals(MomentumStrategy(), signals), df),
+            lambda: with_signals(MomentumStrategy(), signals).backtest(df)
+        ),
+        'MeanReversion': (
+            lambda: legacy_base_backtest(with_signals(MeanReversionStrategy(), signals), df),
+            lambda: with_signals(MeanReversionStrategy(), signals).backtest(df)
+        ),
+        'Week1Refined5m': (
+            lambda: legacy_all_in_backtest(week1_signals),
+            lambda: with_signals(Week1Refined5mStrategy(), week1_signals).backtest(df)
+        ),
+        'Phase2': (
+            lambda: legacy_phase2_backtest(with_signals(OptimizedPhase2Strategy(), signals), df),
+            lambda: with_signals(OptimizedPhase2Strategy(), signals).backtest(df)
+        ),
+    }
+
+
+def portfolio_cases(df: pd.DataFrame) -> Dict[str, Tuple[Callable, Callable]]:
+    """20-symbol portfolio replay: (PortfolioManager loop, PortfolioBacktester)"""
+    from strategies.portfolio_backtest import PortfolioBacktester
+
+    close, signal, symbols = portfolio_inputs(len(df))
+    return {
+        'Portfolio x20': (
+            lambda: legacy_portfolio_backtest(close, signal, symbols),
+            lambda: portfolio_summary(PortfolioBacktester().run(close, signal, symbols))
+        ),
+    }
+
+
+def run_benchmark(sizes: List[int], cases: Callable = benchmark_cases) -> pd.DataFrame:
+    """Time legacy vs current implementations and verify identical output"""
+    rows = []
+
+    for n in sizes:
+        df = make_candles(n)
+
+        for name, (legacy, current) in cases(df).items():
+            legacy_time, expected = _time(legacy)
+            current_time, actual = _time(current)
+
+            rows.append({
+                'strategy': name,
+                'rows': n,
+                'legacy_s': legacy_time,
+                'current_s': current_time,
+                'speedup': legacy_time / current_time if current_time > 0 else float('inf'),
+                'identical': _identical(expected, actual)
+            })
+
+            print(f"  {name:>16} {n:>7,} rows: legacy {legacy_time:8.3f}s | "
+                  f"current {current_time:8.4f}s | x{rows[-1]['speedup']:,.0f} | "
+                  f"identical: {rows[-1]['identical']}")
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark strategy signal generation")
+    parser.add_argument('--sizes', type=int, nargs='+', default=None)
+    parser.add_argument('--backtest', action='store_true',
+                        help='Benchmark backtests (default size: one year of 5m candles)')
+    parser.add_argument('--portfolio', action='store_true',
+                        help='Benchmark the 20-symbol portfolio backtest (default size: one year)')
+    args = parser.parse_args()
+
+    if args.portfolio:
+        sizes, cases, label = args.sizes or [105_120], portfolio_cases, 'Portfolio'
+    elif args.backtest:
+        sizes, cases, label = args.sizes or [105_120], backtest_cases, 'Backtest'
+    else:
+        sizes, cases, label = args.sizes or [2_000, 10_000, 26_000], benchmark_cases, 'Signal'
+
+    print(f"⏱️  Strategy {label} Benchmark")
+    print("=" * 80)
+    results = run_benchmark(sizes, cases)
+    print("=" * 80)
+
+    if results['identical'].all():
+        print(f"✅ All strategies produce identical {label.lower()} results")
+    else:
+        print(f"❌ {label} mismatch detected")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,530 @@
+"""
+Incremental (Streaming) Technical Indicators
+Constant-time per-candle counterparts to TechnicalIndicators for live trading
+"""
+import math
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+
+class _RollingWindow:
+    """
+    Fixed-size window with running sum and sum of squares
+
+    Sums are kept relative to a shift value and rebuilt from the window once
+    per full rotation, which keeps float drift bounded while the amortized
+    cost stays O(1) per update.
+    """
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError(f"window must be >= 1, got {window}")
+        self.window = window
+        self.values: deque = deque()
+        self.nan_count = 0
+        self._shift = 0.0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._updates_since_resync = 0
+
+    def _resync(self):
+        finite = [v for v in self.values if not math.isnan(v)]
+        self._shift = finite[0] if finite else 0.0
+        self._sum = math.fsum(v - self._shift for v in finite)
+        self._sumsq = math.fsum((v - self._shift) ** 2 for v in finite)
+        self._updates_since_resync = 0
+
+    def push(self, value: float):
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                self._sum -= old - self._shift
+                self._sumsq -= (old - self._shift) ** 2
+
+        self.values.append(value)
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            self._sum += value - self._shift
+            self._sumsq += (value - self._shift) ** 2
+
+        self._updates_since_resync += 1
+        if self._updates_since_resync >= self.window:
+            self._resync()
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window and self.nan_count == 0
+
+    def mean(self) -> float:
+        """Rolling mean (NaN until the window holds `window` finite values)"""
+        if not self.full:
+            return NAN
+        return self._shift + self._sum / self.window
+
+    def std(self) -> float:
+        """Rolling sample standard deviation (ddof=1, pandas default)"""
+        if not self.full or self.window < 2:
+            return NAN
+        variance = (self._sumsq - self._sum * self._sum / self.window) / (self.window - 1)
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+
+class _RollingExtreme:
+    """Rolling min or max over a fixed window using a monotonic deque"""
+
+    def __init__(self, window: int, mode: str = 'max'):
+        self.window = window
+        self.is_max = mode == 'max'
+        self._deque: deque = deque()  # (index, value), monotonic
+        self._index = -1
+
+    def push(self, value: float):
+        self._index += 1
+        if self.is_max:
+            while self._deque and self._deque[-1][1] <= value:
+                self._deque.pop()
+        else:
+            while self._deque and self._deque[-1][1] >= value:
+                self._deque.pop()
+        self._deque.append((self._index, value))
+        while self._deque[0][0] <= self._index - self.window:
+            self._deque.popleft()
+
+    @property
+    def value(self) -> float:
+        if self._index < self.window - 1:
+            return NAN
+        return self._deque[0][1]
+
+
+class IncrementalSMA:
+    """Simple Moving Average updated one value at a time"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._window = _RollingWindow(window)
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        self._window.push(value)
+        self.value = self._window.mean()
+        return self.value
+
+
+class IncrementalEMA:
+    """Exponential Moving Average (span-based, adjust=False)"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.alpha = 2.0 / (window + 1)
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        if math.isnan(self.value):
+            self.value = value
+        else:
+            self.value = self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+
+class IncrementalRSI:
+    """
+    Relative Strength Index matching TechnicalIndicators.rsi
+
+    Uses simple rolling means of gains/losses. As in the batch version the
+    first (undefined) price change counts as a zero gain and zero loss.
+    """
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self._gains = _RollingWindow(window)
+        self._losses = _RollingWindow(window)
+        self._gain_count = 0
+        self._loss_count = 0
+        self._prev_close: Optional[float] = None
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        delta = 0.0 if self._prev_close is None else close - self._prev_close
+        self._prev_close = close
+
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        # Track non-zero members so an all-zero window is exactly zero
+        if len(self._gains.values) == self.window:
+            self._gain_count -= self._gains.values[0] != 0
+            self._loss_count -= self._losses.values[0] != 0
+        self._gains.push(gain)
+        self._losses.push(loss)
+        self._gain_count += gain != 0
+        self._loss_count += loss != 0
+
+        if not self._gains.full:
+            self.value = NAN
+            return self.value
+
+        avg_gain = self._gains.mean() if self._gain_count else 0.0
+        avg_loss = self._losses.mean() if self._loss_count else 0.0
+
+        if avg_loss == 0:
+            self.value = NAN if avg_gain == 0 else 100.0
+        else:
+            rs = avg_gain / avg_loss
+            self.value = 100 - (100 / (1 + rs))
+        return self.value
+
+
+class IncrementalMACD:
+    """MACD line, signal line and histogram"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self._fast = IncrementalEMA(fast)
+        self._slow = IncrementalEMA(slow)
+        self._signal = IncrementalEMA(signal)
+        self.macd = NAN
+        self.signal = NAN
+        self.histogram = NAN
+
+    def update(self, close: float) -> Dict[str, float]:
+        self.macd = self._fast.update(close) - self._slow.update(close)
+        self.signal = self._signal.update(self.macd)
+        self.histogram = self.macd - self.signal
+        return {'macd': self.macd, 'macd_signal': self.signal, 'macd_histogram': self.histogram}
+
+
+class IncrementalBollingerBands:
+    """Bollinger Bands (SMA +/- num_std * rolling sample std)"""
+
+    def __init__(self, window: int = 20, num_std: float = 2):
+        self.window = window
+        self.num_std = num_std
+        self._window = _RollingWindow(window)
+        self.upper = NAN
+        self.middle = NAN
+        self.lower = NAN
+
+    def update(self, close: float) -> Dict[str, float]:
+        self._window.push(close)
+        self.middle = self._window.mean()
+        std = self._window.std()
+        self.upper = self.middle + std * self.num_std
+        self.lower = self.middle - std * self.num_std
+        return {'bb_upper': self.upper, 'bb_middle': self.middle, 'bb_lower': self.lower}
+
+
+class IncrementalATR:
+    """Average True Range (SMA of true range)"""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self._window = _RollingWindow(window)
+        self._prev_close: Optional[float] = None
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = high - low
+        if self._prev_close is not None:
+            true_range = max(true_range, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+
+        self._window.push(true_range)
+        self.value = self._window.mean()
+        return self.value
+
+
+class IncrementalStochastic:
+    """Stochastic Oscillator %K and %D"""
+
+    def __init__(self, k_window: int = 14, d_window: int = 3):
+        self._highest = _RollingExtreme(k_window, 'max')
+        self._lowest = _RollingExtreme(k_window, 'min')
+        self._d = _RollingWindow(d_window)
+        self.k = NAN
+        self.d = NAN
+
+    def update(self, high: float, low: float, close: float) -> Dict[str, float]:
+        self._highest.push(high)
+        self._lowest.push(low)
+        highest_high = self._highest.value
+        lowest_low = self._lowest.value
+
+        price_range = highest_high - lowest_low
+        if math.isnan(price_range) or price_range == 0:
+            self.k = NAN
+        else:
+            self.k = ((close - lowest_low) / price_range) * 100
+
+        self._d.push(self.k)
+        self.d = self._d.mean()
+        return {'stoch_k': self.k, 'stoch_d': self.d}
+
+
+class IncrementalWilliamsR:
+    """Williams %R"""
+
+    def __init__(self, window: int = 14):
+        self._highest = _RollingExtreme(window, 'max')
+        self._lowest = _RollingExtreme(window, 'min')
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        self._highest.push(high)
+        self._lowest.push(low)
+        highest_high = self._highest.value
+        lowest_low = self._lowest.value
+
+        price_range = highest_high - lowest_low
+        if math.isnan(price_range) or price_range == 0:
+            self.value = NAN
+        else:
+            self.value = ((highest_high - close) / price_range) * -100
+        return self.value
+
+
+class IncrementalADX:
+    """Average Directional Index matching Week1Refined5mStrategy.calculate_adx"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._tr = _RollingWindow(period)
+        self._plus_dm = _RollingWindow(period)
+        self._minus_dm = _RollingWindow(period)
+        self._dx = _RollingWindow(period)
+        self._prev_high: Optional[float] = None
+        self._prev_low: Optional[float] = None
+        self._prev_close: Optional[float] = None
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self._prev_high is None:
+            plus_dm = minus_dm = NAN
+            true_range = high - low
+        else:
+            plus_dm = high - self._prev_high
+            minus_dm = self._prev_low - low
+            if plus_dm < 0:
+                plus_dm = 0.0
+            if minus_dm < 0:
+                minus_dm = 0.0
+            if plus_dm <= minus_dm:
+                plus_dm = 0.0
+            if minus_dm <= plus_dm:
+                minus_dm = 0.0
+            true_range = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+
+        self._prev_high, self._prev_low, self._prev_close = high, low, close
+
+        self._tr.push(true_range)
+        self._plus_dm.push(plus_dm)
+        self._minus_dm.push(minus_dm)
+
+        atr = self._tr.mean()
+        plus_di = 100 * _divide(self._plus_dm.mean(), atr)
+        minus_di = 100 * _divide(self._minus_dm.mean(), atr)
+        dx = 100 * _divide(abs(plus_di - minus_di), plus_di + minus_di)
+
+        self._dx.push(dx)
+        self.value = self._dx.mean()
+        return self.value
+
+
+class IncrementalVWAP:
+    """Cumulative Volume Weighted Average Price"""
+
+    def __init__(self):
+        self._cum_volume_price = 0.0
+        self._cum_volume = 0.0
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        typical_price = (high + low + close) / 3
+        self._cum_volume_price += typical_price * volume
+        self._cum_volume += volume
+        self.value = self._cum_volume_price / self._cum_volume if self._cum_volume else NAN
+        return self.value
+
+
+class IncrementalIndicatorState:
+    """
+    All streaming indicators for a single symbol
+
+    Output keys follow the column names of TechnicalIndicators.calculate_all_indicators
+    (sma_<n>, ema_<n>, rsi, macd, bb_upper, stoch_k, williams_r, atr, vwap, ...).
+    """
+
+    def __init__(self, sma_windows: Iterable[int] = (5, 10, 20, 50, 200),
+                 ema_windows: Iterable[int] = (5, 10, 20, 50),
+                 rsi_window: int = 14):
+        self.smas = {w: IncrementalSMA(w) for w in sma_windows}
+        self.emas = {w: IncrementalEMA(w) for w in ema_windows}
+        self.rsi = IncrementalRSI(rsi_window)
+        self.macd = IncrementalMACD()
+        self.bollinger = IncrementalBollingerBands()
+        self.atr = IncrementalATR()
+        self.stochastic = IncrementalStochastic()
+        self.williams_r = IncrementalWilliamsR()
+        self.vwap = IncrementalVWAP()
+
+        self.candle_count = 0
+        self.last_timestamp: Optional[datetime] = None
+        self.values: Dict[str, float] = {}
+
+    def update(self, candle: Any) -> Dict[str, float]:
+        """
+        Feed one completed candle
+
+        Args:
+            candle: Candle dataclass, dict or DataFrame row with
+                    high_price, low_price, close_price, volume (and optionally timestamp)
+
+        Returns:
+            Dict of latest indicator values
+        """
+        high = float(_field(candle, 'high_price'))
+        low = float(_field(candle, 'low_price'))
+        close = float(_field(candle, 'close_price'))
+        volume = float(_field(candle, 'volume'))
+
+        values = {}
+        for window, sma in self.smas.items():
+            values[f'sma_{window}'] = sma.update(close)
+        for window, ema in self.emas.items():
+            values[f'ema_{window}'] = ema.update(close)
+
+        values['rsi'] = self.rsi.update(close)
+        values.update(self.macd.update(close))
+        values.update(self.bollinger.update(close))
+        values.update(self.stochastic.update(high, low, close))
+        values['williams_r'] = self.williams_r.update(high, low, close)
+        values['atr'] = self.atr.update(high, low, close)
+        values['vwap'] = self.vwap.update(high, low, close, volume)
+
+        self.candle_count += 1
+        self.last_timestamp = _field(candle, 'timestamp', self.last_timestamp)
+        self.values = values
+        return values
+
+
+class IncrementalIndicatorEngine:
+    """
+    Per-symbol streaming indicator engine
+
+    Each completed candle is applied once; the per-cycle cost is independent of
+    window length and of how much history has already been seen.
+    """
+
+    def __init__(self, sma_windows: Iterable[int] = (5, 10, 20, 50, 200),
+                 ema_windows: Iterable[int] = (5, 10, 20, 50),
+                 rsi_window: int = 14):
+        self.sma_windows = tuple(sma_windows)
+        self.ema_windows = tuple(ema_windows)
+        self.rsi_window = rsi_window
+        self.states: Dict[str, IncrementalIndicatorState] = {}
+
+    def _get_state(self, symbol: str) -> IncrementalIndicatorState:
+        if symbol not in self.states:
+            self.states[symbol] = IncrementalIndicatorState(
+                self.sma_windows, self.ema_windows, self.rsi_window
+            )
+        return self.states[symbol]
+
+    def update(self, symbol: str, candle: Any) -> Dict[str, float]:
+        """Feed a single completed candle for a symbol"""
+        return self._get_state(symbol).update(candle)
+
+    def sync(self, symbol: str, candles: List[Any]) -> Dict[str, float]:
+        """
+        Feed only the candles newer than the last one seen for this symbol
+
+        Args:
+            symbol: Trading symbol
+            candles: Completed candles in chronological order (e.g. CandleAggregator history)
+
+        Returns:
+            Latest indicator values
+        """
+        state = self._get_state(symbol)
+        watermark = state.last_timestamp
+
+        if watermark is None:
+            new_candles = candles
+        else:
+            # Walk back from the end; normally only 0-1 candles are new
+            start = len(candles)
+            while start > 0 and _field(candles[start - 1], 'timestamp') > watermark:
+                start -= 1
+            new_candles = candles[start:]
+
+        for candle in new_candles:
+            state.update(candle)
+
+        return state.values
+
+    def get(self, symbol: str) -> Dict[str, float]:
+        """Latest indicator values for a symbol (empty if never updated)"""
+        state = self.states.get(symbol)
+        return state.values if state else {}
+
+    def candle_count(self, symbol: str) -> int:
+        """Number of candles applied for a symbol"""
+        state = self.states.get(symbol)
+        return state.candle_count if state else 0
+
+    def reset(self, symbol: Optional[str] = None):
+        """Drop state for one symbol or for all symbols"""
+        if symbol is None:
+            self.states.clear()
+        else:
+            self.states.pop(symbol, None)
+
+
+def _field(candle: Any, name: str, default: Any = None) -> Any:
+    """Read a field from a Candle dataclass, dict or pandas row"""
+    if isinstance(candle, dict):
+        return candle.get(name, default)
+    if hasattr(candle, name):
+        return getattr(candle, name)
+    try:
+        return candle[name]
+    except (KeyError, TypeError, IndexError):
+        return default
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    """Float division with numpy/pandas semantics for a zero denominator"""
+    if denominator == 0:
+        if numerator == 0 or math.isnan(numerator):
+            return NAN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+def candle_ohlcv(candle: Any) -> Tuple[float, float, float, float, float]:
+    """
+    Read (open, high, low, close, volume) from a candle
+
+    Accepts both the *_price column names (Candle, database rows) and the
+    short open/high/low/close names used by the API and the live engine.
+    """
+    close = _field(candle, 'close_price')
+    if close is None:
+        close = _field(candle, 'close')
+
+    def price(name: str) -> float:
+        value = _field(candle, f'{name}_price')
+        if value is None:
+            value = _field(candle, name, close)
+        return float(value)
+
+    volume = _field(candle, 'volume', 0.0)
+    return price('open'), price('high'), price('low'), float(close), float(volume or 0.0)
@@ -0,0 +1,184 @@
+"""
+Process-wide Indicator Cache
+Memoizes indicator results per (symbol, timeframe, indicator, params, candle watermark)
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def cache_symbol(symbol: str) -> str:
+    """Cache key form of a symbol ('BTC/USDT' -> 'BTCUSDT')"""
+    return symbol.replace('/', '').upper()
+
+
+def frame_watermark(df: pd.DataFrame) -> Optional[Tuple]:
+    """
+    Watermark of an OHLCV DataFrame for cache keys
+
+    The last close is included because the last bar may still be forming.
+    Timestamps are compared as naive UTC.
+
+    Args:
+        df: Candles with 'timestamp' and 'close' columns
+
+    Returns:
+        (last timestamp, last close, number of candles), or None when the
+        frame cannot be identified
+    """
+    if df.empty or 'timestamp' not in df.columns or 'close' not in df.columns:
+        return None
+
+    # API frames carry UTC offsets, database frames are naive UTC
+    last = pd.Timestamp(df['timestamp'].iloc[-1])
+    if last.tzinfo is not None:
+        last = last.tz_convert('UTC').tz_localize(None)
+    return (last, float(df['close'].iloc[-1]), len(df))
+
+
+class IndicatorCache:
+    """
+    LRU cache for computed indicator series
+
+    The watermark identifies the candles the indicator was computed on (see
+    frame_watermark), so a new bar always produces a new key. CandleAggregator
+    also calls invalidate() when it closes a bar to release superseded entries.
+    Symbols are normalized (see cache_symbol), so 'BTC/USDT' and 'BTCUSDT'
+    share entries. The cache is per process.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        """
+        Args:
+            max_entries: Maximum number of cached results before LRU eviction
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(symbol: str, timeframe: str, indicator: str,
+                 params: Optional[Dict] = None, watermark: Hashable = None) -> Tuple:
+        """Build the cache key; params are order-independent"""
+        frozen_params = tuple(sorted((params or {}).items()))
+        return (cache_symbol(symbol), timeframe, indicator, frozen_params, watermark)
+
+    def get(self, symbol: str, timeframe: str, indicator: str,
+            params: Optional[Dict] = None, watermark: Hashable = None) -> Optional[Any]:
+        """Return the cached result or None"""
+        key = self.make_key(symbol, timeframe, indicator, params, watermark)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            self.misses += 1
+            return None
+
+    def put(self, symbol: str, timeframe: str, indicator: str,
+            params: Optional[Dict], watermark: Hashable, value: Any):
+        """Store a result, evicting the least recently used entries"""
+        key = self.make_key(symbol, timeframe, indicator, params, watermark)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, symbol: str, timeframe: str, indicator: str,
+                       params: Optional[Dict], watermark: Hashable,
+                       compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached result, computing and storing it on a miss
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Candle timeframe (e.g. '5m')
+            indicator: Indicator name
+            params: Indicator parameters
+            watermark: Candles the result was computed on (see frame_watermark)
+            compute: Zero-argument callable producing the result
+
+        Returns:
+            Indicator result
+        """
+        value = self.get(symbol, timeframe, indicator, params, watermark)
+        if value is not None:
+            return value
+
+        # Computed outside the lock; concurrent misses may compute twice
+        value = compute()
+        self.put(symbol, timeframe, indicator, params, watermark, value)
+        return value
+
+    def invalidate(self, symbol: str, timeframe: Optional[str] = None) -> int:
+        """
+        Drop cached results for a symbol (optionally a single timeframe)
+
+        Returns:
+            Number of entries removed
+        """
+        symbol = cache_symbol(symbol)
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if key[0] == symbol and (timeframe is None or key[1] == timeframe)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+            self.invalidations += len(stale)
+
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cached indicators for {symbol} {timeframe or ''}")
+
+        return len(stale)
+
+    def clear(self):
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Get cache statistics"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total > 0 else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+
+# Global indicator cache
+_indicator_cache: Optional[IndicatorCache] = None
+
+def get_indicator_cache() -> IndicatorCache:
+    """Get the global indicator cache"""
+    global _indicator_cache
+
+    if _indicator_cache is None:
+        _indicator_cache = IndicatorCache()
+
+    return _indicator_cache
@@ -0,0 +1,155 @@
+"""
+Monte Carlo Robustness Analysis
+Resample a backtest's trade sequence into thousands of equity paths and report
+return / drawdown percentile bands and the probability of ruin
+"""
+import time
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+METHODS = ('bootstrap', 'permute')
+
+# Paths x trades cells simulated per block (bounds memory for long trade lists)
+_BLOCK_CELLS = 2_000_000
+
+
+def trade_returns(trades: List[Dict], initial_capital: float = 10000) -> np.ndarray:
+    """
+    Per-trade account returns (fractions) from a backtest trade list
+
+    Understands the trade formats in this package:
+    - closed trades with a dollar 'pnl' (PivotZone) or 'profit' plus
+      'exit_price' (Week 2): chained from initial_capital
+    - Week 1 'SELL' records, whose 'profit' is cumulative since the start
+
+    Args:
+        trades: Trade dicts from a backtest result
+        initial_capital: Capital the backtest started with
+
+    Returns:
+        Array of returns in trade order (BUY / entry-only records are skipped)
+    """
+    equity = [float(initial_capital)]
+    for trade in trades:
+        if 'pnl' in trade:
+            equity.append(equity[-1] + trade['pnl'])
+        elif trade.get('type') == 'SELL' and 'exit_price' not in trade:
+            equity.append(initial_capital + trade['profit'])
+        elif 'profit' in trade and 'exit_price' in trade:
+            equity.append(equity[-1] + trade['profit'])
+
+    equity = np.asarray(equity)
+    return equity[1:] / equity[:-1] - 1
+
+
+def simulate_paths(returns: Sequence[float], n_paths: int = 5000, method: str = 'bootstrap',
+                   rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Resampled trade return sequences as one matrix
+
+    Args:
+        returns: Per-trade returns
+        n_paths: Number of sequences
+        method: 'bootstrap' draws trades with replacement, 'permute'
+            shuffles the original trades (same final return, different path)
+        rng: Random generator
+
+    Returns:
+        (n_paths, n_trades) array of returns
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+
+    returns = np.asarray(returns, dtype=float)
+    rng = rng or np.random.default_rng()
+    if method == 'bootstrap':
+        return returns[rng.integers(0, len(returns), size=(n_paths, len(returns)))]
+    return rng.permuted(np.broadcast_to(returns, (n_paths, len(returns))), axis=1)
+
+
+def path_statistics(paths: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Final return, max drawdown and lowest equity of every path
+
+    Args:
+        paths: (n_paths, n_trades) per-trade returns
+
+    Returns:
+        Dict of per-path arrays (fractions): total_return, max_drawdown
+        (<= 0) and min_equity (relative to the starting capital)
+    """
+    equity = np.cumprod(1 + paths, axis=1)
+    # Every path starts at 1.0 before its first trade
+    peaks = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+
+    return {
+        'total_return': equity[:, -1] - 1,
+        'max_drawdown': (equity / peaks - 1).min(axis=1).clip(max=0),
+        'min_equity': equity.min(axis=1).clip(max=1.0)
+    }
+
+
+def monte_carlo(returns: Sequence[float], n_paths: int = 5000, method: str = 'bootstrap',
+                ruin_drawdown: float = 0.5, percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+                seed: Optional[int] = None) -> Dict:
+    """
+    Monte Carlo analysis of a trade return sequence
+
+    Args:
+        returns: Per-trade returns (see trade_returns)
+        n_paths: Number of simulated paths
+        method: 'bootstrap' or 'permute'
+        ruin_drawdown: Ruin = equity falls this fraction below the starting capital
+        percentiles: Percentiles reported for return and drawdown
+        seed: Random seed
+
+    Returns:
+        Dict with percentile bands (in %) for total_return and max_drawdown,
+        probability_of_ruin / probability_of_loss (in %) and throughput
+    """
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) == 0:
+        return {'error': 'No closed trades'}
+
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+
+    block = max(1, _BLOCK_CELLS // len(returns))
+    stats = {'total_return': [], 'max_drawdown': [], 'min_equity': []}
+    for start in range(0, n_paths, block):
+        paths = simulate_paths(returns, min(block, n_paths - start), method, rng)
+        for name, values in path_statistics(paths).items():
+            stats[name].append(values)
+    stats = {name: np.concatenate(values) for name, values in stats.items()}
+
+    elapsed = time.perf_counter() - started
+    return {
+        'method': method,
+        'paths': n_paths,
+        'trades': len(returns),
+        'total_return': dict(zip(percentiles, np.percentile(stats['total_return'], percentiles) * 100)),
+        'max_drawdown': dict(zip(percentiles, np.percentile(stats['max_drawdown'], percentiles) * 100)),
+        'probability_of_loss': (stats['total_return'] < 0).mean() * 100,
+        'probability_of_ruin': (stats['min_equity'] <= 1 - ruin_drawdown).mean() * 100,
+        'ruin_drawdown': ruin_drawdown,
+        'elapsed': elapsed,
+        'paths_per_second': n_paths / max(elapsed, 1e-9)
+    }
+
+
+def analyze_result(result: Dict, initial_capital: Optional[float] = None, **kwargs) -> Dict:
+    """
+    Monte Carlo analysis of a backtest result dict
+
+    Args:
+        result: Backtest result with 'trades'
+        initial_capital: Capital the backtest started with (defaults to the
+            result's 'initial_capital'; total_return units differ between
+            strategies, so it is never inferred)
+        **kwargs: Passed to monte_carlo()
+    """
+    if initial_capital is None:
+        initial_capital = result.get('initial_capital')
+    if initial_capital is None:
+        raise ValueError("initial_capital is required (the result has no 'initial_capital')")
+    return monte_carlo(trade_returns(result.get('trades', []), initial_capital), **kwargs)
@@ -4,13 +4,144 @@ Test different parameter combinations to improve performance
 """
 import pandas as pd
 import numpy as np
+import math
+import random
 from datetime import datetime
 from itertools import product
+from typing import Any, Dict, List, Optional, Tuple
 import sys
 import os
+import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from strategies.pivot_zone_strategy import PivotZoneStrategy
+from strategies.parallel_sweep import SharedArrays, parallel_map, default_workers
+
+# Worker-side (arrays, context) rebuilt once per sweep from the shared arrays
+_context_cache: List = [None, None]
+
+
+def context_arrays(context: Dict) -> Dict[str, np.ndarray]:
+    """Split a prepare_signal_context result into shareable numeric arrays"""
+    arrays = {name: values for name, values in context.items() if name != 'index'}
+    index = context['index']
+    if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    arrays['index'] = np.asarray(index)
+    return arrays
+
+
+def context_from_arrays(arrays: Dict[str, np.ndarray], tz: Optional[str] = None) -> Dict:
+    """Rebuild a signal context from shared arrays"""
+    context = {name: values for name, values in arrays.items() if name != 'index'}
+    if arrays['index'].dtype.kind != 'M':
+        context['index'] = pd.Index(arrays['index'])
+        return context
+    
+    index = pd.DatetimeIndex(arrays['index'])
+    context['index'] = index.tz_localize('UTC').tz_convert(tz) if tz else index
+    return context
+
+
+def slice_context(context: Dict, start: int, stop: int) -> Dict:
+    """
+    Rows [start, stop) of a prepare_signal_context result
+
+    Valid because every precomputed column (pivot zones from prior days,
+    trailing volume / MA averages) only looks backwards. The slice records
+    its absolute 'offset', so signals_from_context only masks rows that lack
+    warm-up history in the full context: slice signals equal the matching
+    rows of the full context's signals.
+    """
+    sliced = {name: values[start:stop] if name == 'index' else values[..., start:stop]
+              for name, values in context.items() if name != 'offset'}
+    sliced['offset'] = context.get('offset', 0) + start
+    return sliced
+
+
+def _shared_context(arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> Dict:
+    if _context_cache[0] is not arrays:
+        _context_cache[:] = [arrays, context_from_arrays(arrays, meta.get('tz'))]
+    return _context_cache[1]
+
+
+def _backtest_params(context: Dict, meta: Dict[str, Any], params: Dict) -> Dict:
+    strategy = PivotZoneStrategy()
+    for name, value in params.items():
+        setattr(strategy, name, value)
+
+    try:
+        result = strategy.backtest(
+            symbol=meta['symbol'],
+            lookback_days=meta['lookback_days'],
+            initial_capital=meta['initial_capital'],
+            context=context,
+            fill=meta.get('fill', 'close')
+        )
+    except Exception as e:
+        return {'parameters': params, 'error': str(e)}
+
+    result.pop('equity_curve', None)  # Not needed for scoring; keeps results small to send back
+    result['parameters'] = params
+    return result
+
+
+def evaluate_combination(arrays: Dict[str, np.ndarray], meta: Dict[str, Any], params: Dict) -> Dict:
+    """
+    Backtest one parameter combination on the shared context (runs in a worker)
+
+    Returns:
+        Backtest result with 'parameters', or {'parameters', 'error'}
+    """
+    return _backtest_params(_shared_context(arrays, meta), meta, params)
+
+
+def evaluate_recent(arrays: Dict[str, np.ndarray], meta: Dict[str, Any], task: Tuple[Dict, int]) -> Dict:
+    """
+    Backtest (params, start) on the candles from row start to the end (runs in a worker)
+
+    Successive halving scores candidates on the most recent slice of history
+    first; start 0 is the full-length backtest.
+    """
+    params, start = task
+    context = _shared_context(arrays, meta)
+    if start:
+        context = slice_context(context, start, len(context['close']))
+    return _backtest_params(context, meta, params)
+
+
+class _GaussianProcess:
+    """Minimal GP regressor (RBF kernel) on inputs scaled to [0, 1]"""
+
+    def __init__(self, length_scale: float = 0.2, noise: float = 1e-2):
+        self.length_scale = length_scale
+        self.noise = noise
+
+    def _kernel(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        distance = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)
+        return np.exp(-0.5 * distance / self.length_scale ** 2)
+
+    def fit(self, x: np.ndarray, y: np.ndarray) -> '_GaussianProcess':
+        self.x = x
+        self.y_mean, self.y_std = y.mean(), y.std() or 1.0
+        kernel = self._kernel(x, x) + self.noise * np.eye(len(x))
+        self.cholesky = np.linalg.cholesky(kernel)
+        self.alpha = np.linalg.solve(self.cholesky.T, np.linalg.solve(self.cholesky, (y - self.y_mean) / self.y_std))
+        return self
+
+    def predict(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        cross = self._kernel(x, self.x)
+        mean = cross @ self.alpha
+        v = np.linalg.solve(self.cholesky, cross.T)
+        std = np.sqrt(np.clip(1.0 - (v ** 2).sum(axis=0), 1e-12, None))
+        return mean * self.y_std + self.y_mean, std * self.y_std
+
+
+def _expected_improvement(mean: np.ndarray, std: np.ndarray, best: float) -> np.ndarray:
+    z = (mean - best) / std
+    cdf = 0.5 * (1 + np.vectorize(math.erf)(z / math.sqrt(2)))
+    pdf = np.exp(-0.5 * z ** 2) / math.sqrt(2 * math.pi)
+    return (mean - best) * cdf + std * pdf
 
 
 class PivotZoneOptimizer:
@@ -34,16 +165,26 @@ class PivotZoneOptimizer:
             'ma_trend_period': [20, 50, 100]
         }
     
-    def optimize(self, max_tests: int = 50):
+    def optimize(self, max_tests: Optional[int] = None, workers: Optional[int] = None,
+                 data: Optional[pd.DataFrame] = None, fill: str = 'close'):
         """
         Run optimization to find best parameter combination
         
+        Candles are loaded and prepared once, shared with worker processes
+        through shared memory, and combinations are evaluated in parallel.
+        
         Args:
             max_tests: Maximum number of parameter combinations to test
+                (None tests the full grid)
+            workers: Worker processes (defaults to one per core)
+            data: Preloaded OHLCV candles (loaded from the database if None)
+            fill: Stop / target fill model passed to the backtest
         
         Returns:
             List of results sorted by score
         """
+        workers = workers or default_workers()
+        
         print("=" * 100)
         print("PIVOT ZONE STRATEGY OPTIMIZER")
         print("=" * 100)
@@ -51,7 +192,8 @@ class PivotZoneOptimizer:
         print(f"🎯 Goal: Achieve 60%+ win rate")
         print(f"📊 Symbol: {self.symbol}")
         print(f"📅 Period: {self.lookback_days} days")
-        print(f"🔬 Max Tests: {max_tests}")
+        print(f"🔬 Max Tests: {max_tests or 'full grid'}")
+        print(f"⚙️  Workers: {workers}")
         print()
         print("-" * 100)
         print()
@@ -61,65 +203,231 @@ class PivotZoneOptimizer:
         param_values = list(self.param_grid.values())
         
         combinations = list(product(*param_values))
+        total_combinations = len(combinations)
         
         # Limit tests
-        if len(combinations) > max_tests:
-            import random
+        if max_tests and total_combinations > max_tests:
             combinations = random.sample(combinations, max_tests)
-            print(f"⚠️  Sampling {max_tests} from {len(list(product(*param_values)))} total combinations")
+            print(f"⚠️  Sampling {max_tests} from {total_combinations} total combinations")
             print()
         
+        # Load and prepare the candles once
+        context, meta = self._prepare_context(data, fill)
+        if context is None:
+            print(f"❌ No data found for {self.symbol}")
+            return []
+        
         results = []
+        started = time.perf_counter()
         
-        for i, params in enumerate(combinations, 1):
-            # Create parameter dict
-            param_dict = dict(zip(param_names, params))
-            
-            print(f"Test {i}/{len(combinations)}: Testing parameters...")
-            print(f"  Volume: {param_dict['min_volume_multiplier']}x")
-            print(f"  Stop Loss: {param_dict['stop_loss_pct']*100:.0f}%")
-            print(f"  Take Profit: {param_dict['take_profit_pct']*100:.0f}%")
-            print(f"  Position: {param_dict['max_position_pct']*100:.0f}%")
-            print(f"  Trend Filter: {param_dict['use_trend_filter']}")
-            print(f"  MA Period: {param_dict['ma_trend_period']}")
+        with SharedArrays(context_arrays(context), meta) as shared:
+            tasks = [dict(zip(param_names, params)) for params in combinations]
             
-            try:
-                # Create strategy with these parameters
-                strategy = PivotZoneStrategy()
-                strategy.min_volume_multiplier = param_dict['min_volume_multiplier']
-                strategy.stop_loss_pct = param_dict['stop_loss_pct']
-                strategy.take_profit_pct = param_dict['take_profit_pct']
-                strategy.max_position_pct = param_dict['max_position_pct']
-                strategy.use_trend_filter = param_dict['use_trend_filter']
-                strategy.ma_trend_period = param_dict['ma_trend_period']
-                
-                # Run backtest
-                result = strategy.backtest(
-                    symbol=self.symbol,
-                    lookback_days=self.lookback_days,
-                    initial_capital=self.initial_capital
-                )
+            for i, result in enumerate(parallel_map(evaluate_combination, tasks, shared, workers), 1):
+                param_dict = result['parameters']
+                label = (f"vol {param_dict['min_volume_multiplier']}x | SL {param_dict['stop_loss_pct']*100:.0f}% | "
+                         f"TP {param_dict['take_profit_pct']*100:.0f}% | pos {param_dict['max_position_pct']*100:.0f}% | "
+                         f"trend {param_dict['use_trend_filter']} | MA {param_dict['ma_trend_period']}")
                 
                 if 'error' not in result and result['total_trades'] > 0:
                     # Calculate score (weighted)
                     score = self._calculate_score(result)
-                    
-                    result['parameters'] = param_dict
                     result['score'] = score
                     results.append(result)
                     
-                    print(f"  ✅ Win Rate: {result['win_rate']:.1f}% | Return: {result['total_return']:.2f}% | Score: {score:.1f}")
+                    print(f"Test {i}/{len(tasks)}: {label} -> ✅ Win Rate: {result['win_rate']:.1f}% | "
+                          f"Return: {result['total_return']:.2f}% | Score: {score:.1f}")
                 else:
-                    print(f"  ❌ Failed: {result.get('error', 'No trades')}")
-                
-            except Exception as e:
-                print(f"  ❌ Error: {str(e)}")
-            
-            print()
+                    print(f"Test {i}/{len(tasks)}: {label} -> ❌ Failed: {result.get('error', 'No trades')}")
+        
+        elapsed = time.perf_counter() - started
+        
+        # Results stream in completion order; restore grid order so ties sort deterministically
+        grid_order = {tuple(task.values()): k for k, task in enumerate(tasks)}
+        results.sort(key=lambda r: grid_order[tuple(r['parameters'].values())])
+        print()
+        print(f"⏱️  {len(combinations)} combinations in {elapsed:.1f}s ({len(combinations) / max(elapsed, 1e-9):.1f}/s)")
+        print()
         
         # Sort by score
         results.sort(key=lambda x: x['score'], reverse=True)
         
+        self._print_results(results)
+        
+        return results
+    
+    def optimize_adaptive(self, eta: int = 4, rungs: int = 4, surrogate_trials: int = 24,
+                          continuous_ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+                          max_tests: Optional[int] = None, workers: Optional[int] = None,
+                          data: Optional[pd.DataFrame] = None, fill: str = 'close',
+                          seed: Optional[int] = None):
+        """
+        Successive halving over the grid, then optional surrogate refinement
+        
+        Every combination is first scored on the most recent 1/eta**(rungs-1)
+        of the history; the best 1/eta advance to a slice eta times longer
+        until the survivors get full-length backtests. With surrogate_trials
+        the best configuration's continuous parameters are then refined by a
+        Gaussian process with expected improvement on full-length backtests.
+        
+        Args:
+            eta: Promotion ratio between rungs
+            rungs: Number of rungs (the last one is full length)
+            surrogate_trials: Full-length backtests for the refinement (0 skips it)
+            continuous_ranges: Parameter -> (low, high) refined by the
+                surrogate (defaults to stop_loss_pct / take_profit_pct)
+            max_tests: Sample this many combinations from the grid first
+            workers: Worker processes (defaults to one per core)
+            data: Preloaded OHLCV candles (loaded from the database if None)
+            fill: Stop / target fill model passed to the backtest
+            seed: Seed for grid sampling and surrogate candidates
+        
+        Returns:
+            Full-length results sorted by score (same format as optimize)
+        """
+        workers = workers or default_workers()
+        continuous_ranges = continuous_ranges or {'stop_loss_pct': (0.02, 0.15), 'take_profit_pct': (0.05, 0.35)}
+        
+        param_names = list(self.param_grid.keys())
+        combinations = list(product(*self.param_grid.values()))
+        if max_tests and len(combinations) > max_tests:
+            combinations = random.Random(seed).sample(combinations, max_tests)
+        
+        print("=" * 100)
+        print("PIVOT ZONE ADAPTIVE OPTIMIZER (SUCCESSIVE HALVING)")
+        print("=" * 100)
+        print()
+        print(f"📊 Symbol: {self.symbol}")
+        print(f"🔬 Combinations: {len(combinations)} | eta {eta} | {rungs} rungs | "
+              f"{surrogate_trials} surrogate trials")
+        print(f"⚙️  Workers: {workers}")
+        print()
+        
+        context, meta = self._prepare_context(data, fill)
+        if context is None:
+            print(f"❌ No data found for {self.symbol}")
+            return []
+        n = len(context['close'])
+        
+        candidates = [dict(zip(param_names, params)) for params in combinations]
+        grid_order = {params: k for k, params in enumerate(combinations)}
+        evaluations, cost = 0, 0.0
+        started = time.perf_counter()
+        
+        with SharedArrays(context_arrays(context), meta) as shared:
+            for rung in range(rungs):
+                last = rung == rungs - 1
+                start = 0 if last else n - max(int(n / eta ** (rungs - 1 - rung)), 1)
+                
+                results = list(parallel_map(evaluate_recent, [(params, start) for params in candidates],
+                                            shared, workers))
+                evaluations += len(candidates)
+                cost += len(candidates) * (n - start) / n
+                
+                # Grid order first so ties rank deterministically, then best score first
+                results.sort(key=lambda r: grid_order[tuple(r['parameters'].values())])
+                for result in results:
+                    valid = 'error' not in result and result['total_trades'] > 0
+                    result['score'] = self._calculate_score(result) if valid else float('-inf')
+                results.sort(key=lambda r: r['score'], reverse=True)
+                
+                print(f"Rung {rung + 1}/{rungs}: {len(candidates)} candidates on the last {n - start} candles "
+                      f"-> best score {results[0]['score']:.1f}")
+                
+                if last:
+                    results = [result for result in results if result['score'] > float('-inf')]
+                else:
+                    candidates = [result['parameters'] for result in results[:max(1, math.ceil(len(results) / eta))]]
+            
+            if surrogate_trials and results:
+                refined = self._surrogate_search(results, continuous_ranges, surrogate_trials, shared,
+                                                 workers, np.random.default_rng(seed))
+                print(f"Surrogate: {len(refined)} trials -> best score "
+                      f"{max((r['score'] for r in refined), default=float('nan')):.1f}")
+                results = sorted(results + refined, key=lambda r: r['score'], reverse=True)
+                evaluations += surrogate_trials
+                cost += surrogate_trials
+        
+        elapsed = time.perf_counter() - started
+        print()
+        print(f"⏱️  {evaluations} backtests ({cost:.0f} full-length equivalents vs {len(combinations)} "
+              f"for the grid, {len(combinations) / max(cost, 1e-9):.1f}x fewer) in {elapsed:.1f}s")
+        print()
+        
+        self._print_results(results)
+        
+        return results
+    
+    def _surrogate_search(self, evaluated: List[Dict], ranges: Dict[str, Tuple[float, float]], trials: int,
+                          shared: SharedArrays, workers: int, rng: np.random.Generator) -> List[Dict]:
+        """
+        Refine the continuous parameters of the best configuration
+        
+        Fits a Gaussian process to the full-length scores seen so far for the
+        best configuration's other parameters, and evaluates the candidates
+        with the highest expected improvement in batches of `workers`.
+        
+        Returns:
+            New full-length results that traded (with 'score')
+        """
+        base = evaluated[0]['parameters']
+        names = list(ranges)
+        low = np.array([ranges[name][0] for name in names], dtype=float)
+        high = np.array([ranges[name][1] for name in names], dtype=float)
+        
+        def fixed(params):
+            return all(params[key] == value for key, value in base.items() if key not in ranges)
+        
+        x = [(np.array([r['parameters'][name] for name in names]) - low) / (high - low)
+             for r in evaluated if fixed(r['parameters'])]
+        y = [r['score'] for r in evaluated if fixed(r['parameters'])]
+        
+        refined, done = [], 0
+        while done < trials:
+            batch = min(max(workers, 1), trials - done)
+            pool = rng.uniform(size=(2048, len(names)))
+            if len(x) >= 3:
+                gp = _GaussianProcess().fit(np.array(x), np.array(y))
+                mean, std = gp.predict(pool)
+                pool = pool[np.argsort(-_expected_improvement(mean, std, max(y)))]
+            points = pool[:batch]
+            
+            tasks = [({**base, **{name: round(float(value), 4)
+                                  for name, value in zip(names, low + point * (high - low))}}, 0)
+                     for point in points]
+            for result in parallel_map(evaluate_recent, tasks, shared, workers):
+                valid = 'error' not in result and result['total_trades'] > 0
+                score = self._calculate_score(result) if valid else 0.0
+                x.append((np.array([result['parameters'][name] for name in names]) - low) / (high - low))
+                y.append(score)
+                if valid:
+                    result['score'] = score
+                    refined.append(result)
+            done += batch
+        
+        return refined
+    
+    def _prepare_context(self, data: Optional[pd.DataFrame], fill: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Signal context and worker metadata for the candles ((None, None) if there are none)"""
+        strategy = PivotZoneStrategy()
+        if data is None:
+            data = strategy._load_backtest_data(self.symbol, self.lookback_days)
+            if data is None:
+                return None, None
+        context = strategy.prepare_signal_context(data)
+        index = context['index']
+        
+        meta = {
+            'symbol': self.symbol,
+            'lookback_days': self.lookback_days,
+            'initial_capital': self.initial_capital,
+            'fill': fill,
+            'tz': str(index.tz) if getattr(index, 'tz', None) is not None else None
+        }
+        return context, meta
+    
+    def _print_results(self, results: List[Dict]):
+        """Print the top 10 results and the best configuration"""
         # Display top results
         print("=" * 100)
         print("TOP 10 RESULTS")
@@ -161,8 +469,6 @@ class PivotZoneOptimizer:
                 print(f"  strategy.{key} = {value}")
             print()
             print("=" * 100)
-        
-        return results
     
     def _calculate_score(self, result: Dict) -> float:
         """
@@ -233,10 +539,9 @@ def main():
     optimizer = PivotZoneOptimizer()
     
     print("Starting optimization...")
-    print("This may take a few minutes...")
     print()
     
-    results = optimizer.optimize(max_tests=30)  # Test 30 combinations
+    results = optimizer.optimize()  # Full grid, in parallel
     
     if results:
         print(f"\n✅ Optimization complete! Tested {len(results)} configurations.")
@@ -9,9 +9,12 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 import pandas as pd
 import numpy as np
+from typing import Optional
 from data.database import get_db
 from data.models import MarketData
 from strategies.technical_indicators import TechnicalIndicators
+from strategies.signal_frame import SignalFrame
+from strategies.backtest_core import run_all_in, all_in_trade_records
 
 class Week1RefinedStrategy:
     """
@@ -170,54 +173,23 @@ class Week1RefinedStrategy:
         
         return data
     
+    def generate_signal_frame(self, data: pd.DataFrame, symbol: Optional[str] = None) -> SignalFrame:
+        """Signals as a SignalFrame (stop / target levels and indicator columns included)"""
+        return SignalFrame.from_frame(self.generate_signals(data))
+    
     def backtest(self, data: pd.DataFrame, initial_capital: float = 10000) -> dict:
         """Backtest the strategy"""
         signals = self.generate_signals(data)
+        frame = SignalFrame.from_frame(signals, extras=[])
+        close = signals['close_price'].to_numpy(dtype=float)
+        timestamps = signals['timestamp']
         
-        capital = initial_capital
-        position = 0
-        entry_price = 0
-        trades = []
-        equity_curve = [initial_capital]
-        
-        for i in range(len(signals)):
-            current_price = signals.iloc[i]['close_price']
-            signal = signals.iloc[i]['signal']
-            
-            if signal == 1 and position == 0:
-                # BUY
-                position = capital / current_price
-                entry_price = current_price
-                capital = 0
-                trades.append({
-                    'type': 'BUY',
-                    'price': current_price,
-                    'timestamp': signals.iloc[i]['timestamp']
-                })
-                
-            elif signal == -1 and position > 0:
-                # SELL
-                capital = position * current_price
-                profit = capital - initial_capital
-                trades.append({
-                    'type': 'SELL',
-                    'price': current_price,
-                    'profit': profit,
-                    'return': (current_price - entry_price) / entry_price * 100,
-                    'timestamp': signals.iloc[i]['timestamp']
-                })
-                position = 0
-                entry_price = 0
-            
-            # Track equity
-            if position > 0:
-                equity_curve.append(position * current_price)
-            else:
-                equity_curve.append(capital)
+        result = run_all_in(close, frame.signal, initial_capital)
+        trades = all_in_trade_records(result, timestamps, initial_capital)
+        equity_curve = [initial_capital] + result.equity.tolist()
         
         # Close any open position
-        if position > 0:
-            capital = position * signals.iloc[-1]['close_price']
+        capital = result.final_value
         
         # Calculate metrics
         final_value = capital if capital > 0 else equity_curve[-1]
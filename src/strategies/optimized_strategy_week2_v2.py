@@ -14,11 +14,11 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from typing import List, Dict, Optional, Tuple
 import pandas as pd
-from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from data.database import get_db
-from data.models import MarketData
+from data.backtest_data import get_backtest_data_provider
 from strategies.technical_indicators import TechnicalIndicators
+from strategies.signal_frame import SignalFrame
 
 class OptimizedStrategyWeek2V2:
     """Week 2 v2 - Optimized Exit Strategy with relaxed parameters"""
@@ -278,32 +278,27 @@ class OptimizedStrategyWeek2V2:
         
         return signals
     
+    def generate_signal_frame(self, data: pd.DataFrame, symbol: Optional[str] = None) -> SignalFrame:
+        """
+        Signals as a SignalFrame aligned to data
+        
+        BUY rows carry the ATR stop and TP1 (TP2 in extras), exits carry the
+        exit price and reason; partial exits are -0.5.
+        """
+        timestamps = data['timestamp'] if 'timestamp' in data.columns else None
+        return SignalFrame.from_records(self.generate_signals(data), data.index, timestamps)
+    
     def backtest(self, db: Session, days: int = 90, initial_capital: float = 10000.0) -> Dict:
         """
         Backtest Week 2 v2 strategy with partial exit support
         """
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        # Fetch data
-        data = db.query(MarketData).filter(
-            MarketData.timestamp >= start_date,
-            MarketData.timestamp <= end_date,
-            MarketData.symbol == 'BTC/USDT'  # Historical data has slash
-        ).order_by(MarketData.timestamp).all()
+        # Fetch data (historical data has slash)
+        df = get_backtest_data_provider().get_frame('BTC/USDT', lookback_days=days, style='price',
+                                                    index=False, session=db)
         
-        if not data:
+        if df is None:
             return {'error': 'No data available'}
         
-        df = pd.DataFrame([{
-            'timestamp': d.timestamp,
-            'open_price': float(d.open_price),
-            'high_price': float(d.high_price),
-            'low_price': float(d.low_price),
-            'close_price': float(d.close_price),
-            'volume': float(d.volume)
-        } for d in data])
-        
         # Generate signals
         signals = self.generate_signals(df)
         
@@ -404,6 +399,8 @@ class OptimizedStrategyWeek2V2:
         
         return {
             'win_rate': win_rate,
+            'initial_capital': initial_capital,
+            'final_value': capital,
             'total_return': total_return,
             'max_drawdown': max_drawdown,
             'volatility': volatility,
@@ -0,0 +1,151 @@
+"""
+Parallel Parameter Sweeps
+Fan work items out to worker processes that share read-only arrays through shared memory
+"""
+import os
+import logging
+import multiprocessing as mp
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Worker-side view of the shared arrays, set once per process by the pool initializer
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_meta: Dict[str, Any] = {}
+_worker_blocks: List[shared_memory.SharedMemory] = []
+
+
+class SharedArrays:
+    """
+    Numeric arrays copied once into shared memory blocks
+
+    Workers attach to the blocks by name and get read-only NumPy views, so a
+    sweep pays for loading and preparing the data once instead of per worker
+    or per combination. Use as a context manager (or call close()) to free
+    the blocks.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            arrays: Name -> numeric array (object dtypes cannot be shared)
+            meta: Small picklable values sent to every worker (symbol, tz, ...)
+        """
+        self.meta = dict(meta or {})
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.spec: Dict[str, Tuple[str, Tuple[int, ...], str]] = {}
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+        try:
+            for name, values in arrays.items():
+                values = np.ascontiguousarray(values)
+                if values.dtype == object:
+                    raise TypeError(f"Array '{name}' has object dtype and cannot be shared")
+
+                block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                self._blocks.append(block)
+
+                view = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)
+                view[...] = values
+                view.flags.writeable = False
+
+                self.arrays[name] = view
+                self.spec[name] = (block.name, values.shape, values.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    @staticmethod
+    def attach(spec: Dict[str, Tuple[str, Tuple[int, ...], str]]
+               ) -> Tuple[Dict[str, np.ndarray], List[shared_memory.SharedMemory]]:
+        """
+        Attach to blocks created in another process
+
+        Returns:
+            (read-only arrays, block handles that must stay referenced)
+        """
+        arrays, blocks = {}, []
+        for name, (block_name, shape, dtype) in spec.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            blocks.append(block)
+            view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+            view.flags.writeable = False
+            arrays[name] = view
+        return arrays, blocks
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.nbytes for values in self.arrays.values())
+
+    def close(self):
+        """Release and unlink the shared memory blocks"""
+        self.arrays = {}
+        for block in self._blocks:
+            try:
+                block.close()
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = []
+
+    def __enter__(self) -> 'SharedArrays':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _init_worker(spec: Dict, meta: Dict[str, Any]):
+    global _worker_arrays, _worker_meta, _worker_blocks
+    _worker_arrays, _worker_blocks = SharedArrays.attach(spec)
+    _worker_meta = meta
+
+
+def _call_worker(func: Callable, item: Any) -> Any:
+    return func(_worker_arrays, _worker_meta, item)
+
+
+def default_workers() -> int:
+    """Worker processes to use: one per available core"""
+    try:
+        return max(len(os.sched_getaffinity(0)), 1)
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def parallel_map(func: Callable[[Dict[str, np.ndarray], Dict[str, Any], Any], Any],
+                 items: Iterable, shared: SharedArrays, workers: Optional[int] = None,
+                 chunksize: Optional[int] = None) -> Iterator:
+    """
+    Evaluate func(arrays, meta, item) for every item, yielding results as they finish
+
+    Args:
+        func: Module-level (picklable) function
+        items: Work items, e.g. parameter dicts
+        shared: Arrays and metadata passed to every call
+        workers: Worker processes (defaults to one per core); with 1 the
+            items run in this process without a pool
+        chunksize: Items sent to a worker at a time (defaults to ~8 chunks
+            per worker)
+
+    Yields:
+        func results in completion order
+    """
+    items = list(items)
+    workers = min(workers or default_workers(), max(len(items), 1))
+
+    if workers <= 1:
+        for item in items:
+            yield func(shared.arrays, shared.meta, item)
+        return
+
+    chunksize = chunksize or max(1, len(items) // (workers * 8))
+    logger.info(f"Sweeping {len(items)} items on {workers} workers "
+                f"({shared.nbytes / 1e6:.1f} MB shared, chunksize {chunksize})")
+
+    with mp.Pool(workers, initializer=_init_worker, initargs=(shared.spec, shared.meta)) as pool:
+        yield from pool.imap_unordered(partial(_call_worker, func), items, chunksize)
@@ -9,9 +9,13 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 import pandas as pd
 import numpy as np
+from typing import Any, Dict, Optional
 from data.database import get_db
 from data.models import MarketData
 from strategies.technical_indicators import TechnicalIndicators
+from strategies.signal_frame import SignalFrame
+from strategies.backtest_core import run_sized_long, BUY
+from strategies.incremental_indicators import IncrementalSMA, IncrementalRSI, candle_ohlcv
 
 class OptimizedPhase2Strategy:
     """Optimized strategy balancing signals and risk management"""
@@ -23,6 +27,9 @@ class OptimizedPhase2Strategy:
         self.slow_ma = 21
         self.rsi_oversold = 35
         self.rsi_overbought = 65
+        
+        # Per-symbol streaming state for on_candle / latest_signal
+        self.live_states: Dict[str, Dict[str, Any]] = {}
     
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """Generate optimized signals with multiple confirmations"""
@@ -74,78 +81,93 @@ class OptimizedPhase2Strategy:
         
         return signals
     
+    def generate_signal_frame(self, data: pd.DataFrame, symbol: Optional[str] = None) -> SignalFrame:
+        """Signals as a SignalFrame"""
+        return SignalFrame.from_series(self.generate_signals(data))
+    
+    def on_candle(self, symbol: str, candle: Any) -> float:
+        """
+        Evaluate one completed candle for a symbol
+        
+        Same rules as generate_signals, applied to the newest candle only with
+        per-symbol streaming MAs and RSI.
+        
+        Returns:
+            Signal for this candle: 1.0, 0.5, -1.0 or 0.0
+        """
+        state = self.live_states.get(symbol)
+        if state is None:
+            state = self.live_states[symbol] = {
+                'ma_fast': IncrementalSMA(self.fast_ma),
+                'ma_slow': IncrementalSMA(self.slow_ma),
+                'rsi': IncrementalRSI(14),
+                'index': -1,
+                'prev_fast': float('nan'),
+                'prev_slow': float('nan'),
+                'signal': 0.0
+            }
+        
+        close = candle_ohlcv(candle)[3]
+        state['index'] += 1
+        ma_fast = state['ma_fast'].update(close)
+        ma_slow = state['ma_slow'].update(close)
+        rsi = state['rsi'].update(close)
+        
+        signal = 0.0
+        if state['index'] >= self.slow_ma:
+            ma_crossover_up = ma_fast > ma_slow and state['prev_fast'] <= state['prev_slow']
+            ma_crossover_down = ma_fast < ma_slow and state['prev_fast'] >= state['prev_slow']
+            rsi_overbought = rsi > self.rsi_overbought
+            
+            if ma_crossover_up and not rsi_overbought:
+                signal = 1.0
+            elif ma_crossover_down or (rsi_overbought and rsi > 70):
+                signal = -1.0
+            elif rsi < self.rsi_oversold and ma_fast > ma_slow and rsi < 30:
+                signal = 0.5
+        
+        state['prev_fast'], state['prev_slow'] = ma_fast, ma_slow
+        state['signal'] = signal
+        return signal
+    
+    def latest_signal(self, symbol: str) -> float:
+        """Signal of the most recent candle passed to on_candle (0.0 if none)"""
+        state = self.live_states.get(symbol)
+        return state['signal'] if state else 0.0
+    
+    def reset_live_state(self, symbol: Optional[str] = None):
+        """Drop streaming state for one symbol or for all symbols"""
+        if symbol is None:
+            self.live_states.clear()
+        else:
+            self.live_states.pop(symbol, None)
+    
     def backtest(self, data: pd.DataFrame, initial_capital: float = 10000):
         """Optimized backtesting with smart position sizing"""
         signals = self.generate_signals(data)
         
-        cash = initial_capital
-        position = 0
-        portfolio_values = []
-        trades = []
-        
-        # Risk management
-        max_position_pct = 0.30  # Max 30% per trade
-        stop_loss_pct = 0.10     # 10% stop loss
-        entry_price = 0
+        result = run_sized_long(
+            data['close_price'].to_numpy(dtype=float),
+            signals.to_numpy(dtype=float),
+            initial_capital=initial_capital,
+            max_position_pct=0.30,  # Max 30% per trade, scaled by signal strength
+            stop_loss_pct=0.10      # 10% stop loss
+        )
         
-        for i, (timestamp, row) in enumerate(data.iterrows()):
-            current_price = row['close_price']
-            signal = signals.iloc[i]
-            
-            # Current portfolio value
-            portfolio_value = cash + (position * current_price)
-            portfolio_values.append(portfolio_value)
-            
-            # Stop loss check
-            if position > 0 and entry_price > 0:
-                if current_price <= entry_price * (1 - stop_loss_pct):
-                    # Stop loss triggered
-                    cash = cash + (position * current_price)
-                    trades.append({
-                        'type': 'STOP_LOSS', 
-                        'price': current_price, 
-                        'shares': position, 
-                        'timestamp': timestamp
-                    })
-                    position = 0
-                    entry_price = 0
-            
-            # Signal-based trading
-            if signal > 0 and position == 0:  # Buy signal
-                position_size = max_position_pct * signal  # Scale by signal strength
-                max_investment = portfolio_value * position_size
-                shares_to_buy = max_investment / current_price
-                
-                if cash >= max_investment:
-                    position = shares_to_buy
-                    cash = cash - (shares_to_buy * current_price)
-                    entry_price = current_price
-                    trades.append({
-                        'type': 'BUY', 
-                        'price': current_price, 
-                        'shares': shares_to_buy, 
-                        'timestamp': timestamp,
-                        'signal_strength': signal
-                    })
-                
-            elif signal < 0 and position > 0:  # Sell signal
-                cash = cash + (position * current_price)
-                trades.append({
-                    'type': 'SELL', 
-                    'price': current_price, 
-                    'shares': position, 
-                    'timestamp': timestamp
-                })
-                position = 0
-                entry_price = 0
+        trades = []
+        for i, kind, price, size in zip(result.trades['index'].tolist(), result.trades['kind'],
+                                        result.trades['price'].tolist(), result.trades['size'].tolist()):
+            trade = {'type': kind, 'price': price, 'shares': abs(size), 'timestamp': data.index[i]}
+            if kind == BUY:
+                trade['signal_strength'] = signals.iloc[i]
+            trades.append(trade)
         
         # Final calculations
-        final_price = data['close_price'].iloc[-1]
-        final_value = cash + (position * final_price)
+        final_value = result.final_value
         total_return = (final_value - initial_capital) / initial_capital
+        portfolio_values = result.equity
         
         # Performance metrics
-        portfolio_values = np.array(portfolio_values)
         returns = np.diff(portfolio_values) / portfolio_values[:-1]
         volatility = np.std(returns) * np.sqrt(365 * 24) if len(returns) > 0 else 0
         sharpe_ratio = np.mean(returns) / np.std(returns) if np.std(returns) > 0 else 0
@@ -5,16 +5,18 @@ Implements zone-based entries with volume and trend confirmation
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from strategies.technical_indicators import TechnicalIndicators
-from data.models import MarketData
-from data.database import get_db
+from strategies.signal_frame import SignalFrame
+from strategies.backtest_core import (
+    run_brackets, bar_ticks, BUY, SELL, STOP_LOSS, TAKE_PROFIT
+)
+from data.backtest_data import get_backtest_data_provider
 
 
 class PivotZoneStrategy:
@@ -194,105 +196,126 @@ class PivotZoneStrategy:
             else:
                 return 'NEUTRAL'
     
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+    # Zone pairs checked in priority order: (name, bottom level, top level, is_support)
+    ZONE_PAIRS = [
+        ('R5/R6', 'r5', 'r6', False),
+        ('R2/R3', 'r2', 'r3', False),
+        ('R0/R1', 'r0', 'r1', False),
+        ('S0/S1', 's1', 's0', True),  # Note: s1 < s0
+        ('S2/S3', 's3', 's2', True),
+        ('S5/S6', 's6', 's5', True),
+    ]
+    
+    def prepare_signal_context(self, data: pd.DataFrame, volume_lookback: int = 20) -> Dict:
         """
-        Generate buy/sell signals based on pivot zones
+        Precompute everything generate_signals needs that does not depend on
+        the filter parameters: OHLCV arrays, zone bounds per pair, trailing
+        volume average and the MA50/MA200 trend columns
         
-        Returns DataFrame with columns:
-        - signal: 1.0 (buy), -1.0 (sell), 0.0 (hold)
-        - zone_name: Which zone triggered
-        - signal_strength: 0.0-1.0 confidence score
-        """
-        # Ensure we have a proper dataframe
-        if isinstance(data, pd.DataFrame):
-            df = data.copy()
-        else:
-            df = pd.DataFrame(data)
+        The context can be reused across parameter sets (see signals_from_context).
         
+        Returns:
+            Dict of numpy arrays plus the frame index
+        """
+        df = data.copy() if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
         zones = self.calculate_pivot_zones(df)
         
-        signals = pd.DataFrame(index=df.index)
-        signals['signal'] = 0.0
-        signals['zone_name'] = ''
-        signals['signal_strength'] = 0.0
-        
-        # Zone pairs to check (name, bottom, top)
-        # Check support zones for buys, resistance zones for sells
-        zone_pairs = [
-            ('R5/R6', zones['r5'], zones['r6']),
-            ('R2/R3', zones['r2'], zones['r3']),
-            ('R0/R1', zones['r0'], zones['r1']),
-            ('S0/S1', zones['s1'], zones['s0']),  # Note: s1 < s0
-            ('S2/S3', zones['s3'], zones['s2']),
-            ('S5/S6', zones['s6'], zones['s5']),
-        ]
-        
-        # Start after we have enough data for all indicators
-        start_idx = max(self.ma_trend_period, 200, 20)
+        close = df['close'].to_numpy(dtype=float)
+        volume = df['volume'].to_numpy(dtype=float)
         
-        for i in range(start_idx, len(df)):
-            candle = df.iloc[i]
-            
-            # Get trend
-            trend = self.check_trend_direction(df, i)
+        return {
+            'index': df.index,
+            'open': df['open'].to_numpy(dtype=float),
+            'high': df['high'].to_numpy(dtype=float),
+            'low': df['low'].to_numpy(dtype=float),
+            'close': close,
+            'volume': volume,
+            # One row per zone pair, in ZONE_PAIRS order
+            'zone_bottom': np.vstack([zones[bottom].to_numpy(dtype=float) for _, bottom, _, _ in self.ZONE_PAIRS]),
+            'zone_top': np.vstack([zones[top].to_numpy(dtype=float) for _, _, top, _ in self.ZONE_PAIRS]),
+            # Averages over the candles before i (the current candle is excluded)
+            'avg_volume': _trailing_mean(volume, volume_lookback),
+            'ma50': _trailing_mean(close, 50),
+            'ma200': _trailing_mean(close, 200),
+        }
+    
+    def signals_from_context(self, context: Dict) -> pd.DataFrame:
+        """
+        Evaluate the zone entry rules for every candle and zone pair at once
+        
+        Uses the current filter settings (min_volume_multiplier, use_trend_filter).
+        
+        Returns:
+            DataFrame with signal, zone_name and signal_strength columns
+        """
+        close = context['close']
+        ma50 = context['ma50']
+        ma200 = context['ma200']
+        n = len(close)
+        
+        with np.errstate(invalid='ignore'):
+            bullish = (ma50 > ma200 * 1.02) & (close > ma50)  # 2% buffer
+            bearish = ~bullish & (ma50 < ma200 * 0.98) & (close < ma50)
+            volume_ok = context['volume'] >= (context['avg_volume'] * self.min_volume_multiplier)
             
-            # Check volume
-            volume_ok = self.check_volume_confirmation(df, i)
+            bottom = context['zone_bottom']
+            top = context['zone_top']
+            touched = (context['low'] <= top) & (context['high'] >= bottom)
+            opened_in_zone = (bottom <= context['open']) & (context['open'] <= top)
+            interaction = touched | opened_in_zone
             
-            # Check each zone
-            for zone_name, zone_bottom, zone_top in zone_pairs:
-                bottom_val = zone_bottom.iloc[i]
-                top_val = zone_top.iloc[i]
-                
-                # BUY signal: Touched zone and closed ABOVE
-                # This happens at support zones when price bounces
-                if 'S' in zone_name:  # Support zones = potential buy
-                    if self.check_zone_touch_and_close(candle, bottom_val, top_val, 'ABOVE'):
-                        # Apply filters
-                        if self.use_trend_filter and trend == 'BEARISH':
-                            continue  # Don't buy in downtrend
-                        
-                        if not volume_ok:
-                            continue  # Skip low volume signals
-                        
-                        # Calculate signal strength
-                        strength = 0.6  # Base
-                        if trend == 'BULLISH':
-                            strength += 0.2
-                        if volume_ok:
-                            strength += 0.2
-                        
-                        signals.loc[signals.index[i], 'signal'] = 1.0
-                        signals.loc[signals.index[i], 'zone_name'] = zone_name
-                        signals.loc[signals.index[i], 'signal_strength'] = min(strength, 1.0)
-                        break  # Only one signal per candle
-                
-                # SELL signal: Touched zone and closed BELOW
-                # This happens at resistance zones when price rejects
-                elif 'R' in zone_name:  # Resistance zones = potential sell
-                    if self.check_zone_touch_and_close(candle, bottom_val, top_val, 'BELOW'):
-                        # Apply filters
-                        if self.use_trend_filter and trend == 'BULLISH':
-                            continue  # Don't sell in uptrend
-                        
-                        if not volume_ok:
-                            continue  # Skip low volume signals
-                        
-                        # Calculate signal strength
-                        strength = 0.6  # Base
-                        if trend == 'BEARISH':
-                            strength += 0.2
-                        if volume_ok:
-                            strength += 0.2
-                        
-                        signals.loc[signals.index[i], 'signal'] = -1.0
-                        signals.loc[signals.index[i], 'zone_name'] = zone_name
-                        signals.loc[signals.index[i], 'signal_strength'] = min(strength, 1.0)
-                        break  # Only one signal per candle
+            is_support = np.array([support for _, _, _, support in self.ZONE_PAIRS])[:, None]
+            closed_through = np.where(is_support, close > top, close < bottom)
+        
+        # Buys skip downtrends, sells skip uptrends
+        trend_ok = np.where(is_support, ~bearish, ~bullish) if self.use_trend_filter else True
+        passed = interaction & closed_through & trend_ok & volume_ok
+        
+        # Start after we have enough data for all indicators; a sliced context
+        # (see optimize_pivot_zone.slice_context) is already warmed up by its offset
+        start_idx = max(self.ma_trend_period, 200, 20)
+        passed[:, :max(start_idx - context.get('offset', 0), 0)] = False
+        
+        # Only one signal per candle: the first qualifying zone pair wins
+        has_signal = passed.any(axis=0)
+        winner = passed.argmax(axis=0)
+        winner_support = is_support[winner, 0]
+        
+        favourable = np.where(winner_support, bullish, bearish)
+        strength = np.minimum(np.where(favourable, 0.6 + 0.2, 0.6) + 0.2, 1.0)
+        
+        zone_names = np.array([name for name, _, _, _ in self.ZONE_PAIRS], dtype=object)
+        
+        signals = pd.DataFrame(index=context['index'])
+        signals['signal'] = np.where(has_signal, np.where(winner_support, 1.0, -1.0), 0.0)
+        signals['zone_name'] = np.where(has_signal, zone_names[winner], '')
+        signals['signal_strength'] = np.where(has_signal, strength, 0.0)
         
         return signals
     
-    def backtest(self, symbol: str = 'BTC/USDT', lookback_days: int = 90, initial_capital: float = 10000):
+    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Generate buy/sell signals based on pivot zones
+        
+        Returns DataFrame with columns:
+        - signal: 1.0 (buy), -1.0 (sell), 0.0 (hold)
+        - zone_name: Which zone triggered
+        - signal_strength: 0.0-1.0 confidence score
+        """
+        return self.signals_from_context(self.prepare_signal_context(data))
+    
+    def generate_signal_frame(self, data: pd.DataFrame, symbol: Optional[str] = None) -> SignalFrame:
+        """Signals as a SignalFrame with signal_strength and the triggering zone_name"""
+        return SignalFrame.from_frame(self.generate_signals(data), extras=['zone_name'])
+    
+    def _load_backtest_data(self, symbol: str, lookback_days: int) -> Optional[pd.DataFrame]:
+        """Load OHLCV candles (cached), indexed by timestamp (None if empty)"""
+        return get_backtest_data_provider().get_frame(symbol, lookback_days=lookback_days, style='short')
+    
+    def backtest(self, symbol: str = 'BTC/USDT', lookback_days: int = 90, initial_capital: float = 10000,
+                 data: Optional[pd.DataFrame] = None, fill: str = 'close',
+                 ticks: Optional[Tuple[Sequence, Sequence]] = None, same_bar: str = 'stop_first',
+                 context: Optional[Dict] = None):
         """
         Backtest the pivot zone strategy on historical data
         
@@ -300,165 +323,78 @@ class PivotZoneStrategy:
             symbol: Trading pair symbol
             lookback_days: Number of days to backtest
             initial_capital: Starting capital
+            data: Preloaded OHLCV candles (open/high/low/close/volume with a
+                timestamp column or DatetimeIndex); loaded from the database if None
+            fill: 'close' checks stop / target at the candle close, 'intrabar'
+                against the candle high / low (see backtest_core.run_brackets)
+            ticks: Optional (timestamps, prices) replayed inside each candle,
+                e.g. 30-second ticker polls like the live stop checks
+            same_bar: Order when a candle crosses both stop and target
+            context: Precomputed prepare_signal_context output; skips data
+                loading and indicator prep (parameter sweeps reuse one context)
         
         Returns:
             Dict with performance metrics and trade list
         """
-        # Get historical data
-        db = next(get_db())
-        end_date = datetime.now()
-        start_date = end_date - pd.Timedelta(days=lookback_days)
-        
-        records = db.query(MarketData).filter(
-            MarketData.symbol == symbol,
-            MarketData.timestamp >= start_date,
-            MarketData.timestamp <= end_date
-        ).order_by(MarketData.timestamp).all()
-        
-        if not records:
-            return {
-                'error': f'No data found for {symbol}',
-                'trades': [],
-                'win_rate': 0,
-                'total_return': 0
-            }
-        
-        # Convert to DataFrame
-        data = pd.DataFrame([{
-            'timestamp': r.timestamp,
-            'open': float(r.open_price),
-            'high': float(r.high_price),
-            'low': float(r.low_price),
-            'close': float(r.close_price),
-            'volume': float(r.volume)
-        } for r in records])
-        
-        data['timestamp'] = pd.to_datetime(data['timestamp'])
-        data = data.set_index('timestamp')
+        if context is None:
+            if data is None:
+                data = self._load_backtest_data(symbol, lookback_days)
+                if data is None:
+                    return {
+                        'error': f'No data found for {symbol}',
+                        'trades': [],
+                        'win_rate': 0,
+                        'total_return': 0
+                    }
+            elif 'timestamp' in data.columns:
+                data = data.assign(timestamp=pd.to_datetime(data['timestamp'])).set_index('timestamp')
+            
+            context = self.prepare_signal_context(data)
+        index = context['index']
         
         # Generate signals
-        signals_df = self.generate_signals(data)
-        
-        # Backtest loop
-        cash = initial_capital
-        position = 0
-        entry_price = 0
-        entry_zone = ''
-        portfolio_values = []
-        trades = []
+        frame = SignalFrame.from_frame(self.signals_from_context(context), extras=['zone_name'])
+        close = context['close']
+        zone_names = frame.extras['zone_name']
+        
+        if ticks is not None:
+            ticks = bar_ticks(index, *ticks)
+        intrabar = fill == 'intrabar' or ticks is not None
+        
+        result = run_brackets(
+            close,
+            frame.signal,
+            self.max_position_pct * frame.strength,  # Position size based on signal strength
+            self.stop_loss_pct,
+            self.take_profit_pct,
+            initial_capital=initial_capital,
+            fill=fill,
+            open_=context['open'] if intrabar else None,
+            high=context['high'] if intrabar else None,
+            low=context['low'] if intrabar else None,
+            ticks=ticks,
+            same_bar=same_bar
+        )
+        portfolio_values = result.equity
+        cash = result.cash
         
-        for i in range(len(data)):
-            timestamp = data.index[i]
-            current_price = data['close'].iloc[i]
-            signal = signals_df['signal'].iloc[i]
-            signal_strength = signals_df['signal_strength'].iloc[i]
-            zone_name = signals_df['zone_name'].iloc[i]
-            
-            # Portfolio value
-            portfolio_value = cash + (position * current_price)
-            portfolio_values.append(portfolio_value)
-            
-            # Stop loss and take profit checks
-            if position > 0 and entry_price > 0:
-                # Stop loss
-                if current_price <= entry_price * (1 - self.stop_loss_pct):
-                    proceeds = position * current_price
-                    pnl = proceeds - (position * entry_price)
-                    pnl_pct = (current_price / entry_price - 1) * 100
-                    cash += proceeds
-                    
-                    trades.append({
-                        'entry_time': entry_time,
-                        'exit_time': timestamp,
-                        'entry_price': entry_price,
-                        'exit_price': current_price,
-                        'shares': position,
-                        'pnl': pnl,
-                        'pnl_pct': pnl_pct,
-                        'exit_reason': 'STOP_LOSS',
-                        'zone': entry_zone
-                    })
-                    
-                    position = 0
-                    entry_price = 0
-                    continue
-                
-                # Take profit
-                if current_price >= entry_price * (1 + self.take_profit_pct):
-                    proceeds = position * current_price
-                    pnl = proceeds - (position * entry_price)
-                    pnl_pct = (current_price / entry_price - 1) * 100
-                    cash += proceeds
-                    
-                    trades.append({
-                        'entry_time': entry_time,
-                        'exit_time': timestamp,
-                        'entry_price': entry_price,
-                        'exit_price': current_price,
-                        'shares': position,
-                        'pnl': pnl,
-                        'pnl_pct': pnl_pct,
-                        'exit_reason': 'TAKE_PROFIT',
-                        'zone': entry_zone
-                    })
-                    
-                    position = 0
-                    entry_price = 0
-                    continue
-            
-            # Buy signal
-            if signal > 0 and position == 0 and cash > 0:
-                # Position size based on signal strength
-                position_size = self.max_position_pct * signal_strength
-                investment = portfolio_value * position_size
-                
-                if cash >= investment:
-                    position = investment / current_price
-                    cash -= investment
-                    entry_price = current_price
-                    entry_time = timestamp
-                    entry_zone = zone_name
+        trades = []
+        exit_reasons = {STOP_LOSS: 'STOP_LOSS', TAKE_PROFIT: 'TAKE_PROFIT', SELL: 'SIGNAL'}
+        for i, kind, price, size in zip(result.trades['index'].tolist(), result.trades['kind'],
+                                        result.trades['price'].tolist(), result.trades['size'].tolist()):
+            if kind == BUY:
+                entry_time, entry_price, entry_zone = index[i], price, zone_names[i]
+                continue
             
-            # Sell signal (close position)
-            elif signal < 0 and position > 0:
-                proceeds = position * current_price
-                pnl = proceeds - (position * entry_price)
-                pnl_pct = (current_price / entry_price - 1) * 100
-                cash += proceeds
-                
-                trades.append({
-                    'entry_time': entry_time,
-                    'exit_time': timestamp,
-                    'entry_price': entry_price,
-                    'exit_price': current_price,
-                    'shares': position,
-                    'pnl': pnl,
-                    'pnl_pct': pnl_pct,
-                    'exit_reason': 'SIGNAL',
-                    'zone': entry_zone
-                })
-                
-                position = 0
-                entry_price = 0
+            trades.append(self._closed_trade(entry_time, index[i], entry_price, price, -size,
+                                             exit_reasons[kind], entry_zone))
         
         # Close final position if still open
-        if position > 0:
-            proceeds = position * data['close'].iloc[-1]
-            pnl = proceeds - (position * entry_price)
-            pnl_pct = (data['close'].iloc[-1] / entry_price - 1) * 100
-            cash += proceeds
-            
-            trades.append({
-                'entry_time': entry_time,
-                'exit_time': data.index[-1],
-                'entry_price': entry_price,
-                'exit_price': data['close'].iloc[-1],
-                'shares': position,
-                'pnl': pnl,
-                'pnl_pct': pnl_pct,
-                'exit_reason': 'FINAL_CLOSE',
-                'zone': entry_zone
-            })
+        if result.position > 0:
+            position = result.position
+            cash += position * close[-1]
+            trades.append(self._closed_trade(entry_time, index[-1], entry_price, close[-1], position,
+                                             'FINAL_CLOSE', entry_zone))
         
         # Calculate metrics
         final_value = cash
@@ -490,11 +426,39 @@ class PivotZoneStrategy:
             'avg_win': avg_win,
             'avg_loss': avg_loss,
             'max_drawdown': max_drawdown,
+            'initial_capital': initial_capital,
             'final_value': final_value,
-            'trades': trades
+            'trades': trades,
+            'equity_curve': portfolio_values
+        }
+
+    @staticmethod
+    def _closed_trade(entry_time, exit_time, entry_price: float, exit_price: float,
+                      shares: float, exit_reason: str, zone: str) -> Dict:
+        """Trade record for a closed position"""
+        proceeds = shares * exit_price
+        return {
+            'entry_time': entry_time,
+            'exit_time': exit_time,
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'shares': shares,
+            'pnl': proceeds - (shares * entry_price),
+            'pnl_pct': (exit_price / entry_price - 1) * 100,
+            'exit_reason': exit_reason,
+            'zone': zone
         }
 
 
+def _trailing_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the `window` values before each position (NaN until available)"""
+    result = np.full(len(values), np.nan)
+    if len(values) > window:
+        windows = np.lib.stride_tricks.sliding_window_view(values[:-1], window)
+        result[window:] = windows.mean(axis=1)
+    return result
+
+
 if __name__ == '__main__':
     """Test the Pivot Zone strategy"""
     print("=" * 80)
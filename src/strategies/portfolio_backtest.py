@@ -0,0 +1,280 @@
+"""
+Portfolio Backtest
+Replay aligned multi-symbol candles through the live PortfolioManager sizing and risk rules
+
+Mirrors LiveTradingEngine5m.trading_cycle on every candle: stop losses, then
+take profits (in position-open order), then each symbol's signal in symbol
+order, buying on a new positive signal and selling on a new negative one.
+Like the single-symbol kernels in backtest_core, the loop jumps from one
+candle with a signal change or exit to the next; holdings, cash and equity
+between events are filled in with array operations.
+"""
+import copy
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from strategies.backtest_core import BUY, SELL, STOP_LOSS, TAKE_PROFIT, _first_hit, max_drawdown
+
+
+@dataclass
+class PortfolioBacktestResult:
+    """
+    Output of PortfolioBacktester.run
+
+    equity / cash / exposure: Per candle, after the candle's cycle
+        (exposure = share of equity held in positions)
+    holdings: (candles, symbols) units held after each candle
+    trades: Trade dicts in execution order (symbol, side, index, timestamp,
+        price, amount, pnl, reason)
+    attribution: Per-symbol trades, win rate, realized / unrealized P&L and
+        contribution to the portfolio return
+    """
+    index: pd.Index
+    symbols: List[str]
+    equity: np.ndarray
+    cash: np.ndarray
+    holdings: np.ndarray
+    exposure: np.ndarray
+    trades: List[Dict]
+    attribution: pd.DataFrame
+    initial_capital: float
+
+    @property
+    def final_value(self) -> float:
+        return float(self.equity[-1]) if len(self.equity) else self.initial_capital
+
+    @property
+    def total_return(self) -> float:
+        """Total return in percent"""
+        return (self.final_value / self.initial_capital - 1) * 100
+
+    @property
+    def max_drawdown(self) -> float:
+        """Largest peak-to-trough decline in percent (positive)"""
+        return max_drawdown(np.r_[self.initial_capital, self.equity]) * 100
+
+    def equity_curve(self) -> pd.Series:
+        return pd.Series(self.equity, index=self.index, name='equity')
+
+
+class PortfolioBacktester:
+    """
+    Multi-symbol backtest with the live engine's portfolio rules
+
+    Sizing (get_position_size), the cash floor (can_open_position), dynamic
+    stop losses and take profits are computed by a copy of a PortfolioManager
+    instance that carries the backtest's cash and positions, so backtests
+    follow changes to the live settings and formulas.
+    """
+
+    def __init__(self, portfolio=None, max_positions: Optional[int] = None, window: int = 256):
+        """
+        Args:
+            portfolio: PortfolioManager providing the rules and initial
+                balance (a default live_engine_5m.PortfolioManager if None)
+            max_positions: Optional cap on simultaneously open positions
+                (the live engine has none)
+            window: Initial scan window when searching for the next exit
+        """
+        from trading.live_engine_5m import PortfolioManager, Position
+
+        if portfolio is None:
+            portfolio = PortfolioManager()
+        self._position_type = Position
+
+        self.portfolio = portfolio
+        self.max_positions = max_positions
+        self.window = window
+
+    def run(self, close: np.ndarray, signal: np.ndarray, symbols: Optional[Sequence[str]] = None,
+            index: Optional[Sequence] = None) -> PortfolioBacktestResult:
+        """
+        Replay aligned candles
+
+        Args:
+            close: (candles, symbols) close prices; NaN where a symbol has
+                no candle (it is skipped that cycle, like a missing ticker)
+            signal: (candles, symbols) strategy signals; only the sign is used
+            symbols: Symbol names (column order is the processing order)
+            index: Candle timestamps
+
+        Returns:
+            PortfolioBacktestResult
+        """
+        close = np.asarray(close, dtype=float)
+        signal = np.asarray(signal, dtype=float)
+        if close.ndim != 2 or close.shape != signal.shape:
+            raise ValueError(f"close and signal must be matching 2-D arrays, got {close.shape} and {signal.shape}")
+
+        n, m = close.shape
+        symbols = list(symbols) if symbols is not None else [str(k) for k in range(m)]
+        index = pd.Index(index) if index is not None else pd.RangeIndex(n)
+        initial = float(self.portfolio.initial_balance)
+
+        # Scratch copy of the rules instance: live formulas, backtest state
+        pm = copy.copy(self.portfolio)
+        pm.cash_balance = initial
+        pm.positions = {}
+        pm.trades = []
+
+        available = ~np.isnan(close)
+        # Positions keep their last known price when a candle is missing
+        marks = pd.DataFrame(close).ffill().fillna(0.0).to_numpy()
+        columns = np.ascontiguousarray(close.T)
+
+        # last_signals only advance on cycles where the symbol has a price
+        current = np.where(available, np.nan_to_num(signal), np.nan)
+        previous = pd.DataFrame(current).shift(1).ffill().fillna(0.0).to_numpy()
+        buys = available & (current > 0) & (previous <= 0)
+        sells = available & (current < 0) & (previous >= 0)
+        edge_rows = np.flatnonzero((buys | sells).any(axis=1))
+
+        cash = initial
+        positions: Dict[int, Dict] = {}  # column -> open position, in open order
+        trades: List[Dict] = []
+        deltas = []  # (row, column, units, cash change)
+
+        def close_position(t: int, s: int, price: float, reason: str):
+            nonlocal cash
+            position = positions.pop(s)
+            del pm.positions[symbols[s]]
+            proceeds = position['amount'] * price
+            pnl = proceeds - (position['amount'] * position['entry_price'])
+            cash += proceeds
+            pm.cash_balance = cash
+            deltas.append((t, s, -position['amount'], proceeds))
+            trades.append({'symbol': symbols[s], 'side': SELL, 'index': t, 'timestamp': index[t],
+                           'price': price, 'amount': position['amount'], 'pnl': pnl, 'reason': reason})
+
+        def open_position(t: int, s: int, price: float):
+            nonlocal cash
+            symbol = symbols[s]
+            if not pm.can_open_position(symbol):
+                return
+            if self.max_positions is not None and len(positions) >= self.max_positions:
+                return
+
+            # Open positions are marked to this candle before sizing
+            for k in positions:
+                pm.positions[symbols[k]].current_price = marks[t, k]
+            amount = pm.get_position_size(symbol, price)
+            if amount <= 0:
+                return
+            cost = amount * price
+            if cost > cash:
+                return
+
+            stop = pm.calculate_dynamic_stop_loss(symbol, price)
+            target = price * (1 + pm.take_profit_pct)
+            column = columns[s]
+            exit_row = _first_hit(lambda a, b: (column[a:b] <= stop) | (column[a:b] >= target),
+                                  t + 1, n, self.window)
+            exit_kind = None
+            if exit_row < n:
+                exit_kind = STOP_LOSS if column[exit_row] <= stop else TAKE_PROFIT
+
+            positions[s] = {'amount': amount, 'entry_price': price, 'exit_row': exit_row, 'exit_kind': exit_kind}
+            pm.positions[symbol] = self._position_type(symbol, amount, price, index[t], stop, target, price)
+            cash -= cost
+            pm.cash_balance = cash
+            deltas.append((t, s, amount, -cost))
+            trades.append({'symbol': symbols[s], 'side': BUY, 'index': t, 'timestamp': index[t],
+                           'price': price, 'amount': amount, 'pnl': 0.0, 'reason': 'SIGNAL'})
+
+        k = 0
+        while True:
+            t_edge = edge_rows[k] if k < len(edge_rows) else n
+            t_exit = min((p['exit_row'] for p in positions.values()), default=n)
+            t = min(t_edge, t_exit)
+            if t >= n:
+                break
+
+            if t_exit == t:
+                for kind in (STOP_LOSS, TAKE_PROFIT):
+                    for s in [s for s, p in positions.items() if p['exit_row'] == t and p['exit_kind'] == kind]:
+                        close_position(t, s, close[t, s], kind)
+
+            if t_edge == t:
+                for s in np.flatnonzero(buys[t] | sells[t]).tolist():
+                    if buys[t, s]:
+                        open_position(t, s, close[t, s])
+                    elif s in positions:
+                        close_position(t, s, close[t, s], 'SIGNAL')
+                k += 1
+
+        # Piecewise-constant holdings and cash from the trade deltas
+        holdings = np.zeros((n, m))
+        cash_path = np.zeros(n)
+        if deltas:
+            rows, cols, units, flows = (np.array(values) for values in zip(*deltas))
+            np.add.at(holdings, (rows.astype(int), cols.astype(int)), units)
+            np.add.at(cash_path, rows.astype(int), flows)
+        holdings = np.cumsum(holdings, axis=0)
+        cash_path = initial + np.cumsum(cash_path)
+
+        position_values = holdings * marks
+        equity = cash_path + position_values.sum(axis=1)
+        exposure = np.divide(position_values.sum(axis=1), equity, out=np.zeros(n), where=equity > 0)
+
+        attribution = self._attribution(symbols, trades, positions, marks, position_values, equity, initial)
+        return PortfolioBacktestResult(index, symbols, equity, cash_path, holdings, exposure,
+                                       trades, attribution, initial)
+
+    def run_frames(self, frames: Dict[str, pd.DataFrame], strategy) -> PortfolioBacktestResult:
+        """
+        Generate signals per symbol and replay them on aligned candles
+
+        Args:
+            frames: Symbol -> OHLCV candles indexed by timestamp (columns
+                in the form the strategy expects)
+            strategy: Object with generate_signal_frame(df, symbol=...)
+
+        Returns:
+            PortfolioBacktestResult on the union of all candle timestamps
+        """
+        symbols = list(frames)
+        index = frames[symbols[0]].index
+        for symbol in symbols[1:]:
+            index = index.union(frames[symbol].index)
+
+        close = np.full((len(index), len(symbols)), np.nan)
+        signal = np.zeros((len(index), len(symbols)))
+        for k, symbol in enumerate(symbols):
+            df = frames[symbol]
+            rows = index.get_indexer(df.index)
+            price = df['close'] if 'close' in df.columns else df['close_price']
+            close[rows, k] = price.to_numpy(dtype=float)
+            signal[rows, k] = strategy.generate_signal_frame(df, symbol=symbol).signal
+
+        return self.run(close, signal, symbols, index)
+
+    @staticmethod
+    def _attribution(symbols: List[str], trades: List[Dict], positions: Dict[int, Dict],
+                     marks: np.ndarray, position_values: np.ndarray, equity: np.ndarray,
+                     initial: float) -> pd.DataFrame:
+        rows = []
+        for s, symbol in enumerate(symbols):
+            exits = [trade for trade in trades if trade['symbol'] == symbol and trade['side'] == SELL]
+            realized = sum(trade['pnl'] for trade in exits)
+            unrealized = 0.0
+            if s in positions and len(marks):
+                unrealized = positions[s]['amount'] * (marks[-1, s] - positions[s]['entry_price'])
+            wins = sum(trade['pnl'] > 0 for trade in exits)
+
+            rows.append({
+                'symbol': symbol,
+                'trades': len(exits),
+                'win_rate': wins / len(exits) * 100 if exits else 0.0,
+                'stop_losses': sum(trade['reason'] == STOP_LOSS for trade in exits),
+                'take_profits': sum(trade['reason'] == TAKE_PROFIT for trade in exits),
+                'realized_pnl': realized,
+                'unrealized_pnl': unrealized,
+                'contribution_pct': (realized + unrealized) / initial * 100,
+                'avg_exposure_pct': float(np.mean(position_values[:, s] / equity) * 100) if len(equity) else 0.0
+            })
+        return pd.DataFrame(rows)
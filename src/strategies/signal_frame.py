@@ -0,0 +1,249 @@
+"""
+Columnar Signal Container
+One signal shape for every strategy: NumPy arrays aligned to the candle index
+"""
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Week2V2 record actions -> signal values (partial exit sells half the position)
+RECORD_SIGNALS = {'BUY': 1.0, 'SELL': -1.0, 'SELL_PARTIAL': -0.5}
+
+# Output columns that map onto SignalFrame fields rather than extras
+_FIELD_ALIASES = {
+    'signal': 'signal',
+    'stop_loss': 'stop_loss',
+    'take_profit': 'take_profit',
+    'signal_strength': 'strength',
+    'strength': 'strength',
+}
+
+
+@dataclass
+class SignalFrame:
+    """
+    Signals for a window of candles as parallel float64 arrays
+
+    signal: +1.0 buy, -1.0 sell, fractional values for weaker / partial
+        signals, 0.0 hold
+    stop_loss / take_profit: Price levels, NaN where the strategy sets none
+    strength: 0.0-1.0 confidence (defaults to |signal|)
+    price: Execution price for the signal, NaN means the candle close
+    extras: Further per-candle columns (indicators, zone names, exit reasons)
+    """
+    index: pd.Index
+    signal: np.ndarray
+    stop_loss: np.ndarray
+    take_profit: np.ndarray
+    strength: np.ndarray
+    price: np.ndarray
+    extras: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __post_init__(self):
+        n = len(self.index)
+        for name in ('signal', 'stop_loss', 'take_profit', 'strength', 'price'):
+            values = np.asarray(getattr(self, name), dtype=float)
+            if values.shape != (n,):
+                raise ValueError(f"SignalFrame.{name} has shape {values.shape}, expected ({n},)")
+            setattr(self, name, values)
+
+        for name, values in self.extras.items():
+            if len(values) != n:
+                raise ValueError(f"SignalFrame extra '{name}' has length {len(values)}, expected {n}")
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @classmethod
+    def from_arrays(cls, index: Sequence, signal: Sequence,
+                    stop_loss: Optional[Sequence] = None, take_profit: Optional[Sequence] = None,
+                    strength: Optional[Sequence] = None, price: Optional[Sequence] = None,
+                    **extras) -> 'SignalFrame':
+        """Build from arrays; missing levels/prices are NaN, strength defaults to |signal|"""
+        index = pd.Index(index)
+        signal = np.asarray(signal, dtype=float)
+        missing = np.full(len(index), np.nan)
+
+        return cls(
+            index=index,
+            signal=signal,
+            stop_loss=missing.copy() if stop_loss is None else stop_loss,
+            take_profit=missing.copy() if take_profit is None else take_profit,
+            strength=np.abs(signal) if strength is None else strength,
+            price=missing.copy() if price is None else price,
+            extras={name: np.asarray(values) for name, values in extras.items()}
+        )
+
+    @classmethod
+    def empty(cls, index: Sequence = ()) -> 'SignalFrame':
+        """All-hold frame over an index"""
+        return cls.from_arrays(index, np.zeros(len(index)))
+
+    @classmethod
+    def from_series(cls, signals: pd.Series) -> 'SignalFrame':
+        """Adapter for strategies returning a Series of signal values"""
+        return cls.from_arrays(signals.index, signals.to_numpy(dtype=float, na_value=0.0))
+
+    @classmethod
+    def from_frame(cls, signals: pd.DataFrame, extras: Optional[Sequence[str]] = None) -> 'SignalFrame':
+        """
+        Adapter for strategies returning a DataFrame with a 'signal' column
+
+        Args:
+            signals: Frame with 'signal' and optionally stop_loss, take_profit,
+                signal_strength / strength columns
+            extras: Further columns to keep (defaults to every other numeric column)
+
+        Non-positive stop / target levels mean "not set" and become NaN.
+        """
+        mapped = {field_name: signals[column].to_numpy(dtype=float)
+                  for column, field_name in _FIELD_ALIASES.items() if column in signals.columns}
+
+        if 'signal' not in mapped:
+            raise KeyError(f"Expected a 'signal' column. Found: {signals.columns.tolist()}")
+
+        for level in ('stop_loss', 'take_profit'):
+            if level in mapped:
+                mapped[level] = np.where(mapped[level] > 0, mapped[level], np.nan)
+
+        if extras is None:
+            extras = [
+                column for column in signals.columns
+                if column not in _FIELD_ALIASES and pd.api.types.is_numeric_dtype(signals[column])
+            ]
+
+        return cls.from_arrays(
+            signals.index,
+            mapped['signal'],
+            stop_loss=mapped.get('stop_loss'),
+            take_profit=mapped.get('take_profit'),
+            strength=mapped.get('strength'),
+            **{column: signals[column].to_numpy() for column in extras}
+        )
+
+    @classmethod
+    def from_records(cls, records: List[Dict], index: Sequence,
+                     timestamps: Optional[Sequence] = None) -> 'SignalFrame':
+        """
+        Adapter for strategies returning a list of signal dicts (event records)
+
+        Args:
+            records: Dicts with 'timestamp', 'signal' ('BUY' / 'SELL' /
+                'SELL_PARTIAL') and 'price', optionally stop_loss, tp1, tp2,
+                exit_reason
+            index: Candle index of the evaluated data
+            timestamps: Candle timestamps used to place records (defaults to index)
+
+        Returns:
+            SignalFrame with take_profit = tp1 and tp2 / exit_reason as extras
+        """
+        index = pd.Index(index)
+        n = len(index)
+        frame = cls.empty(index)
+        tp2 = np.full(n, np.nan)
+        exit_reason = np.full(n, '', dtype=object)
+
+        if not records:
+            return cls.from_arrays(index, frame.signal, tp2=tp2, exit_reason=exit_reason)
+
+        lookup = pd.Index(timestamps if timestamps is not None else index)
+        rows = lookup.get_indexer([record['timestamp'] for record in records])
+        if (rows < 0).any():
+            raise KeyError("Signal record timestamp not found in the candle index")
+
+        for row, record in zip(rows, records):
+            frame.signal[row] = RECORD_SIGNALS[record['signal']]
+            frame.price[row] = record.get('price', np.nan)
+            frame.stop_loss[row] = record.get('stop_loss', np.nan)
+            frame.take_profit[row] = record.get('tp1', np.nan)
+            tp2[row] = record.get('tp2', np.nan)
+            exit_reason[row] = record.get('exit_reason', '')
+
+        return cls.from_arrays(
+            index, frame.signal, frame.stop_loss, frame.take_profit,
+            price=frame.price, tp2=tp2, exit_reason=exit_reason
+        )
+
+    def events(self) -> np.ndarray:
+        """Positions of non-hold signals"""
+        return np.flatnonzero(self.signal != 0)
+
+    def latest(self) -> Dict[str, Any]:
+        """Values for the most recent candle (NaN levels become None)"""
+        if len(self) == 0:
+            raise IndexError("SignalFrame is empty")
+
+        def scalar(value):
+            if isinstance(value, (float, np.floating)):
+                return None if np.isnan(value) else float(value)
+            return value.item() if isinstance(value, np.generic) else value
+
+        row = {
+            'timestamp': self.index[-1],
+            'signal': float(self.signal[-1]),
+            'stop_loss': scalar(self.stop_loss[-1]),
+            'take_profit': scalar(self.take_profit[-1]),
+            'strength': float(self.strength[-1]),
+            'price': scalar(self.price[-1]),
+        }
+        row.update({name: scalar(values[-1]) for name, values in self.extras.items()})
+        return row
+
+    def tail(self, n: int) -> 'SignalFrame':
+        """Last n candles"""
+        start = max(len(self) - n, 0)
+        return SignalFrame(
+            index=self.index[start:],
+            signal=self.signal[start:],
+            stop_loss=self.stop_loss[start:],
+            take_profit=self.take_profit[start:],
+            strength=self.strength[start:],
+            price=self.price[start:],
+            extras={name: values[start:] for name, values in self.extras.items()}
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame view for reporting"""
+        columns = {
+            'signal': self.signal,
+            'stop_loss': self.stop_loss,
+            'take_profit': self.take_profit,
+            'strength': self.strength,
+            'price': self.price,
+        }
+        columns.update(self.extras)
+        return pd.DataFrame(columns, index=self.index)
+
+
+def as_signal_frame(signals: Any, index: Optional[Sequence] = None,
+                    timestamps: Optional[Sequence] = None) -> SignalFrame:
+    """
+    Convert any existing strategy output into a SignalFrame
+
+    Args:
+        signals: SignalFrame, DataFrame, Series, list of signal dicts or a scalar
+        index: Candle index of the evaluated data (needed for records / scalars)
+        timestamps: Candle timestamps used to place records
+
+    Returns:
+        SignalFrame
+    """
+    if isinstance(signals, SignalFrame):
+        return signals
+    if isinstance(signals, pd.DataFrame):
+        return SignalFrame.from_frame(signals)
+    if isinstance(signals, pd.Series):
+        return SignalFrame.from_series(signals)
+    if isinstance(signals, list):
+        if index is None:
+            raise ValueError("A candle index is required to place signal records")
+        return SignalFrame.from_records(signals, index, timestamps)
+
+    # Scalar: a single signal for the latest candle
+    index = pd.Index(index[-1:] if index is not None and len(index) else [0])
+    value = 0.0 if signals is None else float(signals)
+    return SignalFrame.from_arrays(index, [value])
@@ -4,14 +4,72 @@ Run multiple strategies side-by-side on same data and compare results
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List
-from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta
 import sys
 import os
+import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from strategies.optimized_strategy_week1_refined import Week1RefinedStrategy
 from strategies.pivot_zone_strategy import PivotZoneStrategy
+from strategies.parallel_sweep import SharedArrays, parallel_map
+from strategies.monte_carlo import analyze_result
+from data.backtest_data import CandleArrays, get_backtest_data_provider
+
+# Columns of the run_batch results table
+BATCH_COLUMNS = [
+    'symbol', 'strategy', 'lookback_days', 'candles', 'first_candle', 'last_candle',
+    'total_trades', 'win_rate', 'total_return', 'max_drawdown', 'final_value',
+    'avg_win', 'avg_loss', 'seconds', 'error'
+]
+
+
+def run_comparison_cell(arrays: Dict[str, np.ndarray], meta: Dict[str, Any], cell: Tuple[str, str, int]) -> Dict:
+    """
+    Backtest one (symbol, strategy, lookback_days) cell (runs in a worker)
+
+    Returns:
+        Row with BATCH_COLUMNS; 'error' is None on success
+    """
+    symbol, name, lookback_days = cell
+    started = time.perf_counter()
+    row = dict.fromkeys(BATCH_COLUMNS)
+    row.update(symbol=symbol, strategy=name, lookback_days=lookback_days, candles=0)
+
+    candles = CandleArrays(symbol, '5m', *(arrays[f'{symbol}|{column}'] for column in
+                                          ('timestamp', 'open', 'high', 'low', 'close', 'volume')))
+    candles = candles.between(meta['end_ns'] - lookback_days * 86_400 * 10**9, meta['end_ns'])
+
+    if len(candles) == 0:
+        row['error'] = f'No data found for {symbol}'
+    else:
+        data = candles.to_frame(style='both', index=False)
+        row.update(candles=len(data), first_candle=data['timestamp'].iloc[0], last_candle=data['timestamp'].iloc[-1])
+        try:
+            result = StrategyComparison._normalize_result(
+                meta['strategies'][name].backtest(data=data, initial_capital=meta['initial_capital'])
+            )
+            if 'error' in result:
+                row['error'] = result['error']
+            else:
+                row.update({column: result[column] for column in (
+                    'total_trades', 'win_rate', 'total_return', 'max_drawdown', 'final_value', 'avg_win', 'avg_loss'
+                )})
+        except Exception as e:
+            row['error'] = str(e)
+
+    row['seconds'] = time.perf_counter() - started
+    return row
+
+
+def write_table(table: pd.DataFrame, path: str):
+    """Write a results table as Parquet (.parquet, needs pyarrow or fastparquet) or CSV"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if path.endswith('.parquet'):
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
 
 
 class StrategyComparison:
@@ -49,42 +107,17 @@ class StrategyComparison:
         print("-" * 100)
         print()
         
-        # Get historical data once for all strategies
-        from data.database import get_db
-        from data.models import MarketData
-        
-        db = next(get_db())
-        end_date = datetime.now()
-        start_date = end_date - pd.Timedelta(days=lookback_days)
+        # Get historical data once for all strategies, with both column
+        # styles (Week1Refined expects the _price suffix)
+        from data.backtest_data import get_backtest_data_provider
         
-        records = db.query(MarketData).filter(
-            MarketData.symbol == symbol,
-            MarketData.timestamp >= start_date,
-            MarketData.timestamp <= end_date
-        ).order_by(MarketData.timestamp).all()
+        data = get_backtest_data_provider().get_frame(symbol, lookback_days=lookback_days,
+                                                      style='both', index=False)
         
-        if not records:
+        if data is None:
             print(f"❌ No data found for {symbol}")
             return {}
         
-        # Convert to DataFrame
-        data = pd.DataFrame([{
-            'timestamp': r.timestamp,
-            'open': float(r.open_price),
-            'high': float(r.high_price),
-            'low': float(r.low_price),
-            'close': float(r.close_price),
-            'volume': float(r.volume)
-        } for r in records])
-        
-        data['timestamp'] = pd.to_datetime(data['timestamp'])
-        
-        # Add _price suffix for strategies that expect it (Week1Refined)
-        data['open_price'] = data['open']
-        data['high_price'] = data['high']
-        data['low_price'] = data['low']
-        data['close_price'] = data['close']
-        
         print(f"📊 Loaded {len(data)} candles from {data['timestamp'].min()} to {data['timestamp'].max()}")
         print()
         
@@ -95,31 +128,10 @@ class StrategyComparison:
             print("-" * 100)
             
             try:
-                # Check which backtest interface the strategy uses
-                import inspect
-                sig = inspect.signature(strategy.backtest)
-                params = sig.parameters
-                
-                if 'symbol' in params:
-                    # New interface: strategy handles data loading
-                    result = strategy.backtest(symbol=symbol, lookback_days=lookback_days, initial_capital=initial_capital)
-                else:
-                    # Old interface: pass DataFrame directly
-                    result = strategy.backtest(data=data, initial_capital=initial_capital)
-                
-                # Normalize result format
-                if 'total_trades' not in result:
-                    # Week1Refined format - calculate missing metrics
-                    sell_trades = [t for t in result.get('trades', []) if t.get('type') == 'SELL']
-                    winning_trades = [t for t in sell_trades if t.get('return', 0) > 0]
-                    losing_trades = [t for t in sell_trades if t.get('return', 0) <= 0]
-                    
-                    result['total_trades'] = len(sell_trades)
-                    result['winning_trades'] = len(winning_trades)
-                    result['losing_trades'] = len(losing_trades)
-                    result['avg_win'] = np.mean([t.get('return', 0) for t in winning_trades]) if winning_trades else 0
-                    result['avg_loss'] = np.mean([t.get('return', 0) for t in losing_trades]) if losing_trades else 0
+                # Every strategy backtests the same preloaded candles
+                result = strategy.backtest(data=data, initial_capital=initial_capital)
                 
+                result = self._normalize_result(result)
                 results[name] = result
                 
                 # Display results
@@ -284,12 +296,95 @@ class StrategyComparison:
         
         return results
     
-    def detailed_trade_analysis(self, results: Dict):
+    def run_batch(self, symbols: Sequence[str], strategies: Optional[Sequence[str]] = None,
+                  lookback_days: Sequence[int] = (90,), initial_capital: float = 10000,
+                  workers: Optional[int] = None, output: Optional[str] = None) -> pd.DataFrame:
+        """
+        Run every (symbol, strategy, lookback) cell concurrently
+        
+        Candles are loaded once per symbol (for the longest lookback) and
+        shared with the worker processes; each cell backtests its window and
+        reports its own timing.
+        
+        Args:
+            symbols: Trading pair symbols
+            strategies: Names from self.strategies (default: all)
+            lookback_days: Windows to test, each ending at load time
+            initial_capital: Starting capital for each cell
+            workers: Worker processes (defaults to one per core)
+            output: Write the table to this .csv or .parquet path
+        
+        Returns:
+            One row per cell (see BATCH_COLUMNS), in input order
+        """
+        strategies = list(strategies or self.strategies)
+        unknown = [name for name in strategies if name not in self.strategies]
+        if unknown:
+            raise ValueError(f"Unknown strategies: {unknown}")
+        
+        provider = get_backtest_data_provider()
+        end = datetime.now()
+        arrays = {}
+        for symbol in symbols:
+            candles = provider.get(symbol, end - timedelta(days=max(lookback_days)), end)
+            for column in ('timestamp', 'open', 'high', 'low', 'close', 'volume'):
+                arrays[f'{symbol}|{column}'] = getattr(candles, column)
+        
+        meta = {
+            'strategies': {name: self.strategies[name] for name in strategies},
+            'initial_capital': initial_capital,
+            'end_ns': pd.Timestamp(end.astimezone()).value
+        }
+        cells = [(symbol, name, days) for symbol in symbols for name in strategies for days in lookback_days]
+        
+        print(f"🧪 {len(cells)} cells: {len(symbols)} symbols x {len(strategies)} strategies x "
+              f"{len(lookback_days)} windows")
+        
+        rows = []
+        started = time.perf_counter()
+        with SharedArrays(arrays, meta) as shared:
+            for i, row in enumerate(parallel_map(run_comparison_cell, cells, shared, workers), 1):
+                status = f"❌ {row['error']}" if row['error'] else \
+                    f"Return {row['total_return']:.2f}% | Win Rate {row['win_rate']:.1f}% | Trades {row['total_trades']}"
+                print(f"[{i}/{len(cells)}] {row['symbol']} {row['strategy']} {row['lookback_days']}d "
+                      f"({row['seconds']:.2f}s) -> {status}")
+                rows.append(row)
+        
+        order = {cell: k for k, cell in enumerate(cells)}
+        rows.sort(key=lambda row: order[(row['symbol'], row['strategy'], row['lookback_days'])])
+        table = pd.DataFrame(rows, columns=BATCH_COLUMNS)
+        print(f"⏱️  {len(cells)} cells in {time.perf_counter() - started:.1f}s")
+        
+        if output:
+            write_table(table, output)
+            print(f"💾 Results saved to {output}")
+        
+        return table
+    
+    @staticmethod
+    def _normalize_result(result: Dict) -> Dict:
+        """Add the trade statistics Week1Refined results lack"""
+        if 'total_trades' not in result:
+            sell_trades = [t for t in result.get('trades', []) if t.get('type') == 'SELL']
+            winning_trades = [t for t in sell_trades if t.get('return', 0) > 0]
+            losing_trades = [t for t in sell_trades if t.get('return', 0) <= 0]
+            
+            result['total_trades'] = len(sell_trades)
+            result['winning_trades'] = len(winning_trades)
+            result['losing_trades'] = len(losing_trades)
+            result['avg_win'] = np.mean([t.get('return', 0) for t in winning_trades]) if winning_trades else 0
+            result['avg_loss'] = np.mean([t.get('return', 0) for t in losing_trades]) if losing_trades else 0
+        
+        return result
+    
+    def detailed_trade_analysis(self, results: Dict, monte_carlo_paths: int = 5000):
         """
         Show detailed trade-by-trade comparison
         
         Args:
             results: Results dict from run_comparison()
+            monte_carlo_paths: Bootstrapped trade sequences per strategy
+                for the robustness bands (0 skips the Monte Carlo analysis)
         """
         print()
         print("=" * 100)
@@ -339,14 +434,44 @@ class StrategyComparison:
             if len(trades) > 10:
                 print(f"  ... ({len(trades) - 10} more trades)")
                 print()
+            
+            if monte_carlo_paths:
+                mc = analyze_result(result, n_paths=monte_carlo_paths)
+                if 'error' not in mc:
+                    returns, drawdowns = mc['total_return'], mc['max_drawdown']
+                    print(f"  🎲 Monte Carlo ({mc['paths']:,} bootstrapped paths of {mc['trades']} trades, "
+                          f"{mc['paths_per_second']:,.0f} paths/s):")
+                    print(f"    Return:  p5 {returns[5]:.2f}% | p50 {returns[50]:.2f}% | p95 {returns[95]:.2f}%")
+                    print(f"    Max DD:  p5 {drawdowns[5]:.2f}% | p50 {drawdowns[50]:.2f}% | p95 {drawdowns[95]:.2f}%")
+                    print(f"    Probability of loss: {mc['probability_of_loss']:.1f}% | "
+                          f"Probability of ruin (-{mc['ruin_drawdown'] * 100:.0f}%): {mc['probability_of_ruin']:.1f}%")
+                    print()
         
         print("=" * 100)
 
 
 def main():
     """Run strategy comparison"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Compare trading strategies")
+    parser.add_argument('--batch', action='store_true',
+                        help='Run symbols x strategies x lookbacks in parallel and write a results table')
+    parser.add_argument('--symbols', nargs='+', default=['BTC/USDT'])
+    parser.add_argument('--strategies', nargs='+', default=None)
+    parser.add_argument('--lookbacks', type=int, nargs='+', default=[90])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default='logs/strategy_comparison.csv',
+                        help='.csv or .parquet path for --batch')
+    args = parser.parse_args()
+    
     comparison = StrategyComparison()
     
+    if args.batch:
+        comparison.run_batch(args.symbols, args.strategies, args.lookbacks,
+                             workers=args.workers, output=args.output)
+        return
+    
     # Run comparison on 90 days
     results = comparison.run_comparison(
         symbol='BTC/USDT',
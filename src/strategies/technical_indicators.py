@@ -3,7 +3,8 @@ Technical Analysis Indicators for Trading Strategies
 """
 import pandas as pd
 import numpy as np
-from typing import Optional, Tuple, Dict, Any
+import re
+from typing import Optional, Tuple, Dict, Any, Iterable
 import logging
 
 logger = logging.getLogger(__name__)
@@ -143,20 +144,24 @@ class TechnicalIndicators:
         If Close > Previous Close: OBV = Previous OBV + Volume
         If Close < Previous Close: OBV = Previous OBV - Volume
         If Close = Previous Close: OBV = Previous OBV
+        
+        Vectorized as a cumulative sum of signed volume.
         """
-        price_change = close.diff()
-        obv = pd.Series(index=close.index, dtype=float)
-        obv.iloc[0] = volume.iloc[0]
-        
-        for i in range(1, len(close)):
-            if price_change.iloc[i] > 0:
-                obv.iloc[i] = obv.iloc[i-1] + volume.iloc[i]
-            elif price_change.iloc[i] < 0:
-                obv.iloc[i] = obv.iloc[i-1] - volume.iloc[i]
-            else:
-                obv.iloc[i] = obv.iloc[i-1]
+        close_values = close.to_numpy(dtype=float)
+        volume_values = volume.to_numpy(dtype=float)
+        
+        if len(close_values) == 0:
+            return pd.Series(index=close.index, dtype=float)
+        
+        price_change = np.diff(close_values)
+        signed_volume = np.empty_like(volume_values)
+        signed_volume[0] = volume_values[0]
+        signed_volume[1:] = np.where(
+            price_change > 0, volume_values[1:],
+            np.where(price_change < 0, -volume_values[1:], 0.0)
+        )
         
-        return obv
+        return pd.Series(np.cumsum(signed_volume), index=close.index)
     
     @staticmethod
     def vwap(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series) -> pd.Series:
@@ -173,6 +178,33 @@ class TechnicalIndicators:
         vwap = cumulative_volume_price / cumulative_volume
         return vwap
     
+    @staticmethod
+    def rolling_mean_absolute_deviation(data: pd.Series, window: int, chunk_size: int = 65536) -> pd.Series:
+        """
+        Calculate rolling Mean Absolute Deviation
+        
+        MAD = mean(|x - mean(x)|) over each window
+        
+        Evaluated on strided window views in fixed-size chunks (no Python
+        callback per window); matches rolling(window).apply(...) bit for bit.
+        """
+        values = data.to_numpy(dtype=float)
+        result = np.full(len(values), np.nan)
+        
+        if window < 1 or len(values) < window:
+            return pd.Series(result, index=data.index, name=data.name)
+        
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        
+        for start in range(0, len(windows), chunk_size):
+            chunk = windows[start:start + chunk_size]
+            means = chunk.mean(axis=1)
+            result[start + window - 1:start + window - 1 + len(chunk)] = (
+                np.abs(chunk - means[:, None]).mean(axis=1)
+            )
+        
+        return pd.Series(result, index=data.index, name=data.name)
+    
     @staticmethod
     def commodity_channel_index(high: pd.Series, low: pd.Series, close: pd.Series, window: int = 20) -> pd.Series:
         """
@@ -184,9 +216,7 @@ class TechnicalIndicators:
         sma_tp = typical_price.rolling(window=window).mean()
         
         # Calculate mean deviation
-        mean_deviation = typical_price.rolling(window=window).apply(
-            lambda x: np.mean(np.abs(x - x.mean())), raw=True
-        )
+        mean_deviation = TechnicalIndicators.rolling_mean_absolute_deviation(typical_price, window)
         
         cci = (typical_price - sma_tp) / (0.015 * mean_deviation)
         return cci
@@ -197,43 +227,50 @@ class TechnicalIndicators:
         """
         Calculate Parabolic SAR (Stop and Reverse)
         
-        Complex indicator that provides potential reversal points
+        Complex indicator that provides potential reversal points.
+        The recursion runs over plain float buffers instead of Series.iloc.
         """
-        length = len(high)
-        psar = pd.Series(index=high.index, dtype=float)
+        high_values = high.to_numpy(dtype=float).tolist()
+        low_values = low.to_numpy(dtype=float).tolist()
+        length = len(high_values)
+        
+        if length == 0:
+            return pd.Series(index=high.index, dtype=float)
+        
+        psar = [0.0] * length
         uptrend = True
         af = af_start
-        ep = high.iloc[0] if uptrend else low.iloc[0]
+        ep = high_values[0]
         
-        psar.iloc[0] = low.iloc[0]
+        psar[0] = low_values[0]
+        prev = psar[0]
         
         for i in range(1, length):
+            current = prev + af * (ep - prev)
+            
             if uptrend:
-                psar.iloc[i] = psar.iloc[i-1] + af * (ep - psar.iloc[i-1])
-                
-                if low.iloc[i] <= psar.iloc[i]:
+                if low_values[i] <= current:
                     uptrend = False
-                    psar.iloc[i] = ep
-                    ep = low.iloc[i]
+                    current = ep
+                    ep = low_values[i]
                     af = af_start
-                else:
-                    if high.iloc[i] > ep:
-                        ep = high.iloc[i]
-                        af = min(af + af_increment, af_max)
+                elif high_values[i] > ep:
+                    ep = high_values[i]
+                    af = min(af + af_increment, af_max)
             else:
-                psar.iloc[i] = psar.iloc[i-1] + af * (ep - psar.iloc[i-1])
-                
-                if high.iloc[i] >= psar.iloc[i]:
+                if high_values[i] >= current:
                     uptrend = True
-                    psar.iloc[i] = ep
-                    ep = high.iloc[i]
+                    current = ep
+                    ep = high_values[i]
                     af = af_start
-                else:
-                    if low.iloc[i] < ep:
-                        ep = low.iloc[i]
-                        af = min(af + af_increment, af_max)
+                elif low_values[i] < ep:
+                    ep = low_values[i]
+                    af = min(af + af_increment, af_max)
+            
+            psar[i] = current
+            prev = current
         
-        return psar
+        return pd.Series(psar, index=high.index, dtype=float)
     
     @classmethod
     def calculate_all_indicators(cls, df: pd.DataFrame) -> pd.DataFrame:
@@ -309,6 +346,151 @@ class TechnicalIndicators:
         except Exception as e:
             logger.error(f"Error calculating technical indicators: {e}")
             raise
+    
+    @classmethod
+    def calculate_indicators(cls, df: pd.DataFrame, columns: Iterable[str],
+                             include_inputs: bool = True) -> pd.DataFrame:
+        """
+        Calculate only the requested indicator columns
+        
+        Column names follow calculate_all_indicators; sma_<n>, ema_<n> and
+        rsi_<n> accept any window. Shared intermediates (typical price, true
+        range, EMAs, rolling std/min/max) are computed once and only the
+        subgraph needed for the requested columns is evaluated. Values are
+        identical to calculate_all_indicators.
+        
+        Args:
+            df: DataFrame with open_price, high_price, low_price, close_price, volume
+            columns: Indicator columns to compute
+            include_inputs: Prepend the input columns to the result
+        
+        Returns:
+            DataFrame with the requested columns in the given order
+        """
+        columns = list(dict.fromkeys(columns))
+        resolver = _IndicatorResolver(cls, df)
+        
+        # Written column by column into a single preallocated block
+        block = np.empty((len(df), len(columns)))
+        for j, column in enumerate(columns):
+            block[:, j] = resolver.get(column)
+        
+        result = pd.DataFrame(block, index=df.index, columns=columns)
+        if include_inputs:
+            inputs = df.drop(columns=[c for c in columns if c in df.columns])
+            result = pd.concat([inputs, result], axis=1)
+        
+        logger.debug(f"Calculated {len(columns)} selected technical indicators")
+        return result
+
+
+class _IndicatorResolver:
+    """Memoized dependency graph behind TechnicalIndicators.calculate_indicators"""
+    
+    _PARAMETRIC = re.compile(r'^(sma|ema|rsi)_(\d+)$')
+    
+    def __init__(self, indicators, df: pd.DataFrame):
+        self.ti = indicators
+        self.df = df
+        self.nodes: Dict[str, Any] = {}
+    
+    def get(self, name: str) -> Any:
+        """Return a node, computing it (and its dependencies) on first use"""
+        if name not in self.nodes:
+            self.nodes[name] = self._compute(name)
+        return self.nodes[name]
+    
+    def _compute(self, name: str) -> Any:
+        ti = self.ti
+        get = self.get
+        
+        inputs = {'close': 'close_price', 'high': 'high_price', 'low': 'low_price', 'volume': 'volume'}
+        if name in inputs:
+            return self.df[inputs[name]]
+        
+        match = self._PARAMETRIC.match(name)
+        if match:
+            kind, window = match.group(1), int(match.group(2))
+            if kind == 'sma':
+                return ti.simple_moving_average(get('close'), window)
+            if kind == 'ema':
+                return ti.exponential_moving_average(get('close'), window)
+            return ti.rsi(get('close'), window)
+        
+        if name == 'rsi':
+            return get('rsi_14')
+        
+        # MACD shares the 12/26 EMAs
+        if name == 'macd':
+            return get('ema_12') - get('ema_26')
+        if name == 'macd_signal':
+            return ti.exponential_moving_average(get('macd'), 9)
+        if name == 'macd_histogram':
+            return get('macd') - get('macd_signal')
+        
+        # Bollinger Bands share sma_20 and the rolling std with price_volatility
+        if name == 'std_20':
+            return get('close').rolling(20).std()
+        if name == 'bb_middle':
+            return get('sma_20')
+        if name == 'bb_upper':
+            return get('sma_20') + (get('std_20') * 2)
+        if name == 'bb_lower':
+            return get('sma_20') - (get('std_20') * 2)
+        if name == 'bb_width':
+            return (get('bb_upper') - get('bb_lower')) / get('bb_middle')
+        if name == 'bb_position':
+            return (get('close') - get('bb_lower')) / (get('bb_upper') - get('bb_lower'))
+        if name == 'price_volatility':
+            return get('std_20')
+        
+        # Stochastic and Williams %R share the 14-period range
+        if name == 'lowest_low_14':
+            return get('low').rolling(window=14).min()
+        if name == 'highest_high_14':
+            return get('high').rolling(window=14).max()
+        if name == 'stoch_k':
+            return ((get('close') - get('lowest_low_14')) /
+                    (get('highest_high_14') - get('lowest_low_14'))) * 100
+        if name == 'stoch_d':
+            return get('stoch_k').rolling(window=3).mean()
+        if name == 'williams_r':
+            return ((get('highest_high_14') - get('close')) /
+                    (get('highest_high_14') - get('lowest_low_14'))) * -100
+        
+        if name == 'true_range':
+            high, low, close = get('high'), get('low'), get('close')
+            return pd.concat([high - low, (high - close.shift(1)).abs(),
+                              (low - close.shift(1)).abs()], axis=1).max(axis=1)
+        if name == 'atr':
+            return get('true_range').rolling(window=14).mean()
+        
+        # VWAP and CCI share the typical price
+        if name == 'typical_price':
+            return (get('high') + get('low') + get('close')) / 3
+        if name == 'vwap':
+            return (get('typical_price') * get('volume')).cumsum() / get('volume').cumsum()
+        if name == 'cci':
+            typical_price = get('typical_price')
+            mean_deviation = ti.rolling_mean_absolute_deviation(typical_price, 20)
+            return (typical_price - typical_price.rolling(window=20).mean()) / (0.015 * mean_deviation)
+        
+        if name == 'obv':
+            return ti.on_balance_volume(get('close'), get('volume'))
+        if name == 'psar':
+            return ti.parabolic_sar(get('high'), get('low'))
+        
+        if name == 'volume_sma':
+            return ti.simple_moving_average(get('volume'), 20)
+        if name == 'volume_ratio':
+            return get('volume') / get('volume_sma')
+        
+        if name == 'price_change':
+            return get('close').pct_change()
+        if name == 'price_change_5d':
+            return get('close').pct_change(5)
+        
+        raise ValueError(f"Unknown indicator column: {name}")
 
 
 class SignalGenerator:
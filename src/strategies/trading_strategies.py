@@ -9,6 +9,8 @@ import logging
 from abc import ABC, abstractmethod
 
 from .technical_indicators import TechnicalIndicators, SignalGenerator
+from .signal_frame import SignalFrame
+from .backtest_core import run_target_positions, run_sized_positions, max_drawdown
 
 logger = logging.getLogger(__name__)
 
@@ -34,54 +36,65 @@ class BaseStrategy(ABC):
         """Calculate position size based on signal strength and risk management"""
         pass
     
+    def generate_signal_frame(self, data: pd.DataFrame, symbol: Optional[str] = None) -> SignalFrame:
+        """Signals as a SignalFrame"""
+        return SignalFrame.from_series(self.generate_signals(data))
+    
+    def position_sizes(self, signals: pd.Series, prices: np.ndarray, portfolio_value: float) -> Optional[np.ndarray]:
+        """
+        Target position fractions for every candle at once
+
+        Strategies whose sizing ignores the portfolio value override this with
+        the same rule as get_position_size applied to arrays. The default
+        returns None, so backtest calls get_position_size candle by candle
+        with the current portfolio value.
+        """
+        return None
+    
     def backtest(self, data: pd.DataFrame, initial_capital: float = 10000) -> Dict[str, Any]:
         """Run backtest on historical data"""
         signals = self.generate_signals(data)
         
-        cash = initial_capital
-        position = 0  # Number of shares/coins held
-        trades = []
-        portfolio_values = []
+        prices = data['close_price'].to_numpy(dtype=float)
+        aligned = signals.iloc[:len(prices)]
+        if len(aligned) < len(prices):
+            aligned = pd.concat([aligned, pd.Series(0.0, index=data.index[len(aligned):])])
         
-        for i, (timestamp, row) in enumerate(data.iterrows()):
-            current_price = row['close_price']
-            signal = signals.iloc[i] if i < len(signals) else 0
-            
-            # Current portfolio value
-            current_portfolio_value = cash + (position * current_price)
-            portfolio_values.append(current_portfolio_value)
-            
-            # Calculate target position size (as fraction of portfolio)
-            target_position_fraction = self.get_position_size(signal, current_price, current_portfolio_value)
-            target_position_value = target_position_fraction * current_portfolio_value
-            target_position_shares = target_position_value / current_price if current_price > 0 else 0
-            
-            # Execute trade if significant change
-            position_change = target_position_shares - position
-            
-            if abs(position_change * current_price) > current_portfolio_value * 0.01:  # 1% minimum trade size
-                trade_value = position_change * current_price
-                fee = abs(trade_value) * 0.001  # 0.1% trading fee
-                
-                # Check if we have enough cash for the trade
-                if trade_value <= cash + fee:
-                    # Execute the trade
-                    cash -= trade_value + fee
-                    position = target_position_shares
-                    
-                    trades.append({
-                        'timestamp': timestamp,
-                        'signal': signal,
-                        'price': current_price,
-                        'size': position_change,
-                        'position': position,
-                        'cash': cash,
-                        'portfolio_value': cash + (position * current_price)
-                    })
+        # Rebalance toward the target fraction; 1% minimum trade size, 0.1% fee
+        targets = self.position_sizes(aligned, prices, initial_capital)
+        if targets is not None:
+            result = run_target_positions(prices, targets, initial_capital=initial_capital,
+                                          fee_rate=0.001, min_trade_pct=0.01)
+        else:
+            signal_values = aligned.tolist()
+            result = run_sized_positions(
+                prices,
+                lambda i, price, value: self.get_position_size(signal_values[i], price, value),
+                initial_capital=initial_capital,
+                fee_rate=0.001,
+                min_trade_pct=0.01
+            )
+        
+        trades = [
+            {
+                'timestamp': data.index[i],
+                'signal': aligned.iloc[i],
+                'price': price,
+                'size': size,
+                'position': position,
+                'cash': cash,
+                'portfolio_value': cash + (position * price)
+            }
+            for i, price, size, position, cash in zip(
+                result.trades['index'].tolist(), result.trades['price'].tolist(),
+                result.trades['size'].tolist(), result.trades['position'].tolist(),
+                result.trades['cash'].tolist()
+            )
+        ]
         
         # Final portfolio value
-        final_price = data['close_price'].iloc[-1]
-        final_portfolio_value = cash + (position * final_price)
+        final_portfolio_value = result.final_value
+        portfolio_values = result.equity.tolist()
         portfolio_values[-1] = final_portfolio_value
         
         # Calculate performance metrics
@@ -125,18 +138,7 @@ class BaseStrategy(ABC):
     
     def _calculate_max_drawdown(self, portfolio_values: List[float]) -> float:
         """Calculate maximum drawdown"""
-        peak = portfolio_values[0]
-        max_dd = 0
-        
-        for value in portfolio_values:
-            if value > peak:
-                peak = value
-            
-            drawdown = (peak - value) / peak
-            if drawdown > max_dd:
-                max_dd = drawdown
-        
-        return max_dd
+        return max_drawdown(portfolio_values)
 
 
 class MomentumStrategy(BaseStrategy):
@@ -179,8 +181,11 @@ class MomentumStrategy(BaseStrategy):
         
         Signal strength: -1 (strong sell) to +1 (strong buy)
         """
-        # Calculate all technical indicators
-        data_with_indicators = TechnicalIndicators.calculate_all_indicators(data)
+        # Calculate only the indicators this strategy reads
+        data_with_indicators = TechnicalIndicators.calculate_indicators(data, [
+            f'sma_{self.parameters["fast_ma"]}', f'sma_{self.parameters["slow_ma"]}',
+            'rsi', 'macd', 'macd_signal', 'volume_ratio'
+        ])
         
         # Extract relevant columns
         close = data_with_indicators['close_price']
@@ -252,16 +257,18 @@ class MomentumStrategy(BaseStrategy):
         
         Uses volatility-adjusted position sizing with Kelly Criterion concepts
         """
-        if abs(signal) < self.parameters['min_signal_strength']:
-            return 0.0
-        
-        # Base position size from signal strength
-        base_position = signal * self.parameters['max_position']
-        
         # Risk adjustment could be added here (ATR-based, volatility-based, etc.)
         # For now, using simple signal-based sizing
-        
-        return base_position
+        return float(self._size_fraction(signal))
+    
+    def position_sizes(self, signals: pd.Series, prices: np.ndarray, portfolio_value: float) -> np.ndarray:
+        """Vectorized get_position_size"""
+        return self._size_fraction(signals.to_numpy(dtype=float))
+    
+    def _size_fraction(self, signal):
+        """Base position from signal strength (scalar or array)"""
+        return np.where(np.abs(signal) < self.parameters['min_signal_strength'], 0.0,
+                        signal * self.parameters['max_position'])
     
     def get_stop_loss_take_profit(self, entry_price: float, signal: float) -> Tuple[float, float]:
         """Calculate stop loss and take profit levels"""
@@ -308,7 +315,9 @@ class MeanReversionStrategy(BaseStrategy):
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """Generate mean reversion signals"""
         # Calculate indicators
-        data_with_indicators = TechnicalIndicators.calculate_all_indicators(data)
+        data_with_indicators = TechnicalIndicators.calculate_indicators(
+            data, ['bb_upper', 'bb_lower', 'bb_middle', 'rsi', 'volume_ratio']
+        )
         
         close = data_with_indicators['close_price']
         bb_upper = data_with_indicators['bb_upper']
@@ -362,12 +371,15 @@ class MeanReversionStrategy(BaseStrategy):
     
     def get_position_size(self, signal: float, current_price: float, portfolio_value: float) -> float:
         """Position sizing for mean reversion strategy"""
-        if abs(signal) < 0.3:  # Minimum signal threshold
-            return 0.0
-        
-        # Conservative position sizing for mean reversion
-        base_position = signal * self.parameters['max_position'] * 0.5
-        return base_position
+        return float(self._size_fraction(signal))
+    
+    def position_sizes(self, signals: pd.Series, prices: np.ndarray, portfolio_value: float) -> np.ndarray:
+        """Vectorized get_position_size"""
+        return self._size_fraction(signals.to_numpy(dtype=float))
+    
+    def _size_fraction(self, signal):
+        """Conservative half-size position above a 0.3 signal threshold (scalar or array)"""
+        return np.where(np.abs(signal) < 0.3, 0.0, signal * self.parameters['max_position'] * 0.5)
 
 
 def run_strategy_comparison(data: pd.DataFrame, initial_capital: float = 10000) -> Dict[str, Any]:
@@ -418,7 +430,13 @@ class BuyHoldStrategy(BaseStrategy):
         return signals
     
     def get_position_size(self, signal: float, current_price: float, portfolio_value: float) -> float:
-        return 1.0 if signal > 0 else 0.0
+        return float(self._size_fraction(signal))
+    
+    def position_sizes(self, signals: pd.Series, prices: np.ndarray, portfolio_value: float) -> np.ndarray:
+        return self._size_fraction(signals.to_numpy(dtype=float))
+    
+    def _size_fraction(self, signal):
+        return np.where(np.asarray(signal) > 0, 1.0, 0.0)
 
 
 if __name__ == "__main__":
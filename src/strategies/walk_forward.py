@@ -0,0 +1,314 @@
+"""
+Walk-Forward Optimization
+Optimize on rolling train windows, evaluate out of sample on the following window
+and stitch the out-of-sample equity curves together
+"""
+import pandas as pd
+import numpy as np
+from itertools import product
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from strategies.pivot_zone_strategy import PivotZoneStrategy
+from strategies.optimize_pivot_zone import (
+    PivotZoneOptimizer, context_arrays, context_from_arrays, slice_context
+)
+from strategies.parallel_sweep import SharedArrays, parallel_map, default_workers
+from strategies.backtest_core import max_drawdown
+
+# Worker-side cache of the full context and its fold slices, rebuilt once per run
+_segment_cache: Dict = {}
+
+
+def walk_forward_folds(timestamps, train_days: float, test_days: float,
+                       step_days: Optional[float] = None, anchored: bool = False) -> List[Tuple[int, int, int, int]]:
+    """
+    Split a candle history into consecutive train / test windows
+
+    Args:
+        timestamps: Candle timestamps (DatetimeIndex or datetime64 array), ascending
+        train_days: Length of each train window
+        test_days: Length of each out-of-sample window
+        step_days: Shift between folds (defaults to test_days, so test windows
+            tile the history without overlap)
+        anchored: Train windows all start at the first candle (expanding)
+
+    Returns:
+        List of (train_start, train_stop, test_start, test_stop) row positions,
+        stops exclusive; test_start == train_stop
+    """
+    times = pd.DatetimeIndex(timestamps)
+    step = pd.Timedelta(days=step_days or test_days)
+    train, test = pd.Timedelta(days=train_days), pd.Timedelta(days=test_days)
+
+    # End of the last candle, so a window may end exactly with the history
+    end = times[-1] + (times[-1] - times[-2] if len(times) > 1 else pd.Timedelta(0))
+
+    folds = []
+    fold_start = times[0]
+    while fold_start + train + test <= end:
+        train_start = 0 if anchored else times.searchsorted(fold_start)
+        test_start = times.searchsorted(fold_start + train)
+        test_stop = times.searchsorted(fold_start + train + test)
+        if train_start < test_start < test_stop:
+            folds.append((int(train_start), int(test_start), int(test_start), int(test_stop)))
+        fold_start += step
+    return folds
+
+
+def evaluate_segment(arrays: Dict[str, np.ndarray], meta: Dict[str, Any], task: Tuple) -> Dict:
+    """
+    Backtest one parameter set on one fold window (runs in a worker)
+
+    Args:
+        task: (fold, 'train' | 'test', start, stop, params)
+
+    Returns:
+        Metrics dict with 'fold', 'segment' and 'parameters' (train results
+        drop trades / equity curve), or the same keys plus 'error'
+    """
+    fold, segment, start, stop, params = task
+
+    if _segment_cache.get('arrays') is not arrays:
+        _segment_cache.clear()
+        _segment_cache['arrays'] = arrays
+        _segment_cache['context'] = context_from_arrays(arrays, meta.get('tz'))
+    key = (start, stop)
+    if key not in _segment_cache:
+        _segment_cache[key] = slice_context(_segment_cache['context'], start, stop)
+
+    strategy = PivotZoneStrategy()
+    for name, value in params.items():
+        setattr(strategy, name, value)
+
+    try:
+        result = strategy.backtest(
+            symbol=meta['symbol'],
+            initial_capital=meta['initial_capital'],
+            context=_segment_cache[key],
+            fill=meta.get('fill', 'close')
+        )
+    except Exception as e:
+        return {'fold': fold, 'segment': segment, 'parameters': params, 'error': str(e)}
+
+    if segment == 'train':
+        result.pop('trades', None)
+        result.pop('equity_curve', None)
+    result.update(fold=fold, segment=segment, parameters=params)
+    return result
+
+
+class WalkForwardOptimizer:
+    """
+    Walk-forward optimization of PivotZoneStrategy parameters
+
+    Indicators are prepared once for the whole history and shared with the
+    worker processes; every (fold, parameter set) train run and every
+    out-of-sample run only slices that context and recomputes the
+    parameter-dependent signals and backtest.
+    """
+
+    def __init__(self, param_grid: Optional[Dict[str, List]] = None, train_days: float = 30,
+                 test_days: float = 10, step_days: Optional[float] = None, anchored: bool = False):
+        """
+        Args:
+            param_grid: Parameter ranges (defaults to PivotZoneOptimizer's grid)
+            train_days: In-sample window length
+            test_days: Out-of-sample window length
+            step_days: Shift between folds (defaults to test_days)
+            anchored: Expanding train windows starting at the first candle
+        """
+        self.optimizer = PivotZoneOptimizer()
+        self.symbol = self.optimizer.symbol
+        self.lookback_days = self.optimizer.lookback_days
+        self.initial_capital = self.optimizer.initial_capital
+        self.param_grid = param_grid or self.optimizer.param_grid
+
+        self.train_days = train_days
+        self.test_days = test_days
+        self.step_days = step_days
+        self.anchored = anchored
+
+    def run(self, data: Optional[pd.DataFrame] = None, workers: Optional[int] = None,
+            max_tests: Optional[int] = None, fill: str = 'close', min_trades: int = 1) -> Dict:
+        """
+        Run walk-forward optimization
+
+        Args:
+            data: OHLCV candles (loaded for lookback_days if None)
+            workers: Worker processes (defaults to one per core)
+            max_tests: Sample this many parameter sets (the same sample for
+                every fold); None tests the full grid
+            fill: Stop / target fill model passed to the backtest
+            min_trades: In-sample trades a parameter set needs to be eligible
+
+        Returns:
+            Dict with per-fold results, the stitched out-of-sample equity
+            curve and summary metrics ({} if there is no data or no fold)
+        """
+        workers = workers or default_workers()
+
+        strategy = PivotZoneStrategy()
+        if data is None:
+            data = strategy._load_backtest_data(self.symbol, self.lookback_days)
+            if data is None:
+                print(f"❌ No data found for {self.symbol}")
+                return {}
+        elif 'timestamp' in data.columns:
+            data = data.assign(timestamp=pd.to_datetime(data['timestamp'])).set_index('timestamp')
+
+        context = strategy.prepare_signal_context(data)
+        index = context['index']
+        folds = walk_forward_folds(index, self.train_days, self.test_days, self.step_days, self.anchored)
+        if not folds:
+            print(f"❌ Not enough history for {self.train_days}+{self.test_days} day folds")
+            return {}
+
+        param_names = list(self.param_grid.keys())
+        combinations = list(product(*self.param_grid.values()))
+        if max_tests and len(combinations) > max_tests:
+            import random
+            combinations = random.sample(combinations, max_tests)
+        param_sets = [dict(zip(param_names, params)) for params in combinations]
+        grid_order = {params: k for k, params in enumerate(combinations)}
+
+        print("=" * 100)
+        print("PIVOT ZONE WALK-FORWARD OPTIMIZATION")
+        print("=" * 100)
+        print()
+        print(f"📊 Symbol: {self.symbol}")
+        print(f"📅 Folds: {len(folds)} x ({self.train_days}d train → {self.test_days}d test)"
+              f"{' anchored' if self.anchored else ''}")
+        print(f"🔬 Parameter sets: {len(param_sets)}")
+        print(f"⚙️  Workers: {workers}")
+        print()
+
+        meta = {
+            'symbol': self.symbol,
+            'initial_capital': self.initial_capital,
+            'fill': fill,
+            'tz': str(index.tz) if getattr(index, 'tz', None) is not None else None
+        }
+
+        started = time.perf_counter()
+        with SharedArrays(context_arrays(context), meta) as shared:
+            # In-sample: every fold x parameter set in one parallel sweep
+            train_tasks = [(k, 'train', train_start, train_stop, params)
+                           for k, (train_start, train_stop, _, _) in enumerate(folds)
+                           for params in param_sets]
+            best, best_key = {}, {}
+            for result in parallel_map(evaluate_segment, train_tasks, shared, workers):
+                if 'error' in result or result['total_trades'] < min_trades:
+                    continue
+                result['score'] = self.optimizer._calculate_score(result)
+                # Ties go to the earlier grid entry so results do not depend on completion order
+                key = (result['score'], -grid_order[tuple(result['parameters'].values())])
+                if result['fold'] not in best or key > best_key[result['fold']]:
+                    best[result['fold']], best_key[result['fold']] = result, key
+
+            # Out of sample: each fold's winner on the following window
+            test_tasks = [(k, 'test', test_start, test_stop, best[k]['parameters'])
+                          for k, (_, _, test_start, test_stop) in enumerate(folds) if k in best]
+            tested = {result['fold']: result for result in parallel_map(evaluate_segment, test_tasks, shared, workers)}
+        elapsed = time.perf_counter() - started
+
+        fold_results = []
+        for k, (train_start, train_stop, test_start, test_stop) in enumerate(folds):
+            fold = {
+                'fold': k,
+                'train_start': index[train_start], 'train_end': index[train_stop - 1],
+                'test_start': index[test_start], 'test_end': index[test_stop - 1],
+            }
+            if k not in best:
+                fold['error'] = 'No parameter set traded in sample'
+            elif 'error' in tested[k]:
+                fold['error'] = tested[k]['error']
+            else:
+                fold.update(parameters=best[k]['parameters'], in_sample=best[k], out_of_sample=tested[k])
+            fold_results.append(fold)
+
+        report = self._stitch(fold_results, index, folds)
+        report['folds'] = fold_results
+        report['elapsed'] = elapsed
+        self._print_report(report, len(train_tasks) + len(test_tasks))
+        return report
+
+    def _stitch(self, fold_results: List[Dict], index, folds) -> Dict:
+        """Chain out-of-sample equity curves, each fold starting from the previous fold's final value"""
+        capital = self.initial_capital
+        pieces = []
+        for fold, (_, _, test_start, test_stop) in zip(fold_results, folds):
+            if 'out_of_sample' not in fold:
+                continue
+            oos = fold['out_of_sample']
+            growth = capital / self.initial_capital
+            pieces.append(pd.Series(np.asarray(oos['equity_curve']) * growth, index=index[test_start:test_stop]))
+            capital *= oos['final_value'] / self.initial_capital
+
+        equity = pd.concat(pieces) if pieces else pd.Series(dtype=float)
+        scored = [fold for fold in fold_results if 'out_of_sample' in fold]
+        in_sample = np.mean([fold['in_sample']['total_return'] for fold in scored]) if scored else 0.0
+        out_of_sample = np.mean([fold['out_of_sample']['total_return'] for fold in scored]) if scored else 0.0
+
+        return {
+            'equity_curve': equity,
+            'final_value': capital,
+            'total_return': (capital / self.initial_capital - 1) * 100,
+            'max_drawdown': max_drawdown(equity.to_numpy()) * 100 if len(equity) else 0.0,
+            'avg_in_sample_return': in_sample,
+            'avg_out_of_sample_return': out_of_sample,
+            # Share of the in-sample return that survives out of sample
+            'efficiency': out_of_sample / in_sample if in_sample > 0 else None
+        }
+
+    def _print_report(self, report: Dict, evaluations: int):
+        print("-" * 100)
+        for fold in report['folds']:
+            label = (f"Fold {fold['fold']}: test {fold['test_start']:%Y-%m-%d} → {fold['test_end']:%Y-%m-%d}"
+                     if isinstance(fold['test_start'], pd.Timestamp) else f"Fold {fold['fold']}")
+            if 'error' in fold:
+                print(f"{label} -> ❌ {fold['error']}")
+                continue
+            ins, oos = fold['in_sample'], fold['out_of_sample']
+            print(f"{label} -> IS {ins['total_return']:.2f}% (score {ins['score']:.1f}) | "
+                  f"OOS {oos['total_return']:.2f}% | Win Rate {oos['win_rate']:.1f}% | Trades {oos['total_trades']}")
+            print(f"   Parameters: {fold['parameters']}")
+        print("-" * 100)
+        print()
+        print(f"⏱️  {evaluations} backtests in {report['elapsed']:.1f}s")
+        print(f"💰 Stitched OOS Return: {report['total_return']:.2f}% | Max DD: {report['max_drawdown']:.2f}%")
+        print(f"📈 Avg IS Return: {report['avg_in_sample_return']:.2f}% | "
+              f"Avg OOS Return: {report['avg_out_of_sample_return']:.2f}%")
+        if report['efficiency'] is not None:
+            print(f"🎯 Walk-forward efficiency: {report['efficiency']:.2f}")
+        print()
+
+
+def main():
+    """Run Pivot Zone walk-forward optimization"""
+    optimizer = WalkForwardOptimizer(train_days=30, test_days=10)
+    report = optimizer.run()
+
+    if report:
+        import json
+        output_file = 'logs/pivot_zone_walk_forward.json'
+        os.makedirs('logs', exist_ok=True)
+
+        summary = {name: value for name, value in report.items() if name != 'equity_curve'}
+        for fold in summary['folds']:
+            for segment in ('in_sample', 'out_of_sample'):
+                if segment in fold:
+                    fold[segment] = {name: value for name, value in fold[segment].items()
+                                     if name not in ('trades', 'equity_curve')}
+
+        with open(output_file, 'w') as f:
+            json.dump(summary, f, indent=2, default=str)
+
+        print(f"💾 Walk-forward report saved to {output_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,9 +9,15 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 import pandas as pd
 import numpy as np
+from typing import Any, Dict, Optional
 from data.database import get_db
 from data.models import MarketData
 from strategies.technical_indicators import TechnicalIndicators
+from strategies.signal_frame import SignalFrame
+from strategies.backtest_core import run_all_in, all_in_trade_records
+from strategies.incremental_indicators import (
+    IncrementalSMA, IncrementalRSI, IncrementalMACD, IncrementalADX, candle_ohlcv
+)
 
 class Week1Refined5mStrategy:
     """
@@ -55,9 +61,12 @@ class Week1Refined5mStrategy:
         self.stop_loss_pct = 0.15   # 15% stop loss
         self.take_profit_pct = 0.30 # 30% take profit
 
-        # State tracking
+        # State tracking (entry index of the latest generate_signals run)
         self.last_trade_index = -100
 
+        # Per-symbol streaming state for on_candle / latest_signal
+        self.live_states: Dict[str, '_LiveSignalState'] = {}
+
     def calculate_adx(self, data: pd.DataFrame, period: int = 14) -> pd.Series:
         """Calculate Average Directional Index (ADX)"""
         high = data['high_price']
@@ -140,122 +149,190 @@ class Week1Refined5mStrategy:
         data['htf_fast'] = data['close_price'].rolling(self.htf_fast_ma).mean()
         data['htf_slow'] = data['close_price'].rolling(self.htf_slow_ma).mean()
 
-        # Initialize signals
-        data['signal'] = 0
-        data['position'] = 0
-        data['entry_price'] = 0.0
-        data['stop_loss'] = 0.0
-        data['take_profit'] = 0.0
-
-        position = 0
-        entry_price = 0
-
-        for i in range(len(data)):
-            # Need enough data for higher timeframe filter
-            if i < max(self.htf_slow_ma, 200):
-                continue
-
-            # Filter 1: Higher timeframe trend (HTF MAs)
-            trend_up = data.iloc[i]['htf_fast'] > data.iloc[i]['htf_slow']
-
-            # Filter 2: Trade cooldown (3 periods = 15 minutes)
-            cooldown_passed = (i - self.last_trade_index) >= self.cooldown_periods
-
-            # Filter 3: Volume confirmation (1.05x for 5m)
-            volume_ok = data.iloc[i]['volume_confirmed']
-
-            # Filter 4: MACD confirmation
-            macd_bullish = data.iloc[i]['macd'] > data.iloc[i]['macd_signal']
-
-            # Filter 5: ADX trend strength (>18 for 5m)
-            strong_trend = data.iloc[i]['adx'] > self.adx_threshold
-
-            if position == 0:
-                # BUY: All conditions must be met
-                ma_cross_up = (data.iloc[i]['ma_fast'] > data.iloc[i]['ma_slow'] and
-                              data.iloc[i-1]['ma_fast'] <= data.iloc[i-1]['ma_slow'])
-                rsi_ok = data.iloc[i]['rsi'] < self.rsi_overbought
-
-                if (ma_cross_up and rsi_ok and trend_up and cooldown_passed and
-                    volume_ok and macd_bullish and strong_trend):
-                    data.loc[data.index[i], 'signal'] = 1
-                    position = 1
-                    entry_price = data.iloc[i]['close_price']
-                    data.loc[data.index[i], 'entry_price'] = entry_price
-                    data.loc[data.index[i], 'stop_loss'] = entry_price * (1 - self.stop_loss_pct)
-                    data.loc[data.index[i], 'take_profit'] = entry_price * (1 + self.take_profit_pct)
-                    self.last_trade_index = i
-
-            elif position == 1:
-                # SELL conditions
-                ma_cross_down = (data.iloc[i]['ma_fast'] < data.iloc[i]['ma_slow'] and
-                               data.iloc[i-1]['ma_fast'] >= data.iloc[i-1]['ma_slow'])
-                rsi_overbought = data.iloc[i]['rsi'] > self.rsi_overbought
-                stop_loss_hit = data.iloc[i]['close_price'] <= data.iloc[i-1]['stop_loss']
-                take_profit_hit = data.iloc[i]['close_price'] >= data.iloc[i-1]['take_profit']
-
-                if ma_cross_down or rsi_overbought or stop_loss_hit or take_profit_hit:
-                    data.loc[data.index[i], 'signal'] = -1
-                    position = 0
-                    entry_price = 0
-                else:
-                    # Carry forward position and stops
-                    data.loc[data.index[i], 'entry_price'] = data.iloc[i-1]['entry_price']
-                    data.loc[data.index[i], 'stop_loss'] = data.iloc[i-1]['stop_loss']
-                    data.loc[data.index[i], 'take_profit'] = data.iloc[i-1]['take_profit']
-
-            data.loc[data.index[i], 'position'] = position
+        signal, position, entry_price, stop_loss, take_profit = self._run_trade_state(data)
+        data['signal'] = signal
+        data['position'] = position
+        data['entry_price'] = entry_price
+        data['stop_loss'] = stop_loss
+        data['take_profit'] = take_profit
 
         return data
 
+    def generate_signal_frame(self, data: pd.DataFrame, symbol: Optional[str] = None) -> SignalFrame:
+        """Signals as a SignalFrame (stop / target levels and indicator columns included)"""
+        return SignalFrame.from_frame(self.generate_signals(data))
+
+    def _entry_exit_filters(self, data: pd.DataFrame):
+        """Entry filters (all but cooldown) and indicator exits as boolean arrays"""
+        ma_fast = data['ma_fast'].to_numpy(dtype=float)
+        ma_slow = data['ma_slow'].to_numpy(dtype=float)
+        prev_fast = np.concatenate(([np.nan], ma_fast[:-1]))
+        prev_slow = np.concatenate(([np.nan], ma_slow[:-1]))
+        rsi = data['rsi'].to_numpy(dtype=float)
+
+        with np.errstate(invalid='ignore'):
+            ma_cross_up = (ma_fast > ma_slow) & (prev_fast <= prev_slow)
+            ma_cross_down = (ma_fast < ma_slow) & (prev_fast >= prev_slow)
+
+            entry_filters = (
+                ma_cross_up &
+                (rsi < self.rsi_overbought) &
+                (data['htf_fast'].to_numpy(dtype=float) > data['htf_slow'].to_numpy(dtype=float)) &
+                data['volume_confirmed'].to_numpy(dtype=bool) &
+                (data['macd'].to_numpy(dtype=float) > data['macd_signal'].to_numpy(dtype=float)) &
+                (data['adx'].to_numpy(dtype=float) > self.adx_threshold)
+            )
+            exit_filters = ma_cross_down | (rsi > self.rsi_overbought)
+
+        # Need enough data for higher timeframe filter
+        start = max(self.htf_slow_ma, 200)
+        entry_filters[:start] = False
+        exit_filters[:start] = False
+
+        return entry_filters, exit_filters
+
+    def _run_trade_state(self, data: pd.DataFrame):
+        """
+        Position/cooldown state machine over the precomputed filter arrays
+
+        Jumps from one qualifying entry to the first exit (indicator exit,
+        stop loss or take profit) instead of visiting every row.
+        """
+        close = data['close_price'].to_numpy(dtype=float)
+        entry_filters, exit_filters = self._entry_exit_filters(data)
+        n = len(close)
+
+        signal = np.zeros(n, dtype=np.int64)
+        position = np.zeros(n, dtype=np.int64)
+        entry_price = np.zeros(n)
+        stop_loss = np.zeros(n)
+        take_profit = np.zeros(n)
+
+        entries = np.flatnonzero(entry_filters)
+        exits = np.flatnonzero(exit_filters)
+        last_trade_index = -100
+        i = 0
+
+        while True:
+            # Next qualifying entry that also clears the trade cooldown
+            k = np.searchsorted(entries, max(i, last_trade_index + self.cooldown_periods))
+            if k >= len(entries):
+                break
+
+            entry = int(entries[k])
+            price = close[entry]
+            stop = price * (1 - self.stop_loss_pct)
+            target = price * (1 + self.take_profit_pct)
+            signal[entry] = 1
+            last_trade_index = entry
+
+            # First indicator exit, unless a stop/target is hit before it
+            k = np.searchsorted(exits, entry + 1)
+            exit_index = int(exits[k]) if k < len(exits) else n
+            held = close[entry + 1:exit_index]
+            hits = np.flatnonzero((held <= stop) | (held >= target))
+            if len(hits):
+                exit_index = entry + 1 + int(hits[0])
+
+            position[entry:exit_index] = 1
+            entry_price[entry:exit_index] = price
+            stop_loss[entry:exit_index] = stop
+            take_profit[entry:exit_index] = target
+
+            if exit_index >= n:
+                break
+
+            signal[exit_index] = -1
+            i = exit_index + 1
+
+        # Cooldown state is local to this frame; kept on the instance for inspection only
+        self.last_trade_index = last_trade_index
+        return signal, position, entry_price, stop_loss, take_profit
+
+    def on_candle(self, symbol: str, candle: Any) -> int:
+        """
+        Evaluate one completed candle for a symbol
+
+        Keeps indicators, position, cooldown and stop levels per symbol, so
+        feeding a symbol's candles in order yields the same signals as the last
+        row of generate_signals over that history, at O(1) cost per candle.
+
+        Args:
+            symbol: Trading symbol
+            candle: Candle dataclass, dict or row (*_price or open/high/low/close names)
+
+        Returns:
+            Signal for this candle: 1 (buy), -1 (sell) or 0
+        """
+        state = self.live_states.get(symbol)
+        if state is None:
+            state = self.live_states[symbol] = _LiveSignalState(self)
+
+        _, high, low, close, volume = candle_ohlcv(candle)
+        state.index += 1
+        i = state.index
+
+        ma_fast = state.ma_fast.update(close)
+        ma_slow = state.ma_slow.update(close)
+        htf_fast = state.htf_fast.update(close)
+        htf_slow = state.htf_slow.update(close)
+        rsi = state.rsi.update(close)
+        macd = state.macd.update(close)
+        adx = state.adx.update(high, low, close)
+        volume_ok = volume > state.volume_avg.update(volume) * self.volume_multiplier
+
+        signal = 0
+        if i >= max(self.htf_slow_ma, 200):
+            if state.position == 0:
+                ma_cross_up = ma_fast > ma_slow and state.prev_fast <= state.prev_slow
+                if (ma_cross_up and rsi < self.rsi_overbought and htf_fast > htf_slow and
+                        (i - state.last_trade_index) >= self.cooldown_periods and volume_ok and
+                        macd['macd'] > macd['macd_signal'] and adx > self.adx_threshold):
+                    signal = 1
+                    state.position = 1
+                    state.entry_price = close
+                    state.stop_loss = close * (1 - self.stop_loss_pct)
+                    state.take_profit = close * (1 + self.take_profit_pct)
+                    state.last_trade_index = i
+            else:
+                ma_cross_down = ma_fast < ma_slow and state.prev_fast >= state.prev_slow
+                if (ma_cross_down or rsi > self.rsi_overbought or
+                        close <= state.stop_loss or close >= state.take_profit):
+                    signal = -1
+                    state.position = 0
+                    state.entry_price = state.stop_loss = state.take_profit = 0.0
+
+        state.prev_fast, state.prev_slow = ma_fast, ma_slow
+        state.signal = signal
+        state.values = {
+            'ma_fast': ma_fast, 'ma_slow': ma_slow, 'rsi': rsi,
+            'htf_fast': htf_fast, 'htf_slow': htf_slow, 'adx': adx, **macd
+        }
+        return signal
+
+    def latest_signal(self, symbol: str) -> int:
+        """Signal of the most recent candle passed to on_candle (0 if none)"""
+        state = self.live_states.get(symbol)
+        return state.signal if state else 0
+
+    def reset_live_state(self, symbol: Optional[str] = None):
+        """Drop streaming state for one symbol or for all symbols"""
+        if symbol is None:
+            self.live_states.clear()
+        else:
+            self.live_states.pop(symbol, None)
+
     def backtest(self, data: pd.DataFrame, initial_capital: float = 10000) -> dict:
         """Backtest the 5m strategy"""
         signals = self.generate_signals(data)
 
-        capital = initial_capital
-        position = 0
-        entry_price = 0
-        trades = []
-        equity_curve = [initial_capital]
-
-        for i in range(len(signals)):
-            current_price = signals.iloc[i]['close_price']
-            signal = signals.iloc[i]['signal']
-
-            if signal == 1 and position == 0:
-                # BUY
-                position = capital / current_price
-                entry_price = current_price
-                capital = 0
-                trades.append({
-                    'type': 'BUY',
-                    'price': current_price,
-                    'timestamp': signals.iloc[i].name if hasattr(signals.iloc[i], 'name') else i
-                })
-
-            elif signal == -1 and position > 0:
-                # SELL
-                capital = position * current_price
-                profit = capital - initial_capital
-                trades.append({
-                    'type': 'SELL',
-                    'price': current_price,
-                    'profit': profit,
-                    'return': (current_price - entry_price) / entry_price * 100,
-                    'timestamp': signals.iloc[i].name if hasattr(signals.iloc[i], 'name') else i
-                })
-                position = 0
-                entry_price = 0
-
-            # Track equity
-            if position > 0:
-                equity_curve.append(position * current_price)
-            else:
-                equity_curve.append(capital)
+        result = run_all_in(signals['close_price'].to_numpy(dtype=float),
+                            signals['signal'].to_numpy(dtype=float), initial_capital)
+        trades = all_in_trade_records(result, signals.index, initial_capital)
+        equity_curve = [initial_capital] + result.equity.tolist()
 
         # Close any open position
-        if position > 0:
-            capital = position * signals.iloc[-1]['close_price']
+        capital = result.final_value
 
         # Calculate metrics
         final_value = capital if capital > 0 else equity_curve[-1]
@@ -295,6 +372,31 @@ class Week1Refined5mStrategy:
         }
 
 
+class _LiveSignalState:
+    """Per-symbol streaming state behind Week1Refined5mStrategy.on_candle"""
+
+    def __init__(self, strategy: Week1Refined5mStrategy):
+        self.ma_fast = IncrementalSMA(strategy.fast_ma)
+        self.ma_slow = IncrementalSMA(strategy.slow_ma)
+        self.htf_fast = IncrementalSMA(strategy.htf_fast_ma)
+        self.htf_slow = IncrementalSMA(strategy.htf_slow_ma)
+        self.volume_avg = IncrementalSMA(20)
+        self.rsi = IncrementalRSI(14)
+        self.macd = IncrementalMACD()
+        self.adx = IncrementalADX(14)
+
+        self.index = -1
+        self.prev_fast = float('nan')
+        self.prev_slow = float('nan')
+        self.position = 0
+        self.last_trade_index = -100
+        self.entry_price = 0.0
+        self.stop_loss = 0.0
+        self.take_profit = 0.0
+        self.signal = 0
+        self.values: Dict[str, float] = {}
+
+
 if __name__ == "__main__":
     print("Week 1 Refined 5m Strategy - High Frequency Trading")
     print("=" * 70)
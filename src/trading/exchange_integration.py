@@ -316,6 +316,13 @@ def initialize_exchanges():
     """Initialize and register all exchange connections"""
     global exchange_manager
     
+    # In-process exchange for load tests (no network, no real orders)
+    if os.getenv('SIMULATED_EXCHANGE', 'false').lower() == 'true':
+        from trading.simulated_exchange import SimulatedExchange
+        exchange_manager.add_exchange('binance', SimulatedExchange.from_env(), is_default=True)
+        logger.info("Using simulated exchange (SIMULATED_EXCHANGE=true)")
+        return exchange_manager
+    
     if not BINANCE_AVAILABLE:
         logger.warning("Binance client not available - skipping exchange initialization")
         return exchange_manager
@@ -17,6 +17,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from trading.exchange_integration import exchange_manager, initialize_exchanges
 from strategies.technical_indicators import TechnicalIndicators
+from strategies.incremental_indicators import IncrementalIndicatorEngine
+from strategies.indicator_cache import get_indicator_cache, frame_watermark
+from strategies.signal_frame import as_signal_frame
 from strategies.week1_refined_5m import Week1Refined5mStrategy
 from data.candle_aggregator import get_candle_aggregator, start_candle_aggregator
 from trading.signal_monitor import get_signal_monitor
@@ -198,7 +201,18 @@ class LiveTradingEngine5m:
     - Expected: 8-12 trades per day
     """
 
-    def __init__(self, symbols: List[str] = None, paper_trading: bool = True, use_ai: bool = False):
+    def __init__(self, symbols: List[str] = None, paper_trading: bool = True, use_ai: bool = False,
+                 exchange=None, signal_monitor=None, paper_monitor=None):
+        """
+        Args:
+            symbols: Trading symbols
+            paper_trading: Use paper trading mode (no real money)
+            use_ai: Enable AI-enhanced strategy
+            exchange: ExchangeInterface for tickers / orders (the registered
+                'binance' exchange if None)
+            signal_monitor: SignalMonitor (the global monitor if None)
+            paper_monitor: PaperTradingMonitor (a new monitor if None)
+        """
         self.symbols = symbols or ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
         self.portfolio = PortfolioManager()
 
@@ -206,7 +220,12 @@ class LiveTradingEngine5m:
         if use_ai:
             try:
                 from strategies.ai_enhanced_strategy import AIEnhancedStrategy
-                self.strategy = AIEnhancedStrategy()
+                from ai.sentiment_refresher import get_sentiment_refresher
+                # Only the latest row is read from generate_signals; sentiment
+                # is refreshed in the background instead of inside the cycle
+                self.strategy = AIEnhancedStrategy(
+                    tail_rows=1, sentiment_refresher=get_sentiment_refresher()
+                )
                 logger.info(f"✨ AI-ENHANCED Strategy: {self.strategy.name} (Technical 40% + LSTM 30% + Sentiment 30%)")
             except ImportError as e:
                 logger.warning(f"AI Strategy not available: {e}. Falling back to base strategy.")
@@ -219,14 +238,26 @@ class LiveTradingEngine5m:
 
         self.indicators = TechnicalIndicators()
 
+        # Streaming indicators for monitoring (RSI, MA 8/21, HTF MA 20/50),
+        # fed once per completed candle instead of recomputed every cycle
+        self.incremental_indicators = IncrementalIndicatorEngine(
+            sma_windows=(8, 21, 20, 50), ema_windows=(), rsi_window=14
+        )
+
+        # Last candle timestamp fed to strategy.on_candle per symbol
+        self.strategy_watermarks: Dict[str, datetime] = {}
+
         # Initialize exchanges
-        initialize_exchanges()
-        self.exchange = exchange_manager.get_exchange('binance')
+        if exchange is None:
+            initialize_exchanges()
+            exchange = exchange_manager.get_exchange('binance')
+        self.exchange = exchange
 
         # Paper trading mode - NO REAL MONEY
         self.paper_trading = paper_trading
 
         self.running = False
+        self._owns_refresher = False  # stop() stops the sentiment sweep only if start() began it
         self.update_interval = 30  # Check every 30 seconds (more frequent for 5m)
         self.last_signals = {}
 
@@ -237,8 +268,8 @@ class LiveTradingEngine5m:
         self.paper_trades = []
 
         # Monitoring and alerts
-        self.signal_monitor = get_signal_monitor()
-        self.paper_monitor = PaperTradingMonitor()
+        self.signal_monitor = signal_monitor or get_signal_monitor()
+        self.paper_monitor = paper_monitor or PaperTradingMonitor()
 
         # Candle aggregator (will be initialized on start)
         self.candle_aggregator = None
@@ -306,6 +337,13 @@ class LiveTradingEngine5m:
             self.running = False
             return
 
+        # Keep AI sentiment warm off the trading cycle
+        refresher = getattr(self.strategy, 'sentiment_refresher', None)
+        if refresher is not None:
+            # A sweep already running (e.g. started by the API) is left to its owner
+            self._owns_refresher = not refresher.running
+            await refresher.start(self.symbols)
+
         try:
             while self.running:
                 await self.trading_cycle()
@@ -322,6 +360,11 @@ class LiveTradingEngine5m:
         self.running = False
         logger.info("Stopping trading engine...")
 
+        refresher = getattr(self.strategy, 'sentiment_refresher', None)
+        if refresher is not None and self._owns_refresher:
+            await refresher.stop()
+            self._owns_refresher = False
+
     async def trading_cycle(self):
         """Execute one trading cycle"""
         try:
@@ -371,6 +414,7 @@ class LiveTradingEngine5m:
                 return
 
             df = self.candle_aggregator.get_candles_as_dataframe(symbol, limit=300)
+            from_aggregator = len(df) >= 30
 
             # Fallback to database if aggregator doesn't have enough candles yet
             if len(df) < 30:  # Reduced from 60 for testing
@@ -433,62 +477,37 @@ class LiveTradingEngine5m:
                     'close_price': 'close'
                 })
 
-            # Generate signals
-            signals = self.strategy.generate_signals(df, symbol=symbol.replace('USDT', ''))
+            # Generate signals; strategies with per-symbol streaming state only
+            # evaluate the candles completed since the last cycle
+            if from_aggregator and hasattr(self.strategy, 'on_candle'):
+                frame = as_signal_frame(self._sync_strategy(symbol), df.index)
+            else:
+                frame = self.strategy.generate_signal_frame(df, symbol=symbol.replace('USDT', ''))
 
-            # Handle different return types
-            if isinstance(signals, pd.DataFrame):
-                # DataFrame with columns
-                if len(signals) == 0:
-                    return
-                try:
-                    latest_signal = signals.iloc[-1]['signal'] if 'signal' in signals.columns else signals.iloc[-1].iloc[0]
-                except (IndexError, KeyError, TypeError) as e:
-                    logger.error(f"Error extracting signal from DataFrame for {symbol}: {e}")
-                    return
-                rsi = signals.iloc[-1].get('rsi')
-                ma_fast = signals.iloc[-1].get('ma_fast')
-                ma_slow = signals.iloc[-1].get('ma_slow')
-                htf_fast = signals.iloc[-1].get('htf_fast')
-                htf_slow = signals.iloc[-1].get('htf_slow')
-                
-            elif isinstance(signals, pd.Series):
-                # Series - just signal values, calculate indicators ourselves
-                if len(signals) == 0:
-                    return
-                # Handle both scalar and series returns
-                try:
-                    # Check if it's a scalar value (happens when Series has one element and you access it)
-                    if np.isscalar(signals):
-                        latest_signal = float(signals)
-                    elif hasattr(signals, 'iloc') and len(signals) > 0:
-                        latest_signal = float(signals.iloc[-1])
-                    elif hasattr(signals, 'values') and len(signals.values) > 0:
-                        latest_signal = float(signals.values[-1])
-                    else:
-                        latest_signal = float(signals)
-                except (IndexError, TypeError, AttributeError, ValueError) as e:
-                    logger.error(f"Error extracting signal value for {symbol}: {e}, signals type: {type(signals)}, signals: {signals}")
-                    return
-                
-                # Calculate indicators for monitoring - ensure column names exist
-                if 'close' not in df.columns:
-                    logger.error(f"Missing 'close' column for {symbol}, columns: {df.columns.tolist()}")
-                    return
-                    
-                rsi = self.indicators.rsi(df['close'], window=14).iloc[-1] if len(df) >= 14 else None
-                ma_fast = df['close'].rolling(window=8).mean().iloc[-1] if len(df) >= 8 else None
-                ma_slow = df['close'].rolling(window=21).mean().iloc[-1] if len(df) >= 21 else None
-                htf_fast = df['close'].rolling(window=20).mean().iloc[-1] if len(df) >= 20 else None
-                htf_slow = df['close'].rolling(window=50).mean().iloc[-1] if len(df) >= 50 else None
+            if len(frame) == 0:
+                return
+            latest = frame.latest()
+            latest_signal = latest['signal']
+
+            # Monitoring values: taken from the strategy output when it carries
+            # them, otherwise calculated here
+            monitoring = ('rsi', 'ma_fast', 'ma_slow', 'htf_fast', 'htf_slow')
+            if all(name in frame.extras for name in monitoring):
+                rsi, ma_fast, ma_slow, htf_fast, htf_slow = (latest[name] for name in monitoring)
+            elif from_aggregator:
+                rsi, ma_fast, ma_slow, htf_fast, htf_slow = self._streaming_indicators(symbol)
+            elif 'close' in df.columns:
+                # Database candles only change when a new bar is stored
+                watermark = frame_watermark(df)
+                close = df['close']
+                rsi = self._cached_latest(symbol, 'rsi', 14, watermark, lambda: self.indicators.rsi(close, window=14)) if len(df) >= 14 else None
+                ma_fast = self._cached_latest(symbol, 'sma', 8, watermark, lambda: close.rolling(window=8).mean()) if len(df) >= 8 else None
+                ma_slow = self._cached_latest(symbol, 'sma', 21, watermark, lambda: close.rolling(window=21).mean()) if len(df) >= 21 else None
+                htf_fast = self._cached_latest(symbol, 'sma', 20, watermark, lambda: close.rolling(window=20).mean()) if len(df) >= 20 else None
+                htf_slow = self._cached_latest(symbol, 'sma', 50, watermark, lambda: close.rolling(window=50).mean()) if len(df) >= 50 else None
             else:
-                # Scalar or unknown type
-                latest_signal = float(signals) if signals is not None else 0.0
-                rsi = None
-                ma_fast = None
-                ma_slow = None
-                htf_fast = None
-                htf_slow = None
+                logger.error(f"Missing 'close' column for {symbol}, columns: {df.columns.tolist()}")
+                return
 
             # Determine trend
             if htf_fast is not None and htf_slow is not None:
@@ -523,6 +542,49 @@ class LiveTradingEngine5m:
         except Exception as e:
             logger.error(f"Error processing {symbol}: {e}", exc_info=True)
 
+    def _new_candles(self, symbol: str, watermark) -> list:
+        """Completed aggregator candles newer than the watermark timestamp"""
+        candles = self.candle_aggregator.get_candle_history(symbol)
+        if watermark is None:
+            return candles
+
+        # Walk back from the end; normally only 0-1 candles are new
+        start = len(candles)
+        while start > 0 and candles[start - 1].timestamp > watermark:
+            start -= 1
+        return candles[start:]
+
+    def _sync_strategy(self, symbol: str) -> float:
+        """Feed new completed candles to the strategy and return its latest signal"""
+        strategy_symbol = symbol.replace('USDT', '')
+
+        for candle in self._new_candles(symbol, self.strategy_watermarks.get(symbol)):
+            self.strategy.on_candle(strategy_symbol, candle)
+            self.strategy_watermarks[symbol] = candle.timestamp
+
+        return self.strategy.latest_signal(strategy_symbol)
+
+    def _streaming_indicators(self, symbol: str) -> Tuple[Optional[float], ...]:
+        """Monitoring values (RSI, MA 8/21, HTF MA 20/50) from the streaming engine"""
+        # Only candles completed since the last cycle are applied
+        latest = self.incremental_indicators.sync(
+            symbol, self.candle_aggregator.get_candle_history(symbol)
+        )
+        return tuple(
+            None if v is None or np.isnan(v) else v
+            for v in (latest.get('rsi'), latest.get('sma_8'), latest.get('sma_21'),
+                      latest.get('sma_20'), latest.get('sma_50'))
+        )
+
+    def _cached_latest(self, symbol: str, indicator: str, period: int, watermark, compute) -> float:
+        """Latest value of an indicator series, memoized per candle watermark"""
+        if watermark is None:
+            return compute().iloc[-1]
+
+        return get_indicator_cache().get_or_compute(
+            symbol, '5m', indicator, {'period': period}, watermark, compute
+        ).iloc[-1]
+
     async def execute_buy(self, symbol: str, price: float):
         """Execute a buy order"""
         try:
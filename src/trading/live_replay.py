@@ -0,0 +1,483 @@
+"""
+Live Pipeline Replay
+Feed historical or recorded prices through the production live path under a simulated clock
+
+DataFeedManager -> CandleAggregator.process_price_update -> LiveTradingEngine5m.trading_cycle
+run unchanged; only the edges are swapped:
+- datetime.now() in the live modules reads a SimulatedClock
+- the engine's asyncio.sleep(update_interval) between cycles becomes a clock
+  jump to the next cycle, so a day of 5m data replays in seconds
+- tickers come from the replayed feed, and candles, trades, signals and
+  alerts are kept in memory instead of the database / log files
+"""
+import asyncio
+import heapq
+import logging
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from data.live_feed import PriceUpdate, LiveDataFeed, DataFeedManager
+from data.candle_aggregator import Candle, CandleAggregator
+from trading.exchange_integration import ExchangeInterface
+from trading.live_engine_5m import LiveTradingEngine5m
+from trading.signal_monitor import SignalMonitor
+from trading.paper_trading_monitor import PaperTradingMonitor
+
+logger = logging.getLogger(__name__)
+
+# Modules whose datetime.now() follows the simulated clock during a replay
+CLOCK_MODULES = (
+    'trading.live_engine_5m',
+    'trading.signal_monitor',
+    'trading.paper_trading_monitor',
+    'data.candle_aggregator',
+    'data.live_feed',
+    'trading.simulated_exchange',
+    __name__,
+)
+
+
+class SimulatedClock:
+    """Replay time source; only moves when the replay advances it"""
+
+    def __init__(self, start: Optional[datetime] = None):
+        self._now = start
+
+    def now(self, tz=None) -> datetime:
+        """Current simulated time (naive unless tz is given, like datetime.now)"""
+        if self._now is None:
+            raise RuntimeError("Simulated clock has not been started")
+        moment = self._now if self._now.tzinfo else self._now.replace(tzinfo=timezone.utc)
+        if tz is None:
+            return moment.astimezone(timezone.utc).replace(tzinfo=None)
+        return moment.astimezone(tz)
+
+    def set(self, moment: datetime):
+        """Move to a moment; the clock never runs backwards"""
+        if self._now is not None and moment < self._now:
+            return
+        self._now = moment
+
+    def advance(self, seconds: float):
+        """Equivalent of asyncio.sleep(seconds) in simulated time"""
+        self._now += timedelta(seconds=seconds)
+
+    async def sleep(self, seconds: float):
+        """asyncio.sleep replacement: advance the clock instead of waiting"""
+        if self._now is not None:
+            self.advance(seconds)
+        await asyncio.sleep(0)
+
+    def seconds(self) -> float:
+        """Clock as epoch seconds (0.0 before the replay starts)"""
+        return self.now(timezone.utc).timestamp() if self._now is not None else 0.0
+
+    @contextmanager
+    def patch(self, modules: Iterable[str] = CLOCK_MODULES):
+        """Make datetime.now() in the given (imported) modules read this clock"""
+        clock = self
+
+        class ClockDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return clock.now(tz)
+
+            @classmethod
+            def utcnow(cls):
+                return clock.now()
+
+        originals = {}
+        for name in modules:
+            module = sys.modules.get(name)
+            if module is not None and getattr(module, 'datetime', None) is datetime:
+                originals[module] = module.datetime
+                module.datetime = ClockDatetime
+        try:
+            yield self
+        finally:
+            for module, original in originals.items():
+                module.datetime = original
+
+
+class FeedExchange(ExchangeInterface):
+    """Tickers from the replayed feed; orders fill at the latest replayed price"""
+
+    def __init__(self, feed_manager: DataFeedManager, clock: SimulatedClock):
+        self.feed_manager = feed_manager
+        self.clock = clock
+        self.orders: List[Dict] = []
+
+    async def get_balance(self) -> Dict:
+        return {}
+
+    async def get_ticker(self, symbol: str) -> Dict:
+        update = self.feed_manager.get_latest_price(symbol)
+        if update is None:
+            return {}
+        return {'symbol': symbol, 'price': update.price, 'timestamp': update.timestamp}
+
+    async def place_order(self, symbol: str, side: str, amount: float, price: Optional[float] = None) -> Dict:
+        update = self.feed_manager.get_latest_price(symbol)
+        if update is None:
+            return {'error': f'No replayed price for {symbol}'}
+
+        order = {
+            'order_id': f'replay_{len(self.orders) + 1}',
+            'symbol': symbol,
+            'side': side.upper(),
+            'amount': amount,
+            'price': price or update.price,
+            'status': 'FILLED',
+            'timestamp': self.clock.now()
+        }
+        self.orders.append(order)
+        return order
+
+    async def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict]:
+        return []
+
+    async def cancel_order(self, order_id: str, symbol: str) -> Dict:
+        return {'error': f'Order {order_id} is already filled'}
+
+
+class ReplayCandleAggregator(CandleAggregator):
+    """CandleAggregator that counts completed candles instead of storing them"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.completed = 0
+
+    def preload(self, candles: List[Candle]):
+        """Seed completed history (the live engine loads it from the database)"""
+        for candle in candles:
+            history = self.candle_history[candle.symbol]
+            history.append(candle)
+            if len(history) > self.buffer_size:
+                del history[:-self.buffer_size]
+
+    def _save_to_database(self, candle: Candle):
+        self.completed += 1
+
+    def _save_to_store(self, candle: Candle):
+        pass
+
+
+class ReplaySignalMonitor(SignalMonitor):
+    """SignalMonitor without console, file or database output"""
+
+    def __init__(self):
+        super().__init__(log_dir=tempfile.gettempdir())
+
+    def _notify(self, alert):
+        self.alerts.append(alert)
+        for callback in self.callbacks:
+            callback(alert)
+
+    def _load_alerts(self) -> List[Dict]:
+        return []
+
+    def _load_signal_states(self):
+        pass
+
+    def _save_signal_state(self, state):
+        pass
+
+
+class ReplayPaperMonitor(PaperTradingMonitor):
+    """PaperTradingMonitor that keeps its trade log in memory"""
+
+    def __init__(self):
+        super().__init__(log_dir=tempfile.gettempdir())
+
+    def _load_metrics(self) -> List[Dict]:
+        return []
+
+    def _load_trades(self) -> List[Dict]:
+        return []
+
+    def _save_metrics(self):
+        pass
+
+    def _save_trades(self):
+        pass
+
+    def log_trade(self, trade_data: Dict):
+        trade_data['timestamp'] = str(trade_data.get('timestamp', datetime.now()))
+        self.trades.append(trade_data)
+
+
+class ReplayTradingEngine(LiveTradingEngine5m):
+    """LiveTradingEngine5m that records dashboard trades instead of writing them"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.saved_trades: List[Dict] = []
+
+    def save_trade_to_database(self, symbol: str, side: str, amount: float, price: float, strategy: str = "Week1Refined5m"):
+        self.saved_trades.append({'symbol': symbol, 'side': side, 'amount': amount, 'price': price,
+                                  'timestamp': datetime.now(), 'strategy': strategy})
+
+
+def frame_to_candles(df: pd.DataFrame, symbol: str, timeframe: str = '5m') -> List[Candle]:
+    """Candle dataclasses from an OHLCV frame indexed by timestamp"""
+    columns = _ohlcv_columns(df)
+    return [
+        Candle(symbol, timestamp, o, h, l, c, v, timeframe)
+        for timestamp, o, h, l, c, v in zip(df.index.to_pydatetime(), *(df[name].to_numpy(dtype=float) for name in columns))
+    ]
+
+
+def candle_ticks(df: pd.DataFrame, symbol: str, timeframe_minutes: int = 5) -> Iterator[PriceUpdate]:
+    """
+    Synthetic ticks that rebuild each candle exactly in CandleAggregator
+
+    Four ticks per candle, a quarter period apart: open, then the extreme
+    nearer the open's side of the move (high for a down candle, low for an
+    up candle), the other extreme and the close. Volume is split evenly.
+
+    Args:
+        df: OHLCV candles indexed by timestamp
+        symbol: Symbol for the updates
+        timeframe_minutes: Candle period
+
+    Yields:
+        PriceUpdate in time order
+    """
+    o, h, l, c, v = (df[name].to_numpy(dtype=float) for name in _ohlcv_columns(df))
+    down = c < o
+    prices = np.column_stack([o, np.where(down, h, l), np.where(down, l, h), c])
+    step = timedelta(minutes=timeframe_minutes) / 4
+
+    for start, row, volume in zip(df.index.to_pydatetime(), prices.tolist(), (v / 4).tolist()):
+        for k, price in enumerate(row):
+            yield PriceUpdate(symbol=symbol, price=price, timestamp=start + step * k, volume=volume)
+
+
+def recorded_ticks(df: pd.DataFrame) -> Iterator[PriceUpdate]:
+    """
+    PriceUpdates from recorded ticks (e.g. stored feed updates)
+
+    Args:
+        df: Columns symbol, timestamp, price and optionally volume
+
+    Yields:
+        PriceUpdate in time order
+    """
+    df = df.sort_values('timestamp', kind='stable')
+    volume = df['volume'] if 'volume' in df.columns else pd.Series(0.0, index=df.index)
+    timestamps = pd.to_datetime(df['timestamp']).dt.to_pydatetime()
+    for symbol, timestamp, price, qty in zip(df['symbol'], timestamps, df['price'].astype(float), volume.astype(float)):
+        yield PriceUpdate(symbol=symbol, price=price, timestamp=timestamp, volume=qty)
+
+
+def _ohlcv_columns(df: pd.DataFrame) -> List[str]:
+    if 'close_price' in df.columns:
+        return ['open_price', 'high_price', 'low_price', 'close_price', 'volume']
+    return ['open', 'high', 'low', 'close', 'volume']
+
+
+def _trade_record(trade) -> Dict:
+    return {'timestamp': trade.timestamp, 'symbol': trade.symbol, 'side': trade.side,
+            'amount': trade.amount, 'price': trade.price, 'order_id': trade.order_id}
+
+
+class LiveReplay:
+    """
+    Accelerated replay through the real live pipeline
+
+    Ticks go to DataFeedManager subscribers (the candle aggregator) as they
+    "arrive"; the engine runs trading_cycle every update_interval seconds of
+    simulated time. Ticks stamped at or before a cycle are delivered first.
+    """
+
+    def __init__(self, symbols: List[str], engine: Optional[LiveTradingEngine5m] = None,
+                 update_interval: Optional[float] = None, timeframe_minutes: int = 5,
+                 exchange: Optional[ExchangeInterface] = None):
+        """
+        Args:
+            symbols: Symbols to trade
+            engine: Engine to drive (a ReplayTradingEngine on the replayed
+                feed if None; paper trading unless an exchange is given)
+            update_interval: Seconds between cycles (the engine's if None)
+            timeframe_minutes: Candle period of the aggregator
+            exchange: Exchange for tickers and orders (e.g. a
+                SimulatedExchange, which then follows the replayed prices)
+        """
+        self.symbols = symbols
+        self.clock = SimulatedClock()
+
+        self.feed_manager = DataFeedManager(symbols, feed=LiveDataFeed(symbols))
+        self.feed_manager.store_to_db = False
+        self.aggregator = ReplayCandleAggregator(symbols, timeframe_minutes=timeframe_minutes)
+        self.feed_manager.subscribe_to_prices(self.aggregator.process_price_update)
+
+        if exchange is None:
+            self.exchange = FeedExchange(self.feed_manager, self.clock)
+        else:
+            self.exchange = exchange
+            if hasattr(exchange, 'attach_feed'):
+                exchange.attach_feed(self.feed_manager)
+            if hasattr(exchange, 'set_clock'):
+                exchange.set_clock(self.clock.seconds, self.clock.sleep)
+        self.engine = engine or ReplayTradingEngine(
+            symbols, paper_trading=exchange is None, exchange=self.exchange,
+            signal_monitor=ReplaySignalMonitor(), paper_monitor=ReplayPaperMonitor()
+        )
+        self.engine.candle_aggregator = self.aggregator
+        self.update_interval = update_interval or self.engine.update_interval
+
+    def preload(self, candles: List[Candle]):
+        """Seed the aggregator with completed candles before the replay"""
+        self.aggregator.preload(candles)
+
+    async def run(self, ticks: Iterable[PriceUpdate]) -> Dict:
+        """
+        Replay ticks (in time order) and run the engine on the simulated schedule
+
+        Returns:
+            Dict with trades, per-cycle equity, engine metrics and throughput
+        """
+        engine, clock = self.engine, self.clock
+        equity = []
+        n_ticks = cycles = 0
+        next_cycle = None
+
+        async def cycle():
+            nonlocal cycles
+            await engine.trading_cycle()
+            equity.append((clock.now(), engine.portfolio.get_portfolio_value()))
+            cycles += 1
+
+        started = time.perf_counter()
+        with clock.patch():
+            await self.feed_manager.start()
+            try:
+                for update in ticks:
+                    if next_cycle is None:
+                        # Engine starts with the feed, first cycle after the first tick
+                        clock.set(update.timestamp)
+                        next_cycle = update.timestamp
+                        engine.running, engine.start_time = True, clock.now()
+
+                    while next_cycle < update.timestamp:
+                        clock.set(next_cycle)
+                        await cycle()
+                        next_cycle += timedelta(seconds=self.update_interval)
+
+                    clock.set(update.timestamp)
+                    self.feed_manager.feed.notify_subscribers(update)
+                    n_ticks += 1
+
+                if next_cycle is not None:
+                    clock.set(next_cycle)
+                    await cycle()
+                metrics = engine.get_performance_metrics()
+            finally:
+                engine.running = False
+                await self.feed_manager.stop()
+        elapsed = time.perf_counter() - started
+
+        simulated = (equity[-1][0] - equity[0][0]).total_seconds() if equity else 0.0
+        return {
+            'trades': [_trade_record(trade) for trade in engine.portfolio.trades],
+            'equity_curve': equity,
+            'metrics': metrics,
+            'ticks': n_ticks,
+            'cycles': cycles,
+            'candles': self.aggregator.completed,
+            'simulated_seconds': simulated,
+            'elapsed': elapsed,
+            'speedup': simulated / max(elapsed, 1e-9),
+            'ticks_per_second': n_ticks / max(elapsed, 1e-9),
+            'cycles_per_second': cycles / max(elapsed, 1e-9)
+        }
+
+    def run_sync(self, ticks: Iterable[PriceUpdate]) -> Dict:
+        """Blocking wrapper around run()"""
+        return asyncio.run(self.run(ticks))
+
+
+def replay_history(frames: Dict[str, pd.DataFrame], warmup: int = 300, **kwargs) -> Dict:
+    """
+    Replay historical candles through the live pipeline
+
+    The first `warmup` candles of each symbol seed the aggregator history;
+    the rest are replayed as candle_ticks.
+
+    Args:
+        frames: Symbol -> OHLCV candles indexed by timestamp
+        warmup: Candles preloaded per symbol
+        **kwargs: Passed to LiveReplay
+
+    Returns:
+        LiveReplay.run result
+    """
+    replay = LiveReplay(list(frames), **kwargs)
+    minutes = replay.aggregator.timeframe_minutes
+    streams = []
+    for symbol, df in frames.items():
+        replay.preload(frame_to_candles(df.iloc[:warmup], symbol, replay.aggregator.timeframe_str))
+        streams.append(candle_ticks(df.iloc[warmup:], symbol, minutes))
+
+    return replay.run_sync(heapq.merge(*streams, key=lambda update: update.timestamp))
+
+
+def main():
+    """Replay recent history through the live engine and report throughput"""
+    import argparse
+    from data.backtest_data import get_backtest_data_provider
+
+    parser = argparse.ArgumentParser(description='Accelerated replay through the live trading pipeline')
+    parser.add_argument('--symbols', nargs='+', default=['BTCUSDT', 'ETHUSDT', 'SOLUSDT'])
+    parser.add_argument('--days', type=float, default=1.0, help='Days of 5m candles to replay')
+    parser.add_argument('--warmup', type=int, default=300, help='Candles preloaded per symbol')
+    parser.add_argument('--ticks', help='CSV of recorded ticks (symbol,timestamp,price[,volume]) instead of candles')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    print("⏩ Live Pipeline Replay")
+    print("=" * 70)
+
+    if args.ticks:
+        replay = LiveReplay(args.symbols)
+        result = replay.run_sync(recorded_ticks(pd.read_csv(args.ticks)))
+    else:
+        provider = get_backtest_data_provider()
+        lookback = args.days + args.warmup * 5 / (24 * 60)
+        frames = {}
+        for symbol in args.symbols:
+            df = provider.get_frame(symbol, lookback_days=lookback, style='price')
+            if df is None:
+                print(f"❌ No data for {symbol}")
+                continue
+            frames[symbol] = df
+        if not frames:
+            return
+        result = replay_history(frames, warmup=args.warmup)
+
+    metrics = result['metrics']
+    print(f"Ticks: {result['ticks']:,} | Cycles: {result['cycles']:,} | Candles: {result['candles']:,}")
+    print(f"Simulated: {result['simulated_seconds'] / 3600:.1f}h in {result['elapsed']:.2f}s "
+          f"(x{result['speedup']:,.0f}, {result['ticks_per_second']:,.0f} ticks/s, "
+          f"{result['cycles_per_second']:,.0f} cycles/s)")
+    if metrics:
+        print(f"Trades: {metrics['total_trades']} | Portfolio: ${metrics['portfolio_value']:,.2f} "
+              f"({metrics['total_return'] * 100:+.2f}%)")
+    for trade in result['trades'][-10:]:
+        print(f"  {trade['timestamp']} {trade['side']:4} {trade['symbol']} {trade['amount']:.6f} @ ${trade['price']:.2f}")
+
+
+
+if __name__ == "__main__":
+    main()
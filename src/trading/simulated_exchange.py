@@ -0,0 +1,604 @@
+"""
+Simulated Exchange
+In-process exchange behind ExchangeInterface for load tests and replays
+
+- Matching engine over a per-symbol order book: market orders walk the
+  levels (slippage, partial fills when depth runs out), limit orders take
+  what crosses and rest the remainder until the book trades through them
+- Synthetic books around a random-walk mid, or replayed prices / books
+  (set_price, set_book, attach_feed)
+- Configurable network latency, maker / taker fees and a token-bucket rate
+  limit that rejects requests like an HTTP 429
+"""
+import asyncio
+import math
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from trading.exchange_integration import ExchangeInterface
+
+logger = logging.getLogger(__name__)
+
+QUOTE_ASSETS = ('USDT', 'BUSD', 'USDC', 'USD')
+
+DEFAULT_PRICES = {
+    'BTCUSDT': 32030.58,
+    'ETHUSDT': 2529.55,
+    'SOLUSDT': 108.04,
+    'ADAUSDT': 0.55,
+    'DOTUSDT': 5.23
+}
+
+RATE_LIMIT_ERROR = 'Rate limit exceeded (429): too many requests'
+
+
+def split_symbol(symbol: str) -> Tuple[str, str]:
+    """'BTCUSDT' -> ('BTC', 'USDT')"""
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    raise ValueError(f"Unknown quote asset in symbol '{symbol}'")
+
+
+@dataclass
+class OrderBook:
+    """Price levels as [price, quantity]; bids descending, asks ascending"""
+    bids: List[List[float]]
+    asks: List[List[float]]
+
+    @classmethod
+    def synthetic(cls, mid: float, spread_bps: float = 2.0, levels: int = 20,
+                  level_bps: float = 1.0, depth: float = 50_000.0,
+                  rng: Optional[random.Random] = None) -> 'OrderBook':
+        """
+        Book around a mid price
+
+        Args:
+            mid: Mid price
+            spread_bps: Best bid / ask distance in basis points
+            levels: Levels per side
+            level_bps: Distance between levels in basis points
+            depth: Average quote value per level (randomized +-50%)
+            rng: Random generator for level sizes
+        """
+        rng = rng or random.Random()
+        half = spread_bps / 2e4
+        step = level_bps / 1e4
+        bids, asks = [], []
+        for k in range(levels):
+            bid = mid * (1 - half - k * step)
+            ask = mid * (1 + half + k * step)
+            bids.append([bid, depth * rng.uniform(0.5, 1.5) / bid])
+            asks.append([ask, depth * rng.uniform(0.5, 1.5) / ask])
+        return cls(bids, asks)
+
+    @property
+    def mid(self) -> Optional[float]:
+        if self.bids and self.asks:
+            return (self.bids[0][0] + self.asks[0][0]) / 2
+        if self.bids or self.asks:
+            return (self.bids or self.asks)[0][0]
+        return None
+
+
+@dataclass
+class SimulatedOrder:
+    """Order state; amount is base quantity except for market buys (quote)"""
+    order_id: int
+    symbol: str
+    side: str
+    order_type: str
+    amount: float
+    price: Optional[float]
+    timestamp: datetime
+    status: str = 'NEW'
+    filled: float = 0.0
+    cost: float = 0.0
+    fee: float = 0.0
+    locked: float = 0.0
+    fills: List[Dict] = field(default_factory=list)
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in ('NEW', 'PARTIALLY_FILLED')
+
+    def to_dict(self) -> Dict:
+        """BinanceExchange.place_order format plus execution details"""
+        return {
+            'order_id': self.order_id,
+            'symbol': self.symbol,
+            'side': self.side,
+            'type': self.order_type,
+            'amount': self.amount,
+            'price': self.price,
+            'status': self.status,
+            'timestamp': self.timestamp,
+            'filled_amount': self.filled,
+            'filled_price': self.cost / self.filled if self.filled else None,
+            'cost': self.cost,
+            'fee': self.fee,
+            'fills': list(self.fills)
+        }
+
+
+class SimulatedExchange(ExchangeInterface):
+    """
+    In-process exchange with a matching engine, latency, fees and rate limits
+
+    Order semantics follow BinanceExchange: market BUY amounts are in quote
+    currency (quoteOrderQty), market SELL and limit amounts in base units.
+    Fees are charged in the quote asset.
+    """
+
+    def __init__(self, balances: Optional[Dict[str, float]] = None,
+                 prices: Optional[Dict[str, float]] = None,
+                 latency_ms: float = 0.0, latency_jitter_ms: float = 0.0,
+                 taker_fee: float = 0.001, maker_fee: float = 0.001,
+                 spread_bps: float = 2.0, levels: int = 20, level_bps: float = 1.0,
+                 depth: float = 50_000.0, volatility: float = 0.0005,
+                 refresh_interval: float = 1.0, rate_limit: Optional[float] = 20.0,
+                 burst: Optional[float] = None, seed: Optional[int] = None,
+                 time_fn: Callable[[], float] = time.monotonic, sleep=asyncio.sleep):
+        """
+        Args:
+            balances: Starting free balances per asset (10,000 USDT if None)
+            prices: Starting mid prices for synthetic books
+            latency_ms: Mean one-way-and-back request latency
+            latency_jitter_ms: Latency standard deviation
+            taker_fee / maker_fee: Fee rates (0.001 = 0.1%)
+            spread_bps / levels / level_bps / depth: Synthetic book shape
+                (see OrderBook.synthetic)
+            volatility: Random-walk volatility of synthetic mids per sqrt(second)
+            refresh_interval: Seconds between synthetic book refreshes;
+                taken depth stays gone until the next refresh
+            rate_limit: Requests per second (None disables the limit)
+            burst: Token bucket size (defaults to one second of requests)
+            seed: Random seed for books, mids and latency
+            time_fn: Clock in seconds (e.g. a replay clock)
+            sleep: Coroutine used to wait out latency
+        """
+        self.balances = {asset: {'free': float(amount), 'locked': 0.0}
+                         for asset, amount in (balances or {'USDT': 10000.0}).items()}
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.book_shape = {'spread_bps': spread_bps, 'levels': levels, 'level_bps': level_bps, 'depth': depth}
+        self.volatility = volatility
+        self.refresh_interval = refresh_interval
+        self.rate_limit = rate_limit
+        self.burst = burst or rate_limit or 0.0
+        self.rng = random.Random(seed)
+        self.time_fn = time_fn
+        self.sleep = sleep
+
+        self.books: Dict[str, OrderBook] = {}
+        self.book_times: Dict[str, float] = {}
+        self.replayed: set = set()  # Symbols whose prices come from outside
+        self.orders: Dict[int, SimulatedOrder] = {}
+        self.resting: Dict[str, Dict[int, SimulatedOrder]] = {}  # Open limit orders per symbol
+        self.next_order_id = 1
+
+        self._tokens = self.burst
+        self._token_time = time_fn()
+        self.counters = {'requests': 0, 'rate_limited': 0, 'orders': 0, 'rejected': 0,
+                         'fills': 0, 'volume': 0.0, 'fees': 0.0, 'latency': 0.0}
+
+    # ------------------------------------------------------------------
+    # Market data
+    # ------------------------------------------------------------------
+
+    def set_price(self, symbol: str, price: float):
+        """Replay a price: rebuild the symbol's book around it and match resting orders"""
+        self.replayed.add(symbol)
+        self.prices[symbol] = price
+        self._install_book(symbol, OrderBook.synthetic(price, rng=self.rng, **self.book_shape))
+
+    def set_book(self, symbol: str, bids: Sequence[Tuple[float, float]], asks: Sequence[Tuple[float, float]]):
+        """Replay an order book snapshot"""
+        self.replayed.add(symbol)
+        book = OrderBook(sorted(([float(p), float(q)] for p, q in bids), reverse=True),
+                         sorted([float(p), float(q)] for p, q in asks))
+        if book.mid is not None:
+            self.prices[symbol] = book.mid
+        self._install_book(symbol, book)
+
+    def attach_feed(self, feed_manager):
+        """Follow a DataFeedManager: every PriceUpdate becomes the symbol's mid"""
+        feed_manager.subscribe_to_prices(lambda update: self.set_price(update.symbol, update.price))
+
+    def get_book(self, symbol: str) -> OrderBook:
+        """Current book, refreshing synthetic books on their interval"""
+        now = self.time_fn()
+        book = self.books.get(symbol)
+        if symbol in self.replayed and book is not None:
+            return book
+
+        last = self.book_times.get(symbol)
+        if book is None or now - last >= self.refresh_interval:
+            mid = self.prices.get(symbol, 100.0)
+            if last is not None and self.volatility:
+                mid *= math.exp(self.volatility * math.sqrt(now - last) * self.rng.gauss(0, 1))
+            self.prices[symbol] = mid
+            self._install_book(symbol, OrderBook.synthetic(mid, rng=self.rng, **self.book_shape), now)
+        return self.books[symbol]
+
+    def _install_book(self, symbol: str, book: OrderBook, now: Optional[float] = None):
+        self.books[symbol] = book
+        self.book_times[symbol] = self.time_fn() if now is None else now
+        self._match_resting(symbol, book)
+
+    # ------------------------------------------------------------------
+    # ExchangeInterface
+    # ------------------------------------------------------------------
+
+    async def get_balance(self) -> Dict:
+        """Non-zero balances in the BinanceExchange format"""
+        if not await self._arrive():
+            return {}
+        balances = {
+            asset: {'free': b['free'], 'locked': b['locked'], 'total': b['free'] + b['locked']}
+            for asset, b in self.balances.items() if b['free'] + b['locked'] > 0
+        }
+        await self._respond()
+        return balances
+
+    async def get_ticker(self, symbol: str) -> Dict:
+        """Mid price of the symbol's book ({} when rate limited)"""
+        if not await self._arrive():
+            return {}
+        book = self.get_book(symbol)
+        ticker = {'symbol': symbol, 'price': book.mid, 'timestamp': datetime.now(),
+                  'bid': book.bids[0][0] if book.bids else None,
+                  'ask': book.asks[0][0] if book.asks else None}
+        await self._respond()
+        return ticker
+
+    async def place_order(self, symbol: str, side: str, amount: float, price: Optional[float] = None) -> Dict:
+        """
+        Place a market (price=None) or limit order
+
+        Returns:
+            Order dict (see SimulatedOrder.to_dict) or {'error': message}
+        """
+        if not await self._arrive():
+            return {'error': RATE_LIMIT_ERROR}
+        result = self._execute(symbol, side.upper(), amount, price)
+        await self._respond()
+        return result
+
+    async def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict]:
+        if not await self._arrive():
+            return []
+        orders = [order.to_dict() for book_symbol, resting in self.resting.items()
+                  if symbol is None or book_symbol == symbol for order in resting.values()]
+        await self._respond()
+        return orders
+
+    async def cancel_order(self, order_id: str, symbol: str) -> Dict:
+        if not await self._arrive():
+            return {'error': RATE_LIMIT_ERROR}
+        # Ids from other executors (paper_buy_..., replay_N) are unknown here
+        order = self.orders.get(int(order_id)) if str(order_id).isdigit() else None
+        if order is None or order.symbol != symbol:
+            result = {'error': f'Unknown order {order_id}'}
+        elif not order.is_open:
+            result = {'error': f'Order {order_id} is already {order.status}'}
+        else:
+            self._release(order)
+            order.status = 'CANCELED'
+            del self.resting[symbol][order.order_id]
+            result = {'order_id': order.order_id, 'symbol': symbol, 'status': 'CANCELED'}
+        await self._respond()
+        return result
+
+    def set_clock(self, time_fn: Callable[[], float], sleep=None):
+        """Switch to another time source (e.g. a replay clock) and reset timers"""
+        self.time_fn = time_fn
+        if sleep is not None:
+            self.sleep = sleep
+        self._tokens, self._token_time = self.burst, time_fn()
+        self.book_times.clear()
+
+    def stats(self) -> Dict:
+        """Request, order, fill and fee counters plus mean latency in ms"""
+        stats = dict(self.counters)
+        stats['avg_latency_ms'] = stats.pop('latency') / max(stats['requests'], 1) * 1000
+        stats['open_orders'] = sum(len(resting) for resting in self.resting.values())
+        return stats
+
+    # ------------------------------------------------------------------
+    # Network model
+    # ------------------------------------------------------------------
+
+    async def _arrive(self) -> bool:
+        """Outbound half of the latency, then the server-side rate limit check"""
+        self.counters['requests'] += 1
+        await self._wait()
+
+        if self.rate_limit is None:
+            return True
+        now = self.time_fn()
+        self._tokens = min(self.burst, self._tokens + (now - self._token_time) * self.rate_limit)
+        self._token_time = now
+        if self._tokens < 1:
+            self.counters['rate_limited'] += 1
+            await self._wait()
+            return False
+        self._tokens -= 1
+        return True
+
+    async def _respond(self):
+        await self._wait()
+
+    async def _wait(self):
+        if self.latency_ms <= 0 and self.latency_jitter_ms <= 0:
+            return
+        delay = max(0.0, self.rng.gauss(self.latency_ms, self.latency_jitter_ms)) / 2000
+        self.counters['latency'] += delay
+        await self.sleep(delay)
+
+    # ------------------------------------------------------------------
+    # Matching engine
+    # ------------------------------------------------------------------
+
+    def _execute(self, symbol: str, side: str, amount: float, price: Optional[float]) -> Dict:
+        try:
+            base, quote = split_symbol(symbol)
+        except ValueError as e:
+            return self._reject(str(e))
+        if side not in ('BUY', 'SELL'):
+            return self._reject(f"Invalid side '{side}'")
+        if not amount > 0 or (price is not None and not price > 0):
+            return self._reject('Amount and price must be positive')
+
+        book = self.get_book(symbol)
+        order = SimulatedOrder(self.next_order_id, symbol, side, 'MARKET' if price is None else 'LIMIT',
+                               amount, price, datetime.now())
+
+        # Funds are locked up front, like an exchange holding them for the order
+        if side == 'BUY':
+            need = amount * (1 + self.taker_fee) if price is None else \
+                amount * price * (1 + max(self.taker_fee, self.maker_fee))
+            asset = quote
+        else:
+            need, asset = amount, base
+        if self._balance(asset)['free'] < need:
+            return self._reject(f'Insufficient {asset} balance')
+
+        self.next_order_id += 1
+        self.counters['orders'] += 1
+        self._balance(asset)['free'] -= need
+        self._balance(asset)['locked'] += need
+        order.locked = need
+
+        levels = book.asks if side == 'BUY' else book.bids
+        if price is None and side == 'BUY':
+            self._take(order, levels, quote_budget=amount)
+        else:
+            self._take(order, levels, quantity=amount, limit=price)
+
+        if order.order_type == 'MARKET' or order.filled >= order.amount:
+            # Market remainders expire (IOC); funds not used are returned
+            self._release(order)
+            if order.filled == 0:
+                order.status = 'EXPIRED'
+                self.orders[order.order_id] = order
+                return {'error': f'Insufficient liquidity for {symbol}', 'order_id': order.order_id}
+            order.status = 'FILLED' if self._complete(order) else 'PARTIALLY_FILLED'
+        else:
+            order.status = 'PARTIALLY_FILLED' if order.filled else 'NEW'
+            self.resting.setdefault(symbol, {})[order.order_id] = order
+        self.orders[order.order_id] = order
+        return order.to_dict()
+
+    def _take(self, order: SimulatedOrder, levels: List[List[float]], quantity: Optional[float] = None,
+              quote_budget: Optional[float] = None, limit: Optional[float] = None):
+        """Fill an incoming order against book levels (taker)"""
+        buy = order.side == 'BUY'
+        while levels:
+            level_price, level_qty = levels[0]
+            if limit is not None and (level_price > limit if buy else level_price < limit):
+                break
+            if quote_budget is not None:
+                qty = min(level_qty, (quote_budget - order.cost) / level_price)
+            else:
+                qty = min(level_qty, quantity - order.filled)
+            if qty <= 0:
+                break
+
+            self._fill(order, level_price, qty, maker=False)
+            if qty >= level_qty:
+                levels.pop(0)
+            else:
+                levels[0][1] -= qty
+            if quote_budget is not None and order.cost >= quote_budget * (1 - 1e-12):
+                break
+
+    def _match_resting(self, symbol: str, book: OrderBook):
+        """Resting limit orders fill at their price when the book trades through them"""
+        resting = self.resting.get(symbol, {})
+        for order in list(resting.values()):
+            levels = book.asks if order.side == 'BUY' else book.bids
+            while levels and order.filled < order.amount:
+                level_price, level_qty = levels[0]
+                if (level_price > order.price) if order.side == 'BUY' else (level_price < order.price):
+                    break
+                qty = min(level_qty, order.amount - order.filled)
+                self._fill(order, order.price, qty, maker=True)
+                if qty >= level_qty:
+                    levels.pop(0)
+                else:
+                    levels[0][1] -= qty
+
+            if order.filled > 0:
+                if self._complete(order):
+                    order.status = 'FILLED'
+                    self._release(order)
+                    del resting[order.order_id]
+                else:
+                    order.status = 'PARTIALLY_FILLED'
+
+    def _fill(self, order: SimulatedOrder, price: float, qty: float, maker: bool):
+        base, quote = split_symbol(order.symbol)
+        value = price * qty
+        fee = value * (self.maker_fee if maker else self.taker_fee)
+
+        if order.side == 'BUY':
+            spent = value + fee
+            self._balance(quote)['locked'] -= spent
+            order.locked -= spent
+            self._balance(base)['free'] += qty
+        else:
+            self._balance(base)['locked'] -= qty
+            order.locked -= qty
+            self._balance(quote)['free'] += value - fee
+
+        order.filled += qty
+        order.cost += value
+        order.fee += fee
+        order.fills.append({'price': price, 'amount': qty, 'fee': fee, 'maker': maker})
+        self.counters['fills'] += 1
+        self.counters['volume'] += value
+        self.counters['fees'] += fee
+
+    def _complete(self, order: SimulatedOrder) -> bool:
+        if order.order_type == 'MARKET' and order.side == 'BUY':
+            return order.cost >= order.amount * (1 - 1e-9)
+        return order.filled >= order.amount * (1 - 1e-9)
+
+    def _release(self, order: SimulatedOrder):
+        """Return an order's unused locked funds"""
+        base, quote = split_symbol(order.symbol)
+        asset = quote if order.side == 'BUY' else base
+        self._balance(asset)['locked'] -= order.locked
+        self._balance(asset)['free'] += order.locked
+        order.locked = 0.0
+
+    def _balance(self, asset: str) -> Dict[str, float]:
+        return self.balances.setdefault(asset, {'free': 0.0, 'locked': 0.0})
+
+    def _reject(self, message: str) -> Dict:
+        self.counters['rejected'] += 1
+        return {'error': message}
+
+    @classmethod
+    def from_env(cls) -> 'SimulatedExchange':
+        """Exchange configured from SIMULATED_EXCHANGE_* environment variables"""
+        rate_limit = os.getenv('SIMULATED_EXCHANGE_RATE_LIMIT', '20')
+        return cls(
+            balances={'USDT': float(os.getenv('SIMULATED_EXCHANGE_BALANCE', '10000'))},
+            latency_ms=float(os.getenv('SIMULATED_EXCHANGE_LATENCY_MS', '50')),
+            latency_jitter_ms=float(os.getenv('SIMULATED_EXCHANGE_JITTER_MS', '10')),
+            taker_fee=float(os.getenv('SIMULATED_EXCHANGE_FEE', '0.001')),
+            maker_fee=float(os.getenv('SIMULATED_EXCHANGE_FEE', '0.001')),
+            rate_limit=None if rate_limit.lower() in ('', 'none', '0') else float(rate_limit)
+        )
+
+
+async def load_test(exchange: ExchangeInterface, orders: int = 2000, concurrency: int = 50,
+                    symbols: Sequence[str] = ('BTCUSDT', 'ETHUSDT'), order_value: float = 100.0,
+                    limit_share: float = 0.3, seed: Optional[int] = None) -> Dict:
+    """
+    Fire random orders at an exchange from concurrent clients
+
+    Args:
+        exchange: Exchange under test
+        orders: Total orders
+        concurrency: Concurrent clients
+        symbols: Symbols to trade
+        order_value: Quote value per order
+        limit_share: Fraction of limit orders (priced slightly off the mid)
+        seed: Random seed
+
+    Returns:
+        Dict with throughput, round-trip latency percentiles and outcome counts
+    """
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    outcomes: Dict[str, int] = {}
+    remaining = iter(range(orders))
+
+    async def client():
+        for _ in remaining:
+            symbol = rng.choice(symbols)
+            ticker = await exchange.get_ticker(symbol)
+            mid = ticker.get('price') or DEFAULT_PRICES.get(symbol, 100.0)
+            side = rng.choice(('BUY', 'SELL'))
+
+            if rng.random() < limit_share:
+                price = mid * (1 + rng.uniform(-0.001, 0.001))
+                args = (order_value / price, price)
+            elif side == 'BUY':
+                args = (order_value, None)
+            else:
+                args = (order_value / mid, None)
+
+            started = time.perf_counter()
+            result = await exchange.place_order(symbol, side, *args)
+            latencies.append(time.perf_counter() - started)
+
+            outcome = 'error: ' + result['error'].split(':')[0] if 'error' in result else result['status']
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    percentile = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        'orders': len(latencies),
+        'elapsed': elapsed,
+        'orders_per_second': len(latencies) / max(elapsed, 1e-9),
+        'latency_p50_ms': percentile(0.5),
+        'latency_p99_ms': percentile(0.99),
+        'outcomes': outcomes
+    }
+
+
+def main():
+    """Load test the simulated exchange"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Simulated exchange load test')
+    parser.add_argument('--orders', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=10.0)
+    parser.add_argument('--rate-limit', type=float, default=None, help='Requests per second (default: unlimited)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    exchange = SimulatedExchange(
+        balances={'USDT': 1e9, 'BTC': 1e4, 'ETH': 1e5},
+        latency_ms=args.latency_ms, latency_jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit, seed=args.seed
+    )
+
+    print("🏦 Simulated Exchange Load Test")
+    print("=" * 70)
+    report = asyncio.run(load_test(exchange, args.orders, args.concurrency, seed=args.seed))
+
+    print(f"Orders: {report['orders']:,} in {report['elapsed']:.2f}s "
+          f"({report['orders_per_second']:,.0f} orders/s, {args.concurrency} clients)")
+    print(f"Round trip: p50 {report['latency_p50_ms']:.1f}ms | p99 {report['latency_p99_ms']:.1f}ms")
+    for outcome, count in sorted(report['outcomes'].items()):
+        print(f"  {outcome:30} {count:,}")
+
+    stats = exchange.stats()
+    print(f"Fills: {stats['fills']:,} | Volume: ${stats['volume']:,.0f} | Fees: ${stats['fees']:,.2f} | "
+          f"Open orders: {stats['open_orders']:,} | Rate limited: {stats['rate_limited']:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Test suite for AI support services
+"""
+import pytest
+import asyncio
+import threading
+import time
+from datetime import datetime
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+try:
+    from ai.sentiment_analyzer import SentimentScore
+    from ai.sentiment_refresher import SentimentRefresher, normalize_symbol, get_sentiment_refresher
+    AI_AVAILABLE = True
+except ImportError:
+    AI_AVAILABLE = False
+
+
+class SlowFetcher:
+    """Blocking fetcher that counts calls and can be released on demand"""
+
+    def __init__(self, sentiment: float = 0.5):
+        self.sentiment = sentiment
+        self.calls = []
+        self.release = threading.Event()
+
+    def __call__(self, symbol: str):
+        self.calls.append(symbol)
+        self.release.wait(5)
+        return SentimentScore(symbol, self.sentiment, 0.8, 'test', [], datetime.now())
+
+
+@pytest.mark.skipif(not AI_AVAILABLE, reason="AI dependencies not available")
+class TestSentimentRefresher:
+    """Stale-while-revalidate, single-flight sentiment refresh"""
+
+    def test_normalize_symbol(self):
+        assert normalize_symbol('BTCUSDT') == 'BTC'
+        assert normalize_symbol('eth/usdt') == 'ETH'
+        assert normalize_symbol('SOL') == 'SOL'
+
+    def test_shared_refresher_collects_three_per_source(self):
+        assert get_sentiment_refresher().max_results == 3
+
+    def test_concurrent_requests_share_one_fetch(self):
+        """Engine, API and commentary callers trigger a single fetch"""
+        fetcher = SlowFetcher()
+        refresher = SentimentRefresher(fetcher=fetcher)
+
+        async def scenario():
+            waiters = [asyncio.ensure_future(refresher.get(s)) for s in ('BTC', 'BTCUSDT', 'BTC/USDT')]
+            await asyncio.sleep(0.05)
+            fetcher.release.set()
+            return await asyncio.gather(*waiters)
+
+        scores = asyncio.run(scenario())
+
+        assert fetcher.calls == ['BTC']
+        assert all(score is scores[0] for score in scores)
+
+    def test_stale_value_served_while_revalidating(self):
+        """An expired score is returned at once and refreshed in the background"""
+        fetcher = SlowFetcher(sentiment=-0.4)
+        fetcher.release.set()
+        refresher = SentimentRefresher(ttl=60, refresh_ahead=0, fetcher=fetcher)
+        stale = SentimentScore('BTC', 0.9, 1.0, 'old', [], datetime.now())
+        refresher._scores['BTC'] = (stale, time.monotonic() - 120)
+
+        async def scenario():
+            first = await refresher.get('BTC')
+            await asyncio.sleep(0.1)
+            return first, await refresher.get('BTC')
+
+        first, second = asyncio.run(scenario())
+
+        assert first is stale
+        assert second.sentiment == -0.4
+        assert fetcher.calls == ['BTC']
+
+    def test_strategy_reads_without_blocking(self):
+        """AIEnhancedStrategy gets neutral until the background fetch lands"""
+        ai = pytest.importorskip('strategies.ai_enhanced_strategy')
+        fetcher = SlowFetcher(sentiment=0.5)
+        refresher = SentimentRefresher(fetcher=fetcher)
+        strategy = ai.AIEnhancedStrategy(sentiment_refresher=refresher)
+
+        async def scenario():
+            await refresher.start()
+            started = time.perf_counter()
+            cold = strategy.get_sentiment_signal('BTC')
+            elapsed = time.perf_counter() - started
+
+            fetcher.release.set()
+            await asyncio.sleep(0.1)
+            warm = strategy.get_sentiment_signal('BTC')
+            await refresher.stop()
+            return cold, elapsed, warm
+
+        cold, elapsed, warm = asyncio.run(scenario())
+
+        assert cold == 0.0
+        assert elapsed < 0.1
+        assert warm == pytest.approx(0.5 * 0.8)
+        assert fetcher.calls == ['BTC']
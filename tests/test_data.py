@@ -2,6 +2,7 @@
 Test suite for data collection and database operations
 """
 import pytest
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import sys
@@ -167,4 +168,242 @@ class TestDataValidation:
         assert trade.price > 0
         
         db_session.add(trade)
-        db_session.commit()
\ No newline at end of file
+        db_session.commit()
+
+class TestBacktestDataProvider:
+    """Test the cached backtest candle provider"""
+    
+    @pytest.fixture
+    def session_factory(self):
+        """In-memory SQLite database with three days of 5m candles"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
+        
+        engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        MarketData.__table__.create(engine)
+        factory = sessionmaker(bind=engine)
+        
+        session = factory()
+        start = pd.Timestamp('2024-01-01')
+        for i in range(864):
+            price = 100.0 + i * 0.1
+            session.add(MarketData(
+                symbol='BTC/USDT', timestamp=(start + pd.Timedelta(minutes=5 * i)).to_pydatetime(),
+                open_price=price, high_price=price + 1, low_price=price - 1,
+                close_price=price + 0.5, volume=10.0
+            ))
+        session.commit()
+        session.close()
+        return factory
+    
+    def test_cache_hits_and_incremental_top_up(self, session_factory, tmp_path):
+        """Repeated ranges are served from memory, extensions query only the missing rows"""
+        from data.backtest_data import BacktestDataProvider
+        
+        provider = BacktestDataProvider(cache_dir=str(tmp_path), session_factory=session_factory)
+        start = datetime(2024, 1, 2)
+        
+        first = provider.get('BTC/USDT', start, datetime(2024, 1, 2, 12), timeframe='5m')
+        assert len(first) == 145
+        assert first.close.dtype == np.float64
+        assert provider.queries == 1
+        
+        again = provider.get('BTC/USDT', start, datetime(2024, 1, 2, 6), timeframe='5m')
+        assert len(again) == 73
+        assert provider.queries == 1
+        assert provider.memory_hits == 1
+        
+        rows_before = provider.rows_fetched
+        provider.refresh_interval = 0
+        longer = provider.get('BTC/USDT', datetime(2024, 1, 1), datetime(2024, 1, 3), timeframe='5m')
+        assert len(longer) == 577
+        assert provider.rows_fetched - rows_before == 577 - 145
+        assert np.all(np.diff(longer.timestamp) == 300 * 10**9)
+    
+    def test_disk_cache_and_frames(self, session_factory, tmp_path):
+        """A new provider reloads the covered range from disk without querying"""
+        from data.backtest_data import BacktestDataProvider
+        
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 2)
+        BacktestDataProvider(cache_dir=str(tmp_path), session_factory=session_factory).get('BTC/USDT', start, end)
+        
+        provider = BacktestDataProvider(cache_dir=str(tmp_path), session_factory=session_factory)
+        frame = provider.get_frame('BTC/USDT', start=start, end=end, style='both', index=False)
+        assert provider.queries == 0
+        assert provider.disk_loads == 1
+        assert len(frame) == 289
+        assert frame['close'].equals(frame['close_price'])
+        assert frame['timestamp'].iloc[0] == pd.Timestamp('2024-01-01', tz='UTC')
+        
+        assert provider.get_frame('ETH/USDT', start=start, end=end) is None
+
+
+class TestCandleStore:
+    """Test month-partitioned memory-mapped candle store"""
+    
+    @staticmethod
+    def _candles(start, periods, symbol='BTC/USDT', offset=0.0):
+        from data.backtest_data import CandleArrays
+        
+        timestamps = pd.date_range(start, periods=periods, freq='5min', tz='UTC').as_unit('ns').asi8
+        close = 100.0 + offset + np.arange(periods, dtype=float)
+        return CandleArrays(symbol, '5m', timestamps, close, close + 1, close - 1, close, np.ones(periods))
+    
+    def test_round_trip_across_months(self, tmp_path):
+        """Candles spanning a month boundary come back whole and in order"""
+        from data.candle_store import CandleStore
+        
+        store = CandleStore(str(tmp_path))
+        candles = self._candles('2024-01-31 12:00', 576)
+        assert store.append(candles) == 576
+        
+        assert store.months('BTC/USDT', '5m') == ['2024-01', '2024-02']
+        assert store.series() == [('BTC/USDT', '5m')]
+        
+        full = CandleStore(str(tmp_path)).read('BTC/USDT', '5m')
+        assert np.array_equal(full.timestamp, candles.timestamp)
+        assert np.array_equal(full.close, candles.close)
+        assert np.array_equal(full.volume, candles.volume)
+        
+        window = store.read('BTC/USDT', '5m', pd.Timestamp('2024-02-01 00:00', tz='UTC'),
+                            pd.Timestamp('2024-02-01 01:00', tz='UTC'))
+        assert len(window) == 13
+        assert window.timestamp[0] == pd.Timestamp('2024-02-01', tz='UTC').value
+    
+    def test_range_inside_month_is_zero_copy(self, tmp_path):
+        """A range inside one partition is a view of the memory-mapped file"""
+        from data.candle_store import CandleStore
+        
+        store = CandleStore(str(tmp_path))
+        store.append(self._candles('2024-03-01', 1000))
+        
+        window = store.read('BTC/USDT', '5m', pd.Timestamp('2024-03-02', tz='UTC'), pd.Timestamp('2024-03-03', tz='UTC'))
+        assert len(window) == 289
+        for column in ('timestamp', 'open', 'close', 'volume'):
+            values = getattr(window, column)
+            assert isinstance(values.base, np.memmap) or isinstance(values, np.memmap)
+            assert not values.flags.writeable
+    
+    def test_appends_skip_stored_candles_and_backfill(self, tmp_path):
+        """Stored candles win over duplicates; older gaps are merged into their month"""
+        from data.candle_store import CandleStore
+        
+        store = CandleStore(str(tmp_path))
+        store.append(self._candles('2024-01-01 02:00', 24))
+        before = store.read('BTC/USDT', '5m')
+        
+        # Overlaps the stored range on both sides
+        assert store.append(self._candles('2024-01-01 00:00', 48, offset=1000.0)) == 24
+        merged = store.read('BTC/USDT', '5m')
+        
+        assert len(merged) == 48
+        assert np.all(np.diff(merged.timestamp) == 300 * 10**9)
+        stored = np.isin(merged.timestamp, before.timestamp)
+        assert np.array_equal(merged.close[stored], before.close)
+        assert np.all(merged.close[~stored] >= 1100)
+        assert os.listdir(tmp_path / 'BTC_USDT' / '5m') == ['2024-01']
+        
+        assert store.append(self._candles('2024-01-01 00:00', 48)) == 0
+    
+    def test_torn_append_is_repaired(self, tmp_path):
+        """Rows missing from some columns are ignored on read and dropped before the next append"""
+        from data.candle_store import CandleStore
+        
+        store = CandleStore(str(tmp_path))
+        store.append(self._candles('2024-01-01', 10))
+        
+        partition = tmp_path / 'BTC_USDT' / '5m' / '2024-01'
+        with open(partition / 'close.bin', 'ab') as f:
+            f.write(np.array([1.0, 2.0]).tobytes())
+        assert len(CandleStore(str(tmp_path)).read('BTC/USDT', '5m')) == 10
+        
+        assert store.append(self._candles('2024-01-01 00:50', 5, offset=10.0)) == 5
+        candles = store.read('BTC/USDT', '5m')
+        assert len(candles) == 15
+        assert np.array_equal(candles.close, 100.0 + np.arange(15))
+        assert os.path.getsize(partition / 'close.bin') == 15 * 8
+    
+    def test_frames_candles_and_provider(self, tmp_path):
+        """DataFrames and aggregator candles are stored; the provider can read from the store"""
+        from data.backtest_data import BacktestDataProvider
+        from data.candle_aggregator import Candle
+        from data.candle_store import CandleStore
+        
+        store = CandleStore(str(tmp_path))
+        df = pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-01', periods=12, freq='5min'),
+            'open': np.arange(12.0), 'high': np.arange(12.0) + 1, 'low': np.arange(12.0) - 1,
+            'close': np.arange(12.0), 'volume': np.ones(12)
+        })
+        assert store.append_frame('ETH/USDT', '5m', df) == 12
+        assert store.append_candle(Candle('ETH/USDT', datetime(2024, 1, 1, 1, 0), 12.0, 13.0, 11.0, 12.5, 2.0, '5m')) == 1
+        
+        provider = BacktestDataProvider(cache_dir=None, store=store, session_factory=lambda: pytest.fail('queried database'))
+        frame = provider.get_frame('ETH/USDT', start=datetime(2023, 12, 31), end=datetime(2024, 1, 2))
+        assert len(frame) == 13
+        assert frame.index[0] == pd.Timestamp('2024-01-01', tz='UTC')
+        assert frame['close'].iloc[-1] == 12.5
+
+
+class TestMarketDataWriter:
+    """Test bulk market data inserts"""
+    
+    @pytest.fixture
+    def engine(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import StaticPool
+        
+        return create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    
+    @staticmethod
+    def _frame(start, periods):
+        close = 100.0 + np.arange(periods, dtype=float)
+        return pd.DataFrame({
+            'timestamp': pd.date_range(start, periods=periods, freq='5min'),
+            'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': np.ones(periods)
+        })
+    
+    def test_bulk_insert_skips_duplicates(self, engine):
+        """Overlapping batches insert only new (symbol, timestamp) rows"""
+        from sqlalchemy.orm import Session
+        from data.market_data_writer import insert_candle_frame
+        
+        MarketData.__table__.create(engine)
+        with Session(engine) as session:
+            assert insert_candle_frame('BTC/USDT', self._frame('2024-01-01', 500), session, batch_size=64) == 500
+            assert insert_candle_frame('BTC/USDT', self._frame('2024-01-01 20:00', 500), session, batch_size=64) == 240
+            assert insert_candle_frame('ETH/USDT', self._frame('2024-01-01', 10), session) == 10
+            
+            assert session.query(MarketData).filter(MarketData.symbol == 'BTC/USDT').count() == 740
+            last = session.query(MarketData).order_by(MarketData.timestamp.desc()).first()
+            assert float(last.close_price) == 599.0
+    
+    def test_unique_index_added_to_existing_table(self, engine):
+        """Tables created without the constraint are deduplicated and indexed"""
+        from sqlalchemy import text
+        from sqlalchemy.orm import Session
+        from data.database import ensure_market_data_unique
+        from data.market_data_writer import insert_candle_frame
+        
+        with engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE market_data (
+                    id INTEGER PRIMARY KEY, symbol VARCHAR(20) NOT NULL, timestamp DATETIME NOT NULL,
+                    open_price NUMERIC NOT NULL, high_price NUMERIC NOT NULL, low_price NUMERIC NOT NULL,
+                    close_price NUMERIC NOT NULL, volume NUMERIC NOT NULL, created_at DATETIME
+                )
+            """))
+            for price in (1.0, 2.0):
+                conn.execute(text(
+                    "INSERT INTO market_data (symbol, timestamp, open_price, high_price, low_price, close_price, volume) "
+                    "VALUES ('BTC/USDT', '2024-01-01 00:00:00.000000', :p, :p, :p, :p, 1)"
+                ), {'p': price})
+        
+        assert ensure_market_data_unique(engine) is True
+        assert ensure_market_data_unique(engine) is False
+        
+        with Session(engine) as session:
+            assert session.query(MarketData).count() == 1
+            assert float(session.query(MarketData).one().close_price) == 1.0
+            assert insert_candle_frame('BTC/USDT', self._frame('2024-01-01', 3), session) == 2
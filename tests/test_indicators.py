@@ -0,0 +1,267 @@
+"""
+Test suite for technical indicator implementations
+"""
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from strategies.technical_indicators import TechnicalIndicators
+from strategies.incremental_indicators import IncrementalIndicatorEngine
+from strategies.indicator_cache import IndicatorCache, get_indicator_cache, frame_watermark
+from strategies.batch_indicators import BatchIndicators, stack_frames
+from strategies.benchmark_indicators import (
+    legacy_on_balance_volume, legacy_parabolic_sar, legacy_commodity_channel_index
+)
+
+
+@pytest.fixture
+def ohlcv_data():
+    """Random-walk OHLCV candles with a flat stretch"""
+    rng = np.random.default_rng(42)
+    n = 1500
+    close = 30000 + np.cumsum(rng.normal(0, 50, n))
+    high = close + rng.uniform(0, 30, n)
+    low = close - rng.uniform(0, 30, n)
+
+    # Flat stretch exercises zero-range / zero-loss edge cases
+    close[200:240] = close[199]
+    high[200:240] = close[199]
+    low[200:240] = close[199]
+
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2025-01-01', periods=n, freq='5min'),
+        'open_price': close,
+        'high_price': high,
+        'low_price': low,
+        'close_price': close,
+        'volume': rng.uniform(1, 100, n)
+    })
+
+
+class TestIncrementalIndicators:
+    """Streaming indicators must match the batch implementations"""
+
+    def test_matches_batch_indicators(self, ohlcv_data):
+        """Every streamed value matches calculate_all_indicators"""
+        batch = TechnicalIndicators.calculate_all_indicators(ohlcv_data)
+
+        engine = IncrementalIndicatorEngine()
+        streamed = pd.DataFrame([
+            engine.update('BTCUSDT', row) for row in ohlcv_data.to_dict('records')
+        ])
+
+        for column in streamed.columns:
+            np.testing.assert_allclose(
+                streamed[column].values, batch[column].values,
+                rtol=1e-8, atol=1e-8, err_msg=column
+            )
+
+    def test_sync_applies_only_new_candles(self, ohlcv_data):
+        """sync() skips candles at or before the last seen timestamp"""
+        records = ohlcv_data.to_dict('records')
+        engine = IncrementalIndicatorEngine()
+
+        engine.sync('BTCUSDT', records[:300])
+        engine.sync('BTCUSDT', records[:300])
+        latest = engine.sync('BTCUSDT', records[:301])
+
+        assert engine.candle_count('BTCUSDT') == 301
+        expected = TechnicalIndicators.rsi(ohlcv_data['close_price'].iloc[:301]).iloc[-1]
+        assert latest['rsi'] == pytest.approx(expected, rel=1e-9)
+
+    def test_symbols_are_independent(self, ohlcv_data):
+        """State is kept per symbol"""
+        records = ohlcv_data.to_dict('records')
+        engine = IncrementalIndicatorEngine()
+
+        for record in records[:100]:
+            engine.update('BTCUSDT', record)
+        engine.update('ETHUSDT', records[0])
+
+        assert engine.candle_count('BTCUSDT') == 100
+        assert engine.candle_count('ETHUSDT') == 1
+        assert np.isnan(engine.get('ETHUSDT')['sma_20'])
+
+
+class TestVectorizedKernels:
+    """Array-backed kernels must reproduce the previous row-by-row output"""
+
+    def test_obv_identical_to_legacy(self, ohlcv_data):
+        """OBV from signed-volume cumsum equals the .iloc loop"""
+        expected = legacy_on_balance_volume(ohlcv_data['close_price'], ohlcv_data['volume'])
+        actual = TechnicalIndicators.on_balance_volume(ohlcv_data['close_price'], ohlcv_data['volume'])
+        pd.testing.assert_series_equal(actual, expected)
+
+    def test_psar_identical_to_legacy(self, ohlcv_data):
+        """PSAR over raw buffers equals the .iloc loop"""
+        expected = legacy_parabolic_sar(ohlcv_data['high_price'], ohlcv_data['low_price'])
+        actual = TechnicalIndicators.parabolic_sar(ohlcv_data['high_price'], ohlcv_data['low_price'])
+        pd.testing.assert_series_equal(actual, expected)
+
+    def test_cci_identical_to_legacy(self, ohlcv_data):
+        """CCI from windowed views equals rolling.apply"""
+        args = (ohlcv_data['high_price'], ohlcv_data['low_price'], ohlcv_data['close_price'])
+        pd.testing.assert_series_equal(
+            TechnicalIndicators.commodity_channel_index(*args),
+            legacy_commodity_channel_index(*args)
+        )
+
+    def test_rolling_mad_chunk_boundaries(self, ohlcv_data):
+        """Chunked evaluation does not change results"""
+        data = ohlcv_data['close_price']
+        expected = data.rolling(20).apply(lambda x: np.mean(np.abs(x - x.mean())), raw=True)
+        actual = TechnicalIndicators.rolling_mean_absolute_deviation(data, 20, chunk_size=97)
+        pd.testing.assert_series_equal(actual, expected)
+
+
+class TestIndicatorCache:
+    """Shared indicator cache keyed by candle watermark"""
+
+    def test_hit_after_miss(self, ohlcv_data):
+        """Second identical request is served from the cache"""
+        cache = IndicatorCache()
+        close = ohlcv_data['close_price']
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return TechnicalIndicators.rsi(close)
+
+        first = cache.get_or_compute('BTCUSDT', '5m', 'rsi', {'period': 14}, 't0', compute)
+        second = cache.get_or_compute('BTCUSDT', '5m', 'rsi', {'period': 14}, 't0', compute)
+
+        assert second is first
+        assert len(calls) == 1
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_lru_eviction(self):
+        """Least recently used entry is evicted first"""
+        cache = IndicatorCache(max_entries=2)
+        cache.put('BTCUSDT', '5m', 'sma', {'period': 5}, 't0', 1)
+        cache.put('BTCUSDT', '5m', 'sma', {'period': 10}, 't0', 2)
+        cache.get('BTCUSDT', '5m', 'sma', {'period': 5}, 't0')
+        cache.put('BTCUSDT', '5m', 'sma', {'period': 20}, 't0', 3)
+
+        assert cache.get('BTCUSDT', '5m', 'sma', {'period': 10}, 't0') is None
+        assert cache.get('BTCUSDT', '5m', 'sma', {'period': 5}, 't0') == 1
+        assert cache.stats()['evictions'] == 1
+
+    def test_engine_and_chart_frames_share_entries(self):
+        """Same candles key the same entry whatever the symbol or timestamp format"""
+        cache = IndicatorCache()
+        timestamps = pd.date_range('2025-01-01', periods=30, freq='5min')
+        close = pd.Series(np.linspace(100, 110, 30))
+        engine_df = pd.DataFrame({'timestamp': timestamps, 'close': close})
+        chart_df = pd.DataFrame({'timestamp': timestamps.tz_localize('UTC'), 'close': close})
+
+        engine_value = cache.get_or_compute('BTCUSDT', '5m', 'rsi', {'period': 14},
+                                            frame_watermark(engine_df), lambda: TechnicalIndicators.rsi(close))
+        chart_value = cache.get('BTC/USDT', '5m', 'rsi', {'period': 14}, frame_watermark(chart_df))
+
+        assert chart_value is engine_value
+        assert frame_watermark(engine_df.iloc[:-1]) != frame_watermark(engine_df)
+        assert frame_watermark(engine_df.iloc[:0]) is None
+
+    def test_completed_candle_invalidates_symbol(self):
+        """Closing a bar drops that symbol's cached indicators"""
+        from data.candle_aggregator import CandleAggregator, Candle
+
+        cache = get_indicator_cache()
+        cache.clear()
+        cache.put('BTCUSDT', '5m', 'rsi', {'period': 14}, 't0', 1)
+        cache.put('ETHUSDT', '5m', 'rsi', {'period': 14}, 't0', 2)
+
+        aggregator = CandleAggregator(['BTCUSDT', 'ETHUSDT'])
+        aggregator._save_to_database = lambda candle: None
+        aggregator._save_to_store = lambda candle: None
+        aggregator._complete_candle('BTCUSDT', Candle(
+            'BTCUSDT', pd.Timestamp('2025-01-01'), 1.0, 1.0, 1.0, 1.0, 1.0, '5m'
+        ))
+
+        assert cache.get('BTCUSDT', '5m', 'rsi', {'period': 14}, 't0') is None
+        assert cache.get('ETHUSDT', '5m', 'rsi', {'period': 14}, 't0') == 2
+
+
+class TestBatchIndicators:
+    """Batched (symbols x time) kernels must match the per-Series implementations"""
+
+    def test_matches_per_symbol_indicators(self, ohlcv_data):
+        """Each matrix row equals calculate_all_indicators on that symbol"""
+        # Skip the flat stretch: pandas rolling std leaves ~1e-8 residue there
+        base = ohlcv_data.iloc[250:]
+        frames = {
+            'BTCUSDT': base,
+            'ETHUSDT': base.assign(close_price=base['close_price'] * 0.05,
+                                   high_price=base['high_price'] * 0.05,
+                                   low_price=base['low_price'] * 0.05),
+            # Shorter history, left-padded with NaN in the matrix
+            'SOLUSDT': base.iloc[300:]
+        }
+        frames = {symbol: frame.set_index('timestamp') for symbol, frame in frames.items()}
+
+        symbols, index, matrices = stack_frames(frames)
+        batch = BatchIndicators.calculate_all_indicators(
+            matrices['close_price'], matrices['high_price'],
+            matrices['low_price'], matrices['volume']
+        )
+
+        for row, symbol in enumerate(symbols):
+            expected = TechnicalIndicators.calculate_all_indicators(frames[symbol])
+            offset = len(index) - len(expected)
+
+            for column, values in batch.items():
+                np.testing.assert_allclose(
+                    values[row, offset:], expected[column].values,
+                    rtol=1e-8, atol=1e-8, err_msg=f"{symbol} {column}"
+                )
+
+
+class TestSelectiveIndicators:
+    """calculate_indicators computes only the requested columns"""
+
+    def test_matches_calculate_all(self, ohlcv_data):
+        """Every column is identical to calculate_all_indicators"""
+        expected = TechnicalIndicators.calculate_all_indicators(ohlcv_data)
+        columns = [c for c in expected.columns if c not in ohlcv_data.columns]
+
+        actual = TechnicalIndicators.calculate_indicators(ohlcv_data, columns)
+
+        pd.testing.assert_frame_equal(actual, expected, check_names=False)
+
+    def test_subset_and_parametric_windows(self, ohlcv_data):
+        """Only requested columns are returned; arbitrary windows resolve"""
+        result = TechnicalIndicators.calculate_indicators(
+            ohlcv_data, ['macd', 'sma_8', 'rsi_21'], include_inputs=False
+        )
+
+        assert list(result.columns) == ['macd', 'sma_8', 'rsi_21']
+        pd.testing.assert_series_equal(
+            result['sma_8'], ohlcv_data['close_price'].rolling(8).mean(), check_names=False
+        )
+
+    def test_unknown_column_raises(self, ohlcv_data):
+        """Unknown names are rejected"""
+        with pytest.raises(ValueError):
+            TechnicalIndicators.calculate_indicators(ohlcv_data, ['not_an_indicator'])
+
+
+class TestIncrementalADX:
+    """Streaming ADX matches Week1Refined5mStrategy.calculate_adx"""
+
+    def test_matches_batch_adx(self, ohlcv_data):
+        from strategies.week1_refined_5m import Week1Refined5mStrategy
+        from strategies.incremental_indicators import IncrementalADX
+
+        expected = Week1Refined5mStrategy().calculate_adx(ohlcv_data)
+        adx = IncrementalADX(14)
+        streamed = [
+            adx.update(row['high_price'], row['low_price'], row['close_price'])
+            for row in ohlcv_data.to_dict('records')
+        ]
+
+        np.testing.assert_allclose(streamed, expected.values, rtol=1e-8, atol=1e-8)
@@ -264,4 +264,187 @@ class TestDataConsistency:
         api_timestamp = datetime.fromisoformat(data["timestamp"].replace('Z', '+00:00'))
         
         # Timestamp should be between before and after times
-        assert before_time <= api_timestamp.replace(tzinfo=None) <= after_time
\ No newline at end of file
+        assert before_time <= api_timestamp.replace(tzinfo=None) <= after_time
+
+class _CandleDirectionStrategy:
+    """Streaming test strategy: long after a higher close, flat after a lower one"""
+
+    name = 'CandleDirection'
+
+    def __init__(self):
+        self.signals = {}
+        self.closes = {}
+
+    def on_candle(self, symbol, candle):
+        previous = self.closes.get(symbol, candle.close_price)
+        self.closes[symbol] = candle.close_price
+        self.signals.setdefault(symbol, []).append(1 if candle.close_price > previous else -1)
+
+    def latest_signal(self, symbol):
+        return self.signals.get(symbol, [0])[-1]
+
+
+class TestLiveReplay:
+    """Historical replay through DataFeedManager -> CandleAggregator -> LiveTradingEngine5m"""
+
+    @pytest.mark.integration
+    def test_ticks_rebuild_candles(self):
+        from strategies.benchmark_indicators import make_candles
+        from trading.live_replay import ReplayCandleAggregator, candle_ticks
+
+        df = make_candles(50, seed=4)
+        aggregator = ReplayCandleAggregator(['BTCUSDT'])
+        for update in candle_ticks(df, 'BTCUSDT'):
+            aggregator.process_price_update(update)
+
+        rebuilt = aggregator.get_candles_as_dataframe('BTCUSDT')
+        assert aggregator.completed == 49  # The last candle is still open
+        assert list(rebuilt.index) == list(df.index[:49])
+        assert (rebuilt.to_numpy() == df.iloc[:49][rebuilt.columns].to_numpy()).all()
+
+    @pytest.mark.integration
+    def test_engine_trades_on_simulated_clock(self):
+        import trading.live_engine_5m as live_engine
+        from datetime import timedelta
+        from strategies.benchmark_indicators import make_candles
+        from trading.live_replay import LiveReplay, frame_to_candles, candle_ticks
+
+        df = make_candles(100, seed=6)
+        replay = LiveReplay(['BTCUSDT'])
+        replay.engine.strategy = _CandleDirectionStrategy()
+        replay.preload(frame_to_candles(df.iloc[:40], 'BTCUSDT'))
+        ticks = list(candle_ticks(df.iloc[40:], 'BTCUSDT'))
+
+        result = replay.run_sync(ticks)
+
+        # Last tick at 59 * 300 + 225s; 30s cycles from 0 through 17,940s
+        assert result['cycles'] == 599 and result['candles'] == 59
+        assert live_engine.datetime is datetime
+        assert result['metrics']['running_time'] == timedelta(seconds=17940)
+
+        # Every candle signal is seen by some cycle, so trades follow its edges
+        signals = [0] + replay.engine.strategy.signals['BTC'][39:]
+        buys = sum(b > 0 >= a for a, b in zip(signals, signals[1:]))
+        sells = sum(b < 0 <= a for a, b in zip(signals, signals[1:]) if a > 0)
+        sides = [trade['side'] for trade in result['trades']]
+        assert sides.count('BUY') == buys > 5 and sides.count('SELL') == sells
+
+        # Fills use the latest replayed tick at the simulated cycle time
+        start = ticks[0].timestamp.replace(tzinfo=None)
+        for trade in result['trades']:
+            offset = (trade['timestamp'] - start).total_seconds()
+            assert offset % 30 == 0
+            tick = [t for t in ticks if t.timestamp.replace(tzinfo=None) <= trade['timestamp']][-1]
+            assert trade['price'] == tick.price
+        assert len(replay.engine.saved_trades) == len(result['trades'])
+
+
+class TestSimulatedExchange:
+    """Matching engine, fees, latency and rate limits of the in-process exchange"""
+
+    def _exchange(self, **kwargs):
+        from trading.simulated_exchange import SimulatedExchange
+        kwargs.setdefault('rate_limit', None)
+        exchange = SimulatedExchange(balances={'USDT': 10000.0, 'BTC': 1.0}, **kwargs)
+        exchange.set_book('BTCUSDT', bids=[(99, 1), (98, 1)], asks=[(100, 1), (101, 1)])
+        return exchange
+
+    @pytest.mark.integration
+    def test_market_buy_walks_the_book(self):
+        import asyncio
+        exchange = self._exchange()
+
+        order = asyncio.run(exchange.place_order('BTCUSDT', 'BUY', 150.0))
+
+        assert order['status'] == 'FILLED'
+        assert [(fill['price'], fill['amount']) for fill in order['fills']] == [(100, 1), (101, pytest.approx(50 / 101))]
+        assert order['fee'] == pytest.approx(0.15)
+        assert exchange.balances['USDT'] == {'free': pytest.approx(10000 - 150.15), 'locked': pytest.approx(0)}
+        assert exchange.balances['BTC']['free'] == pytest.approx(1 + 1 + 50 / 101)
+
+    @pytest.mark.integration
+    def test_partial_fill_when_depth_runs_out(self):
+        import asyncio
+        exchange = self._exchange()
+
+        exchange.set_book('BTCUSDT', bids=[(99, 0.4)], asks=[(100, 1)])
+
+        order = asyncio.run(exchange.place_order('BTCUSDT', 'SELL', 1.0))
+        empty = asyncio.run(exchange.place_order('BTCUSDT', 'SELL', 0.5))
+        too_large = asyncio.run(exchange.place_order('BTCUSDT', 'SELL', 5.0))
+
+        assert order['status'] == 'PARTIALLY_FILLED' and order['filled_amount'] == 0.4
+        assert order['filled_price'] == 99
+        # The unfilled remainder expires and is unlocked
+        assert exchange.balances['BTC'] == {'free': pytest.approx(0.6), 'locked': pytest.approx(0)}
+        assert empty['error'] == 'Insufficient liquidity for BTCUSDT'
+        assert too_large['error'] == 'Insufficient BTC balance'
+        assert exchange.balances['USDT']['free'] == pytest.approx(10000 + 0.4 * 99 * 0.999)
+
+    @pytest.mark.integration
+    def test_limit_order_rests_fills_and_cancels(self):
+        import asyncio
+        exchange = self._exchange(maker_fee=0.0005)
+
+        resting = asyncio.run(exchange.place_order('BTCUSDT', 'BUY', 0.5, price=95.0))
+        other = asyncio.run(exchange.place_order('BTCUSDT', 'BUY', 0.5, price=90.0))
+        assert resting['status'] == other['status'] == 'NEW'
+        assert exchange.balances['USDT']['locked'] == pytest.approx((47.5 + 45) * 1.001)
+
+        exchange.set_book('BTCUSDT', bids=[(93, 5)], asks=[(94, 5)])
+        open_orders = asyncio.run(exchange.get_open_orders('BTCUSDT'))
+        canceled = asyncio.run(exchange.cancel_order(str(other['order_id']), 'BTCUSDT'))
+
+        filled = exchange.orders[resting['order_id']]
+        assert filled.status == 'FILLED' and filled.fills[0] == {'price': 95.0, 'amount': 0.5, 'fee': pytest.approx(47.5 * 0.0005), 'maker': True}
+        assert [order['order_id'] for order in open_orders] == [other['order_id']]
+        assert canceled['status'] == 'CANCELED'
+        assert exchange.balances['USDT'] == {'free': pytest.approx(10000 - 47.5 * 1.0005), 'locked': pytest.approx(0)}
+
+        again = asyncio.run(exchange.cancel_order(str(other['order_id']), 'BTCUSDT'))
+        foreign = asyncio.run(exchange.cancel_order('paper_buy_BTCUSDT_1', 'BTCUSDT'))
+        assert again == {'error': f"Order {other['order_id']} is already CANCELED"}
+        assert foreign == {'error': 'Unknown order paper_buy_BTCUSDT_1'}
+
+    @pytest.mark.integration
+    def test_rate_limit_and_latency(self):
+        import asyncio
+        waits = []
+
+        async def sleep(seconds):
+            waits.append(seconds)
+
+        exchange = self._exchange(rate_limit=5.0, latency_ms=40.0, time_fn=lambda: 0.0, sleep=sleep)
+
+        async def burst():
+            return [await exchange.get_ticker('BTCUSDT') for _ in range(5)] + \
+                [await exchange.place_order('BTCUSDT', 'BUY', 10.0)]
+
+        results = asyncio.run(burst())
+
+        assert all(ticker['price'] == 99.5 for ticker in results[:5])
+        assert results[5] == {'error': 'Rate limit exceeded (429): too many requests'}
+        assert waits == [0.02] * 12
+        assert exchange.stats()['rate_limited'] == 1
+
+    @pytest.mark.integration
+    def test_live_engine_orders_through_replay(self):
+        from strategies.benchmark_indicators import make_candles
+        from trading.simulated_exchange import SimulatedExchange
+        from trading.live_replay import LiveReplay, frame_to_candles, candle_ticks
+
+        df = make_candles(70, seed=6)
+        exchange = SimulatedExchange(balances={'USDT': 10000.0, 'BTC': 1.0}, latency_ms=80.0, seed=1)
+        replay = LiveReplay(['BTCUSDT'], exchange=exchange)
+        replay.engine.strategy = _CandleDirectionStrategy()
+        replay.preload(frame_to_candles(df.iloc[:40], 'BTCUSDT'))
+
+        result = replay.run_sync(candle_ticks(df.iloc[40:], 'BTCUSDT'))
+
+        assert replay.engine.paper_trading is False
+        stats = exchange.stats()
+        assert len(result['trades']) == stats['orders'] > 0
+        assert stats['rate_limited'] == 0 and stats['fees'] > 0
+        # Latency is spent in simulated time, not wall time
+        assert stats['avg_latency_ms'] == pytest.approx(80)
+        assert result['elapsed'] < result['simulated_seconds'] / 100
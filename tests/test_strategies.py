@@ -0,0 +1,683 @@
+"""
+Test suite for trading strategy signal generation
+"""
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from strategies.week1_refined_5m import Week1Refined5mStrategy
+from strategies.benchmark_indicators import make_candles
+from strategies.pivot_zone_strategy import PivotZoneStrategy
+from strategies.benchmark_strategies import (
+    legacy_week1_refined_5m_signals, legacy_pivot_zone_signals, short_columns,
+    legacy_base_backtest, legacy_all_in_backtest, legacy_phase2_backtest,
+    sparse_signals, with_signals, legacy_portfolio_backtest, portfolio_summary, portfolio_inputs
+)
+from strategies.trading_strategies import MomentumStrategy, MeanReversionStrategy, BuyHoldStrategy
+from strategies.phase2_final_test import OptimizedPhase2Strategy
+from strategies.backtest_core import run_target_positions, max_drawdown, run_brackets, bar_ticks
+from strategies.parallel_sweep import SharedArrays, parallel_map
+from strategies.optimize_pivot_zone import (
+    PivotZoneOptimizer, context_arrays, evaluate_combination, _GaussianProcess
+)
+from strategies.walk_forward import WalkForwardOptimizer, walk_forward_folds, slice_context
+from strategies.strategy_comparison import StrategyComparison, BATCH_COLUMNS
+from data.backtest_data import BacktestDataProvider, CandleArrays
+from strategies.monte_carlo import trade_returns, simulate_paths, path_statistics, monte_carlo, analyze_result
+from strategies.portfolio_backtest import PortfolioBacktester
+
+
+@pytest.fixture
+def candles_5m():
+    """Random-walk 5m candles with enough history for the HTF filter"""
+    return make_candles(3000, seed=11)
+
+
+class TestWeek1Refined5mSignals:
+    """Vectorized signal generation must reproduce the row-by-row loop"""
+
+    @pytest.mark.parametrize('seed', [3, 29])
+    def test_identical_to_legacy(self, seed):
+        """Output frame is identical to the .iloc implementation"""
+        data = make_candles(3000, seed=seed)
+
+        expected = legacy_week1_refined_5m_signals(Week1Refined5mStrategy(), data)
+        actual = Week1Refined5mStrategy().generate_signals(data)
+
+        pd.testing.assert_frame_equal(actual, expected)
+
+    def test_tight_stops_identical_to_legacy(self, candles_5m):
+        """Stop-loss / take-profit exits match the loop"""
+        legacy_strategy = Week1Refined5mStrategy()
+        strategy = Week1Refined5mStrategy()
+        for s in (legacy_strategy, strategy):
+            s.stop_loss_pct = 0.002
+            s.take_profit_pct = 0.003
+
+        expected = legacy_week1_refined_5m_signals(legacy_strategy, candles_5m)
+        actual = strategy.generate_signals(candles_5m)
+
+        pd.testing.assert_frame_equal(actual, expected)
+        assert (actual['signal'] == 1).sum() > 0
+
+
+class TestPivotZoneSignals:
+    """Vectorized zone evaluation must reproduce the per-row loop"""
+
+    @pytest.mark.parametrize('use_trend_filter', [True, False])
+    @pytest.mark.parametrize('volume_multiplier', [0.8, 1.2])
+    def test_identical_to_legacy(self, candles_5m, use_trend_filter, volume_multiplier):
+        """Signal, zone and strength columns match for each filter setting"""
+        data = short_columns(candles_5m)
+        legacy_strategy = PivotZoneStrategy()
+        strategy = PivotZoneStrategy()
+        for s in (legacy_strategy, strategy):
+            s.use_trend_filter = use_trend_filter
+            s.min_volume_multiplier = volume_multiplier
+
+        expected = legacy_pivot_zone_signals(legacy_strategy, data)
+        actual = strategy.generate_signals(data)
+
+        pd.testing.assert_frame_equal(actual, expected)
+        assert (actual['signal'] != 0).sum() > 0
+
+    def test_context_reused_across_parameters(self, candles_5m):
+        """One prepared context serves several filter settings"""
+        data = short_columns(candles_5m)
+        strategy = PivotZoneStrategy()
+        context = strategy.prepare_signal_context(data)
+
+        strategy.min_volume_multiplier = 1.5
+        reused = strategy.signals_from_context(context)
+
+        pd.testing.assert_frame_equal(reused, strategy.generate_signals(data))
+
+
+class TestLiveSignalAPI:
+    """on_candle / latest_signal must agree with full-history generate_signals"""
+
+    def test_week1_refined_streaming_matches_batch(self, candles_5m):
+        """Per-candle signals equal the batch signal column"""
+        batch_strategy = Week1Refined5mStrategy()
+        live_strategy = Week1Refined5mStrategy()
+        for s in (batch_strategy, live_strategy):
+            s.stop_loss_pct = 0.002
+            s.take_profit_pct = 0.003
+
+        expected = batch_strategy.generate_signals(candles_5m)['signal'].tolist()
+        streamed = [live_strategy.on_candle('BTCUSDT', row) for row in candles_5m.to_dict('records')]
+
+        assert streamed == expected
+        assert live_strategy.latest_signal('BTCUSDT') == expected[-1]
+
+    def test_week1_refined_state_is_per_symbol(self, candles_5m):
+        """Interleaved symbols keep independent position and cooldown state"""
+        other = make_candles(len(candles_5m), seed=5)
+        strategy = Week1Refined5mStrategy()
+
+        btc, eth = [], []
+        for a, b in zip(candles_5m.to_dict('records'), other.to_dict('records')):
+            btc.append(strategy.on_candle('BTCUSDT', a))
+            eth.append(strategy.on_candle('ETHUSDT', b))
+
+        assert btc == Week1Refined5mStrategy().generate_signals(candles_5m)['signal'].tolist()
+        assert eth == Week1Refined5mStrategy().generate_signals(other)['signal'].tolist()
+
+    def test_generate_signals_does_not_leak_cooldown(self, candles_5m):
+        """Repeated calls on one instance give the same result"""
+        strategy = Week1Refined5mStrategy()
+        first = strategy.generate_signals(candles_5m)
+        second = strategy.generate_signals(candles_5m)
+
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_phase2_streaming_matches_batch(self, candles_5m):
+        """OptimizedPhase2Strategy per-candle signals equal generate_signals"""
+        from strategies.phase2_final_test import OptimizedPhase2Strategy
+
+        strategy = OptimizedPhase2Strategy()
+        expected = strategy.generate_signals(candles_5m).tolist()
+        streamed = [strategy.on_candle('BTC', row) for row in candles_5m.to_dict('records')]
+
+        assert streamed == expected
+
+    def test_ai_enhanced_latest_signal_matches_batch(self, candles_5m):
+        """Fused latest_signal equals the last generate_signals value"""
+        ai = pytest.importorskip('strategies.ai_enhanced_strategy')
+        from datetime import datetime
+
+        strategy = ai.AIEnhancedStrategy()
+        strategy.sentiment_cache['BTC'] = (0.5, datetime.now())
+        records = candles_5m.to_dict('records')
+
+        for i, record in enumerate(records[:400]):
+            strategy.on_candle('BTC', record)
+            if i >= 100 and i % 25 == 0:
+                expected = strategy.generate_signals(candles_5m.iloc[:i + 1], symbol='BTC').iloc[-1]
+                assert strategy.latest_signal('BTC') == expected
+
+
+class TestAIEnhancedFusion:
+    """Array fusion of technical, LSTM and sentiment components"""
+
+    @pytest.fixture
+    def strategy_cls(self):
+        return pytest.importorskip('strategies.ai_enhanced_strategy').AIEnhancedStrategy
+
+    def test_matches_weighted_row_loop(self, strategy_cls, candles_5m):
+        """Every row equals the weighted sum thresholded at +/-0.3"""
+        from datetime import datetime
+
+        strategy = strategy_cls()
+        strategy.sentiment_cache['BTC'] = (0.5, datetime.now())
+        technical = strategy.technical_strategy.generate_signals(candles_5m)
+        lstm = strategy.get_lstm_signal(candles_5m, 'BTC')
+
+        expected = []
+        for value in technical:
+            combined = 0.4 * value + 0.3 * lstm + 0.3 * 0.5
+            expected.append(1.0 if combined > 0.3 else -1.0 if combined < -0.3 else 0.0)
+
+        actual = strategy.generate_signals(candles_5m, symbol='BTC')
+
+        assert actual.tolist() == expected
+        assert actual.index.equals(candles_5m.index)
+
+    def test_tail_rows_match_full_window(self, strategy_cls, candles_5m):
+        """Scoring only the trailing rows gives the same values"""
+        from datetime import datetime
+
+        strategy = strategy_cls()
+        strategy.sentiment_cache['BTC'] = (-0.2, datetime.now())
+
+        full = strategy.generate_signals(candles_5m, symbol='BTC')
+        tail = strategy.generate_signals(candles_5m, symbol='BTC', tail_rows=50)
+
+        pd.testing.assert_series_equal(tail, full.iloc[-50:])
+
+    def test_configurable_thresholds(self, strategy_cls, candles_5m):
+        """Unreachable thresholds produce only HOLD"""
+        from datetime import datetime
+
+        strategy = strategy_cls(buy_threshold=2.0, sell_threshold=-2.0)
+        strategy.sentiment_cache['BTC'] = (1.0, datetime.now())
+
+        assert (strategy.generate_signals(candles_5m, symbol='BTC') == 0.0).all()
+
+
+class TestSignalFrame:
+    """Adapters turn every strategy output into the same columnar container"""
+
+    def test_from_week1_frame(self, candles_5m):
+        """DataFrame output keeps levels (unset -> NaN) and indicator columns"""
+        from strategies.signal_frame import SignalFrame
+
+        signals = Week1Refined5mStrategy().generate_signals(candles_5m)
+        frame = SignalFrame.from_frame(signals)
+
+        np.testing.assert_array_equal(frame.signal, signals['signal'].to_numpy(dtype=float))
+        assert np.isnan(frame.stop_loss[signals['stop_loss'] == 0]).all()
+        np.testing.assert_array_equal(frame.extras['rsi'], signals['rsi'].to_numpy())
+        assert frame.latest()['signal'] == float(signals['signal'].iloc[-1])
+
+    def test_from_phase2_series(self, candles_5m):
+        """Series output maps to signal with strength |signal|"""
+        from strategies.phase2_final_test import OptimizedPhase2Strategy
+
+        strategy = OptimizedPhase2Strategy()
+        frame = strategy.generate_signal_frame(candles_5m)
+        expected = strategy.generate_signals(candles_5m).to_numpy()
+
+        np.testing.assert_array_equal(frame.signal, expected)
+        np.testing.assert_array_equal(frame.strength, np.abs(expected))
+        assert frame.index.equals(candles_5m.index)
+
+    def test_from_week2_v2_records(self, candles_5m):
+        """Event records are placed on their candles with prices and levels"""
+        from strategies.optimized_strategy_week2_v2 import OptimizedStrategyWeek2V2
+
+        data = candles_5m.reset_index(names='timestamp')
+        strategy = OptimizedStrategyWeek2V2()
+        strategy.volume_multiplier = 0.5
+        frame = strategy.generate_signal_frame(data)
+
+        # generate_signals advances the cooldown index; rerun from scratch
+        strategy.last_trade_index = -100
+        records = strategy.generate_signals(data)
+        assert records
+
+        rows = frame.events()
+        assert len(rows) == len(records)
+        for row, record in zip(rows, records):
+            assert data['timestamp'].iloc[row] == record['timestamp']
+            assert frame.price[row] == record['price']
+        buys = frame.signal == 1.0
+        assert np.isfinite(frame.stop_loss[buys]).all()
+        assert np.isfinite(frame.extras['tp2'][buys]).all()
+
+    def test_as_signal_frame_scalar(self, candles_5m):
+        """Streaming scalar signals become a one-row frame on the last candle"""
+        from strategies.signal_frame import as_signal_frame
+
+        frame = as_signal_frame(-1.0, candles_5m.index)
+
+        assert len(frame) == 1
+        assert frame.latest()['timestamp'] == candles_5m.index[-1]
+        assert frame.latest()['signal'] == -1.0
+
+
+class TestBacktestCore:
+    """Array backtest kernels must reproduce the per-row backtest loops"""
+
+    @pytest.mark.parametrize('strategy_cls', [MomentumStrategy, MeanReversionStrategy, BuyHoldStrategy])
+    def test_target_positions_match_iterrows(self, strategy_cls, candles_5m):
+        signals = sparse_signals(candles_5m.index, density=0.05)
+
+        expected = legacy_base_backtest(with_signals(strategy_cls(), signals), candles_5m)
+        actual = with_signals(strategy_cls(), signals).backtest(candles_5m)
+
+        assert len(expected['trades']) > 1
+        assert actual['trades'] == expected['trades']
+        assert actual['portfolio_values'] == expected['portfolio_values']
+
+    def test_value_dependent_sizing_matches_iterrows(self, candles_5m):
+        """Without an array rule, get_position_size sees the current portfolio value"""
+        class CappedMomentum(MomentumStrategy):
+            def get_position_size(self, signal, current_price, portfolio_value):
+                # Stops trading after a 0.1% loss
+                return 0.0 if portfolio_value < 9990 else super().get_position_size(signal, current_price, portfolio_value)
+
+            def position_sizes(self, signals, prices, portfolio_value):
+                return None
+
+        signals = sparse_signals(candles_5m.index, density=0.05)
+        expected = legacy_base_backtest(with_signals(CappedMomentum(), signals), candles_5m)
+        actual = with_signals(CappedMomentum(), signals).backtest(candles_5m)
+
+        assert 1 < len(expected['trades']) < len(with_signals(MomentumStrategy(), signals).backtest(candles_5m)['trades'])
+        assert actual['trades'] == expected['trades']
+        assert actual['portfolio_values'] == expected['portfolio_values']
+
+    @pytest.mark.parametrize('strategy_cls', [MomentumStrategy, MeanReversionStrategy, BuyHoldStrategy])
+    def test_position_sizes_match_get_position_size(self, strategy_cls):
+        strategy = strategy_cls()
+        signals = pd.Series(np.linspace(-1, 1, 41))
+        expected = [strategy.get_position_size(signal, 100.0, 10000.0) for signal in signals]
+        assert strategy.position_sizes(signals, np.full(41, 100.0), 10000.0).tolist() == expected
+
+    def test_week1_refined_5m_matches_loop(self, candles_5m):
+        strategy = Week1Refined5mStrategy()
+        strategy.stop_loss_pct = 0.002
+        strategy.take_profit_pct = 0.003
+        signals = strategy.generate_signals(candles_5m)
+
+        expected = legacy_all_in_backtest(signals)
+        actual = with_signals(Week1Refined5mStrategy(), signals).backtest(candles_5m)
+
+        assert len(expected['trades']) > 2
+        assert actual['trades'] == expected['trades']
+        assert actual['equity_curve'] == expected['equity_curve']
+
+    def test_phase2_stop_loss_matches_loop(self, candles_5m):
+        """Stop-outs (including same-candle re-entries) match the iterrows loop"""
+        data = candles_5m.copy()
+        data['close_price'] = data['close_price'] * np.linspace(1.0, 0.2, len(data))
+        signals = pd.Series(0.2, index=data.index)
+        signals.iloc[::400] = -1.0
+
+        expected = legacy_phase2_backtest(with_signals(OptimizedPhase2Strategy(), signals), data)
+        actual = with_signals(OptimizedPhase2Strategy(), signals).backtest(data)
+
+        assert 'STOP_LOSS' in {t['type'] for t in expected['trades']}
+        assert actual['trades'] == expected['trades']
+        np.testing.assert_array_equal(actual['portfolio_values'], expected['portfolio_values'])
+        assert actual['final_value'] == expected['final_value']
+
+    def test_min_trade_size_and_fees(self):
+        """Drift below the minimum trade size does not rebalance; fees come out of cash"""
+        close = np.array([100.0, 100.5, 101.0, 110.0])
+        result = run_target_positions(close, np.full(4, 0.5), initial_capital=1000, fee_rate=0.001)
+
+        assert result.trades['index'].tolist() == [0, 3]
+        assert result.trades['cash'][0] == pytest.approx(500 - 0.5)
+        assert result.max_drawdown == max_drawdown(result.equity)
+
+
+class TestIntrabarFills:
+    """Stop / target resolution inside a candle"""
+
+    # Entry at 100 on candle 0; stop 95, target 110
+    close = np.array([100.0, 101.0, 102.0, 103.0])
+    signal = np.array([1.0, 0.0, 0.0, 0.0])
+
+    def _run(self, open_, high, low, **kwargs):
+        return run_brackets(
+            self.close, self.signal, np.full(4, 1.0), 0.05, 0.10, initial_capital=1000,
+            open_=np.array(open_), high=np.array(high), low=np.array(low), **kwargs
+        )
+
+    def test_close_fill_misses_wick(self):
+        """A wick through the stop only fills with the intrabar model"""
+        ohlc = ([100.0, 100.0, 101.0, 102.0], [100.0, 101.5, 102.5, 103.5], [100.0, 94.0, 100.5, 101.5])
+
+        assert self._run(*ohlc, fill='close').trades['kind'].tolist() == ['BUY']
+
+        intrabar = self._run(*ohlc, fill='intrabar')
+        assert intrabar.trades['kind'].tolist() == ['BUY', 'STOP_LOSS']
+        assert intrabar.trades['price'][1] == pytest.approx(95.0)
+
+    def test_gap_fills_at_open(self):
+        result = self._run([100.0, 93.0, 101.0, 102.0], [100.0, 101.5, 102.5, 103.5],
+                           [100.0, 92.0, 100.5, 101.5], fill='intrabar')
+
+        assert result.trades['kind'][1] == 'STOP_LOSS'
+        assert result.trades['price'][1] == 93.0
+
+    @pytest.mark.parametrize('same_bar, expected', [
+        ('stop_first', 'STOP_LOSS'), ('target_first', 'TAKE_PROFIT'), ('open_distance', 'TAKE_PROFIT')
+    ])
+    def test_same_bar_ordering(self, same_bar, expected):
+        """Candle 1 crosses both levels; its open sits nearer the high"""
+        result = self._run([100.0, 108.0, 101.0, 102.0], [100.0, 111.0, 102.5, 103.5],
+                           [100.0, 94.0, 100.5, 101.5], fill='intrabar', same_bar=same_bar)
+
+        assert result.trades['kind'][1] == expected
+
+    def test_tick_replay_uses_polled_prices(self):
+        """With ticks, only polled prices trigger and fill (like the live stop checks)"""
+        ohlc = ([100.0, 100.0, 101.0, 102.0], [100.0, 111.0, 102.5, 103.5], [100.0, 90.0, 100.5, 101.5])
+        ticks = (np.array([1, 1, 1, 2]), np.array([99.0, 94.5, 96.0, 101.0]))
+
+        result = self._run(*ohlc, ticks=ticks)
+
+        assert result.trades['kind'].tolist() == ['BUY', 'STOP_LOSS']
+        assert result.trades['index'].tolist() == [0, 1]
+        assert result.trades['price'][1] == 94.5
+
+    def test_bar_ticks_assigns_candles(self):
+        bars = pd.date_range('2024-01-01', periods=3, freq='5min')
+        tick_times = bars[0] + pd.to_timedelta([-30, 30, 300, 330, 900], unit='s')
+
+        tick_bar, tick_price = bar_ticks(bars, tick_times, [1.0, 2.0, 3.0, 4.0, 5.0])
+
+        assert tick_bar.tolist() == [0, 1, 1, 2]
+        assert tick_price.tolist() == [2.0, 3.0, 4.0, 5.0]
+
+
+class TestParallelSweep:
+    """Shared-memory sweeps must match serial backtests"""
+
+    def test_shared_arrays_attach_read_only(self):
+        values = np.arange(10, dtype=float)
+
+        with SharedArrays({'close': values}, meta={'symbol': 'BTC'}) as shared:
+            arrays, blocks = SharedArrays.attach(shared.spec)
+
+            np.testing.assert_array_equal(arrays['close'], values)
+            with pytest.raises(ValueError):
+                arrays['close'][0] = 1.0
+            for block in blocks:
+                block.close()
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_sweep_matches_serial_backtest(self, candles_5m, workers):
+        data = short_columns(candles_5m)
+        grid = [
+            {'min_volume_multiplier': volume, 'stop_loss_pct': 0.01, 'take_profit_pct': 0.02,
+             'use_trend_filter': trend, 'ma_trend_period': 20}
+            for volume in (0.8, 1.2) for trend in (True, False)
+        ]
+        meta = {'symbol': 'TEST', 'lookback_days': 10, 'initial_capital': 10000, 'tz': None}
+
+        with SharedArrays(context_arrays(PivotZoneStrategy().prepare_signal_context(data)), meta) as shared:
+            results = list(parallel_map(evaluate_combination, grid, shared, workers=workers))
+
+        assert len(results) == len(grid)
+        for result in results:
+            strategy = PivotZoneStrategy()
+            for name, value in result['parameters'].items():
+                setattr(strategy, name, value)
+            expected = strategy.backtest(symbol='TEST', lookback_days=10, data=data)
+
+            assert result['final_value'] == expected['final_value']
+            assert result['trades'] == expected['trades']
+
+
+class TestWalkForward:
+    """Walk-forward folds, fold slicing and stitched out-of-sample equity"""
+
+    def test_folds_tile_history(self):
+        index = pd.date_range('2024-01-01', periods=288 * 20, freq='5min')
+
+        folds = walk_forward_folds(index, train_days=6, test_days=2)
+
+        assert len(folds) == 7
+        assert folds[0] == (0, 288 * 6, 288 * 6, 288 * 8)
+        for (_, _, _, stop), (_, _, start, _) in zip(folds, folds[1:]):
+            assert stop == start
+        assert folds[-1][3] == len(index)
+        assert all(train_start == 0 for train_start, _, _, _ in walk_forward_folds(index, 6, 2, anchored=True))
+
+    def test_sliced_context_keeps_warm_up(self):
+        """Slices past the warm-up period signal exactly like the full context"""
+        data = short_columns(make_candles(288 * 6, seed=3))
+        strategy = PivotZoneStrategy()
+        strategy.use_trend_filter = False
+        context = strategy.prepare_signal_context(data)
+        full = strategy.signals_from_context(context)
+
+        for start, stop in ((250, 600), (288 * 2, 288 * 5)):
+            sliced = strategy.signals_from_context(slice_context(context, start, stop))
+            pd.testing.assert_frame_equal(sliced, full.iloc[start:stop])
+        assert (full['signal'].iloc[250:600] != 0).any()
+
+        nested = slice_context(slice_context(context, 100, 900), 150, 500)
+        assert nested['offset'] == 250
+        pd.testing.assert_frame_equal(strategy.signals_from_context(nested), full.iloc[250:600])
+
+    def test_fold_backtest_uses_sliced_context(self):
+        data = short_columns(make_candles(288 * 12, seed=5))
+        strategy = PivotZoneStrategy()
+        context = strategy.prepare_signal_context(data)
+
+        sliced = slice_context(context, 288 * 4, 288 * 8)
+        assert sliced['zone_bottom'].shape == (len(strategy.ZONE_PAIRS), 288 * 4)
+        np.testing.assert_array_equal(sliced['ma200'], context['ma200'][288 * 4:288 * 8])
+
+        grid = {'min_volume_multiplier': [0.8, 1.2], 'stop_loss_pct': [0.01], 'take_profit_pct': [0.02],
+                'use_trend_filter': [False]}
+        report = WalkForwardOptimizer(grid, train_days=4, test_days=2).run(data=data, workers=1)
+
+        folds = walk_forward_folds(data.index, 4, 2)
+        assert len(report['folds']) == len(folds)
+        traded = [fold for fold in report['folds'] if 'out_of_sample' in fold]
+        assert traded
+        assert report['equity_curve'].iloc[0] == 10000
+        assert report['equity_curve'].index.is_monotonic_increasing
+
+        fold = traded[0]
+        _, _, test_start, test_stop = folds[fold['fold']]
+        expected = PivotZoneStrategy()
+        for name, value in fold['parameters'].items():
+            setattr(expected, name, value)
+        result = expected.backtest(context=slice_context(context, test_start, test_stop))
+        assert fold['out_of_sample']['final_value'] == result['final_value']
+
+
+class TestAdaptiveOptimizer:
+    """Successive halving and surrogate refinement"""
+
+    def test_gaussian_process_interpolates(self):
+        x = np.linspace(0, 1, 8)[:, None]
+        y = np.sin(3 * x[:, 0])
+
+        gp = _GaussianProcess(noise=1e-6).fit(x, y)
+        mean, std = gp.predict(x)
+
+        np.testing.assert_allclose(mean, y, atol=1e-3)
+        assert np.all(std < 0.05)
+        # Far from the data the prior (the score spread) comes back
+        assert gp.predict(np.array([[5.0]]))[1][0] > 0.9 * y.std()
+
+    def test_halving_returns_full_length_results(self, candles_5m):
+        data = short_columns(candles_5m)
+        optimizer = PivotZoneOptimizer()
+        optimizer.param_grid = {
+            'min_volume_multiplier': [0.8, 1.0, 1.2, 1.5],
+            'stop_loss_pct': [0.01, 0.02],
+            'take_profit_pct': [0.02, 0.04],
+            'use_trend_filter': [False]
+        }
+
+        results = optimizer.optimize_adaptive(eta=2, rungs=2, surrogate_trials=4, workers=1, data=data, seed=1)
+
+        assert results
+        scores = [result['score'] for result in results]
+        assert scores == sorted(scores, reverse=True)
+
+        strategy = PivotZoneStrategy()
+        for name, value in results[0]['parameters'].items():
+            setattr(strategy, name, value)
+        expected = strategy.backtest(data=data)
+        assert results[0]['final_value'] == expected['final_value']
+        assert results[0]['score'] == optimizer._calculate_score(expected)
+
+
+class _SyntheticProvider(BacktestDataProvider):
+    """Serves make_candles output ending now instead of querying the database"""
+
+    def _query(self, symbol, timeframe, start_ns, end_ns, session):
+        if symbol == 'MISSING/USDT':
+            return CandleArrays.empty(symbol, timeframe)
+        candles = short_columns(make_candles(3000, seed=11))
+        timestamps = pd.date_range(end=pd.Timestamp.now(tz='UTC').floor('5min'), periods=len(candles), freq='5min')
+        return CandleArrays(symbol, timeframe, timestamps.as_unit('ns').asi8,
+                            *(candles[column].to_numpy() for column in ('open', 'high', 'low', 'close', 'volume'))
+                            ).between(start_ns, end_ns)
+
+
+class TestStrategyComparisonBatch:
+    """Batch comparison over symbols x strategies x lookbacks"""
+
+    def test_batch_table(self, monkeypatch, tmp_path):
+        provider = _SyntheticProvider(cache_dir=None)
+        monkeypatch.setattr('strategies.strategy_comparison.get_backtest_data_provider', lambda: provider)
+        output = tmp_path / 'comparison.csv'
+
+        table = StrategyComparison().run_batch(['BTC/USDT', 'MISSING/USDT'], ['PivotZone'], [5, 10],
+                                               workers=1, output=str(output))
+
+        assert list(table.columns) == BATCH_COLUMNS
+        assert list(zip(table['symbol'], table['lookback_days'])) == [
+            ('BTC/USDT', 5), ('BTC/USDT', 10), ('MISSING/USDT', 5), ('MISSING/USDT', 10)
+        ]
+        assert table['error'].iloc[:2].isna().all()
+        assert table['error'].iloc[2] == 'No data found for MISSING/USDT'
+        assert (table['seconds'] >= 0).all()
+        assert len(pd.read_csv(output)) == 4
+
+        row = table.iloc[1]
+        data = provider.get('BTC/USDT', row['first_candle'], row['last_candle']).to_frame(style='both', index=False)
+        expected = PivotZoneStrategy().backtest(data=data)
+        assert row['candles'] == len(data)
+        assert row['final_value'] == expected['final_value']
+
+
+class TestMonteCarlo:
+    """Resampled trade sequences"""
+
+    def test_trade_returns_chain_to_final_value(self, candles_5m):
+        result = PivotZoneStrategy().backtest(data=short_columns(candles_5m))
+
+        returns = trade_returns(result['trades'], 10000)
+
+        assert len(returns) == result['total_trades']
+        assert np.prod(1 + returns) * 10000 == pytest.approx(result['final_value'])
+
+    def test_path_statistics(self):
+        stats = path_statistics(np.array([[0.1, -0.5, 0.2], [-0.1, -0.1, 0.0]]))
+
+        np.testing.assert_allclose(stats['total_return'], [1.1 * 0.5 * 1.2 - 1, 0.81 - 1])
+        np.testing.assert_allclose(stats['max_drawdown'], [-0.5, -0.19])
+        np.testing.assert_allclose(stats['min_equity'], [0.55, 0.81])
+
+    def test_permute_keeps_final_return(self):
+        returns = np.array([0.05, -0.02, 0.03, -0.04, 0.01])
+
+        paths = simulate_paths(returns, 100, 'permute', np.random.default_rng(0))
+        report = monte_carlo(returns, n_paths=100, method='permute', seed=0)
+
+        assert paths.shape == (100, 5)
+        np.testing.assert_allclose(np.sort(paths, axis=1), np.tile(np.sort(returns), (100, 1)))
+        assert report['total_return'][5] == pytest.approx(report['total_return'][95])
+
+    def test_bootstrap_ruin_and_loss(self):
+        report = monte_carlo([0.1, -0.3], n_paths=4000, ruin_drawdown=0.5, seed=3)
+
+        assert report['paths'] == 4000
+        assert 0 < report['probability_of_ruin'] < report['probability_of_loss'] < 100
+        assert report['max_drawdown'][5] <= report['max_drawdown'][95] <= 0
+        assert analyze_result({'trades': [], 'initial_capital': 1}) == {'error': 'No closed trades'}
+
+    def test_week2_result_uses_its_initial_capital(self, monkeypatch):
+        """Week 2 v2 reports total_return as a fraction; the base comes from initial_capital"""
+        import strategies.optimized_strategy_week2_v2 as week2_v2
+        from types import SimpleNamespace
+
+        candles = make_candles(6000, seed=2).rename_axis('timestamp').reset_index()
+        monkeypatch.setattr(week2_v2, 'get_backtest_data_provider',
+                            lambda: SimpleNamespace(get_frame=lambda *args, **kwargs: candles))
+        result = week2_v2.OptimizedStrategyWeek2V2().backtest(None, days=30, initial_capital=5000)
+
+        assert result['trades'] and result['initial_capital'] == 5000
+        report = analyze_result(result, n_paths=200, method='permute', seed=0)
+        assert report['total_return'][50] == pytest.approx(result['total_return'] * 100)
+
+        with pytest.raises(ValueError):
+            analyze_result({key: value for key, value in result.items() if key != 'initial_capital'})
+
+
+class TestPortfolioBacktest:
+    """Event-jumping portfolio replay must match a PortfolioManager candle loop"""
+
+    @pytest.fixture
+    def universe(self):
+        close, signal, symbols = portfolio_inputs(2000, symbols=4)
+        # Hold symbols 0 and 2 through a crash / rally so stops and targets fire
+        signal[:, [0, 2]] = 0.0
+        signal[10, [0, 2]] = 1.0
+        close[200:, 0] *= np.r_[np.linspace(1, 0.7, 200), np.full(1600, 0.7)]
+        close[200:, 2] *= np.r_[np.linspace(1, 1.5, 200), np.full(1600, 1.5)]
+        close[100:160, 1] = np.nan  # Gap in one symbol's candles
+        close[:50, 3] = np.nan      # Late listing
+        return close, signal, symbols
+
+    def test_matches_portfolio_manager_loop(self, universe):
+        expected = legacy_portfolio_backtest(*universe)
+        result = PortfolioBacktester().run(*universe)
+        actual = portfolio_summary(result)
+
+        assert len(expected['trades']) > 20
+        assert {trade[4] for trade in expected['trades']} == {'SIGNAL', 'STOP_LOSS', 'TAKE_PROFIT'}
+        assert actual['trades'] == expected['trades']
+        np.testing.assert_allclose(actual['equity'], expected['equity'], atol=0.02)
+
+    def test_max_positions(self, universe):
+        result = PortfolioBacktester(max_positions=1).run(*universe)
+
+        assert (np.count_nonzero(result.holdings > 0, axis=1) <= 1).all()
+        assert len(result.trades) > 0
+
+    def test_attribution_sums_to_pnl(self, universe):
+        result = PortfolioBacktester().run(*universe)
+        attribution = result.attribution
+
+        assert list(attribution['symbol']) == universe[2]
+        assert attribution['trades'].sum() == sum(trade['side'] == 'SELL' for trade in result.trades)
+        assert (attribution['realized_pnl'] + attribution['unrealized_pnl']).sum() == \
+            pytest.approx(result.final_value - result.initial_capital)
+        assert ((result.exposure >= 0) & (result.exposure <= 1)).all()